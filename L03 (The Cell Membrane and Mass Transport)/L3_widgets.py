@@ -11,8 +11,16 @@ VoltageClampWidget().display()
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
-from ipywidgets import interact, IntSlider, FloatSlider
+from ipywidgets import IntSlider, FloatSlider
+
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools import linear_ode
+from sscp_tools.widget_runtime import interact_async
 
 
 class VoltageClampWidget:
@@ -34,17 +42,17 @@ class VoltageClampWidget:
     def dV_dt(self, t, V):
         return -self.I_app(t, V)/self.Cm
 
-    def solve_and_plot(self, Cm, Rs):
+    def solve(self, Cm, Rs):
         self.Cm = Cm
         self.Rs = Rs
-        T = (0, 10)
         t = np.linspace(0, 10, 101)
         V0 = (-80,)
-        solution = solve_ivp(self.dV_dt, T, V0, t_eval=t, max_step=0.01)
-        
-        t = solution.t
-        V, = solution.y
+        # Linear between the steps of the target potential, so solved exactly
+        V = linear_ode.solve(self.dV_dt, V0, t, breaks=[2, 6], tfirst=True)[:, 0]
+        return t, V, self.I_cap(t, V)
 
+    def plot(self, result, Cm, Rs):
+        t, V, I_cap = result
         f, (ax1, ax2) = plt.subplots(2, 1, sharex=True)
 
         # Potential Plot
@@ -55,14 +63,17 @@ class VoltageClampWidget:
         ax1.legend()
 
         # I_cap plot
-        ax2.plot(t, self.I_cap(t, V))
+        ax2.plot(t, I_cap)
         ax2.set_ylabel('Cap. current')
         ax2.set_xlabel('Time [ms]')
         ax2.axis((0, 10, -5, 5))
         plt.show()
+
+    def solve_and_plot(self, Cm, Rs):
+        self.plot(self.solve(Cm, Rs), Cm, Rs)
         
     def display(self):
-        widget = interact(self.solve_and_plot,
+        widget = interact_async(self.solve, self.plot,
                           Cm = FloatSlider(value=0.05, min=0.005, max=0.1, step=0.005),  
                           Rs = IntSlider(value=10, min=5, max=20, step=1))
 
@@ -85,18 +96,18 @@ class MembraneWidget():
         E_Na, E_Ca, E_K = self.E_Na, self.E_Ca, self.E_K
         return -(g_Na*(V-E_Na) + g_K*(V - E_K) + g_Ca*(V - E_Ca))/self.Cm
 
-    def solve_and_plot(self, g_Na, g_Ca, g_K):
+    def solve(self, g_Na, g_Ca, g_K):
         self.g_Na = g_Na*1e-3
         self.g_Ca = g_Ca*1e-3
         self.g_K = g_K*1e-3
 
-        T = (0, 20)
+        t = np.linspace(0, 20, 201)
         V0 = (0,)
-        solution = solve_ivp(self.dV_dt, T, V0, max_step=0.5)
-        
-        t = solution.t
-        V, = solution.y
+        V = linear_ode.solve(self.dV_dt, V0, t, tfirst=True)[:, 0]
+        return t, V
 
+    def plot(self, result, g_Na, g_Ca, g_K):
+        t, V = result
         plt.plot(t, V, linewidth=2.0)
         plt.title(f"Potential after 20 ms: {V[-1]:.1f} mV")
         plt.axhline(114, alpha=0.5, color='black', linestyle='--')
@@ -108,8 +119,11 @@ class MembraneWidget():
         plt.xticks(range(0, 25, 5))
         plt.show()
 
+    def solve_and_plot(self, g_Na, g_Ca, g_K):
+        self.plot(self.solve(g_Na, g_Ca, g_K), g_Na, g_Ca, g_K)
+
     def display(self):
-        widget = interact(self.solve_and_plot,
+        widget = interact_async(self.solve, self.plot,
                           g_Na = IntSlider(value=5, min=0, max=30, step=1),
                           g_Ca = IntSlider(value=5, min=0, max=30, step=1),
                           g_K  = IntSlider(value=5, min=0, max=30, step=1))
@@ -1,7 +1,18 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from ipywidgets import interact, IntSlider, FloatSlider
+from ipywidgets import IntSlider, FloatSlider
 from scipy.integrate import odeint
+from collections import namedtuple
+
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools import linear_ode
+from sscp_tools.phase_plane import PhasePlane
+from sscp_tools.widget_runtime import interact_async, cancellable
 
 ########################################################
 ####################   Exercise 1   #################### 
@@ -11,7 +22,7 @@ class GatingWidget():
     """A widget solving the gating equation dm/dt = a*(1-m) -m*b."""
 
     def __init__(self):
-        interact(self.solve_and_plot,
+        interact_async(self.solve, self.plot,
                  m0 = FloatSlider(value=0, min=0.0, max=1, step=0.1, continuous_update=False),  
                  a = FloatSlider(value=1, min=0.0, max=10, step=0.1, continuous_update=False),  
                  b = FloatSlider(value=1, min=0.0, max=10, step=0.1, continuous_update=False))
@@ -19,32 +30,42 @@ class GatingWidget():
     def dm_dt(self, m, t):
         return self.a*(1-m) - self.b*m
 
-    def solve_and_plot(self, m0, a, b):
+    def solve(self, m0, a, b):
 
         self.a = a
         self.b = b
         self.m0 = m0
         time = np.arange(0, 1, 0.01)
-        m = odeint(self.dm_dt, self.m0, time)
-        m = m[:, 0]
+        # The gating equation is linear, so it is solved exactly
+        m = linear_ode.solve(self.dm_dt, self.m0, time)
+        return time, m[:, 0]
 
+    def plot(self, result, m0, a, b):
+        time, m = result
         plt.plot(time, m, time, 0*time + a/(a+b))
         plt.xlabel('Time [ms]')
         plt.legend((r'$m(t)$',r'$m_{\infty}$'));
         plt.ylim(0, 1)
         plt.show()
 
+    def solve_and_plot(self, m0, a, b):
+        self.plot(self.solve(m0, a, b), m0, a, b)
+
 ########################################################
 ####################   Exercise 2   #################### 
 ########################################################
 
 
 
-def plot_voltage_dependence(Va0, da, Vb0, db):
-    
+def voltage_dependence_curves(Va0, da, Vb0, db):
     V = np.linspace(-100, 100, num=1000)
     a = np.exp((V-Va0)/da)
     b = np.exp((V-Vb0)/db)
+    return V, a, b
+
+
+def plot_voltage_dependence_curves(result, Va0, da, Vb0, db):
+    V, a, b = result
 
     plt.rcParams["figure.figsize"] = (12,5)
     plt.rcParams["font.size"] = 16
@@ -61,8 +82,13 @@ def plot_voltage_dependence(Va0, da, Vb0, db):
     plt.show()
 
 
+def plot_voltage_dependence(Va0, da, Vb0, db):
+    plot_voltage_dependence_curves(voltage_dependence_curves(Va0, da, Vb0, db), Va0, da, Vb0, db)
+
+
 def voltage_dependence():    
-    interact(plot_voltage_dependence,  Va0=(-100, 100), da=(1,100), Vb0=(-100, 100), db=(-100,-1))
+    interact_async(voltage_dependence_curves, plot_voltage_dependence_curves,
+                   Va0=(-100, 100), da=(1,100), Vb0=(-100, 100), db=(-100,-1))
 
 ########################################################
 ####################   Exercise 3   #################### 
@@ -90,25 +116,32 @@ class ConstantConductancesWidget():
     def dV_dt(self, V, t):
         return (-self.I_app(t)-self.I_Na(V)-self.I_K(V))/self.Cm
 
-    def solve_and_plot(self, V0, I_amp, gNa, gK):
+    def solve(self, V0, I_amp, gNa, gK):
         self.V0 = V0;
         self.I_amp = I_amp
         self.gNa = gNa
         self.gK = gK
         time = np.arange(0, 2, 0.01)
 
-        V = odeint(self.dV_dt, V0, time)
-        V = V[:, 0]
+        # Linear with a stimulus that stops at t = 1, solved exactly on either side
+        V = linear_ode.solve(self.dV_dt, V0, time, breaks=[1.0])
+        return time, V[:, 0]
+
+    def plot(self, result, V0, I_amp, gNa, gK):
+        time, V = result
         # Potential Plot
         plt.plot(time, V, time, time*0 + self.E_Na, time, time*0 + self.E_K)
         plt.legend(['$V$','$E_{Na}$','$E_{K}$'], loc = "center right")
         plt.ylabel('Mem. Potential [mV]')
         plt.grid()
         plt.show()
+
+    def solve_and_plot(self, V0, I_amp, gNa, gK):
+        self.plot(self.solve(V0, I_amp, gNa, gK), V0, I_amp, gNa, gK)
         
 
     def __init__(self):
-        interact(self.solve_and_plot,  I_amp = FloatSlider(value=1.0, min=0.0, max=10, step=0.1, continuous_update=False), V0 = FloatSlider(value=-60, min=-100.0, max=100, step=1, continuous_update=False),  gNa = FloatSlider(value=0, min=0, max=1, step=0.01, continuous_update=False),  gK = FloatSlider(value=0.2, min=0, max=1, step=0.01, continuous_update=False))
+        interact_async(self.solve, self.plot,  I_amp = FloatSlider(value=1.0, min=0.0, max=10, step=0.1, continuous_update=False), V0 = FloatSlider(value=-60, min=-100.0, max=100, step=1, continuous_update=False),  gNa = FloatSlider(value=0, min=0, max=1, step=0.01, continuous_update=False),  gK = FloatSlider(value=0.2, min=0, max=1, step=0.01, continuous_update=False))
 
 ########################################################
 ####################   Exercise 4   #################### 
@@ -147,28 +180,30 @@ class VoltageDependentConductancesWidget():
     def dV_dt(self, V, t):
         return (-self.I_app(t)-self.I_Na(V)-self.I_K(V))/self.Cm
 
-    def solve_and_plot(self, V0, I_amp, Vs, d):
+    def solve(self, V0, I_amp, Vs, d):
         self.V0 = V0;
         self.I_amp = I_amp
         self.Vs = Vs
         self.d = d
         time = np.arange(0, 10, 0.01)
 
-        V = odeint(self.dV_dt, V0, time)
-        V = V[:, 0]
+        # Stop at the end of the stimulus rather than stepping across it
+        V_t = odeint(cancellable(self.dV_dt), V0, time, tcrit=[1.0])[:, 0]
+        V = np.linspace(-100, 100, num=1000)
+        return time, V_t, V, self.m_inf(V), -self.I_Na(V)-self.I_K(V)
+
+    def plot(self, result, V0, I_amp, Vs, d):
+        time, V_t, V, m_ss, I = result
         # Potential Plot
         plt.subplot(1,3,1)
-        plt.plot(time, V, time, time*0 + self.E_Na, time, time*0 + self.E_K)
+        plt.plot(time, V_t, time, time*0 + self.E_Na, time, time*0 + self.E_K)
         plt.legend(['$V$','$E_{Na}$','$E_{K}$'], loc = "center right")
         plt.title(r'$V(t)$')
-        V = np.linspace(-100, 100, num=1000)
-        m_ss =  self.m_inf(V)
         plt.subplot(1,3,2)
         plt.plot(V, m_ss)
         plt.title(r'$m_{\infty}$')
 
         plt.subplot(1,3,3)
-        I = -self.I_Na(V)-self.I_K(V)
         plt.plot(V, I)
         plt.title(r'$I(V) =  - I_{\rm Na}(V) - I_{\rm K}(V)$')
         plt.ylim(-10, 10)
@@ -176,10 +211,13 @@ class VoltageDependentConductancesWidget():
         
         plt.grid()
         plt.show()
+
+    def solve_and_plot(self, V0, I_amp, Vs, d):
+        self.plot(self.solve(V0, I_amp, Vs, d), V0, I_amp, Vs, d)
         
 
     def __init__(self):
-        interact(self.solve_and_plot,
+        interact_async(self.solve, self.plot,
                      I_amp = FloatSlider(value=0.0, min=0.0, max=10, step=0.1, continuous_update=False),
                      V0 = FloatSlider(value=-80, min=-100.0, max=100, step=1, continuous_update=False),
                      Vs = FloatSlider(value=-20, min=-100, max=100, step=1, continuous_update=False),
@@ -212,65 +250,171 @@ dbh = -dh;
 def I_app(t):
     return -I_amp if t<1 else 0.0
 
-def m_rates(V):
-    alpha = np.exp((V-Vam)/dam)
-    beta  = np.exp((V-Vbm)/dbm)
-    return alpha, beta
 
-def h_rates(V):
-    alpha = np.exp((V-Vah)/dah)
-    beta  = np.exp((V-Vbh)/dbh)
-    return alpha, beta
+class ReducedAPModel(namedtuple('ReducedAPModel', ['Vam', 'Vbm', 'Vah', 'Vbh', 'C_m', 'E_Na', 'E_K',
+                                                   'g_Na', 'g_K', 'dm', 'dh'])):
+    """The reduced AP model of exercise 5 with an immutable parameter set.
+
+    Nothing is stored outside the object and it cannot be modified, so one
+    model can be shared between threads and users. The methods accept arrays
+    of voltages and states (V, h = Y along the first axis), and the
+    parameters may be arrays too, in which case one model holds a whole
+    batch of parameter points that broadcast against the states.
+    """
+    __slots__ = ()
+
+    def __new__(cls, Vam=-60.0, Vbm=-10.0, Vah=-80.0, Vbh=-20.0, C_m=C_m, E_Na=E_Na, E_K=E_K,
+                g_Na=g_Na, g_K=g_K, dm=dm, dh=dh):
+        return super().__new__(cls, Vam, Vbm, Vah, Vbh, C_m, E_Na, E_K, g_Na, g_K, dm, dh)
+
+    def m_rates(self, V):
+        alpha = np.exp((V-self.Vam)/self.dm)
+        beta  = np.exp((V-self.Vbm)/-self.dm)
+        return alpha, beta
+
+    def h_rates(self, V):
+        alpha = np.exp((V-self.Vah)/self.dh)
+        beta  = np.exp((V-self.Vbh)/-self.dh)
+        return alpha, beta
+
+    def m_inf(self, V):
+        alpha_m, beta_m = self.m_rates(V)
+        return alpha_m/(alpha_m+beta_m)
 
-def m_inf(V):
-    alpha_m, beta_m = m_rates(V)
-    return alpha_m/(alpha_m+beta_m)
+    def h_inf(self, V):
+        alpha_h, beta_h = self.h_rates(V)
+        return alpha_h/(alpha_h+beta_h)
 
-def h_inf(V):
-    alpha_h, beta_h = h_rates(V)
-    return alpha_h/(alpha_h+beta_h)
+    def m_tau(self, V):
+        alpha_m, beta_m = self.m_rates(V)
+        return 1/(alpha_m+beta_m)
 
-def m_tau(V):
-    alpha_m, beta_m = m_rates(V)
-    return 1/(alpha_m+beta_m)
+    def h_tau(self, V):
+        alpha_h, beta_h = self.h_rates(V)
+        return 1/(alpha_h+beta_h)
 
-def h_tau(V):
-    alpha_h, beta_h = h_rates(V)
-    return 1/(alpha_h+beta_h)
+    def I_Na(self, V, h):
+        return self.g_Na*h*self.m_inf(V)*(V - self.E_Na)
 
-def I_Na(V, h):
-    return g_Na*h*m_inf(V)*(V - E_Na)
+    def I_K(self, V):
+        return self.g_K*(V - self.E_K)
+
+    def dY_dt(self, Y, t=0):
+        """Right hand side for states Y = (V, h), or arrays of them along the first axis."""
+        V, h = Y[0], Y[1]
+        d_V = (-self.I_Na(V, h)-self.I_K(V))/self.C_m
+        alpha_h, beta_h = self.h_rates(V)
+        d_h = alpha_h*(1-h) - h*beta_h
+        return np.array([d_V, d_h])
+
+    def jacobian(self, Y, t=0):
+        """Analytic Jacobian of dY_dt, shape (2, 2) + the shape of V."""
+        V, h = Y[0], Y[1]
+        m = self.m_inf(V)
+        alpha_h, beta_h = self.h_rates(V)
+        dm_dV = m*(1-m)*2/self.dm
+        J11 = -(self.g_Na*h*(dm_dV*(V - self.E_Na) + m) + self.g_K)/self.C_m
+        J12 = -self.g_Na*m*(V - self.E_Na)/self.C_m
+        J21 = alpha_h/self.dh*(1-h) + beta_h/self.dh*h
+        J22 = -(alpha_h + beta_h)
+        return np.array([[J11, J12], [J21, J22]])
+
+    def dVdt_scalar(self, V):
+        return self.dY_dt([V, self.h_inf(V)])[0]
+
+    def nullclines(self, Vp):
+        h_eq = self.h_inf(Vp)
+        h_V = (self.g_K*(Vp-self.E_K))/(self.g_Na*self.m_inf(Vp)*(self.E_Na-Vp))
+        return h_V, h_eq
 
-def I_K(V):
-    return g_K*(V - E_K)
+    def solve(self, time, V0, h0):
+        """V(t) and h(t) from (V0, h0) for a model with scalar parameters."""
+        Y = odeint(self.dY_dt, [V0, h0], time, Dfun=self.jacobian)
+        return Y[:, 0], Y[:, 1]
 
 
-def dY_dt(Y, t=0):
+def _banded_jacobian(model):
+    """Dfun for odeint(ml=1, mu=1) of a batch of independent models with the
+    states interleaved as (V_0, h_0, V_1, h_1, ...)."""
+    def jac(Y, t):
+        J = model.jacobian(Y.reshape(-1, 2).T)
+        bands = np.zeros((3, len(Y)))
+        bands[1, 0::2], bands[0, 1::2] = J[0, 0], J[0, 1]
+        bands[2, 0::2], bands[1, 1::2] = J[1, 0], J[1, 1]
+        return bands
+    return jac
 
-    V, h = Y
-    d_V = (-I_Na(V, h)-I_K(V))/C_m
-    alpha_h, beta_h = h_rates(V)
-    d_h = alpha_h*(1-h) - h*beta_h;
 
-    return [d_V, d_h]
+def solve_batch(time, params, Y0=(V0, h0), workers=None, **constants):
+    """Integrate one model per row of params, (Vam, Vbm, Vah, Vbh), from Y0
+    (one (V0, h0) for all rows or one per row) and return V and h with
+    shape (len(time), len(params)).
 
+    The rows are integrated together as one system with a banded analytic
+    Jacobian. With workers, the rows are split into that many chunks that
+    are integrated in a thread pool; the models share no state, so no locks
+    are needed. constants override the other parameters of ReducedAPModel.
+    """
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    Y0 = np.broadcast_to(np.asarray(Y0, dtype=float), (len(params), 2))
+    if workers:
+        from concurrent.futures import ThreadPoolExecutor
+        chunks = np.array_split(np.arange(len(params)), workers)
+        with ThreadPoolExecutor(workers) as pool:
+            parts = list(pool.map(lambda rows: solve_batch(time, params[rows], Y0[rows], **constants),
+                                  [rows for rows in chunks if len(rows)]))
+        return np.concatenate([V for V, _ in parts], axis=1), np.concatenate([h for _, h in parts], axis=1)
 
-def dVdt_scalar(V):
+    model = ReducedAPModel(*params.T, **constants)
+    rhs = lambda Y, t: model.dY_dt(Y.reshape(-1, 2).T).T.ravel()
+    Y = odeint(rhs, Y0.ravel(), time, Dfun=_banded_jacobian(model), ml=1, mu=1)
+    return Y[:, 0::2], Y[:, 1::2]
 
-    h_ss = h_inf(V);
-    dV_dt = dY_dt([V, h_ss], 0)[0]
 
-    
-    return dV_dt
+# The functions below evaluate the default model unless they are given one
+DEFAULT_MODEL = ReducedAPModel()
+
 
-def compute_steady_state(V_guess):
+def m_rates(V, model=DEFAULT_MODEL):
+    return model.m_rates(V)
+
+def h_rates(V, model=DEFAULT_MODEL):
+    return model.h_rates(V)
+
+def m_inf(V, model=DEFAULT_MODEL):
+    return model.m_inf(V)
+
+def h_inf(V, model=DEFAULT_MODEL):
+    return model.h_inf(V)
+
+def m_tau(V, model=DEFAULT_MODEL):
+    return model.m_tau(V)
+
+def h_tau(V, model=DEFAULT_MODEL):
+    return model.h_tau(V)
+
+def I_Na(V, h, model=DEFAULT_MODEL):
+    return model.I_Na(V, h)
+
+def I_K(V, model=DEFAULT_MODEL):
+    return model.I_K(V)
+
+
+def dY_dt(Y, t=0, model=DEFAULT_MODEL):
+    return list(model.dY_dt(Y, t))
+
+
+def dVdt_scalar(V, model=DEFAULT_MODEL):
+    return model.dVdt_scalar(V)
+
+def compute_steady_state(V_guess, model=DEFAULT_MODEL):
 
     from scipy.optimize import bisect, newton
     #V_ss = bisect(dVdt_scalar, E_K, E_Na);
 
     try:
-        V_ss = newton(dVdt_scalar, V_guess)
-        h_ss = h_inf(V_ss);
+        V_ss = newton(model.dVdt_scalar, V_guess)
+        h_ss = model.h_inf(V_ss);
     except RuntimeError:
         print('Newton solver failed when starting at '+ str(V_guess))
         V_ss = -999.
@@ -280,36 +424,22 @@ def compute_steady_state(V_guess):
 
 
 def solve(time, V0_l, h0_l, Vam_l, Vbm_l, Vah_l, Vbh_l):
-
-
-    global  V0, h0, Vam, Vbm, Vah, Vbh
-    V0 = V0_l
-    h0 = h0_l
-    Vam = Vam_l
-    Vbm = Vbm_l
-    Vah = Vah_l
-    Vbh = Vbh_l
-
-    Y = odeint(dY_dt, [V0,h0], time)
-    
-    V = Y[:, 0]
-    h = Y[:, 1]
-
-    return V, h 
-
+    """Solve the model with the given parameters. Pass
+    ReducedAPModel(Vam_l, Vbm_l, Vah_l, Vbh_l) as model= to the functions
+    above to evaluate the same model."""
+    return ReducedAPModel(Vam_l, Vbm_l, Vah_l, Vbh_l).solve(time, V0_l, h0_l)
 
 
 
-
-def compute_Jacobian(Y0):
+def compute_Jacobian(Y0, model=DEFAULT_MODEL):
     # Compute Jacobian with finite difference:
     J = np.zeros((2,2))
     eps = 1.e-4;
     for i in range(2):  # perturb in direction i:
         dY = np.array([0.,0.]);
         dY[i] = eps;
-        Yp = Y0 + dY; Fp = np.array(dY_dt(Yp))
-        Ym = Y0 - dY; Fm = np.array(dY_dt(Ym))
+        Yp = Y0 + dY; Fp = np.array(dY_dt(Yp, model=model))
+        Ym = Y0 - dY; Fm = np.array(dY_dt(Ym, model=model))
         J[i,:] = (Fp-Fm)/(2*eps)
                 
     return J
@@ -320,40 +450,40 @@ def compute_eigenvalues(J):
     w, v = linalg.eig(J)
     return w
 
-def check_stability(V0):
+def check_stability(V0, model=DEFAULT_MODEL):
 
         
-    V_eq, h_eq = compute_steady_state(V0)
+    V_eq, h_eq = compute_steady_state(V0, model)
 
-    J = compute_Jacobian([V_eq, h_eq]);
+    J = compute_Jacobian([V_eq, h_eq], model);
     w = compute_eigenvalues(J);
     lambda_max = w.real.max()
 
     return lambda_max, V_eq, h_eq
 
-def plot_scalar(V, color = 'b'):
+def plot_scalar(V, color = 'b', model=DEFAULT_MODEL):
 
 
-    dV_dt =  dVdt_scalar(V)
-    m_ss =  m_inf(V)
-    h_ss =  h_inf(V)
+    dV_dt =  model.dVdt_scalar(V)
+    m_ss =  model.m_inf(V)
+    h_ss =  model.h_inf(V)
     
     mh_max = max(m_ss*h_ss);
-    I_Na_full = g_Na*mh_max*(Vp - E_Na)
-    I_K_full = g_K*(Vp - E_K)
+    I_Na_full = model.g_Na*mh_max*(Vp - model.E_Na)
+    I_K_full = model.g_K*(Vp - model.E_K)
 
     
     plt.rcParams["figure.figsize"] = (10,5)
     plt.figure(3);
     plt.clf()
-    plt.plot(V, C_m*dV_dt, color, V,  -I_K_full, 'k', V,  -I_Na_full -I_K_full,'r')
+    plt.plot(V, model.C_m*dV_dt, color, V,  -I_K_full, 'k', V,  -I_Na_full -I_K_full,'r')
     plt.legend(['$dV/dt$','$I_K$','$I_{K}+I_{Na,\max}$'])
     #plt.ylim(-0.5,0.5)
     plt.grid()
 
     print("V0", "lambda_max", "V_eq", "h_eq")
     for V0 in range(-80,-40,10):
-        lambda_max, V_eq, h_eq = check_stability(V0)
+        lambda_max, V_eq, h_eq = check_stability(V0, model)
         print(V0,lambda_max, V_eq, h_eq)
     
     
@@ -380,17 +510,41 @@ def plot_two_solutions(time, V1, h1, V2, h2):
     #plt.show()
 
 
-def get_nullclines(Vp):
+def get_nullclines(Vp, model=DEFAULT_MODEL):
+    return model.nullclines(Vp)
 
-        h_eq =  h_inf(Vp)
-        h_V = (g_K*(Vp-E_K))/(g_Na*m_inf(Vp)*(E_Na-Vp));
 
-        return h_V, h_eq
+def _dV_dt(V, h, Vam, Vbm):
+    model = ReducedAPModel(Vam=Vam, Vbm=Vbm)
+    return (-model.I_Na(V, h) - model.I_K(V))/model.C_m
 
-def solve_and_plot(V0, h0, Vam, Vbm, Vah, Vbh):
+def _dh_dt(V, h, Vah, Vbh):
+    alpha_h, beta_h = ReducedAPModel(Vah=Vah, Vbh=Vbh).h_rates(V)
+    return alpha_h*(1-h) - h*beta_h
+
+# Nullclines of the widget, cached per slider value: moving Vah or Vbh leaves the V-nullcline in the cache
+phase_plane = PhasePlane(_dV_dt, _dh_dt, spacing=(0.5, 0.005))
+
+def ap_solve(V0, h0, Vam, Vbm, Vah, Vbh):
+    """The solution, nullclines, currents and equilibria shown by ap_widget."""
+    from L4_equilibria import scan
 
     time = np.arange(0, 15, 0.001)
-    V, h = solve(time, V0, h0, Vam, Vbm, Vah, Vbh)
+    model = ReducedAPModel(Vam, Vbm, Vah, Vbh)
+    Y = odeint(cancellable(model.dY_dt), [V0, h0], time, Dfun=model.jacobian)
+
+    Vp = np.linspace(E_K-1, E_Na+1, num=1000)
+    window = (E_K-1, E_Na+1), (-0.2, 1.2)
+    nullclines = [phase_plane.nullclines(k, params, *window) for k, params in enumerate([(Vam, Vbm), (Vah, Vbh)])]
+
+    dV_dt =  model.dVdt_scalar(Vp)
+    m_ss =  model.m_inf(Vp)
+    h_ss =  model.h_inf(Vp)
+    return time, Y[:, 0], Y[:, 1], nullclines, Vp, dV_dt, max(m_ss*h_ss), scan(Vam, Vbm, Vah, Vbh)
+
+
+def ap_plot(result, V0, h0, Vam, Vbm, Vah, Vbh):
+    time, V, h, nullclines, Vp, dV_dt, mh_max, equilibria = result
     # Potential Plot
     plt.subplot(2,2,1)
     plt.plot(time, V, time, time*0 + E_Na, time, time*0 + E_K)
@@ -404,19 +558,14 @@ def solve_and_plot(V0, h0, Vam, Vbm, Vah, Vbh):
 
 
     plt.subplot(2,2,3)
-    Vp = np.linspace(E_K-1, E_Na+1, num=1000)
-    V_null, h_null = get_nullclines(Vp)
-    plt.plot(Vp, V_null, Vp, h_null)
-    plt.legend(['$\dot{V}=0$','$\dot{h}=0$'])
+    for k, (lines, label) in enumerate(zip(nullclines, ['$\dot{V}=0$', '$\dot{h}=0$'])):
+        for i, line in enumerate(lines):
+            plt.plot(line[:, 0], line[:, 1], 'C{}'.format(k), label=label if i == 0 else None)
+    plt.legend()
     plt.ylim(-0.2,1.2); 
     #plt.ylim(0.1,0.25); #zoom
 
     plt.subplot(2,2,4)
-    dV_dt =  dVdt_scalar(Vp)
-    m_ss =  m_inf(Vp)
-    h_ss =  h_inf(Vp)
-    
-    mh_max = max(m_ss*h_ss);
     I_Na_full = g_Na*mh_max*(Vp - E_Na)
     I_K_full = g_K*(Vp - E_K)
     plt.plot(Vp, C_m*dV_dt, 'b', Vp,  -I_K_full, 'k', Vp,  -I_Na_full -I_K_full,'r')
@@ -425,14 +574,15 @@ def solve_and_plot(V0, h0, Vam, Vbm, Vah, Vbh):
     plt.show()
 
     from IPython.display import display, Math
-    for V0 in range(-80,-40,10):
-        lambda_max, V_eq, h_eq = check_stability(V0)
-        if h_eq>-1:
-            display(Math(r'V_{{\mbox{{guess}}}}={:.1f},  V_{{\mbox{{eq}}}}={:.1f},  h_{{\mbox{{eq}}}}={:.3f}, \lambda_{{\max}}={:.3f}'.format(V0,  V_eq, h_eq, lambda_max)))
+    for row in equilibria:
+        display(Math(r'V_{{\mbox{{eq}}}}={:.1f},  h_{{\mbox{{eq}}}}={:.3f}, \lambda_{{\max}}={:.3f}, \mbox{{{}}}'.format(row['V_eq'], row['h_eq'], row['lambda_max'], row['kind'])))
+
+def solve_and_plot(V0, h0, Vam, Vbm, Vah, Vbh):
+    ap_plot(ap_solve(V0, h0, Vam, Vbm, Vah, Vbh), V0, h0, Vam, Vbm, Vah, Vbh)
 
 def ap_widget():
         
-    interact(solve_and_plot,
+    interact_async(ap_solve, ap_plot,
                      V0 = FloatSlider(value=-50, min=-100, max=50, step=1, continuous_update=False),
                      h0 = FloatSlider(value=0.5, min=0, max=1, step=0.01, continuous_update=False),
                      Vam = FloatSlider(value=-60, min=-120, max=0, step=1, continuous_update=False),
@@ -0,0 +1,223 @@
+"""
+All equilibria of the reduced AP model of exercise 5, for many parameters at once.
+
+check_stability in L4_code.py finds one equilibrium per voltage guess with
+scipy's scalar Newton solver and a finite-difference Jacobian, so the widget
+runs it four times per slider event and may report the same equilibrium
+twice or miss one. At an equilibrium h = h_inf(V), so the equilibria are the
+roots of dVdt_scalar(V), which all lie between E_K and E_Na. scan evaluates
+dVdt_scalar on a dense voltage grid for a whole batch of parameter points
+(Vam, Vbm, Vah, Vbh) with NumPy, brackets every sign change, refines all
+brackets together with a safeguarded Newton iteration (analytic derivative,
+bisection where a Newton step leaves the bracket) and classifies every
+equilibrium from the eigenvalues of the analytic 2x2 Jacobian of dY_dt.
+
+Roots where dVdt_scalar touches zero without changing sign (the fold point
+of a saddle-node bifurcation itself) are not found.
+
+Example:
+========
+from L4_equilibria import scan, grid
+
+# The equilibria at the current slider values, and a bifurcation table
+print(scan(Vam=-60, Vbm=-10, Vah=-80, Vbh=-20))
+table = scan(**grid(Vam=np.arange(-120, 1, 1.0), Vbh=np.arange(-100, 1, 1.0)))
+unstable = table[table['lambda_max'] > 0]
+print(np.unique(table['kind'], return_counts=True))
+
+Run this file as a script to time a scan against check_stability.
+"""
+
+import itertools
+import numpy as np
+
+from L4_code import C_m, E_Na, E_K, g_Na, g_K, dam, dbm, dah, dbh
+
+# Defaults of the sliders of ap_widget
+DEFAULTS = dict(Vam=-60.0, Vbm=-10.0, Vah=-80.0, Vbh=-20.0)
+
+KINDS = ('stable node', 'stable focus', 'saddle', 'unstable node', 'unstable focus')
+
+TABLE_DTYPE = [('Vam', float), ('Vbm', float), ('Vah', float), ('Vbh', float), ('point', int),
+               ('V_eq', float), ('h_eq', float), ('lambda_max', float), ('kind', 'U14')]
+
+
+#----------------------------------------------------------------------------
+# Vectorized model
+
+def _gates(V, Vam, Vbm, Vah, Vbh):
+    """m_inf, h_inf, the h rates and the derivatives of m_inf and h_inf, for
+    arrays that broadcast together."""
+    m = 1/(1 + np.exp((V - Vbm)/dbm - (V - Vam)/dam))
+    alpha_h = np.exp((V - Vah)/dah)
+    beta_h = np.exp((V - Vbh)/dbh)
+    h = alpha_h/(alpha_h + beta_h)
+    dm = -m*(1 - m)*(1/dbm - 1/dam)
+    dh = -h*(1 - h)*(1/dbh - 1/dah)
+    return m, h, alpha_h, beta_h, dm, dh
+
+
+def reduced_rhs(V, Vam, Vbm, Vah, Vbh):
+    """dVdt_scalar of L4_code and its derivative with respect to V."""
+    m, h, _, _, dm, dh = _gates(V, Vam, Vbm, Vah, Vbh)
+    F = (-g_Na*h*m*(V - E_Na) - g_K*(V - E_K))/C_m
+    dF = (-g_Na*(dh*m + h*dm)*(V - E_Na) - g_Na*h*m - g_K)/C_m
+    return F, dF
+
+
+def jacobian(V, h, Vam, Vbm, Vah, Vbh):
+    """Entries (J11, J12, J21, J22) of the Jacobian of dY_dt at (V, h)."""
+    m, _, alpha_h, beta_h, dm, _ = _gates(V, Vam, Vbm, Vah, Vbh)
+    J11 = -(g_Na*h*(dm*(V - E_Na) + m) + g_K)/C_m
+    J12 = -g_Na*m*(V - E_Na)/C_m
+    J21 = alpha_h/dah*(1 - h) - beta_h/dbh*h
+    J22 = -(alpha_h + beta_h)
+    return J11, J12, J21, J22
+
+
+def classify(J11, J12, J21, J22):
+    """Largest real part of the eigenvalues and the index into KINDS of
+    each 2x2 Jacobian, from its trace and determinant."""
+    trace = J11 + J22
+    det = J11*J22 - J12*J21
+    disc = trace**2/4 - det
+    root = np.sqrt(np.abs(disc))
+    lambda_max = np.where(disc >= 0, trace/2 + root, trace/2)
+    kind = np.where(det < 0, 2, np.where(trace < 0, 0, 3) + (disc < 0))
+    return lambda_max, kind
+
+
+#----------------------------------------------------------------------------
+# Scanner
+
+def _brackets(Vam, Vbm, Vah, Vbh, V):
+    """Point indices and grid intervals [a, b] where dVdt_scalar changes sign."""
+    U, Vam, Vbm, Vah, Vbh = V[None, :], Vam[:, None], Vbm[:, None], Vah[:, None], Vbh[:, None]
+    # The sign of dVdt_scalar, with one exponential per gate
+    m = 1/(1 + np.exp((U - Vbm)/dbm - (U - Vam)/dam))
+    h = 1/(1 + np.exp((U - Vbh)/dbh - (U - Vah)/dah))
+    positive = g_Na*h*m*(E_Na - U) > g_K*(U - E_K)
+    point, k = np.nonzero(positive[:, :-1] != positive[:, 1:])
+    return point, V[k], V[k + 1], positive[point, k]
+
+
+def _refine(a, b, left_positive, Vam, Vbm, Vah, Vbh, tol, max_iter):
+    """Safeguarded Newton iteration on all brackets at once."""
+    V = (a + b)/2
+    for _ in range(max_iter):
+        F, dF = reduced_rhs(V, Vam, Vbm, Vah, Vbh)
+        # Shrink the bracket, keeping the sign change inside it
+        move_left = (F > 0) == left_positive
+        a = np.where(move_left, V, a)
+        b = np.where(move_left, b, V)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = F/dF
+        V_new = V - step
+        outside = ~((V_new > a) & (V_new < b)) | ~np.isfinite(V_new)
+        V_new = np.where(outside, (a + b)/2, V_new)
+        done = np.abs(V_new - V) < tol
+        V = V_new
+        if done.all():
+            break
+    return V
+
+
+def scan(Vam=DEFAULTS['Vam'], Vbm=DEFAULTS['Vbm'], Vah=DEFAULTS['Vah'], Vbh=DEFAULTS['Vbh'],
+         n_grid=1001, tol=1e-10, max_iter=50, chunk=4096):
+    """All equilibria of the reduced model for every parameter point.
+
+    Vam, Vbm, Vah and Vbh are scalars or arrays that broadcast together;
+    every element is one parameter point (see grid). The voltage grid has
+    n_grid points from E_K to E_Na, so two equilibria closer than its
+    spacing may be missed. The points are processed chunk at a time to bound
+    the memory of the grid evaluation.
+
+    Returns a structured array with one row per equilibrium: the parameters,
+    the flat index of its parameter point, V_eq, h_eq, lambda_max (the
+    largest real part of the eigenvalues) and kind (see KINDS).
+    """
+    Vam, Vbm, Vah, Vbh = (np.ravel(x).astype(float) for x in np.broadcast_arrays(Vam, Vbm, Vah, Vbh))
+    V_grid = np.linspace(E_K, E_Na, n_grid)
+    tables = []
+    for start in range(0, len(Vam), chunk):
+        parameters = [x[start:start+chunk] for x in (Vam, Vbm, Vah, Vbh)]
+        point, a, b, left_positive = _brackets(*parameters, V_grid)
+        parameters = [x[point] for x in parameters]
+        V = _refine(a, b, left_positive, *parameters, tol, max_iter)
+        h = _gates(V, *parameters)[1]
+        lambda_max, kind = classify(*jacobian(V, h, *parameters))
+
+        table = np.zeros(len(V), dtype=TABLE_DTYPE)
+        for name, column in zip(('Vam', 'Vbm', 'Vah', 'Vbh'), parameters):
+            table[name] = column
+        table['point'] = point + start
+        table['V_eq'] = V
+        table['h_eq'] = h
+        table['lambda_max'] = lambda_max
+        table['kind'] = np.array(KINDS)[kind]
+        tables.append(table)
+    return np.concatenate(tables) if tables else np.zeros(0, dtype=TABLE_DTYPE)
+
+
+def grid(**axes):
+    """Full factorial parameter grid for scan, e.g. grid(Vam=[-70, -60],
+    Vbh=[-30, -20]), with the other parameters at the widget defaults."""
+    names = list(axes)
+    rows = np.array(list(itertools.product(*(np.ravel(axes[name]) for name in names))), dtype=float)
+    columns = {name: np.full(len(rows), value) for name, value in DEFAULTS.items()}
+    for k, name in enumerate(names):
+        columns[name] = rows[:, k]
+    return columns
+
+
+def count(table, n_points):
+    """Number of equilibria and of unstable equilibria per parameter point."""
+    total = np.bincount(table['point'], minlength=n_points)
+    unstable = np.bincount(table['point'], weights=table['lambda_max'] > 0, minlength=n_points)
+    return total, unstable.astype(int)
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n=21):
+    """Time a scan over an n x n grid of (Vam, Vbh) against check_stability
+    from four guesses per point, and compare the equilibria they find."""
+    import io
+    import contextlib
+    from time import perf_counter
+    import L4_code
+
+    axes = dict(Vam=np.linspace(-120, 0, n), Vbh=np.linspace(-100, 0, n))
+    start = perf_counter()
+    table = scan(**grid(**axes))
+    elapsed = perf_counter() - start
+    print("scan: {} points, {} equilibria in {:.3f} s".format(n*n, len(table), elapsed))
+
+    points = grid(**axes)
+    start = perf_counter()
+    found = []
+    for i in range(n*n):
+        model = L4_code.ReducedAPModel(*(points[name][i] for name in DEFAULTS))
+        for guess in range(-80, -40, 10):
+            with contextlib.redirect_stdout(io.StringIO()):
+                lambda_max, V_eq, h_eq = L4_code.check_stability(guess, model)
+            if h_eq > -1:
+                found.append((i, V_eq, lambda_max))
+    scalar = perf_counter() - start
+    print("check_stability: {} points in {:.3f} s ({:.0f}x slower)".format(n*n, scalar, scalar/elapsed))
+
+    # Every equilibrium check_stability finds should be in the table
+    missing = 0
+    for i, V_eq, lambda_max in found:
+        rows = table[table['point'] == i]
+        if not np.any(np.abs(rows['V_eq'] - V_eq) < 1e-4):
+            missing += 1
+    print("equilibria found by check_stability but not by scan: {}".format(missing))
+    total, _ = count(table, n*n)
+    distinct = len({(i, round(V_eq, 4)) for i, V_eq, _ in found})
+    print("distinct equilibria: scan {}, check_stability {}".format(total.sum(), distinct))
+
+
+if __name__ == '__main__':
+    benchmark()
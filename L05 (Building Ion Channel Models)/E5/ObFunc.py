@@ -5,107 +5,98 @@ Created on Thu Jun  9 17:37:03 2016
 @author: Andy
 """
 import numpy as np
-import math
-from scipy.integrate import ode
+
+from markov_propagator import Propagator, batch_clamp
+
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from sscp_tools.markov_spec import MarkovSpec, MarkovModel
+
+
+# A Markov state model for the rapidly activating inward rectifying potassium current (IKur)
+# The blocked state B has no transitions (a drug would add O <-> B)
+IKUR_SPEC = MarkovSpec(
+    states=['O', 'I', 'C4', 'C3', 'C2', 'C1', 'B'],
+    rates={'alpha': 'exp((V-P[0])/P[1])',
+           'beta': 'exp((V-P[2])/P[3])*exp(-(V+P[4])/P[5])/(P[6]+P[7]*exp(-(V+P[8])/P[9]))'},
+    transitions=[
+        #transitions between closed states
+        ('C2', 'C1', 'beta'), ('C1', 'C2', '4*alpha'),
+        ('C3', 'C2', '2*beta'), ('C2', 'C3', '3*alpha'),
+        ('C4', 'C3', '3*beta'), ('C3', 'C4', '2*alpha'),
+        #transitions between closed and open states
+        ('C4', 'O', 'alpha'), ('O', 'C4', '4*beta'),
+        #transitions between inactive and open states
+        ('I', 'O', 'P[10]'), ('O', 'I', 'P[11]')])
+
+# The ODE solvers call f one state vector at a time, which runs compiled with numba
+IKUR = MarkovModel(IKUR_SPEC, compiled=True)
+
 
 #define the Markov model
 def f(t,y,P)   :
 # A Markov state model for the rapidly activating inward rectifying potassium current (IKur)      
+    return markov_rhs(y, P)
+
+
+def rate_matrix(P):
+    """Rate matrix A of the IKur Markov model, dy/dt = A y (A[j, i] is the
+    rate from state i to state j), with the parameters and the voltage (last
+    entry) in P. The states are O, I, C4, C3, C2, C1, B."""
     V = P[-1] # For simplicity we pass voltage as a parameter (when would this be a bad idea?)
-    dim = y.shape
-    dy = np.zeros((dim))
-    #states
-    O = int(0)
-    I = int(1)
-    C4 = int(2)
-    C3 = int(3)
-    C2 = int(4)
-    C1 = int(5)
-    B = int(6)
-    
-    n = 7 # number of states
-    A = np.zeros((n,n)) # initialize rate mass matrix for output
-
-    alpha = math.exp((V-P[0])/P[1]);
-    beta = math.exp((V-P[2])/P[3])*math.exp(-(V+P[4])/P[5])/(P[6]+P[7]*math.exp(-(V+P[8])/P[9]));
-
-    #calculate transitions between closed states
-    A[C1, C2] = beta;
-    A[C2, C1] = 4*alpha;
-    A[C2, C3] = 2*beta;
-    A[C3, C2] = 3*alpha;
-    A[C3, C4]  = 3*beta;
-    A[C4, C3]  = 2*alpha;
-    
-    #calculate transitions between closed and open states
-    A[O, C4]  = alpha;
-    A[C4, O]  = 4*beta;
-    
-    #calculate transitions between inactive and open states
-    A[O, I]  = P[10];
-    A[I, O]  = P[11];
-    
-    #calculate transitions between open and blocked states
-    A[O,B] = 0;
-    A[B,O] = 0;
-    
-    for i in range(n):
-        A[i,i] = -math.fsum(A[:,i]);
+    return IKUR.matrix(V, P[:-1])
+
+
+def markov_rhs(y, P):
+    """dy/dt of the IKur Markov model for the states y, with the parameters
+    and the voltage (last entry) in P."""
+    return IKUR.rhs(y, P[-1], P[:-1])
     
-    dy = A.dot(y)
-    return [dy]
+
+def Init(V,P):
+    """Steady state of the model at the holding potential V, shape (7,), or
+    (len(V), 7) for an array of holding potentials."""
+    alpha = np.exp((V-P[0])/P[1]);
+    beta = np.exp((V-P[2])/P[3])*np.exp(-(V+P[4])/P[5])/(P[6]+P[7]*np.exp(-(V+P[8])/P[9]));
+    gamma = beta/alpha
+    Kblk = P[10]/P[11]
+    o = 1/((1+gamma)**4+Kblk)
     
+    # The initial conditions for the model:
+    return np.stack([o, o*Kblk, o*4*gamma, o*6*gamma**2, o*4*gamma**3, o*gamma**4, 0*o], axis=-1)
+
+
+# expm(A(V)*dt) of every step potential, cached over the calls of Activation
+propagator = Propagator(rate_matrix)
+
 
-def Activation(P,V,duration):
+def Activation(P,V,duration,V_H=-70):
     
     #fixed time-step
+    dt = 0.1
     ntsteps = int(duration*10)
     
-    #initialize outputs
-    t = np.zeros((ntsteps))
-    y = np.zeros((ntsteps,7))
-    model_peaks = np.zeros((len(V)))
-    Po_out = np.zeros((ntsteps,len(V)))
+    # The parameters without the voltage; P itself is left as it is
+    params = [float(p) for p in P[:13]]
     
-    #step through the test potentials in your reference data
-    for n,i in enumerate(V):
-        
-        # First reset your initial conditions to the holding potential at the beginning of each step
-        # Question: Is this always a good idea? Why or why not?
-        
-        V_H = -70
-        y0 = np.zeros((7))
-        alpha = math.exp((V_H-P[0])/P[1]);
-        beta = math.exp((V_H-P[2])/P[3])*math.exp(-(V_H+P[4])/P[5])/(P[6]+P[7]*math.exp(-(V_H+P[8])/P[9]));
-        gamma = beta/alpha
-        Kblk = P[10]/P[11]
-        o = 1/((1+gamma)**4+Kblk)
-        
-        # The initial conditions for the model:
-        y0 = [o, o*Kblk, o*4*gamma, o*6*gamma**2, o*4*gamma**3, o*gamma**4, 0]
-        t0 = 0
-        
-        # Collect the parameters and include the step voltage in the last position
-        if n==0 and len(P)<14:        
-            P.append(i)
-        else:
-            P[-1]=i
-            
-        # integrate the model at the current step potential                         
-        r = ode(f).set_integrator('vode', method='bdf', with_jacobian=False, rtol=1e-5, max_step=0.1)
-        r.set_initial_value(y0,t0).set_f_params(P)
-        dt = 0.1
-        ind = 0
-        while r.successful() and r.t < duration and ind < ntsteps:
-            r.integrate(r.t+dt)
-            t[ind]=r.t
-            y[ind,:]=r.y
-            ind = ind+1
-        
-        #store the open probability data and calculate the error metrics
-        Po_out[:,n] = y[:,0]
-        model_peaks[n] = P[-2]*y[:,0].max()
-        out = {'t':t, 'Po':Po_out,'I_peak':model_peaks}        
+    # First reset your initial conditions to the holding potential at the beginning of each step
+    # Question: Is this always a good idea? Why or why not?
+    # (V_H may also be one holding potential per step potential)
+    y0 = Init(np.asarray(V_H, dtype=float), params)
+    
+    # The voltage is constant during each step, so dy/dt = A(V) y is solved
+    # exactly, for all the test potentials in your reference data at once
+    y = propagator.clamp(params, y0, V, dt, ntsteps)[1:]
+    
+    #store the open probability data and calculate the error metrics
+    t = dt*np.arange(1, ntsteps+1)
+    Po_out = y[:,:,0]
+    model_peaks = params[12]*Po_out.max(axis=0)
+    out = {'t':t, 'Po':Po_out,'I_peak':model_peaks}        
         
     return out
 
@@ -121,4 +112,27 @@ def cost(P,V,I,duration):
         
     return error
     
-        
\ No newline at end of file
+        
+
+def rate_matrices(P,V):
+    """rate_matrix for every row of parameters in P, shape (S, 13), and every
+    voltage in V: shape (S, len(V), 7, 7)."""
+    return IKUR.matrix(V, P)
+
+
+def cost_batch(P,V,I,duration,V_H=-70,chunk=8):
+    """cost for every row of parameters in P, shape (S, 13), simulating the
+    activation protocol of all of them together (inf where the parameters
+    give no valid solution)."""
+    P = np.atleast_2d(np.asarray(P, dtype=float))[:, :13]
+    t = 0.1*np.arange(1, int(duration*10)+1)
+    error = np.empty(len(P))
+    # A chunk of candidates at a time bounds the memory of the exponentials
+    for start in range(0, len(P), chunk):
+        params = P[start:start+chunk]
+        with np.errstate(all='ignore'):
+            y0 = Init(V_H, params.T)
+            Po = batch_clamp(rate_matrices(params, V), y0[:, None, :], t, rows=[0])[..., 0]
+            model_peaks = params[:, 12, None]*Po.max(axis=-1)
+            error[start:start+chunk] = np.linalg.norm(model_peaks - I, axis=1)
+    return np.where(np.isfinite(error), error, np.inf)
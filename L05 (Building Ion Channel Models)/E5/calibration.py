@@ -0,0 +1,357 @@
+"""
+Calibration of the IKur Markov model of E5 with many starts or a population.
+
+run.py in "Old/K model" fits the model with a single Nelder-Mead search,
+opt.fmin(ObFunc.cost, ...) capped at 200 evaluations, which ends in
+whatever local minimum is nearest to the initial guess. This module runs
+the searches in a pool of worker processes instead:
+
+* multistart runs a bounded Nelder-Mead search from every row of starts
+  (random_starts draws them, log-uniformly within the bounds), one search
+  per task. It stops all searches once one of them reaches target.
+* evolve runs scipy's differential evolution. Every generation is
+  evaluated as one batch: split over the processes, or, with batch=True,
+  passed as whole chunks to a cost that evaluates many parameter vectors in
+  one call (ObFunc.cost_batch simulates the protocol of all of them
+  together). It stops at target, or when the best cost has not improved by
+  rtol in patience generations.
+
+Every evaluated point can be written to an EvaluationLog, a text file with
+one line per point (the cost, then the parameters), appended as the results
+come in. The searches of multistart append their points to a part file of
+the log per start as they evaluate them, which goes into the log when the
+search finishes, so an interrupted run loses none of them. A run that is
+given the log of an interrupted run looks every point up in it before
+simulating it; searches with the same seed and starts then replay the
+points of the interrupted run from the log and only simulate from where it
+stopped.
+
+Example:
+========
+import ObFunc
+from calibration import BOUNDS, EvaluationLog, evolve, multistart, random_starts
+
+SSA_data = np.loadtxt("SS.txt", dtype='float')
+V, I = SSA_data[:, 0], SSA_data[:, 1]
+log = EvaluationLog("calibration_log.txt")
+
+starts = random_starts(16, BOUNDS, x0=init_params, seed=1)
+table = multistart(ObFunc.cost, starts, args=(V, I, 1000), bounds=BOUNDS, log=log)
+P_opt = table['x'][0]
+
+result = evolve(ObFunc.cost_batch, BOUNDS, args=(V, I, 1000), batch=True, log=log, seed=1)
+P_opt = result.x
+
+Run this file as a script to compare the searches with the single fmin of run.py.
+"""
+
+import os
+import glob
+import multiprocessing
+
+import numpy as np
+from scipy import optimize
+
+# The ranges of the sliders of Markov_Widget, with the lower ends moved off
+# zero (P2, P4, P6 and P10 divide)
+BOUNDS = [(1, 100), (1, 100), (1, 100), (1, 100), (1, 100), (1, 50), (0.1, 5),
+          (1e-3, 2), (1, 100), (1, 50), (1e-6, 1), (1e-6, 1), (0.01, 3)]
+
+
+#----------------------------------------------------------------------------
+# Evaluation log
+
+def _key(x):
+    return tuple(float(v) for v in x)
+
+
+def _append(path, X, f):
+    """Append the points X (rows) with their costs f to a log file."""
+    with open(path, 'a') as file:
+        np.savetxt(file, np.column_stack([f, X]), fmt='%.17g')
+
+
+def _read(path):
+    if os.path.getsize(path) == 0:
+        return np.zeros((0, 0))
+    return np.loadtxt(path, ndmin=2)
+
+
+class EvaluationLog():
+    """All evaluated points and their costs, in memory and, when path is
+    given, in a text file that is read back when it exists. The part files
+    left by an interrupted multistart (path.part0, ...) are merged into it."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.known = {}
+        if path is None:
+            return
+        if os.path.exists(path):
+            for row in _read(path):
+                self.known[_key(row[1:])] = row[0]
+        for part in sorted(glob.glob(glob.escape(path) + '.part*')):
+            rows = [row for row in _read(part) if _key(row[1:]) not in self.known]
+            if rows:
+                rows = np.array(rows)
+                self.record(rows[:, 1:], rows[:, 0])
+            os.remove(part)
+
+    def __len__(self):
+        return len(self.known)
+
+    def __repr__(self):
+        return "EvaluationLog({!r}, {} points)".format(self.path, len(self))
+
+    def lookup(self, x):
+        """The cost of x, or None if it has not been evaluated."""
+        return self.known.get(_key(x))
+
+    def record(self, X, f):
+        """Add the points X (rows) with their costs f."""
+        X = np.atleast_2d(X)
+        f = np.atleast_1d(f)
+        for x, value in zip(X, f):
+            self.known[_key(x)] = float(value)
+        if self.path is not None and len(f):
+            _append(self.path, X, f)
+
+    def best(self):
+        """The point with the lowest cost and its cost."""
+        x, f = min(self.known.items(), key=lambda item: item[1])
+        return np.array(x), f
+
+    def part(self, index):
+        """The file the search from start index appends its points to, or
+        None for a log in memory."""
+        return None if self.path is None else '{}.part{}'.format(self.path, index)
+
+
+#----------------------------------------------------------------------------
+# Workers
+
+def _safe(value):
+    value = float(value)
+    return value if np.isfinite(value) else np.inf
+
+
+def _evaluate_rows(task):
+    """Costs of the rows of X, one call per row or one call for all."""
+    cost, args, X, batch = task
+    if batch:
+        try:
+            with np.errstate(all='ignore'):
+                return [_safe(f) for f in cost(X, *args)]
+        except (ArithmeticError, ValueError, np.linalg.LinAlgError):
+            if len(X) == 1:
+                return [np.inf]
+            # Find the rows that fail, one row per call
+            return [value for k in range(len(X)) for value in _evaluate_rows((cost, args, X[k:k+1], True))]
+    values = []
+    for x in X:
+        try:
+            with np.errstate(all='ignore'):
+                values.append(_safe(cost(x, *args)))
+        except (ArithmeticError, ValueError, np.linalg.LinAlgError):
+            # Parameters the model cannot be evaluated for
+            values.append(np.inf)
+    return values
+
+
+def _local_search(task):
+    """Bounded Nelder-Mead from x0. Returns the start, the optimum, its
+    cost and the points evaluated that were not in known, which are also
+    appended to the file part as they are evaluated, if given."""
+    index, cost, args, x0, bounds, options, known, part = task
+    evaluated = []
+
+    def f(x):
+        key = _key(x)
+        if key not in known:
+            known[key] = _evaluate_rows((cost, args, [x], False))[0]
+            evaluated.append((known[key], x.copy()))
+            if part is not None:
+                _append(part, [x], [known[key]])
+        return known[key]
+
+    result = optimize.minimize(f, x0, method='Nelder-Mead', bounds=bounds, options=options)
+    return index, result.x, result.fun, result.nfev, evaluated
+
+
+class Evaluator():
+    """The cost of every row of a matrix of parameter vectors: from the log
+    where the rows were evaluated before, the others split over processes
+    worker processes (1 evaluates in this process). With batch=True cost
+    takes a matrix of rows and returns their costs, and gets chunks of
+    chunksize rows. Use as a context manager, which closes the pool."""
+
+    def __init__(self, cost, args=(), batch=False, processes=None, log=None, chunksize=8):
+        self.cost = cost
+        self.args = tuple(args)
+        self.batch = batch
+        self.processes = processes or os.cpu_count() or 1
+        self.log = log if log is not None else EvaluationLog()
+        self.chunksize = chunksize
+        self.evaluations = 0
+        self.pool = multiprocessing.Pool(self.processes) if self.processes > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def __call__(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        f = np.array([np.nan if (value := self.log.lookup(x)) is None else value for x in X])
+        missing = np.flatnonzero(np.isnan(f))
+        if not missing.size:
+            return f
+        # Chunks: enough to keep every process busy, of at most chunksize
+        # rows for a batch cost, or single rows
+        size = min(self.chunksize, -(-missing.size//self.processes)) if self.batch else 1
+        tasks = [(self.cost, self.args, X[missing[i:i+size]], self.batch) for i in range(0, missing.size, size)]
+        if self.pool is None:
+            chunks = list(map(_evaluate_rows, tasks))
+        else:
+            chunks = self.pool.map(_evaluate_rows, tasks)
+        f[missing] = [value for chunk in chunks for value in chunk]
+        self.log.record(X[missing], f[missing])
+        self.evaluations += missing.size
+        return f
+
+
+#----------------------------------------------------------------------------
+# Searches
+
+def random_starts(n, bounds, x0=None, seed=None):
+    """n starting points drawn log-uniformly within bounds (all lower bounds
+    positive), the first one x0 if given, shape (n, len(bounds))."""
+    rng = np.random.default_rng(seed)
+    low, high = np.log(np.transpose(bounds))
+    starts = np.exp(rng.uniform(low, high, (n, len(bounds))))
+    if x0 is not None:
+        starts[0] = x0
+    return starts
+
+
+def multistart(cost, starts, args=(), bounds=None, maxfev=200, processes=None, log=None, target=None,
+               xatol=1e-4, fatol=1e-6):
+    """Bounded Nelder-Mead searches of at most maxfev evaluations from every
+    row of starts, one per task in processes worker processes.
+
+    Stops the remaining searches once one of them reaches a cost of target.
+    Returns a structured array with one row per finished search, sorted by
+    cost: the index of its start, the cost f, the number of evaluations
+    nfev and the optimum x.
+    """
+    starts = np.atleast_2d(np.asarray(starts, dtype=float))
+    log = log if log is not None else EvaluationLog()
+    processes = processes or os.cpu_count() or 1
+    options = dict(maxfev=maxfev, xatol=xatol, fatol=fatol)
+    tasks = [(k, cost, tuple(args), x0, bounds, options, dict(log.known), log.part(k))
+             for k, x0 in enumerate(starts)]
+
+    rows = []
+
+    def collect(results):
+        for index, x, f, nfev, evaluated in results:
+            if evaluated:
+                log.record([x for _, x in evaluated], [value for value, _ in evaluated])
+            part = log.part(index)
+            if part is not None and os.path.exists(part):
+                os.remove(part)
+            rows.append((index, f, nfev, x))
+            if target is not None and f <= target:
+                return
+
+    if processes == 1:
+        collect(map(_local_search, tasks))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            collect(pool.imap_unordered(_local_search, tasks))
+
+    table = np.zeros(len(rows), dtype=[('start', int), ('f', float), ('nfev', int), ('x', float, starts.shape[1])])
+    for k, row in enumerate(sorted(rows, key=lambda row: row[1])):
+        table[k] = row
+    return table
+
+
+def evolve(cost, bounds, args=(), batch=False, processes=None, log=None, target=None, patience=20,
+           rtol=1e-4, maxiter=300, popsize=15, seed=None, x0=None, chunksize=8, **options):
+    """Differential evolution within bounds, with every generation evaluated
+    at once by an Evaluator (see there for batch, processes and chunksize).
+
+    Stops at maxiter generations, when the best cost reaches target, or when
+    it has improved by less than rtol (relative) over the last patience
+    generations. Other keyword arguments go to differential_evolution.
+    Returns its OptimizeResult, with evaluations, the number of points
+    simulated (not found in the log), and history, the best cost of every
+    generation.
+    """
+    history = []
+
+    def callback(intermediate_result):
+        history.append(intermediate_result.fun)
+        if target is not None and intermediate_result.fun <= target:
+            raise StopIteration
+        if len(history) > patience and history[-patience - 1] - history[-1] <= rtol*abs(history[-patience - 1]):
+            raise StopIteration
+
+    with Evaluator(cost, args, batch, processes, log, chunksize) as evaluate:
+        result = optimize.differential_evolution(lambda X: evaluate(X.T), bounds, vectorized=True,
+                                                 updating='deferred', callback=callback, maxiter=maxiter,
+                                                 popsize=popsize, seed=seed, x0=x0, polish=False, **options)
+    result.evaluations = evaluate.evaluations
+    result.history = np.array(history)
+    return result
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n_starts=4, maxfev=200):
+    """The fmin of run.py, multistart from its initial guess and random
+    starts, and evolve with the batch cost: wall time and best cost, and a
+    rerun of evolve from the log of the first run."""
+    import tempfile
+    from time import perf_counter
+    import ObFunc
+
+    SSA_data = np.loadtxt("SS.txt", dtype='float')
+    V, I = SSA_data[:, 0], SSA_data[:, 1]
+    args = (V, I, 1000)
+    init_params = [48.4, 49.2, 48.4, 49.2, 48.4, 13.6, 1, 0.023, 48.4, 13.6, 0.00001, 0.00001, 0.3]
+    print("{} processes, initial cost {:.4f}".format(os.cpu_count(), ObFunc.cost(np.array(init_params), *args)))
+
+    start = perf_counter()
+    x, f, iters, funcalls, warnflag = optimize.fmin(ObFunc.cost, init_params, args=args, maxiter=maxfev,
+                                                    maxfun=maxfev, full_output=True, disp=False)
+    print("fmin of run.py: cost {:.4f} after {} evaluations, {:.1f} s".format(f, funcalls, perf_counter() - start))
+
+    start = perf_counter()
+    table = multistart(ObFunc.cost, random_starts(n_starts, BOUNDS, x0=init_params, seed=1), args=args,
+                       bounds=BOUNDS, maxfev=maxfev)
+    print("multistart, {} starts: costs {}, {} evaluations, {:.1f} s".format(
+        n_starts, ', '.join('{:.4f}'.format(f) for f in table['f']), table['nfev'].sum(), perf_counter() - start))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'log.txt')
+        options = dict(batch=True, maxiter=15, popsize=5, seed=1, x0=init_params)
+        start = perf_counter()
+        result = evolve(ObFunc.cost_batch, BOUNDS, args, log=EvaluationLog(path), **options)
+        print("evolve, batch cost: cost {:.4f} after {} generations, {} evaluations, {:.1f} s".format(
+            result.fun, result.nit, result.evaluations, perf_counter() - start))
+        start = perf_counter()
+        rerun = evolve(ObFunc.cost_batch, BOUNDS, args, log=EvaluationLog(path), **options)
+        print("evolve again from the log: cost {:.4f}, {} new evaluations, {:.2f} s".format(
+            rerun.fun, rerun.evaluations, perf_counter() - start))
+
+
+if __name__ == '__main__':
+    benchmark()
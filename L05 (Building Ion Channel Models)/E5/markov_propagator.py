@@ -0,0 +1,209 @@
+"""
+Exact solutions of Markov models under piecewise-constant voltage.
+
+While the voltage is held constant the state probabilities of a Markov
+model obey dy/dt = A(V) y with a constant matrix, so
+
+    y(t + k*dt) = expm(A(V)*dt)^k y(t),
+
+and a voltage-clamp protocol needs one matrix per distinct voltage instead
+of an ODE integration per step potential. Propagator keeps, per parameter
+vector and voltage, the eigendecomposition of A(V) and, per time step, the
+matrix expm(A(V)*dt), in LRU caches, so a widget event or a cost function
+evaluation that repeats a voltage or a parameter vector does not recompute
+them. clamp solves all step potentials of a protocol together: from the
+eigendecomposition, every output sample at once as W exp(lambda*k*dt) W^-1 y0,
+or, where the eigenvectors are ill-conditioned, by one batched matrix
+product per sample with the expm of every voltage. protocol chains clamps
+for protocols of several steps (a prepulse and a test pulse, say), with
+the sweeps as the batch dimension. batch_clamp solves a whole stack of
+models (the candidates of a calibration, say) in one vectorized call.
+
+rate_matrix(P) is the function of the model: it takes the parameters with
+the voltage appended (as markov_rhs in ObFunc.py) and returns A with
+A[j, i] the rate from state i to state j.
+
+Example:
+========
+from ObFunc import rate_matrix, Init
+from markov_propagator import Propagator
+
+propagator = Propagator(rate_matrix)
+V = np.arange(-60, 61, 10.0)
+Y = propagator.clamp(P, y0, V, dt=0.1, n_steps=10000)   # (10001, len(V), 7)
+Po = Y[:, :, 0]
+
+# Inactivation: 1 s prepulses to -80..0 mV, then a test pulse to +40 mV
+prepulses = np.arange(-80, 1, 10.0)
+Y = propagator.protocol(P, Init(-70, P), [(prepulses, 10000), (40.0, 2000)], dt=0.1)
+peaks = Y[10001:, :, 0].max(axis=0)
+
+Run this file as a script to time clamp against the vode loop of Activation.
+"""
+
+import functools
+
+import numpy as np
+from scipy.linalg import expm
+
+
+class Propagator():
+    """expm(A(V)*dt) and the eigendecomposition of A(V) of the model with
+    the given rate_matrix, cached per (parameters, V) and (parameters, V, dt).
+    maxsize is the number of entries kept in each cache."""
+
+    def __init__(self, rate_matrix, maxsize=1024, cond=1e8):
+        self.rate_matrix = rate_matrix
+        self.cond = cond
+        self._eig = functools.lru_cache(maxsize=maxsize)(self._decompose)
+        self._expm = functools.lru_cache(maxsize=maxsize)(self._exponential)
+
+    def __repr__(self):
+        return "Propagator({})".format(getattr(self.rate_matrix, '__name__', self.rate_matrix))
+
+    def clear(self):
+        """Empty the caches."""
+        self._eig.cache_clear()
+        self._expm.cache_clear()
+
+    #------------------------------------------------------------------------
+    # Cached matrices
+
+    def matrix(self, params, V):
+        """The rate matrix A(V) for the parameters (without the voltage)."""
+        return np.asarray(self.rate_matrix(np.array(list(params) + [V], dtype=float)), dtype=float)
+
+    def _decompose(self, params, V):
+        """Eigenvalues and eigenvectors of A(V) and the inverse of the
+        eigenvectors, or None where the eigenvectors are ill-conditioned."""
+        lam, W = np.linalg.eig(self.matrix(params, V))
+        if not np.all(np.isfinite(W)) or np.linalg.cond(W) > self.cond:
+            return None
+        return lam, W, np.linalg.inv(W)
+
+    def _exponential(self, params, V, dt):
+        return expm(self.matrix(params, V)*dt)
+
+    def step(self, params, V, dt):
+        """expm(A(V)*dt), the propagator of one time step dt at voltage V."""
+        return self._expm(tuple(map(float, params)), float(V), float(dt))
+
+    #------------------------------------------------------------------------
+    # Protocols
+
+    def clamp(self, params, y0, V, dt, n_steps):
+        """States at the times k*dt, k = 0..n_steps, for the step potentials
+        V, each from the initial state y0 (one for all potentials, or one
+        row per potential), shape (n_steps + 1, len(V), n)."""
+        params = tuple(map(float, params))
+        V = np.atleast_1d(np.asarray(V, dtype=float))
+        n = len(self.matrix(params, V[0]))
+        y0 = np.broadcast_to(np.asarray(y0, dtype=float), (len(V), n))
+        Y = np.empty((n_steps + 1, len(V), n))
+        Y[0] = y0
+        k = np.arange(1, n_steps + 1)*float(dt)
+        stepped = []
+        for i, v in enumerate(V):
+            parts = self._eig(params, float(v))
+            if parts is None:
+                stepped.append(i)
+                continue
+            lam, W, W_inv = parts
+            # W exp(lambda t) W^-1 y0 at all times at once
+            c = W_inv @ y0[i]
+            Y[1:, i] = ((np.exp(np.outer(k, lam))*c) @ W.T).real
+        if stepped:
+            E = np.array([self.step(params, V[i], dt) for i in stepped])
+            y = y0[stepped]
+            for step in range(n_steps):
+                y = np.einsum('vij,vj->vi', E, y)
+                Y[step + 1, stepped] = y
+        return Y
+
+    def protocol(self, params, y0, segments, dt):
+        """States over a protocol of several steps for a batch of sweeps,
+        shape (total steps + 1, sweeps, n). segments is a sequence of
+        (V, n_steps), V one voltage for all sweeps or one per sweep; y0 is
+        one initial state for all sweeps or one row per sweep."""
+        n_sweeps = max([np.size(V) for V, _ in segments] + [len(np.atleast_2d(y0))])
+        y = np.broadcast_to(np.asarray(y0, dtype=float), (n_sweeps, np.shape(y0)[-1]))
+        blocks = [y[None]]
+        for V, n_steps in segments:
+            Y = self.clamp(params, y, np.broadcast_to(np.asarray(V, dtype=float), (n_sweeps,)), dt, n_steps)
+            blocks.append(Y[1:])
+            y = Y[-1]
+        return np.concatenate(blocks)
+
+
+#----------------------------------------------------------------------------
+# Batches of models
+
+def batch_clamp(A, y0, t, rows=None, cond=1e8):
+    """Solutions of dy/dt = A y at the times t for a stack of rate matrices
+    A (..., n, n) and initial states y0 (..., n), shape (..., len(t), n), or
+    only the states in rows. For calibration, where every candidate
+    parameter vector gives new matrices and nothing can be cached: all
+    matrices are diagonalized in one call, and only the few whose
+    eigenvectors are ill-conditioned go through expm at every time.
+    Matrices that are not finite give nan."""
+    A = np.asarray(A, dtype=float)
+    t = np.asarray(t, dtype=float)
+    y0 = np.broadcast_to(np.asarray(y0, dtype=float), A.shape[:-1])
+    rows = np.arange(A.shape[-1]) if rows is None else np.atleast_1d(rows)
+    finite = np.isfinite(A).all(axis=(-2, -1)) & np.isfinite(y0).all(axis=-1)
+    lam, W = np.linalg.eig(np.where(finite[..., None, None], A, 0.0))
+    good = finite & (np.linalg.cond(W) < cond)
+    W_good = np.where(good[..., None, None], W, np.eye(A.shape[-1]))
+    c = np.linalg.solve(W_good, y0[..., None])[..., 0]
+    if np.isrealobj(lam) or not np.iscomplex(lam).any():
+        lam, W_good, c = lam.real, W_good.real, c.real
+    # sum_j W[r, j] c_j exp(lambda_j t), as one matrix product per model
+    g = W_good[..., rows, :]*c[..., None, :]
+    Y = (np.exp(lam[..., None, :]*t[:, None]) @ np.swapaxes(g, -1, -2)).real
+    for index in zip(*np.nonzero(finite & ~good)):
+        Y[index] = (expm(A[index]*t[:, None, None]) @ y0[index])[:, rows]
+    Y[~finite] = np.nan
+    return Y
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(duration=1000):
+    """Time the activation protocol of E5 (the step potentials of SS.txt,
+    1 s steps sampled every 0.1 ms) with the vode loop of Activation and
+    with clamp. tests/test_markov_propagator.py checks that they agree."""
+    from time import perf_counter
+    from scipy.integrate import ode
+    from ObFunc import rate_matrix, markov_rhs, Init
+
+    # The defaults of the sliders of Markov_Widget
+    P = [45, 20, 65, 50, 20, 15, 1.0, 0.023, 29, 15, 2e-5, 2e-5, 0.5]
+    V = np.loadtxt("SS.txt", dtype='float')[:, 0]
+    dt, n_steps = 0.1, int(duration*10)
+    y0 = Init(-70, P)
+
+    start = perf_counter()
+    reference = np.empty((n_steps, len(V)))
+    for n, v in enumerate(V):
+        r = ode(lambda t, y, P: markov_rhs(y, P))
+        r.set_integrator('vode', method='bdf', with_jacobian=False, rtol=1e-5, max_step=0.1)
+        r.set_initial_value(y0, 0).set_f_params(np.array(P + [v]))
+        for ind in range(n_steps):
+            r.integrate(r.t + dt)
+            reference[ind, n] = r.y[0]
+    loop = perf_counter() - start
+
+    propagator = Propagator(rate_matrix)
+    start = perf_counter()
+    propagator.clamp(P, y0, V, dt, n_steps)
+    first = perf_counter() - start
+    start = perf_counter()
+    propagator.clamp(P, y0, V, dt, n_steps)
+    cached = perf_counter() - start
+    print("{} step potentials x {} samples: vode loop {:.2f} s, clamp {:.1f} ms ({:.1f} ms cached), "
+          "{:.0f}x".format(len(V), n_steps, loop, first*1e3, cached*1e3, loop/first))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,4 +1,5 @@
 from math import pi
+from GBV_schema import VENTRICULAR
 
 Pd = {}
 ## Model Parameters
@@ -194,16 +195,7 @@ state_names = ["mo", "ho", "jo", "do", "fo", "fcaBjo", "fcaBslo",
 
 def name2index(name):
     """Take the name of a state in the model, return the index of that state in the solution vector y."""
-    if type(name) == str:
-        try:
-            return state_names.index(name)
-        except ValueError:
-            raise ValueError("{} is not a state in the model".format(name))
-    else:
-        raise TypeError("Input must be the name of a state in the model as a str")
+    return VENTRICULAR.name2index(name)
 
 def index2name(index):
-    if type(index) == int:
-        return state_names[index]
-    else:
-        raise TypeError("Input must be the index of a state as an int")
\ No newline at end of file
+    return VENTRICULAR.index2name(index) + 'o'
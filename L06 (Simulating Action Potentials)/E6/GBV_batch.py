@@ -0,0 +1,879 @@
+"""
+Population-batched versions of the Grandi-Bers ventricular and atrial models.
+
+The right hand sides in this module take a state array of shape
+(n_cells, n_states) and a per-cell parameter table, and evaluate every cell
+in one NumPy pass. A single 1D state vector also works, in which case the
+functions behave like grandi_bers in GBV_RHS.py.
+
+solve_population integrates a population with odeint or, with
+method='rush_larsen', with fixed (generalized) Rush-Larsen steps that update
+the gates exponentially and advance every cell in lockstep.
+
+Example:
+========
+import numpy as np
+from L6_widgets import set_Pd, Initialize
+from GBV_batch import parameter_table, grandi_bers_batch, solve_population
+
+Pds = [set_Pd([1, gna] + [1]*13) for gna in np.linspace(0.5, 2, 100)]
+P = parameter_table(Pds)
+Y0 = np.tile(Initialize(np.load('Widget_init.npy')), (len(Pds), 1))
+t = np.linspace(0, 1000, 1001)
+Y = solve_population(grandi_bers_batch, Y0, t, P)   # shape (1001, 100, 39)
+Y = solve_population(grandi_bers_batch, Y0, t, P, method='rush_larsen', dt=0.1)
+
+Run this file as a script to compare the APD90 accuracy of odeint and the
+Rush-Larsen schemes.
+"""
+
+import numpy as np
+from math import pi
+from scipy.integrate import odeint
+
+
+#----------------------------------------------------------------------------
+# Per-cell parameter tables
+
+def parameter_table(Pd_list):
+    """Stack a list of parameter dictionaries into a single per-cell table.
+
+    Entries that are equal for all cells are kept as scalars, the others
+    become arrays of shape (n_cells,) that broadcast against the states.
+    """
+    table = {}
+    for key in Pd_list[0]:
+        values = [Pd[key] for Pd in Pd_list]
+        if all(np.array_equal(v, values[0]) for v in values[1:]):
+            table[key] = np.asarray(values[0], dtype=float) if key == 'dynamic' else values[0]
+        else:
+            table[key] = np.asarray(values, dtype=float)
+    return table
+
+
+def _stack(ydot, dynamic):
+    """Stack a list of derivatives (scalars or arrays) along the last axis."""
+    return np.stack(np.broadcast_arrays(*ydot), axis=-1)*dynamic
+
+
+#----------------------------------------------------------------------------
+# Gating kinetics, shared by the right hand sides and fixed-step integrators
+
+def ventricular_gates(Vm, Pd):
+    """Steady states and time constants of the ventricular gates.
+
+    Returns two tuples (inf, tau) ordered as m, h, j, d, f, xtos, ytos, xtof,
+    ytof, xkr, xks.
+    """
+    #INa ten Tusscher formulation
+    mss = 1 / ((1 + np.exp( -(56.86 + Vm) / 9.03 ))**2)
+    taum = 0.1292 * np.exp(-((Vm+45.79)/15.54)**2) + 0.06487 * np.exp(-((Vm-4.823)/51.12)**2)
+    ah = np.where(Vm >= -40, 0.0, 0.057 * np.exp( -(Vm + 80) / 6.8 ))
+    bh = np.where(Vm >= -40, 0.77 / (0.13*(1 + np.exp( -(Vm + 10.66) / 11.1 ))),
+                  2.7 * np.exp( 0.079 * Vm) + 3.1*10**5 * np.exp(0.3485 * Vm))
+    tauh = 1 / (ah + bh)
+    hss = 1 / ((1 + np.exp( (Vm + 71.55)/7.43 ))**2)
+    aj = np.where(Vm >= -40, 0.0,
+                  ((-2.5428 * 10**4*np.exp(0.2444*Vm) - 6.948*10**-6 * np.exp(-0.04391*Vm)) * (Vm + 37.78)) /(1 + np.exp( 0.311 * (Vm + 79.23) )))
+    bj = np.where(Vm >= -40, (0.6 * np.exp( 0.057 * Vm)) / (1 + np.exp( -0.1 * (Vm + 32) )),
+                  (0.02424 * np.exp( -0.01052 * Vm )) / (1 + np.exp( -0.1378 * (Vm + 40.14) )))
+    tauj = 1 / (aj + bj)
+    jss = hss
+
+    ## I_Ca: L-type Calcium Current
+    dss = 1/(1+np.exp(-(Vm+5)/6.0))
+    fss = 1/(1+np.exp((Vm+35)/9))+0.6/(1+np.exp((50-Vm)/20))
+    taud = dss*(1-np.exp(-(Vm+5)/6.0))/(0.035*(Vm+5))
+    tauf = 1/(0.0197*np.exp( -(0.0337*(Vm+14.5))**2 )+0.02)
+
+    ## I_to: Transient Outward K Current (slow and fast components)
+    xtoss = 1/(1+np.exp(-(Vm-19.0)/13))
+    ytoss = 1/(1+np.exp((Vm+19.5)/5))
+    tauxtos = 9/(1+np.exp((Vm+3.0)/15))+0.5
+    tauytos = 800/(1+np.exp((Vm+60.0)/10))+30
+    tauxtof = 11*np.exp(-((Vm+45)/60)**2)+1.0
+    tauytof = 85*np.exp((-(Vm+40)**2/220))+7
+
+    ## I_kr and I_ks
+    xrss = 1/(1+np.exp(-(Vm+10)/5))
+    tauxr = 550/(1+np.exp((-22-Vm)/9))*6/(1+np.exp((Vm-(-11))/9))+230/(1+np.exp((Vm-(-40))/20))
+    xsss = 1 / (1+np.exp(-(Vm + 3.8)/14.25))
+    tauxs = 990.1/(1+np.exp(-(Vm+2.436)/14.12))
+
+    inf = (mss, hss, jss, dss, fss, xtoss, ytoss, xtoss, ytoss, xrss, xsss)
+    tau = (taum, tauh, tauj, taud, tauf, tauxtos, tauytos, tauxtof, tauytof, tauxr, tauxs)
+    return inf, tau
+
+
+def atrial_gates(Vm, Pd):
+    """Steady states and time constants of the atrial gates.
+
+    Returns two tuples (inf, tau) ordered as m, h, j, d, f, xtof, ytof, xkr,
+    xks, rkuro, skuro, ml, hl.
+    """
+    ISO = Pd['ISO']
+
+    #ten Tusscher formulation
+    mss = 1 / ((1 + np.exp( -(56.86 + Vm) / 9.03 ))**2)
+    taum = 0.1292 * np.exp(-((Vm+45.79)/15.54)**2) + 0.06487 * np.exp(-((Vm-4.823)/51.12)**2)
+    ah = np.where(Vm >= -40, 0.0, 0.057 * np.exp( -(Vm + 80) / 6.8 ))
+    bh = np.where(Vm >= -40, 0.77 / (0.13*(1 + np.exp( -(Vm + 10.66) / 11.1 ))),
+                  2.7 * np.exp( 0.079 * Vm) + 3.1*10**5 * np.exp(0.3485 * Vm))
+    tauh = 1 / (ah + bh)
+    hss = 1 / ((1 + np.exp( (Vm + 71.55)/7.43 ))**2)
+    aj = np.where(Vm >= -40, 0.0,
+                  ((-2.5428 * 10**4*np.exp(0.2444*Vm) - 6.948*10**-6 * np.exp(-0.04391*Vm)) * (Vm + 37.78)) /(1 + np.exp( 0.311 * (Vm + 79.23) )))
+    bj = np.where(Vm >= -40, (0.6 * np.exp( 0.057 * Vm)) / (1 + np.exp( -0.1 * (Vm + 32) )),
+                  (0.02424 * np.exp( -0.01052 * Vm )) / (1 + np.exp( -0.1378 * (Vm + 40.14) )))
+    tauj = 1 / (aj + bj)
+    jss = hss
+
+    # Late I_Na, written in alpha/beta form in the original model
+    aml = 0.32*(Vm+47.13)/(1-np.exp(-0.1*(Vm+47.13)))
+    bml = 0.08*np.exp(-Vm/11)
+    mlss = aml/(aml+bml)
+    tauml = 1/(aml+bml)
+    hlinf = 1/(1.0+np.exp((Vm+91.0)/6.1))
+    tauhl = Pd['tauhl']*np.ones_like(Vm)
+
+    ## I_kr and I_ks
+    xrss = 1/(1+np.exp(-(Vm+10)/5))
+    tauxr = 550/(1+np.exp((-22-Vm)/9))*6/(1+np.exp((Vm-(-11))/9))+230/(1+np.exp((Vm-(-40))/20))
+    xsss = 1 / (1+np.exp(-(Vm + 40*ISO + 3.8)/14.25))
+    tauxs = 990.1/(1+np.exp(-(Vm+40*ISO+2.436)/14.12))
+
+    ## I_to: Transient Outward K Current
+    xtoss = 1/(1+np.exp(-(Vm-1.0)/11.0))
+    ytoss = 1/(1+np.exp((Vm+40.5)/11.5))
+    tauxtof = 3.5*np.exp(-((Vm+45)/30)**2)+1.5
+    tauytof = 25.635*np.exp(-(((Vm+52.45)/15.8827)**2.0))+24.14
+
+    ## I_kur: Ultra rapid delayed rectifier Outward K Current
+    xkurss = 1.0/(1.0 + np.exp((Vm+6.0)/-8.6))
+    tauxkur = 9.0/(1.0+np.exp((Vm+5.0)/12.0))+0.5
+    ykurss = 1.0/(1.0 + np.exp((Vm+7.5)/10.0))
+    tauykur = 590.0/(1.0+np.exp((Vm+60.0)/10.0))+3050.0
+
+    ## I_Ca: L-type Calcium Current
+    fss = 1/(1+np.exp((Vm+35)/9))+0.6/(1+np.exp((50-Vm)/20))
+    dss = 1/(1+np.exp(-(Vm+3*ISO+9)/6.0))
+    taud = dss*(1-np.exp(-(Vm+3*ISO+9)/6.0))/(0.035*(Vm+3*ISO+9))
+    tauf = 1/(0.0197*np.exp( -(0.0337*(Vm+3*ISO+25))**2 )+0.02)
+
+    inf = (mss, hss, jss, dss, fss, xtoss, ytoss, xrss, xsss, xkurss, ykurss, mlss, hlinf)
+    tau = (taum, tauh, tauj, taud, tauf, tauxtof, tauytof, tauxr, tauxs, tauxkur, tauykur, tauml, tauhl)
+    return inf, tau
+
+
+def voltage_terms(Vm, Pd):
+    """Voltage-only factors of the currents shared by both models.
+
+    Returns fnak, rkr, kp_kp, the GHK exponentials exp(Vm*FoRT) and
+    exp(2*Vm*FoRT) with their prefactors Vm*Frdy*FoRT/(exp(Vm*FoRT)-1) and
+    4*Vm*Frdy*FoRT/(exp(2*Vm*FoRT)-1), the NCX exponentials exp(nu*Vm*FoRT)
+    and exp((nu-1)*Vm*FoRT), and the voltage dependence of I_kAch.
+    """
+    Frdy = Pd['Frdy']
+    FoRT = Frdy/Pd['R']/Pd['Temp']
+    sigma = (np.exp(Pd['Nao']/67.3)-1)/7
+    fnak = 1/(1+0.1245*np.exp(-0.1*Vm*FoRT)+0.0365*sigma*np.exp(-Vm*FoRT))
+    rkr = 1/(1+np.exp((Vm+74)/24))
+    kp_kp = 1/(1+np.exp(7.488-Vm/5.98))
+    e1 = np.exp(Vm*FoRT)
+    e2 = np.exp(2*Vm*FoRT)
+    ghk1 = (Vm*Frdy*FoRT)/(e1-1)
+    ghk2 = 4*(Vm*Frdy*FoRT)/(e2-1)
+    enu = np.exp(Pd['nu']*Vm*FoRT)
+    enu1 = np.exp((Pd['nu']-1)*Vm*FoRT)
+    kach = 0.08+0.4/(1+np.exp((Vm+91)/12))
+    return fnak, rkr, kp_kp, e1, ghk1, e2, ghk2, enu, enu1, kach
+
+
+#----------------------------------------------------------------------------
+# Right hand sides
+
+def grandi_bers_batch(Y, t, Pd, gates=None, terms=None):
+    """Ventricular Grandi-Bers right hand side for an (n_cells, 39) state array.
+
+    Pd is either a parameter dictionary shared by all cells or a table from
+    parameter_table with one value per cell. gates and terms optionally hold
+    the outputs of ventricular_gates and voltage_terms when the caller has
+    them already, for example from a lookup table.
+    """
+    m,     h,     j,     d,     f,     fcaBj,     fcaBsl,    xtos,     ytos,     xtof,     ytof,     xkr,     xks,     RyRr,    RyRo,    RyRi,    NaBj,    NaBsl,    TnCL,     TnCHc,    TnCHm,    CaM,     Myoc,     Myom,     SRB,     SLLj,     SLLsl,     SLHj,     SLHsl,     Csqnb,     Ca_sr,    Naj,     Nasl,     Nai,     Ki,     Caj,     Casl,    Cai,     Vm  = np.ascontiguousarray(np.moveaxis(np.asarray(Y, dtype=float), -1, 0))
+
+    # Constants
+    Frdy = Pd['Frdy']
+    Temp = Pd['Temp']
+    FoRT = Frdy/Pd['R']/Temp
+    Qpow = (Temp-310)/10
+    Cmem = Pd['Cmem']
+
+    # Cell geometry
+    Vcell = pi*Pd['cellRadius']**2*Pd['cellLength']*1e-15
+    Vmyo = Pd['Vmyo_ratio']*Vcell
+    Vsr = Pd['Vsr_ratio']*Vcell
+    Vsl = Pd['Vsl_ratio']*Vcell
+    Vjunc = Pd['Vjunc_ratio']*Vcell
+
+    # Fractional currents in compartments
+    Fjunc = Pd['Fjunc']
+    Fsl = 1-Fjunc
+    Fjunc_CaL = Pd['Fjunc_CaL']
+    Fsl_CaL = 1-Fjunc_CaL
+
+    # Fixed ion concentrations
+    Cli = Pd['Cli']
+    Clo = Pd['Clo']
+    Ko = Pd['Ko']
+    Nao = Pd['Nao']
+    Cao = Pd['Cao']
+    Mgi = Pd['Mgi']
+
+    # Buffering parameters, volume rescaled where needed
+    Bmax_SLlowsl = Pd['Bmax_SLlowsl']*Vmyo/Vsl
+    Bmax_SLlowj = Pd['Bmax_SLlowj']*Vmyo/Vjunc
+    Bmax_SLhighsl = Pd['Bmax_SLhighsl']*Vmyo/Vsl
+    Bmax_SLhighj = Pd['Bmax_SLhighj']*Vmyo/Vjunc
+    Bmax_Csqn = Pd['Bmax_Csqn']*Vmyo/Vsr
+
+    # Nernst Potentials
+    ena_junc = (1/FoRT)*np.log(Nao/Naj)     # [mV]
+    ena_sl = (1/FoRT)*np.log(Nao/Nasl)       # [mV]
+    ek = (1/FoRT)*np.log(Ko/Ki)	        # [mV]
+    eca_junc = (1/FoRT/2)*np.log(Cao/Caj)   # [mV]
+    eca_sl = (1/FoRT/2)*np.log(Cao/Casl)     # [mV]
+    ecl = (1/FoRT)*np.log(Cli/Clo)            # [mV]
+
+    # Gating variables
+    (mss, hss, jss, dss, fss, xtoss, ytoss, xtofss, ytofss, xrss, xsss), \
+        (taum, tauh, tauj, taud, tauf, tauxtos, tauytos, tauxtof, tauytof, tauxr, tauxs) = gates or ventricular_gates(Vm, Pd)
+    d_m = (mss - m) / taum
+    d_h = (hss - h) / tauh
+    d_j = (jss - j) / tauj
+    d_d = (dss-d)/taud
+    d_f = (fss-f)/tauf
+    d_xtos = (xtoss-xtos)/tauxtos
+    d_ytos = (ytoss-ytos)/tauytos
+    d_xtof = (xtofss-xtof)/tauxtof
+    d_ytof = (ytofss-ytof)/tauytof
+    d_xkr = (xrss-xkr)/tauxr
+    d_xks = (xsss-xks)/tauxs
+
+    #CURRENTS
+    I_Na_junc = Fjunc*Pd['GNa']*m**3*h*j*(Vm-ena_junc)
+    I_Na_sl = Fsl*Pd['GNa']*m**3*h*j*(Vm-ena_sl)
+
+    # Voltage-only factors of the currents
+    fnak, rkr, kp_kp, e1, ghk1, e2, ghk2, enu, enu1, kach = terms or voltage_terms(Vm, Pd)
+
+    # I_nak: Na/K Pump Current
+    I_nak_junc = 1*Fjunc*Pd['IbarNaK']*fnak*Ko/(1+(Pd['KmNaip']/Naj)**4)/(Ko+Pd['KmKo'])
+    I_nak_sl = 1*Fsl*Pd['IbarNaK']*fnak*Ko/(1+(Pd['KmNaip']/Nasl)**4)/(Ko+Pd['KmKo'])
+    I_nak = I_nak_junc+I_nak_sl
+
+    ## I_kr: Rapidly Activating K Current
+    gkr = Pd['Gkr']*np.sqrt(Ko/5.4)
+    I_kr = gkr*xkr*rkr*(Vm-ek)
+
+    ## I_ks: Slowly Activating K Current
+    eks = (1/FoRT)*np.log((Ko+Pd['pNaK']*Nao)/(Ki+Pd['pNaK']*Nai))
+    I_ks = Pd['Gks']*xks**2*(Vm-eks)
+
+    # I_kp: Plateau K current
+    I_kp = Pd['Gkp']*kp_kp*(Vm-ek)
+
+    ## I_to: Transient Outward K Current (slow and fast components)
+    I_tos = Pd['GtoSlow']*xtos*ytos*(Vm-ek)
+    I_tof = Pd['GtoFast']*xtof*ytof*(Vm-ek)
+    I_to = I_tos + I_tof
+
+    ## I_ki: Time-Independent K Current
+    aki = 1.02/(1+np.exp(0.2385*(Vm-ek-59.215)))
+    bki =(0.49124*np.exp(0.08032*(Vm+5.476-ek)) + np.exp(0.06175*(Vm-ek-594.31))) /(1 + np.exp(-0.5143*(Vm-ek+4.753)))
+    kiss = aki/(aki+bki)
+    I_ki = Pd['Gki']*np.sqrt(Ko/5.4)*kiss*(Vm-ek)
+
+    # I_ClCa: Ca-activated Cl Current, I_Clbk: background Cl Current
+    I_ClCa_junc = Fjunc*Pd['GClCa']/(1+Pd['KdClCa']/Caj)*(Vm-ecl)
+    I_ClCa_sl = Fsl*Pd['GClCa']/(1+Pd['KdClCa']/Casl)*(Vm-ecl)
+    I_ClCa = I_ClCa_junc+I_ClCa_sl
+
+    ## I_Ca: L-type Calcium Current (fcaCaj and fcaCaMSL are zero in this model)
+    d_fcaBj = 1.7*Caj*(1-fcaBj)-11.9e-3*fcaBj # fCa_junc
+    d_fcaBsl = 1.7*Casl*(1-fcaBsl)-11.9e-3*fcaBsl # fCa_sl
+    Q10CaL = Pd['Q10CaL']**Qpow
+    ibarca_j = Pd['pCa']*ghk2*(0.341*Caj*e2-0.341*Cao)
+    ibarca_sl = Pd['pCa']*ghk2*(0.341*Casl*e2-0.341*Cao)
+    ibark = Pd['pK']*ghk1*(0.75*Ki*e1-0.75*Ko)
+    ibarna_j = Pd['pNa']*ghk1*(0.75*Naj*e1-0.75*Nao)
+    ibarna_sl = Pd['pNa']*ghk1*(0.75*Nasl*e1-0.75*Nao)
+    I_Ca_junc = (Fjunc_CaL*ibarca_j*d*f*(1-fcaBj)*Q10CaL)*0.45
+    I_Ca_sl = (Fsl_CaL*ibarca_sl*d*f*(1-fcaBsl)*Q10CaL)*0.45
+    I_CaK = (ibark*d*f*(Fjunc_CaL*(1-fcaBj)+Fsl_CaL*(1-fcaBsl))*Q10CaL)*0.45
+    I_CaNa_junc = (Fjunc_CaL*ibarna_j*d*f*(1-fcaBj)*Q10CaL)*0.45
+    I_CaNa_sl = (Fsl_CaL*ibarna_sl*d*f*(1-fcaBsl)*Q10CaL)*.45
+
+    # I_ncx: Na/Ca Exchanger flux
+    Ka_junc = 1/(1+(Pd['Kdact']/Caj)**2)
+    Ka_sl = 1/(1+(Pd['Kdact']/Casl)**2)
+    s1_junc = enu*Naj**3*Cao
+    s1_sl = enu*Nasl**3*Cao
+    s2_junc = enu1*Nao**3*Caj
+    s3_junc = Pd['KmCai']*Nao**3*(1+(Naj/Pd['KmNai'])**3) + Pd['KmNao']**3*Caj*(1+Caj/Pd['KmCai'])+Pd['KmCao']*Naj**3+Naj**3*Cao+Nao**3*Caj
+    s2_sl = enu1*Nao**3*Casl
+    s3_sl = Pd['KmCai']*Nao**3*(1+(Nasl/Pd['KmNai'])**3) + Pd['KmNao']**3*Casl*(1+Casl/Pd['KmCai'])+Pd['KmCao']*Nasl**3+Nasl**3*Cao+Nao**3*Casl
+    I_ncx_junc = Fjunc*Pd['IbarNCX']*Pd['Q10NCX']**Qpow*Ka_junc*(s1_junc-s2_junc)/s3_junc/(1+Pd['ksat']*enu1)
+    I_ncx_sl = Fsl*Pd['IbarNCX']*Pd['Q10NCX']**Qpow*Ka_sl*(s1_sl-s2_sl)/s3_sl/(1+Pd['ksat']*enu1)
+
+    # I_pca: Sarcolemmal Ca Pump Current
+    I_pca_junc = Fjunc*Pd['Q10SLCaP']**Qpow*Pd['IbarSLCaP']*Caj**1.6/(Pd['KmPCa']**1.6+Caj**1.6)
+    I_pca_sl = Fsl*Pd['Q10SLCaP']**Qpow*Pd['IbarSLCaP']*Casl**1.6/(Pd['KmPCa']**1.6+Casl**1.6)
+
+    ## SR fluxes: Calcium Release, SR Ca pump, SR Ca leak
+    MaxSR = 15
+    MinSR = 1
+    kCaSR = MaxSR - (MaxSR-MinSR)/(1+(Pd['ec50SR']/Ca_sr)**2.5)
+    koSRCa = Pd['koCa']/kCaSR
+    kiSRCa = Pd['kiCa']*kCaSR
+    RI = 1-RyRr-RyRo-RyRi
+    d_RyRr = (Pd['kim']*RI-kiSRCa*Caj*RyRr)-(koSRCa*Caj**2*RyRr-Pd['kom']*RyRo)   # R
+    d_RyRo = (koSRCa*Caj**2*RyRr-Pd['kom']*RyRo)-(kiSRCa*Caj*RyRo-Pd['kim']*RyRi)# O
+    d_RyRi = (kiSRCa*Caj*RyRo-Pd['kim']*RyRi)-(Pd['kom']*RyRi-koSRCa*Caj**2*RI)   # I
+    J_SRCarel = Pd['ks']*RyRo*(Ca_sr-Caj)          # [mM/ms]
+    J_serca = 1*Pd['Q10SRCaP']**Qpow*Pd['Vmax_SRCaP']*((Cai/Pd['Kmf'])**Pd['hillSRCaP']-(Ca_sr/Pd['Kmr'])**Pd['hillSRCaP'])/(1+(Cai/Pd['Kmf'])**Pd['hillSRCaP']+(Ca_sr/Pd['Kmr'])**Pd['hillSRCaP'])
+    J_SRleak = 5.348e-6*(Ca_sr-Caj)           #   [mM/ms]
+
+    # BACKROUND CURRENTS
+    I_nabk_junc = Fjunc*Pd['GNaB']*(Vm-ena_junc)
+    I_nabk_sl = Fsl*Pd['GNaB']*(Vm-ena_sl)
+    I_cabk_junc = Fjunc*Pd['GCaB']*(Vm-eca_junc)
+    I_cabk_sl = Fsl*Pd['GCaB']*(Vm-eca_sl)
+    I_Clbk = Pd['GClB']*(Vm-ecl)
+
+    # BUFFERS
+    # Sodium and Calcium Buffering
+    d_NaBj = Pd['kon_na']*Naj*(Pd['Bmax_Naj']-NaBj)-Pd['koff_na']*NaBj
+    d_NaBsl = Pd['kon_na']*Nasl*(Pd['Bmax_Nasl']-NaBsl)-Pd['koff_na']*NaBsl
+
+    # Cytosolic Ca Buffers
+    d_TnCL = Pd['kon_tncl']*Cai*(Pd['Bmax_TnClow']-TnCL)-Pd['koff_tncl']*TnCL
+    d_TnCHc = Pd['kon_tnchca']*Cai*(Pd['Bmax_TnChigh']-TnCHc-TnCHm)-Pd['koff_tnchca']*TnCHc
+    d_TnCHm = Pd['kon_tnchmg']*Mgi*(Pd['Bmax_TnChigh']-TnCHc-TnCHm)-Pd['koff_tnchmg']*TnCHm
+    d_CaM = Pd['kon_cam']*Cai*(Pd['Bmax_CaM']-CaM)-Pd['koff_cam']*CaM
+    d_Myoc = Pd['kon_myoca']*Cai*(Pd['Bmax_myosin']-Myoc-Myom)-Pd['koff_myoca']*Myoc
+    d_Myom = Pd['kon_myomg']*Mgi*(Pd['Bmax_myosin']-Myoc-Myom)-Pd['koff_myomg']*Myom
+    d_SRB = Pd['kon_sr']*Cai*(Pd['Bmax_SR']-SRB)-Pd['koff_sr']*SRB
+    J_CaB_cytosol = d_TnCL + d_TnCHc + d_TnCHm + d_CaM + d_Myoc + d_Myom + d_SRB
+
+    # Junctional and SL Ca Buffers
+    d_SLLj = Pd['kon_sll']*Caj*(Bmax_SLlowj-SLLj)-Pd['koff_sll']*SLLj
+    d_SLLsl = Pd['kon_sll']*Casl*(Bmax_SLlowsl-SLLsl)-Pd['koff_sll']*SLLsl
+    d_SLHj = Pd['kon_slh']*Caj*(Bmax_SLhighj-SLHj)-Pd['koff_slh']*SLHj
+    d_SLHsl = Pd['kon_slh']*Casl*(Bmax_SLhighsl-SLHsl)-Pd['koff_slh']*SLHsl
+    J_CaB_junction = d_SLLj+d_SLHj
+    J_CaB_sl = d_SLLsl+d_SLHsl
+
+    ## Ion concentrations
+    # SR Ca Concentrations
+    d_Csqnb = Pd['kon_csqn']*Ca_sr*(Bmax_Csqn-Csqnb)-Pd['koff_csqn']*Csqnb
+    d_Ca_sr = J_serca-(J_SRleak*Vmyo/Vsr+J_SRCarel)-d_Csqnb
+
+    # Sodium Concentrations
+    I_Na_tot_junc = I_Na_junc+I_nabk_junc+3*I_ncx_junc+3*I_nak_junc+I_CaNa_junc   # [uA/uF]
+    I_Na_tot_sl = I_Na_sl+I_nabk_sl+3*I_ncx_sl+3*I_nak_sl+I_CaNa_sl   # [uA/uF]
+    d_Naj = -I_Na_tot_junc*Cmem/(Vjunc*Frdy)+Pd['J_na_juncsl']/Vjunc*(Nasl-Naj)-d_NaBj
+    d_Nasl = -I_Na_tot_sl*Cmem/(Vsl*Frdy)+Pd['J_na_juncsl']/Vsl*(Naj-Nasl)+Pd['J_na_slmyo']/Vsl*(Nai-Nasl)-d_NaBsl
+    d_Nai = Pd['J_na_slmyo']/Vmyo*(Nasl-Nai)             # [mM/msec]
+
+    # Potassium Concentration
+    I_K_tot = I_to+I_kr+I_ks+I_ki-2*I_nak+I_CaK+I_kp     # [uA/uF]
+    d_Ki = 0
+
+    # Calcium Concentrations
+    I_Ca_tot_junc = I_Ca_junc+I_cabk_junc+I_pca_junc-2*I_ncx_junc                   # [uA/uF]
+    I_Ca_tot_sl = I_Ca_sl+I_cabk_sl+I_pca_sl-2*I_ncx_sl            # [uA/uF]
+    d_Caj = -I_Ca_tot_junc*Cmem/(Vjunc*2*Frdy)+Pd['J_ca_juncsl']/Vjunc*(Casl-Caj)   -J_CaB_junction+(J_SRCarel)*Vsr/Vjunc+J_SRleak*Vmyo/Vjunc  # Ca_j
+    d_Casl = -I_Ca_tot_sl*Cmem/(Vsl*2*Frdy)+Pd['J_ca_juncsl']/Vsl*(Caj-Casl)  + Pd['J_ca_slmyo']/Vsl*(Cai-Casl)-J_CaB_sl   # Ca_sl
+    d_Cai = -J_serca*Vsr/Vmyo-J_CaB_cytosol +Pd['J_ca_slmyo']/Vmyo*(Casl-Cai)
+
+    ## Summing the current components
+    I_Na_tot = I_Na_tot_junc + I_Na_tot_sl          # [uA/uF]
+    I_Cl_tot = I_ClCa+I_Clbk                        # [uA/uF]
+    I_Ca_tot = I_Ca_tot_junc+I_Ca_tot_sl
+    I_tot = I_Na_tot+I_Cl_tot+I_Ca_tot+I_K_tot
+    I_app = Pd['I_app'] if (t<5) else 0.0
+    d_Vm = -(I_tot-I_app)
+
+    ydot = [d_m,d_h, d_j, d_d, d_f,d_fcaBj, d_fcaBsl, d_xtos, d_ytos,d_xtof, d_ytof, d_xkr, d_xks, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL, d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom,   d_SRB, d_SLLj, d_SLLsl, d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Naj, d_Nasl, d_Nai, d_Ki, d_Caj, d_Casl, d_Cai, d_Vm]
+
+    return _stack(ydot, Pd['dynamic'])
+
+
+def grandi_bers_atrial_batch(Y, t, Pd, gates=None, terms=None):
+    """Atrial Grandi-Bers right hand side for an (n_cells, 42) state array.
+
+    Pd is either a parameter dictionary from set_Pd_atrial shared by all
+    cells or a table from parameter_table with one value per cell. gates
+    and terms optionally hold the outputs of atrial_gates and voltage_terms.
+    """
+    m,     h,     j,     d,     f,     fcaBj,     fcaBsl,    xtof,     ytof,     xkr,     xks,     RyRr,    RyRo,    RyRi,    NaBj,    NaBsl,    TnCL,     TnCHc,    TnCHm,    CaM,     Myoc,     Myom,     SRB,     SLLj,     SLLsl,     SLHj,     SLHsl,     Csqnb,     Ca_sr,    Naj,     Nasl,     Nai,     Ki,     Caj,     Casl,    Cai,     Vm,     rkuro,    skuro,    ml,    hl,    INal = np.ascontiguousarray(np.moveaxis(np.asarray(Y, dtype=float), -1, 0))
+
+    # Constants
+    Frdy = Pd['Frdy']
+    Temp = Pd['Temp']
+    FoRT = Frdy/Pd['R']/Temp
+    Qpow = (Temp-310)/10
+    Cmem = Pd['Cmem']
+
+    # Cell geometry
+    Vcell = pi*Pd['cellRadius']**2*Pd['cellLength']*1e-15
+    Vmyo = Pd['Vmyo_ratio']*Vcell
+    Vsr = Pd['Vsr_ratio']*Vcell
+    Vsl = Pd['Vsl_ratio']*Vcell
+    Vjunc = Pd['Vjunc_ratio']*Vcell
+
+    # Fractional currents in compartments
+    Fjunc = Pd['Fjunc']
+    Fsl = 1-Fjunc
+    Fjunc_CaL = Pd['Fjunc_CaL']
+    Fsl_CaL = 1-Fjunc_CaL
+
+    # Fixed ion concentrations
+    Cli = Pd['Cli']
+    Clo = Pd['Clo']
+    Ko = Pd['Ko']
+    Nao = Pd['Nao']
+    Cao = Pd['Cao']
+    Mgi = Pd['Mgi']
+
+    # Buffering parameters, volume rescaled where needed
+    Bmax_SLlowsl = Pd['Bmax_SLlowsl']*Vmyo/Vsl
+    Bmax_SLlowj = Pd['Bmax_SLlowj']*Vmyo/Vjunc
+    Bmax_SLhighsl = Pd['Bmax_SLhighsl']*Vmyo/Vsl
+    Bmax_SLhighj = Pd['Bmax_SLhighj']*Vmyo/Vjunc
+    Bmax_Csqn = Pd['Bmax_Csqn']*Vmyo/Vsr
+
+    # Nernst Potentials
+    ena_junc = (1/FoRT)*np.log(Nao/Naj)    # [mV]
+    ena_sl = (1/FoRT)*np.log(Nao/Nasl)       # [mV]
+    ek = (1/FoRT)*np.log(Ko/Ki)	        # [mV]
+    eca_junc = (1/FoRT/2)*np.log(Cao/Caj)   # [mV]
+    eca_sl = (1/FoRT/2)*np.log(Cao/Casl)     # [mV]
+    ecl = (1/FoRT)*np.log(Cli/Clo)            # [mV]
+
+    # Gating variables
+    (mss, hss, jss, dss, fss, xtoss, ytoss, xrss, xsss, xkurss, ykurss, mlss, hlinf), \
+        (taum, tauh, tauj, taud, tauf, tauxtof, tauytof, tauxr, tauxs, tauxkur, tauykur, tauml, tauhl) = gates or atrial_gates(Vm, Pd)
+    d_m = (mss - m) / taum
+    d_h = (hss - h) / tauh
+    d_j = (jss - j) / tauj
+    d_d = (dss-d)/taud
+    d_f = (fss-f)/tauf
+    d_xtof = (xtoss-xtof)/tauxtof
+    d_ytof = (ytoss-ytof)/tauytof
+    d_xkr = (xrss-xkr)/tauxr
+    d_xks = (xsss-xks)/tauxs
+    d_rkuro = (xkurss-rkuro)/tauxkur
+    d_skuro = (ykurss-skuro)/tauykur
+    d_ml = (mlss-ml)/tauml
+    d_hl = (hlinf-hl)/tauhl
+
+    #CURRENTS
+    I_Na_junc = Fjunc*Pd['GNa']*m**3*h*j*(Vm-ena_junc)
+    I_Na_sl = Fsl*Pd['GNa']*m**3*h*j*(Vm-ena_sl)
+
+    # Late I_Na
+    I_NaL_junc = Fjunc*Pd['GNaL']*ml**3*hl*(Vm-ena_junc)
+    I_NaL_sl = Fsl*Pd['GNaL']*ml**3*hl*(Vm-ena_sl)
+    d_INal = I_NaL_junc + I_NaL_sl
+
+    # Voltage-only factors of the currents
+    fnak, rkr, kp_kp, e1, ghk1, e2, ghk2, enu, enu1, kach = terms or voltage_terms(Vm, Pd)
+
+    # I_nak: Na/K Pump Current
+    I_nak_junc = 1*Fjunc*Pd['IbarNaK']*fnak*Ko/(1+(Pd['KmNaip']/Naj)**4)/(Ko+Pd['KmKo'])
+    I_nak_sl = 1*Fsl*Pd['IbarNaK']*fnak*Ko/(1+(Pd['KmNaip']/Nasl)**4)/(Ko+Pd['KmKo'])
+    I_nak = I_nak_junc+I_nak_sl
+
+    ## I_kr: Rapidly Activating K Current
+    gkr = Pd['Gkr']*np.sqrt(Ko/5.4)
+    I_kr = gkr*xkr*rkr*(Vm-ek)
+
+    ## I_ks: Slowly Activating K Current
+    eks = (1/FoRT)*np.log((Ko+Pd['pNaK']*Nao)/(Ki+Pd['pNaK']*Nai))
+    I_ks = Pd['Gks']*xks**2*(Vm-eks)
+
+    #I_kp: Plateau K current
+    I_kp = Pd['Gkp']*kp_kp*(Vm-ek)
+
+    ## I_to: Transient Outward K Current
+    I_to = Pd['GtoFast']*xtof*ytof*(Vm-ek)
+
+    ## I_kur: Ultra rapid delayed rectifier Outward K Current
+    I_kur = 1*Pd['Gkur']*rkuro*skuro*(Vm-ek)
+
+    ## I_ki: Time-Independent K Current
+    aki = 1.02/(1+np.exp(0.2385*(Vm-ek-59.215)))
+    bki =(0.49124*np.exp(0.08032*(Vm+5.476-ek)) + np.exp(0.06175*(Vm-ek-594.31))) /(1 + np.exp(-0.5143*(Vm-ek+4.753)))
+    kiss = aki/(aki+bki)
+    I_ki =Pd['Gki']*np.sqrt(Ko/5.4)*kiss*(Vm-ek)
+
+    ## I_kAch: Acetylcholine sensitive K+ current
+    I_kAch = Pd['GkAch']*kach*(Vm-ek)
+
+    # I_ClCa: Ca-activated Cl Current
+    I_ClCa_junc = Fjunc*Pd['GClCa']/(1+Pd['KdClCa']/Caj)*(Vm-ecl)
+    I_ClCa_sl = Fsl*Pd['GClCa']/(1+Pd['KdClCa']/Casl)*(Vm-ecl)
+    I_ClCa = I_ClCa_junc+I_ClCa_sl
+
+    ## I_Ca: L-type Calcium Current (fcaCaj and fcaCaMSL are zero in this model)
+    d_fcaBj = 1.7*Caj*(1-fcaBj)-11.9e-3*fcaBj # fCa_junc
+    d_fcaBsl = 1.7*Casl*(1-fcaBsl)-11.9e-3*fcaBsl # fCa_sl
+    Q10CaL = Pd['Q10CaL']**Qpow
+    ibarca_j = Pd['pCa']*ghk2*(0.341*Caj*e2-0.341*Cao)
+    ibarca_sl = Pd['pCa']*ghk2*(0.341*Casl*e2-0.341*Cao)
+    ibark = Pd['pK']*ghk1*(0.75*Ki*e1-0.75*Ko)
+    ibarna_j = Pd['pNa']*ghk1*(0.75*Naj*e1-0.75*Nao)
+    ibarna_sl = Pd['pNa']*ghk1*(0.75*Nasl*e1-0.75*Nao)
+    I_Ca_junc = (Fjunc_CaL*ibarca_j*d*f*(1-fcaBj)*Q10CaL)*0.45
+    I_Ca_sl = (Fsl_CaL*ibarca_sl*d*f*(1-fcaBsl)*Q10CaL)*0.45
+    I_CaK = (ibark*d*f*(Fjunc_CaL*(1-fcaBj)+Fsl_CaL*(1-fcaBsl))*Q10CaL)*0.45
+    I_CaNa_junc = (Fjunc_CaL*ibarna_j*d*f*(1-fcaBj)*Q10CaL)*0.45
+    I_CaNa_sl = (Fsl_CaL*ibarna_sl*d*f*(1-fcaBsl)*Q10CaL)*.45
+
+    # I_ncx: Na/Ca Exchanger flux
+    Ka_junc = 1/(1+(Pd['Kdact']/Caj)**2)
+    Ka_sl = 1/(1+(Pd['Kdact']/Casl)**2)
+    s1_junc = enu*Naj**3*Cao
+    s1_sl = enu*Nasl**3*Cao
+    s2_junc = enu1*Nao**3*Caj
+    s3_junc = Pd['KmCai']*Nao**3*(1+(Naj/Pd['KmNai'])**3) + Pd['KmNao']**3*Caj*(1+Caj/Pd['KmCai'])+Pd['KmCao']*Naj**3+Naj**3*Cao+Nao**3*Caj
+    s2_sl = enu1*Nao**3*Casl
+    s3_sl = Pd['KmCai']*Nao**3*(1+(Nasl/Pd['KmNai'])**3) + Pd['KmNao']**3*Casl*(1+Casl/Pd['KmCai'])+Pd['KmCao']*Nasl**3+Nasl**3*Cao+Nao**3*Casl
+    I_ncx_junc = Fjunc*Pd['IbarNCX']*Pd['Q10NCX']**Qpow*Ka_junc*(s1_junc-s2_junc)/s3_junc/(1+Pd['ksat']*enu1)
+    I_ncx_sl = Fsl*Pd['IbarNCX']*Pd['Q10NCX']**Qpow*Ka_sl*(s1_sl-s2_sl)/s3_sl/(1+Pd['ksat']*enu1)
+
+    # I_pca: Sarcolemmal Ca Pump Current
+    I_pca_junc = Fjunc*Pd['Q10SLCaP']**Qpow*Pd['IbarSLCaP']*Caj**1.6/(Pd['KmPCa']**1.6+Caj**1.6)
+    I_pca_sl = Fsl*Pd['Q10SLCaP']**Qpow*Pd['IbarSLCaP']*Casl**1.6/(Pd['KmPCa']**1.6+Casl**1.6)
+
+    ## SR fluxes: Calcium Release, SR Ca pump, SR Ca leak
+    MaxSR = 15
+    MinSR = 1
+    kCaSR = MaxSR - (MaxSR-MinSR)/(1+(Pd['ec50SR']/Ca_sr)**2.5)
+    koSRCa = Pd['koCa']/kCaSR
+    kiSRCa = Pd['kiCa']*kCaSR
+    RI = 1-RyRr-RyRo-RyRi
+    d_RyRr = (Pd['kim']*RI-kiSRCa*Caj*RyRr)-(koSRCa*Caj**2*RyRr-Pd['kom']*RyRo)   # R
+    d_RyRo = (koSRCa*Caj**2*RyRr-Pd['kom']*RyRo)-(kiSRCa*Caj*RyRo-Pd['kim']*RyRi)# O
+    d_RyRi = (kiSRCa*Caj*RyRo-Pd['kim']*RyRi)-(Pd['kom']*RyRi-koSRCa*Caj**2*RI)   # I
+    J_SRCarel = Pd['ks']*RyRo*(Ca_sr-Caj)          # [mM/ms]
+    J_serca = 1*Pd['Q10SRCaP']**Qpow*Pd['Vmax_SRCaP']*((Cai/Pd['Kmf'])**Pd['hillSRCaP']-(Ca_sr/Pd['Kmr'])**Pd['hillSRCaP'])/(1+(Cai/Pd['Kmf'])**Pd['hillSRCaP']+(Ca_sr/Pd['Kmr'])**Pd['hillSRCaP'])
+    J_SRleak = (1.0+0.25*Pd['AF'])*5.348e-6*(Ca_sr-Caj)           #   [mM/ms]
+
+    # BACKROUND CURRENTS
+    I_nabk_junc = Fjunc*Pd['GNaB']*(Vm-ena_junc)
+    I_nabk_sl = Fsl*Pd['GNaB']*(Vm-ena_sl)
+    I_cabk_junc = Fjunc*Pd['GCaB']*(Vm-eca_junc)
+    I_cabk_sl = Fsl*Pd['GCaB']*(Vm-eca_sl)
+    I_Clbk = Pd['GClB']*(Vm-ecl)
+
+    ## Sodium and Calcium Buffering
+    d_NaBj = Pd['kon_na']*Naj*(Pd['Bmax_Naj']-NaBj)-Pd['koff_na']*NaBj
+    d_NaBsl = Pd['kon_na']*Nasl*(Pd['Bmax_Nasl']-NaBsl)-Pd['koff_na']*NaBsl
+
+    # Cytosolic Ca Buffers
+    d_TnCL = Pd['kon_tncl']*Cai*(Pd['Bmax_TnClow']-TnCL)-Pd['koff_tncl']*TnCL
+    d_TnCHc = Pd['kon_tnchca']*Cai*(Pd['Bmax_TnChigh']-TnCHc-TnCHm)-Pd['koff_tnchca']*TnCHc
+    d_TnCHm = Pd['kon_tnchmg']*Mgi*(Pd['Bmax_TnChigh']-TnCHc-TnCHm)-Pd['koff_tnchmg']*TnCHm
+    d_CaM = Pd['kon_cam']*Cai*(Pd['Bmax_CaM']-CaM)-Pd['koff_cam']*CaM
+    d_Myoc = Pd['kon_myoca']*Cai*(Pd['Bmax_myosin']-Myoc-Myom)-Pd['koff_myoca']*Myoc
+    d_Myom = Pd['kon_myomg']*Mgi*(Pd['Bmax_myosin']-Myoc-Myom)-Pd['koff_myomg']*Myom
+    d_SRB = Pd['kon_sr']*Cai*(Pd['Bmax_SR']-SRB)-Pd['koff_sr']*SRB
+    J_CaB_cytosol = d_TnCL + d_TnCHc + d_TnCHm + d_CaM + d_Myoc + d_Myom + d_SRB
+
+    # Junctional and SL Ca Buffers
+    d_SLLj = Pd['kon_sll']*Caj*(Bmax_SLlowj-SLLj)-Pd['koff_sll']*SLLj
+    d_SLLsl = Pd['kon_sll']*Casl*(Bmax_SLlowsl-SLLsl)-Pd['koff_sll']*SLLsl
+    d_SLHj = Pd['kon_slh']*Caj*(Bmax_SLhighj-SLHj)-Pd['koff_slh']*SLHj
+    d_SLHsl = Pd['kon_slh']*Casl*(Bmax_SLhighsl-SLHsl)-Pd['koff_slh']*SLHsl
+    J_CaB_junction = d_SLLj+d_SLHj
+    J_CaB_sl = d_SLLsl+d_SLHsl
+
+    ## Ion concentrations
+    # SR Ca Concentrations
+    d_Csqnb = Pd['kon_csqn']*Ca_sr*(Bmax_Csqn-Csqnb)-Pd['koff_csqn']*Csqnb
+    d_Ca_sr = J_serca-(J_SRleak*Vmyo/Vsr+J_SRCarel)-d_Csqnb
+
+    # Sodium Concentrations
+    I_Na_tot_junc = I_Na_junc+I_nabk_junc+3*I_ncx_junc+3*I_nak_junc+I_CaNa_junc+I_NaL_junc   # [uA/uF]
+    I_Na_tot_sl = I_Na_sl+I_nabk_sl+3*I_ncx_sl+3*I_nak_sl+I_CaNa_sl+I_NaL_sl   # [uA/uF]
+    d_Naj = -I_Na_tot_junc*Cmem/(Vjunc*Frdy)+Pd['J_na_juncsl']/Vjunc*(Nasl-Naj)-d_NaBj
+    d_Nasl = -I_Na_tot_sl*Cmem/(Vsl*Frdy)+Pd['J_na_juncsl']/Vsl*(Naj-Nasl)+Pd['J_na_slmyo']/Vsl*(Nai-Nasl)-d_NaBsl
+    d_Nai = Pd['J_na_slmyo']/Vmyo*(Nasl-Nai)             # [mM/msec]
+
+    # Potassium Concentration
+    I_K_tot = I_to+I_kr+I_ks+I_ki-2*I_nak+I_CaK+I_kp+I_kur+I_kAch     # [uA/uF]
+    d_Ki = 0
+
+    # Calcium Concentrations
+    I_Ca_tot_junc = I_Ca_junc+I_cabk_junc+I_pca_junc-2*I_ncx_junc                   # [uA/uF]
+    I_Ca_tot_sl = I_Ca_sl+I_cabk_sl+I_pca_sl-2*I_ncx_sl            # [uA/uF]
+    d_Caj = -I_Ca_tot_junc*Cmem/(Vjunc*2*Frdy)+Pd['J_ca_juncsl']/Vjunc*(Casl-Caj)   -J_CaB_junction+(J_SRCarel)*Vsr/Vjunc+J_SRleak*Vmyo/Vjunc  # Ca_j
+    d_Casl = -I_Ca_tot_sl*Cmem/(Vsl*2*Frdy)+Pd['J_ca_juncsl']/Vsl*(Caj-Casl)  + Pd['J_ca_slmyo']/Vsl*(Cai-Casl)-J_CaB_sl   # Ca_sl
+    d_Cai = -J_serca*Vsr/Vmyo-J_CaB_cytosol +Pd['J_ca_slmyo']/Vmyo*(Casl-Cai)
+
+    ## Summing the current components
+    I_Na_tot = I_Na_tot_junc + I_Na_tot_sl          # [uA/uF]
+    I_Cl_tot = I_ClCa+I_Clbk                        # [uA/uF]
+    I_Ca_tot = I_Ca_tot_junc+I_Ca_tot_sl
+    I_tot = I_Na_tot+I_Cl_tot+I_Ca_tot+I_K_tot
+    I_app = Pd['I_app'] if (t<5) else 0.0
+    d_Vm = -(I_tot-I_app)
+
+    ydot = [d_m,d_h, d_j, d_d, d_f,d_fcaBj, d_fcaBsl, d_xtof, d_ytof, d_xkr, d_xks, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL, d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom, d_SRB, d_SLLj, d_SLLsl, d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Naj, d_Nasl, d_Nai, d_Ki, d_Caj, d_Casl, d_Cai, d_Vm,  d_rkuro, d_skuro, d_ml, d_hl, d_INal]
+
+    return _stack(ydot, Pd['dynamic'])
+
+
+#----------------------------------------------------------------------------
+# Rush-Larsen fixed-step integration
+
+# Indices of the (x_inf - x)/tau gates in the two state vectors
+VENTRICULAR_GATES = (0, 1, 2, 3, 4, 7, 8, 9, 10, 11, 12)
+ATRIAL_GATES = (0, 1, 2, 3, 4, 7, 8, 9, 10, 37, 38, 39, 40)
+
+# Ca_sr and calsequestrin exchange Ca too fast for a diagonal linearization,
+# the generalized schemes advance them together
+VENTRICULAR_PAIRS = ((30, 29),)
+ATRIAL_PAIRS = ((28, 27),)
+
+
+def _gating(rhs):
+    """Gate function, gate indices, Vm index, generated Jacobian diagonal and
+    coupled pairs belonging to a batched RHS."""
+    import GBV_jacobian
+    if rhs is grandi_bers_batch:
+        return (ventricular_gates, list(VENTRICULAR_GATES), 38,
+                GBV_jacobian.grandi_bers_diagonal, VENTRICULAR_PAIRS)
+    if rhs is grandi_bers_atrial_batch:
+        return (atrial_gates, list(ATRIAL_GATES), 36,
+                GBV_jacobian.grandi_bers_atrial_diagonal, ATRIAL_PAIRS)
+    raise ValueError("Rush-Larsen integration needs grandi_bers_batch or grandi_bers_atrial_batch")
+
+
+def _prepare(rhs, Pd):
+    """Prepared record of Pd for the generated Jacobian diagonal."""
+    from GBV_prepared import prepare, prepare_atrial
+    return prepare(Pd) if rhs is grandi_bers_batch else prepare_atrial(Pd)
+
+
+def _phi(z):
+    """(exp(z) - 1)/z, equal to 1 at z = 0."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(z == 0, 1.0, np.expm1(z)/np.where(z == 0, 1.0, z))
+
+
+def _pair_step(a11, a12, a21, a22, h, g1, g2):
+    """h*phi(A*h) applied to (g1, g2) for a batch of 2x2 matrices A with
+    a12*a21 > 0, which have real distinct eigenvalues l1 > l2. Uses
+    f(A) = f(l1) + (f(l1) - f(l2))/(l1 - l2)*(A - l1) with f(l) = h*phi(l*h).
+    """
+    mean = (a11 + a22)/2
+    root = np.sqrt(((a11 - a22)/2)**2 + a12*a21)
+    l1, l2 = mean + root, mean - root
+    f1 = h*_phi(l1*h)
+    slope = (f1 - h*_phi(l2*h))/(2*root)
+    return (f1*g1 + slope*((a11 - l1)*g1 + a12*g2),
+            f1*g2 + slope*(a21*g1 + (a22 - l1)*g2))
+
+
+SCHEMES = ('rl1', 'rl2', 'grl1', 'grl2')
+
+
+def rush_larsen_step(rhs, Y, t, dt, Pd, scheme='grl2', P=None, table=None):
+    """Advance the states Y from t to t + dt.
+
+    Every state is advanced with the exponential step
+    y + dt*phi(a*dt)*(f + a*(y - y_eval)), phi(z) = (exp(z) - 1)/z, where f
+    and a are the derivative and its own-state linearization at y_eval. For
+    the gates a = -1/tau, which gives the exact update
+    x_inf + (x - x_inf)*exp(-dt/tau). The remaining states have a = 0 in the
+    Rush-Larsen schemes (forward Euler, 'rl1', or explicit midpoint, 'rl2')
+    and the diagonal of the Jacobian in the generalized schemes 'grl1' and
+    'grl2', which keeps the fast Ca buffers stable at dt = 0.1 ms. The
+    generalized schemes advance the coupled pairs (Ca_sr and calsequestrin)
+    with the exponential of their 2x2 Jacobian block instead. The second
+    order schemes evaluate f, a and the gates at the midpoint. Gate steady
+    states and time constants are computed once per stage and handed to the
+    right hand side. P is the prepared record of Pd used for the Jacobian
+    diagonal; it is built on the fly when not given. With a lookup table from
+    GBV_tables the gates and voltage terms are interpolated instead.
+    """
+    gates, index, iVm, diagonal, pairs = _gating(rhs)
+    if table is not None:
+        from GBV_tables import lookup
+    if scheme not in SCHEMES:
+        raise ValueError("scheme must be one of {}, got {!r}".format(SCHEMES, scheme))
+    generalized = scheme.startswith('g')
+    if generalized and P is None:
+        P = _prepare(rhs, Pd)
+
+    def stage(Y_eval, t_eval, h):
+        if table is None:
+            (inf, tau), terms = gates(Y_eval[..., iVm], Pd), None
+        else:
+            (inf, tau), terms = lookup(table, Y_eval[..., iVm])
+        F = rhs(Y_eval, t_eval, Pd, gates=(inf, tau), terms=terms)
+        if generalized:
+            A, C = diagonal(Y_eval, t_eval, P)
+        else:
+            A, C = np.zeros_like(F), None
+        A[..., index] = -1/np.stack(np.broadcast_arrays(Y_eval[..., iVm], *tau)[1:], axis=-1)
+        dY = Y - Y_eval
+        G = F + A*dY
+        Y_new = Y + h*_phi(A*h)*G
+        if generalized:
+            for k, (i, j) in enumerate(pairs):
+                a12, a21 = C[..., k, 0], C[..., k, 1]
+                step_i, step_j = _pair_step(A[..., i], a12, a21, A[..., j], h,
+                                            G[..., i] + a12*dY[..., j], G[..., j] + a21*dY[..., i])
+                Y_new[..., i] = Y[..., i] + step_i
+                Y_new[..., j] = Y[..., j] + step_j
+        return Y_new
+
+    if scheme.endswith('1'):
+        return stage(Y, t, dt)
+    return stage(stage(Y, t, dt/2), t + dt/2, dt)
+
+
+def rush_larsen(rhs, Y0, t, Pd, dt=0.1, scheme='grl2', tabulated=False):
+    """Integrate with fixed Rush-Larsen steps of at most dt [ms].
+
+    Each output interval of t is split into equal steps, so the returned
+    array has the layout of odeint: (len(t),) + Y0.shape. tabulated=True
+    takes the gates and voltage terms from the cached lookup table of
+    GBV_tables.
+    """
+    P = _prepare(rhs, Pd) if scheme.startswith('g') else None
+    table = None
+    if tabulated:
+        from GBV_tables import table_for
+        table = table_for(rhs, Pd)
+    Y = np.array(Y0, dtype=float)
+    out = np.empty((len(t),) + Y.shape)
+    out[0] = Y
+    for k in range(len(t)-1):
+        n_steps = max(int(np.ceil((t[k+1] - t[k])/dt - 1e-9)), 1)
+        h = (t[k+1] - t[k])/n_steps
+        for i in range(n_steps):
+            Y = rush_larsen_step(rhs, Y, t[k] + i*h, h, Pd, scheme, P, table)
+        out[k+1] = Y
+    return out
+
+
+#----------------------------------------------------------------------------
+# Batched integrator driver
+
+def block_jacobian(rhs, Y, t, Pd, f0=None):
+    """Finite difference Jacobian blocks of a batched right hand side.
+
+    The cells are uncoupled, so perturbing state k in every cell at once gives
+    column k of all the diagonal blocks in one RHS call. Returns an array of
+    shape (n_cells, n_states, n_states).
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    n_cells, n_states = Y.shape
+    if f0 is None:
+        f0 = rhs(Y, t, Pd)
+    J = np.empty((n_cells, n_states, n_states))
+    for k in range(n_states):
+        dy = 1.5e-8*np.maximum(np.abs(Y[:, k]), 1e-6)
+        Yp = Y.copy()
+        Yp[:, k] += dy
+        J[:, :, k] = (rhs(Yp, t, Pd) - f0)/dy[:, None]
+    return J
+
+
+def _banded(J):
+    """Store (n_cells, n, n) Jacobian blocks in the banded layout of odeint."""
+    n_cells, n, _ = J.shape
+    band = np.zeros((2*n-1, n_cells*n))
+    i, k = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    cols = (np.arange(n_cells)[:, None, None]*n + k).ravel()
+    rows = np.broadcast_to(i - k + n - 1, J.shape).ravel()
+    band[rows, cols] = J.ravel()
+    return band
+
+
+def solve_population(rhs, Y0, t, Pd, method='odeint', **kwargs):
+    """Advance a whole population of cells with a single odeint call.
+
+    Y0 has shape (n_cells, n_states) and rhs is one of the batched right hand
+    sides above. The cells are uncoupled, so the Jacobian of the stacked
+    system is block diagonal; it is passed to LSODA as a banded matrix built
+    from n_states batched RHS calls. All cells share the step size, so the
+    step limit per output interval is raised from the odeint default.
+    Returns an array of shape (len(t), n_cells, n_states).
+
+    method='rush_larsen' uses the fixed-step integrator above instead, and
+    passes dt, scheme and tabulated on to rush_larsen.
+    """
+    Y0 = np.atleast_2d(np.asarray(Y0, dtype=float))
+    n_cells, n_states = Y0.shape
+    if method == 'rush_larsen':
+        return rush_larsen(rhs, Y0, t, Pd, **kwargs)
+    if method != 'odeint':
+        raise ValueError("method must be 'odeint' or 'rush_larsen', got {!r}".format(method))
+
+    def f(y, t):
+        return rhs(y.reshape(n_cells, n_states), t, Pd).ravel()
+
+    def jac(y, t):
+        return _banded(block_jacobian(rhs, y.reshape(n_cells, n_states), t, Pd))
+
+    kwargs.setdefault('Dfun', jac)
+    kwargs.setdefault('ml', n_states-1)
+    kwargs.setdefault('mu', n_states-1)
+    kwargs.setdefault('mxstep', 5000)
+    out = odeint(f, Y0.ravel(), t, **kwargs)
+    if kwargs.get('full_output'):
+        return out[0].reshape(len(t), n_cells, n_states), out[1]
+    return out.reshape(len(t), n_cells, n_states)
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n_cells=20, dts=(0.1, 0.05)):
+    """APD90 error and wall time of odeint and the Rush-Larsen schemes for a
+    population with Gkr scaled from 0.5 to 1.5, against a tight odeint run."""
+    from time import perf_counter
+    from L6_widgets import set_Pd, set_Pd_atrial
+    from GBV_biomarkers import apd
+
+    scales = np.linspace(0.5, 1.5, n_cells)
+    t = np.linspace(0, 1000, 10001)
+    cases = [('ventricular', grandi_bers_batch, [set_Pd([1, 1, 1, 1, s] + [1]*10) for s in scales],
+              np.load('Widget_init.npy'), 38),
+             ('atrial', grandi_bers_atrial_batch, [set_Pd_atrial([1, 1, s] + [1]*12 + [0]) for s in scales],
+              np.load('Widget_init_atrial.npy'), 36)]
+    for name, rhs, Pds, y0, iVm in cases:
+        Pd = parameter_table(Pds)
+        Y0 = np.tile(y0, (n_cells, 1))
+        reference = apd(t, solve_population(rhs, Y0, t, Pd, rtol=1e-9, atol=1e-9)[:, :, iVm])
+        print("{} ({} cells, APD90 {:.1f} to {:.1f} ms)".format(name, n_cells, reference.min(), reference.max()))
+        runs = [('odeint', {})] + [(scheme, {'method': 'rush_larsen', 'dt': dt, 'scheme': scheme})
+                                   for scheme in ('grl1', 'grl2') for dt in dts]
+        for label, kwargs in runs:
+            start = perf_counter()
+            Y = solve_population(rhs, Y0, t, Pd, **kwargs)
+            elapsed = perf_counter() - start
+            error = np.max(np.abs(apd(t, Y[:, :, iVm]) - reference))
+            print("  {:6s} dt: {:>5s}  max |APD90 error|: {:6.3f} ms  time: {:6.2f} s".format(
+                label, str(kwargs.get('dt', '-')), error, elapsed))
+
+
+if __name__ == '__main__':
+    benchmark()
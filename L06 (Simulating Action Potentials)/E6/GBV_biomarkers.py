@@ -0,0 +1,83 @@
+"""
+Action potential biomarkers computed from simulated traces.
+
+All functions take the time points t and traces with time along the first
+axis, so the output of odeint, solve_population or rush_larsen can be passed
+in directly and one value is returned per cell.
+
+Example:
+========
+from GBV_biomarkers import apd, ca_amplitude
+
+Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+APD90 = apd(t, Y[:, 38], 0.9)
+CaT = ca_amplitude(t, Y[:, 37])
+"""
+
+import numpy as np
+
+
+def _upstroke(t, X):
+    """Index and time of the fastest rise of each column of X."""
+    dXdt = np.diff(X, axis=0)/np.diff(t)[:, None]
+    k = np.argmax(dXdt, axis=0)
+    return k, 0.5*(t[k] + t[k+1]), dXdt[k, np.arange(X.shape[1])]
+
+
+def _decay_time(t, X, fraction):
+    """Time after the peak at which X falls below X[0] + (1-fraction)*(peak - X[0]),
+    interpolated linearly, or nan."""
+    cells = np.arange(X.shape[1])
+    peak = np.argmax(X, axis=0)
+    level = X[peak, cells] - fraction*(X[peak, cells] - X[0])
+    below = (X < level) & (np.arange(len(t))[:, None] > peak)
+    k = np.argmax(below, axis=0)
+    X1, X0 = X[k, cells], X[k-1, cells]
+    t_down = t[k-1] + (t[k] - t[k-1])*(X0 - level)/(X0 - X1)
+    return np.where(below.any(axis=0), t_down, np.nan)
+
+
+def _columns(t, X):
+    t = np.asarray(t, dtype=float)
+    X = np.asarray(X, dtype=float)
+    return t, X.reshape(len(t), -1), X.shape[1:]
+
+
+def apd(t, Vm, fraction=0.9):
+    """Action potential duration at the given fraction of repolarization.
+
+    Measured from the time of maximum upstroke velocity to the time Vm falls
+    below Vm[0] + (1-fraction)*(peak - Vm[0]), with linear interpolation
+    between samples. Cells that do not repolarize within t give nan.
+    """
+    t, Vm, shape = _columns(t, Vm)
+    durations = _decay_time(t, Vm, fraction) - _upstroke(t, Vm)[1]
+    return durations.reshape(shape)
+
+
+def dvdt_max(t, Vm):
+    """Maximum upstroke velocity [mV/ms], from first differences of the samples."""
+    t, Vm, shape = _columns(t, Vm)
+    return _upstroke(t, Vm)[2].reshape(shape)
+
+
+def rmp(t, Vm):
+    """Resting membrane potential, the lowest Vm before the upstroke."""
+    t, Vm, shape = _columns(t, Vm)
+    k = _upstroke(t, Vm)[0]
+    before = np.where(np.arange(len(t))[:, None] <= k, Vm, np.inf)
+    return np.min(before, axis=0).reshape(shape)
+
+
+def ca_amplitude(t, Cai):
+    """Amplitude of the Ca transient, peak minus the initial (diastolic) value."""
+    t, Cai, shape = _columns(t, Cai)
+    return (np.max(Cai, axis=0) - Cai[0]).reshape(shape)
+
+
+def ca_duration(t, Cai, fraction=0.9):
+    """Ca transient duration, from its fastest rise to the given fraction of
+    decay back to the initial value, defined like apd."""
+    t, Cai, shape = _columns(t, Cai)
+    durations = _decay_time(t, Cai, fraction) - _upstroke(t, Cai)[1]
+    return durations.reshape(shape)
@@ -0,0 +1,338 @@
+"""
+Compiled Grandi-Bers right hand sides and a compiled population integrator.
+
+The kernels generated in GBV_kernels.py read the parameters from the
+prepared parameter vector p = as_array(P) (GBV_prepared.py) and are
+compiled here with numba through nopython.jit. grandi_bers_compiled and
+grandi_bers_atrial_compiled wrap them in the odeint argument order, with
+the dynamic flags as a second argument. integrate_population advances a
+whole population with fixed generalized Rush-Larsen steps (see
+GBV_batch.rush_larsen_step) in a compiled loop over cells and steps, the
+cells in parallel, and only returns the states at the output times. A
+single call from Python, as odeint makes them, spends more time in numba's
+argument dispatch than in the kernel, so population studies should use
+integrate_population, which calls the kernels from compiled code.
+
+Without numba (or with NO_NUMBA set) the same functions run as plain
+Python, which gives the same results, only much more slowly. Compiled code
+is cached in __pycache__, so only the first session pays the compilation
+(about half a minute); warm_up loads everything up front.
+
+Example:
+========
+from L6_widgets import set_Pd
+from GBV_compiled import (grandi_bers_compiled, kernel_arguments, parameter_matrix,
+                          integrate_population)
+
+p, dynamic = kernel_arguments(set_Pd())
+Y = odeint(grandi_bers_compiled, y0, t, (p, dynamic))
+
+Pds = [set_Pd([1, GNa] + [1]*13) for GNa in np.linspace(0.5, 2, 1000)]
+p, dynamic = parameter_matrix(Pds)
+Y = integrate_population(np.tile(y0, (1000, 1)), t, p, dynamic, dt=0.05, bcl=1000)
+# Y has shape (len(t), 1000, 39)
+
+Run this file as a script to compare the RHS throughput of the Python,
+NumPy and compiled versions.
+"""
+
+import math
+import numpy as np
+
+import GBV_kernels
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from sscp_tools.nopython import jit, prange, NUMBA
+from GBV_prepared import prepare, prepare_atrial, as_array
+from GBV_batch import VENTRICULAR_PAIRS, ATRIAL_PAIRS
+from GBV_schema import VENTRICULAR, ATRIAL
+
+_ventricular_kernel = jit(GBV_kernels.grandi_bers_kernel)
+_atrial_kernel = jit(GBV_kernels.grandi_bers_atrial_kernel)
+_ventricular_linearized = jit(GBV_kernels.grandi_bers_linearized)
+_atrial_linearized = jit(GBV_kernels.grandi_bers_atrial_linearized)
+
+_PAIR_ENTRIES = 2*max(len(VENTRICULAR_PAIRS), len(ATRIAL_PAIRS))
+
+SCHEMES = ('grl1', 'grl2')
+
+
+#----------------------------------------------------------------------------
+# Parameters
+
+def kernel_arguments(Pd, atrial=False):
+    """Parameter vector and dynamic flags (1.0 for every state when P.dynamic
+    is None) of a parameter dictionary or a prepared record."""
+    if isinstance(Pd, dict):
+        Pd = prepare_atrial(Pd) if atrial else prepare(Pd)
+    n_states = len(ATRIAL if atrial else VENTRICULAR)
+    dynamic = np.ones(n_states) if Pd.dynamic is None else np.array(Pd.dynamic, dtype=float)
+    return as_array(Pd).copy(), dynamic
+
+
+def parameter_matrix(Pd_list, atrial=False):
+    """Parameter vectors (as_array layout) and dynamic flags of a list of
+    parameter dictionaries or prepared records, one row per cell."""
+    p, dynamic = zip(*(kernel_arguments(Pd, atrial) for Pd in Pd_list))
+    return np.array(p), np.array(dynamic)
+
+
+#----------------------------------------------------------------------------
+# Right hand sides for odeint
+
+@jit
+def grandi_bers_compiled(y, t, p, dynamic):
+    """Ventricular right hand side for odeint with args (p, dynamic)."""
+    ydot = np.empty(y.shape[0])
+    _ventricular_kernel(y, t, p, ydot)
+    return ydot*dynamic
+
+
+@jit
+def grandi_bers_atrial_compiled(y, t, p, dynamic):
+    """Atrial right hand side for odeint with args (p, dynamic)."""
+    ydot = np.empty(y.shape[0])
+    _atrial_kernel(y, t, p, ydot)
+    return ydot*dynamic
+
+
+#----------------------------------------------------------------------------
+# Generalized Rush-Larsen steps
+
+@jit
+def _phi(z):
+    """(exp(z) - 1)/z. Where |z| < 0.01, as for most of the concentrations,
+    the Taylor series to z**5 is exact to rounding and saves a call of expm1."""
+    if abs(z) < 0.01:
+        return 1.0 + z*(1/2 + z*(1/6 + z*(1/24 + z*(1/120 + z*(1/720)))))
+    return math.expm1(z)/z
+
+
+@jit
+def _pair_step(a11, a12, a21, a22, h, g1, g2):
+    """h*phi(A*h) applied to (g1, g2) for a 2x2 matrix A, scalar version of
+    GBV_batch._pair_step. Falls back to the diagonal when the eigenvalues of
+    A are not real and distinct."""
+    disc = ((a11 - a22)/2)**2 + a12*a21
+    if disc <= 0.0:
+        return h*_phi(a11*h)*g1, h*_phi(a22*h)*g2
+    root = math.sqrt(disc)
+    l1 = (a11 + a22)/2 + root
+    l2 = (a11 + a22)/2 - root
+    f1 = h*_phi(l1*h)
+    slope = (f1 - h*_phi(l2*h))/(2*root)
+    return (f1*g1 + slope*((a11 - l1)*g1 + a12*g2),
+            f1*g2 + slope*(a21*g1 + (a22 - l1)*g2))
+
+
+@jit
+def _stage(y, y_eval, t, h, p, dynamic, atrial, y_new, ydot, a, c):
+    """y_new = y + h*phi(a*h)*(f + a*(y - y_eval)) with f and the Jacobian
+    diagonal a evaluated at y_eval, and the coupled pairs advanced with
+    their 2x2 block, as in GBV_batch.rush_larsen_step."""
+    if atrial:
+        _atrial_linearized(y_eval, t, p, ydot, a, c)
+        pairs = ATRIAL_PAIRS
+    else:
+        _ventricular_linearized(y_eval, t, p, ydot, a, c)
+        pairs = VENTRICULAR_PAIRS
+    n = y.shape[0]
+    for k in range(n):
+        ydot[k] *= dynamic[k]
+        a[k] *= dynamic[k]
+    for k in range(len(pairs)):
+        i, j = pairs[k]
+        a12 = c[2*k]*dynamic[i]
+        a21 = c[2*k + 1]*dynamic[j]
+        dyi = y[i] - y_eval[i]
+        dyj = y[j] - y_eval[j]
+        step_i, step_j = _pair_step(a[i], a12, a21, a[j], h,
+                                    ydot[i] + a[i]*dyi + a12*dyj, ydot[j] + a[j]*dyj + a21*dyi)
+        # y_new may be y itself, so keep the new pair values aside
+        c[2*k], c[2*k + 1] = y[i] + step_i, y[j] + step_j
+    for k in range(n):
+        dy = y[k] - y_eval[k]
+        y_new[k] = y[k] + h*_phi(a[k]*h)*(ydot[k] + a[k]*dy)
+    for k in range(len(pairs)):
+        i, j = pairs[k]
+        y_new[i] = c[2*k]
+        y_new[j] = c[2*k + 1]
+
+
+@jit(parallel=True)
+def _integrate(Y0, t, P, D, dt, bcl, atrial, second_order, out):
+    n_cells, n = Y0.shape
+    out[0] = Y0
+    for cell in prange(n_cells):
+        p, dynamic = P[cell], D[cell]
+        y = Y0[cell].copy()
+        y_mid = np.empty(n)
+        ydot = np.empty(n)
+        a = np.empty(n)
+        c = np.empty(_PAIR_ENTRIES)
+        for k in range(t.shape[0] - 1):
+            n_steps = max(int(math.ceil((t[k+1] - t[k])/dt - 1e-9)), 1)
+            h = (t[k+1] - t[k])/n_steps
+            for step in range(n_steps):
+                s = t[k] + step*h
+                if bcl > 0:
+                    s = s % bcl
+                if second_order:
+                    _stage(y, y, s, h/2, p, dynamic, atrial, y_mid, ydot, a, c)
+                    _stage(y, y_mid, s + h/2, h, p, dynamic, atrial, y, ydot, a, c)
+                else:
+                    _stage(y, y, s, h, p, dynamic, atrial, y, ydot, a, c)
+            out[k+1, cell] = y
+
+
+def integrate_population(Y0, t, p, dynamic=None, dt=0.1, scheme='grl2', bcl=None):
+    """Integrate a population with fixed generalized Rush-Larsen steps of at
+    most dt [ms] in compiled code.
+
+    Y0 holds one state vector per row (39 states for the ventricular model,
+    42 for the atrial one), p and dynamic one parameter vector and one row
+    of dynamic flags per cell or a single one for all cells (see
+    kernel_arguments and parameter_matrix). scheme is 'grl1' (first order)
+    or 'grl2' (second order, midpoint), as in GBV_batch. The right hand
+    sides apply the stimulus for t < 5 ms; with bcl given, time restarts at
+    zero every bcl ms, so the cells are paced. Choose dt so that it divides
+    5 ms to place a step boundary at the end of the stimulus.
+
+    Returns the states at the times t, shape (len(t),) + Y0.shape, as
+    GBV_batch.solve_population does.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError("scheme must be one of {}, got {!r}".format(SCHEMES, scheme))
+    Y0 = np.atleast_2d(np.asarray(Y0, dtype=float))
+    n_cells, n_states = Y0.shape
+    if n_states not in (len(VENTRICULAR), len(ATRIAL)):
+        raise ValueError("expected {} (ventricular) or {} (atrial) states, got {}".format(
+            len(VENTRICULAR), len(ATRIAL), n_states))
+    atrial = n_states == len(ATRIAL)
+    p = np.ascontiguousarray(np.broadcast_to(np.asarray(p, dtype=float), (n_cells, np.shape(p)[-1])))
+    dynamic = np.ones(n_states) if dynamic is None else dynamic
+    dynamic = np.ascontiguousarray(np.broadcast_to(np.asarray(dynamic, dtype=float), (n_cells, n_states)))
+    t = np.asarray(t, dtype=float)
+    out = np.empty((len(t), n_cells, n_states))
+    _integrate(Y0, t, p, dynamic, float(dt), float(bcl or 0.0), atrial, scheme == 'grl2', out)
+    return out
+
+
+@jit(parallel=True)
+def _advance(Y, t0, h, n_steps, P, D, cell_parameters, bcl, atrial, second_order):
+    n_cells, n = Y.shape
+    for cell in prange(n_cells):
+        p, dynamic = P[cell_parameters[cell]], D[cell_parameters[cell]]
+        y = Y[cell]
+        y_mid = np.empty(n)
+        ydot = np.empty(n)
+        a = np.empty(n)
+        c = np.empty(_PAIR_ENTRIES)
+        for step in range(n_steps):
+            s = t0 + step*h
+            if bcl > 0:
+                s = s % bcl
+            if second_order:
+                _stage(y, y, s, h/2, p, dynamic, atrial, y_mid, ydot, a, c)
+                _stage(y, y_mid, s + h/2, h, p, dynamic, atrial, y, ydot, a, c)
+            else:
+                _stage(y, y, s, h, p, dynamic, atrial, y, ydot, a, c)
+
+
+def advance_population(Y, t0, h, p, dynamic, cell_parameters, n_steps=1, scheme='grl2', bcl=None):
+    """Advance the states Y (one row per cell, C-contiguous float64) in place
+    by n_steps generalized Rush-Larsen steps of h ms from time t0.
+
+    Cell i uses the parameter vector p[cell_parameters[i]] and the dynamic
+    flags dynamic[cell_parameters[i]], so a few distinct parameter sets can
+    be shared by many cells (see parameter_matrix). This is the reaction
+    step of an operator splitting scheme, see GBV_tissue.py; unlike
+    integrate_population it neither copies its arguments nor stores output.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError("scheme must be one of {}, got {!r}".format(SCHEMES, scheme))
+    _advance(Y, float(t0), float(h), int(n_steps), p, dynamic, cell_parameters,
+             float(bcl or 0.0), Y.shape[1] == len(ATRIAL), scheme == 'grl2')
+
+
+def warm_up():
+    """Compile all entry points, or load them from the cache, now."""
+    from L6_widgets import set_Pd, set_Pd_atrial
+    for atrial, Pd, rhs in ((False, set_Pd(), grandi_bers_compiled),
+                            (True, set_Pd_atrial(), grandi_bers_atrial_compiled)):
+        p, dynamic = kernel_arguments(Pd, atrial)
+        y0 = np.ones(len(dynamic))
+        rhs(y0, 0.0, p, dynamic)
+        integrate_population(y0, [0.0, 0.1], p, dynamic)
+        advance_population(np.ones((1, len(dynamic))), 0.0, 0.1, p[None], dynamic[None], np.zeros(1, dtype=np.intp))
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n_cells=100, duration=50.0, dt=0.05, repeat=5):
+    """RHS evaluations per second of the Python, NumPy and compiled versions
+    of the ventricular model, and the APD90 difference between the NumPy and
+    compiled population integrators. Every rate is the best of repeat runs,
+    as the timings of a shared machine are noisy; the speedups are relative
+    to the hand-written grandi_bers_rhs of L6_widgets and to its prepared
+    version."""
+    from time import perf_counter
+    from L6_widgets import set_Pd, grandi_bers_rhs
+    from GBV_prepared import grandi_bers_prepared
+    from GBV_batch import parameter_table, grandi_bers_batch, rush_larsen
+    from GBV_biomarkers import apd
+
+    start = perf_counter()
+    warm_up()
+    print("numba: {}, compiled or loaded in {:.1f} s".format(NUMBA, perf_counter() - start))
+
+    y0 = np.load('Widget_init.npy')
+    Pds = [set_Pd([1, 1, 1, 1, s] + [1]*10) for s in np.linspace(0.5, 1.5, n_cells)]
+    P = prepare(Pds[0])
+    p, dynamic = kernel_arguments(P)
+
+    def rate(function, calls):
+        best = np.inf
+        for _ in range(repeat):
+            start = perf_counter()
+            for _ in range(calls):
+                result = function()
+            best = min(best, perf_counter() - start)
+        return calls/best, result
+
+    def report(name, rate):
+        print("{:42s} {:12.0f} RHS/s  {:6.1f}x {:6.1f}x".format(name, rate, rate/original, rate/python))
+
+    Pd = set_Pd()
+    original, _ = rate(lambda: grandi_bers_rhs(y0, 10.0, Pd), 1000)
+    print("{:42s} {:12.0f} RHS/s  {:>7s} {:>7s}".format("grandi_bers_rhs, one call", original, "rhs", "prep."))
+    python, _ = rate(lambda: grandi_bers_prepared(y0, 10.0, P), 1000)
+    report("grandi_bers_prepared, one call", python)
+    single, _ = rate(lambda: grandi_bers_compiled(y0, 10.0, p, dynamic), 20000)
+    report("grandi_bers_compiled, one call", single)
+
+    # Both population integrators evaluate the RHS and the Jacobian diagonal twice per grl2 step
+    t = np.linspace(0, duration, 2)
+    evaluations = 2*n_cells*int(round(duration/dt))
+    Y0 = np.tile(y0, (n_cells, 1))
+    numpy, Y_numpy = rate(lambda: rush_larsen(grandi_bers_batch, Y0, t, parameter_table(Pds), dt=dt), 1)
+    report("GBV_batch.rush_larsen, grl2", numpy*evaluations)
+    p, dynamic = parameter_matrix(Pds)
+    compiled, Y_compiled = rate(lambda: integrate_population(Y0, t, p, dynamic, dt=dt), 1)
+    report("integrate_population, grl2", compiled*evaluations)
+    print("largest difference between the two at {:g} ms: {:.2e}".format(
+        duration, np.max(np.abs(Y_compiled[-1] - Y_numpy[-1]))))
+
+    t = np.linspace(0, 1000, 2001)
+    Y = integrate_population(Y0, t, p, dynamic, dt=dt)
+    APD90 = apd(t, Y[:, :, VENTRICULAR.index['Vm']])
+    print("APD90 with Gkr from 0.5 to 1.5: {:.1f} to {:.1f} ms".format(APD90.max(), APD90.min()))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,3397 @@
+# Generated by GBV_jacobian_codegen.py from GBV_prepared.py, do not edit by hand
+"""
+Analytic Jacobians and sparsity patterns of the Grandi-Bers models, and
+NumPy Jacobian diagonals for the generalized Rush-Larsen steps in GBV_batch.py.
+The parameter Jacobians differentiate with respect to the prepared record
+instead of the states, for the forward sensitivities in GBV_sensitivity.py.
+
+Example:
+========
+from GBV_prepared import prepare, grandi_bers_prepared
+from GBV_jacobian import grandi_bers_jacobian, jacobian_sparsity
+
+P = prepare(set_Pd())
+Y = odeint(grandi_bers_prepared, y0, t, (P,), Dfun=grandi_bers_jacobian)
+sol = solve_ivp(lambda t, y: grandi_bers_prepared(y, t, P), (0, 1000), y0,
+                method='BDF', jac_sparsity=jacobian_sparsity(VENTRICULAR_SPARSITY))
+"""
+
+import numpy as np
+from math import exp, log
+from scipy.sparse import csc_matrix
+
+VENTRICULAR_SPARSITY = (
+    np.array([
+        0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10, 11,
+        11, 12, 12, 13, 13, 13, 13, 13, 14, 14, 14, 14, 14, 15, 15, 15, 15, 15,
+        16, 16, 17, 17, 18, 18, 19, 19, 19, 20, 20, 21, 21, 22, 22, 22, 23, 23,
+        24, 24, 25, 25, 26, 26, 27, 27, 28, 28, 29, 29, 30, 30, 30, 30, 30, 31,
+        31, 31, 31, 31, 31, 31, 31, 31, 31, 31, 32, 32, 32, 32, 32, 32, 32, 32,
+        32, 32, 32, 32, 33, 33, 35, 35, 35, 35, 35, 35, 35, 35, 35, 35, 35, 36,
+        36, 36, 36, 36, 36, 36, 36, 36, 36, 37, 37, 37, 37, 37, 37, 37, 37, 37,
+        37, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+        38, 38, 38
+    ]),
+    np.array([
+        0, 38, 1, 38, 2, 38, 3, 38, 4, 38, 5, 35, 6, 36, 7, 38, 8, 38, 9, 38,
+        10, 38, 11, 38, 12, 38, 13, 14, 15, 30, 35, 13, 14, 15, 30, 35, 13, 14,
+        15, 30, 35, 16, 31, 17, 32, 18, 37, 19, 20, 37, 19, 20, 21, 37, 22, 23,
+        37, 22, 23, 24, 37, 25, 35, 26, 36, 27, 35, 28, 36, 29, 30, 14, 29, 30,
+        35, 37, 0, 1, 2, 3, 4, 5, 16, 31, 32, 35, 38, 0, 1, 2, 3, 4, 6, 17, 31,
+        32, 33, 36, 38, 32, 33, 3, 4, 5, 14, 25, 27, 30, 31, 35, 36, 38, 3, 4,
+        6, 26, 28, 32, 35, 36, 37, 38, 18, 19, 20, 21, 22, 23, 24, 30, 36, 37,
+        0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 31, 32, 33, 34, 35, 36, 38
+    ]),
+)
+
+ATRIAL_SPARSITY = (
+    np.array([
+        0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10, 11,
+        11, 11, 11, 11, 12, 12, 12, 12, 12, 13, 13, 13, 13, 13, 14, 14, 15, 15,
+        16, 16, 17, 17, 17, 18, 18, 19, 19, 20, 20, 20, 21, 21, 22, 22, 23, 23,
+        24, 24, 25, 25, 26, 26, 27, 27, 28, 28, 28, 28, 28, 29, 29, 29, 29, 29,
+        29, 29, 29, 29, 29, 29, 29, 29, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30,
+        30, 30, 30, 30, 31, 31, 33, 33, 33, 33, 33, 33, 33, 33, 33, 33, 33, 34,
+        34, 34, 34, 34, 34, 34, 34, 34, 34, 35, 35, 35, 35, 35, 35, 35, 35, 35,
+        35, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36, 36,
+        36, 36, 36, 36, 36, 37, 37, 38, 38, 39, 39, 40, 40, 41, 41, 41, 41, 41
+    ]),
+    np.array([
+        0, 36, 1, 36, 2, 36, 3, 36, 4, 36, 5, 33, 6, 34, 7, 36, 8, 36, 9, 36,
+        10, 36, 11, 12, 13, 28, 33, 11, 12, 13, 28, 33, 11, 12, 13, 28, 33, 14,
+        29, 15, 30, 16, 35, 17, 18, 35, 17, 18, 19, 35, 20, 21, 35, 20, 21, 22,
+        35, 23, 33, 24, 34, 25, 33, 26, 34, 27, 28, 12, 27, 28, 33, 35, 0, 1, 2,
+        3, 4, 5, 14, 29, 30, 33, 36, 39, 40, 0, 1, 2, 3, 4, 6, 15, 29, 30, 31,
+        34, 36, 39, 40, 30, 31, 3, 4, 5, 12, 23, 25, 28, 29, 33, 34, 36, 3, 4,
+        6, 24, 26, 30, 33, 34, 35, 36, 16, 17, 18, 19, 20, 21, 22, 28, 34, 35,
+        0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 29, 30, 31, 32, 33, 34, 36, 37, 38,
+        39, 40, 36, 37, 36, 38, 36, 39, 36, 40, 29, 30, 36, 39, 40
+    ]),
+)
+
+
+def jacobian_sparsity(pattern):
+    """Return a sparsity pattern as a 0/1 csc_matrix for solve_ivp(jac_sparsity=...)."""
+    rows, cols = pattern
+    n = max(rows.max(), cols.max()) + 1
+    return csc_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+def sparse_jacobian(jacobian, pattern):
+    """Wrap a generated Jacobian for solve_ivp(jac=...) as a sparse matrix."""
+    rows, cols = pattern
+    n = max(rows.max(), cols.max()) + 1
+    def jac(t, y, P):
+        return csc_matrix((jacobian(y, t, P)[rows, cols], (rows, cols)), shape=(n, n))
+    return jac
+
+
+def grandi_bers_jacobian(y, t, P):
+    """Analytic Jacobian of grandi_bers_prepared, usable as odeint Dfun with args (P,)."""
+    (m, h, j, d, f, fcaBj, fcaBsl, xtos, ytos, xtof, ytof, xkr, xks, RyRr, RyRo,
+     RyRi, NaBj, NaBsl, TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl,
+     SLHj, SLHsl, Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai, Vm) = y
+    FoRT = P.FoRT
+    RToF = P.RToF
+    Ko = P.Ko
+    Nao = P.Nao
+    Cao = P.Cao
+    Mgi = P.Mgi
+    ecl = P.ecl
+    GNa_junc = P.GNa_junc
+    GNa_sl = P.GNa_sl
+    nak_sigma = P.nak_sigma
+    nak_junc = P.nak_junc
+    nak_sl = P.nak_sl
+    KmNaip = P.KmNaip
+    gkr = P.gkr
+    gki = P.gki
+    Gks = P.Gks
+    Gkp = P.Gkp
+    GtoFast = P.GtoFast
+    pNaK = P.pNaK
+    eks_num = P.eks_num
+    GClCa_junc = P.GClCa_junc
+    GClCa_sl = P.GClCa_sl
+    KdClCa = P.KdClCa
+    GClB = P.GClB
+    ca_junc = P.ca_junc
+    ca_sl = P.ca_sl
+    caK = P.caK
+    Fjunc_CaL = P.Fjunc_CaL
+    Fsl_CaL = P.Fsl_CaL
+    caNa_junc = P.caNa_junc
+    caNa_sl = P.caNa_sl
+    ncx_junc = P.ncx_junc
+    ncx_sl = P.ncx_sl
+    Kdact = P.Kdact
+    nuFoRT = P.nuFoRT
+    nu1FoRT = P.nu1FoRT
+    ksat = P.ksat
+    Nao3 = P.Nao3
+    KmCaiNao3 = P.KmCaiNao3
+    KmNai = P.KmNai
+    KmNao3 = P.KmNao3
+    KmCai = P.KmCai
+    KmCao = P.KmCao
+    pca_junc = P.pca_junc
+    pca_sl = P.pca_sl
+    KmPCa16 = P.KmPCa16
+    GNaB_junc = P.GNaB_junc
+    GNaB_sl = P.GNaB_sl
+    GCaB_junc = P.GCaB_junc
+    GCaB_sl = P.GCaB_sl
+    ec50SR = P.ec50SR
+    koCa = P.koCa
+    kiCa = P.kiCa
+    kom = P.kom
+    kim = P.kim
+    ks = P.ks
+    serca = P.serca
+    Kmf = P.Kmf
+    Kmr = P.Kmr
+    hillSRCaP = P.hillSRCaP
+    kon_na = P.kon_na
+    koff_na = P.koff_na
+    Bmax_Naj = P.Bmax_Naj
+    Bmax_Nasl = P.Bmax_Nasl
+    kon_tncl = P.kon_tncl
+    koff_tncl = P.koff_tncl
+    Bmax_TnClow = P.Bmax_TnClow
+    kon_tnchca = P.kon_tnchca
+    koff_tnchca = P.koff_tnchca
+    kon_tnchmg = P.kon_tnchmg
+    koff_tnchmg = P.koff_tnchmg
+    Bmax_TnChigh = P.Bmax_TnChigh
+    kon_cam = P.kon_cam
+    koff_cam = P.koff_cam
+    Bmax_CaM = P.Bmax_CaM
+    kon_myoca = P.kon_myoca
+    koff_myoca = P.koff_myoca
+    kon_myomg = P.kon_myomg
+    koff_myomg = P.koff_myomg
+    Bmax_myosin = P.Bmax_myosin
+    kon_sr = P.kon_sr
+    koff_sr = P.koff_sr
+    Bmax_SR = P.Bmax_SR
+    kon_sll = P.kon_sll
+    koff_sll = P.koff_sll
+    Bmax_SLlowsl = P.Bmax_SLlowsl
+    Bmax_SLlowj = P.Bmax_SLlowj
+    kon_slh = P.kon_slh
+    koff_slh = P.koff_slh
+    Bmax_SLhighsl = P.Bmax_SLhighsl
+    Bmax_SLhighj = P.Bmax_SLhighj
+    kon_csqn = P.kon_csqn
+    koff_csqn = P.koff_csqn
+    Bmax_Csqn = P.Bmax_Csqn
+    Cmem_FVjunc = P.Cmem_FVjunc
+    Cmem_FVsl = P.Cmem_FVsl
+    Jna_juncsl_Vjunc = P.Jna_juncsl_Vjunc
+    Jna_juncsl_Vsl = P.Jna_juncsl_Vsl
+    Jna_slmyo_Vsl = P.Jna_slmyo_Vsl
+    Jna_slmyo_Vmyo = P.Jna_slmyo_Vmyo
+    Jca_juncsl_Vjunc = P.Jca_juncsl_Vjunc
+    Jca_juncsl_Vsl = P.Jca_juncsl_Vsl
+    Jca_slmyo_Vsl = P.Jca_slmyo_Vsl
+    Jca_slmyo_Vmyo = P.Jca_slmyo_Vmyo
+    Vmyo_Vsr = P.Vmyo_Vsr
+    Vsr_Vjunc = P.Vsr_Vjunc
+    Vmyo_Vjunc = P.Vmyo_Vjunc
+    Vsr_Vmyo = P.Vsr_Vmyo
+    GtoSlow = P.GtoSlow
+    _x0 = exp(-(0.0195618153364632*Vm - 0.0943466353677621)**2)
+    _x1 = exp(-(0.0643500643500644*Vm + 2.94658944658945)**2)
+    _x2 = 1/(0.06487*_x0 + 0.1292*_x1)
+    _x3 = exp(-0.110741971207087*Vm)
+    _x4 = 0.00184221158116513*_x3 + 1
+    _x5 = exp(-0.0900900900900901*Vm)
+    _x6 = 0.0646209624466736*_x5 + 0.168831168831169
+    _x7 = (Vm >= -40)
+    _x8 = exp(-0.147058823529412*Vm)
+    _x9 = exp(0.079*Vm)
+    _x10 = exp(0.3485*Vm)
+    _x11 = ((1/_x6) if _x7 else (310000.0*_x10 + 4.43126792958051e-7*_x8 + 2.7*_x9))
+    _x12 = exp(0.134589502018843*Vm)
+    _x13 = 15212.5932856544*_x12 + 1
+    _x14 = 4094.91070946283*_x12/_x13**3
+    _x15 = -1/_x13**2
+    _x16 = exp(0.057*Vm)
+    _x17 = 0.1*Vm
+    _x18 = 1/(1 + 0.0407622039783662*exp(-_x17))
+    _x19 = exp(-0.01052*Vm)
+    _x20 = 1 + 0.00396086833990426*exp(-0.1378*Vm)
+    _x21 = 1/_x20
+    _x22 = Vm + 37.78
+    _x23 = exp(0.311*Vm)
+    _x24 = 50262745825.954*_x23 + 1
+    _x25 = 1/_x24
+    _x26 = exp(-0.04391*Vm)
+    _x27 = exp(0.2444*Vm)
+    _x28 = 6.948e-6*_x26 + 25428.0*_x27
+    _x29 = _x25*_x28
+    _x30 = ((0.6*_x16*_x18) if _x7 else (0.02424*_x19*_x21 - _x22*_x29))
+    _x31 = 0.035*Vm + 0.175
+    _x32 = exp(-0.166666666666667*Vm)
+    _x33 = 0.434598208507078*_x32
+    _x34 = _x33 + 1
+    _x35 = 1/(1 - _x33)
+    _x36 = _x31*_x34*_x35
+    _x37 = 1/_x34
+    _x38 = -_x37 + d
+    _x39 = 0.0724330347511797*_x32*_x38
+    _x40 = exp(-(0.0337*Vm + 0.48865)**2)
+    _x41 = 0.0197*_x40 + 0.02
+    _x42 = exp((1/9)*(Vm + 35)) + 1
+    _x43 = exp((1/20)*(50 - Vm)) + 1
+    _x44 = (1/9)*Vm
+    _x45 = (1/20)*Vm
+    _x46 = fcaBj - 1
+    _x47 = -_x46
+    _x48 = fcaBsl - 1
+    _x49 = -_x48
+    _x50 = exp((1/15)*Vm)
+    _x51 = 1.22140275816017*_x50 + 1
+    _x52 = 1/(0.5 + 9/_x51)
+    _x53 = exp(-1/13*Vm)
+    _x54 = 4.31258917989007*_x53 + 1
+    _x55 = _x54**(-2)
+    _x56 = -1/_x54
+    _x57 = exp((1/10)*Vm)
+    _x58 = 403.428793492735*_x57 + 1
+    _x59 = 1/(3 + 80/_x58)
+    _x60 = (1/5)*Vm
+    _x61 = exp(_x60)
+    _x62 = 49.4024491055302*_x61 + 1
+    _x63 = _x61/_x62**2
+    _x64 = -1/_x62
+    _x65 = Vm + 45
+    _x66 = 11*exp(-1/3600*_x65**2)
+    _x67 = 1/(_x66 + 1.0)
+    _x68 = Vm + 40
+    _x69 = exp(-1/220*_x68**2)
+    _x70 = 1/(85*_x69 + 7)
+    _x71 = exp(_x45 + 2)
+    _x72 = _x71 + 1
+    _x73 = 1 + exp(-1/9*(Vm + 22))
+    _x74 = 1/_x73
+    _x75 = exp((1/9)*(Vm + 11)) + 1
+    _x76 = 1/_x75
+    _x77 = 1/(330*_x74*_x76 + 23/_x72)
+    _x78 = _x60 + 2
+    _x79 = 1 + exp(-_x78)
+    _x80 = exp(-0.0708215297450425*Vm)
+    _x81 = exp(-0.0701754385964912*Vm)
+    _x82 = 0.765928338364649*_x81 + 1
+    _x83 = 1/Ca_sr
+    _x84 = (_x83*ec50SR)**2.5
+    _x85 = _x84 + 1
+    _x86 = 15 - 14/_x85
+    _x87 = _x86*kiCa
+    _x88 = Caj*_x87
+    _x89 = Caj**2
+    _x90 = koCa/_x86
+    _x91 = _x89*_x90
+    _x92 = _x91 + kim
+    _x93 = Caj*koCa/_x86**2
+    _x94 = 35.0*Caj*_x83*_x84/_x85**2
+    _x95 = Caj*_x90
+    _x96 = 2*_x95
+    _x97 = RyRo*kiCa
+    _x98 = -RyRo*_x87
+    _x99 = RyRi + RyRo + RyRr - 1
+    _x100 = Naj*kon_na + koff_na
+    _x101 = kon_na*(Bmax_Naj - NaBj)
+    _x102 = Nasl*kon_na + koff_na
+    _x103 = kon_na*(Bmax_Nasl - NaBsl)
+    _x104 = Cai*kon_tncl + koff_tncl
+    _x105 = kon_tncl*(Bmax_TnClow - TnCL)
+    _x106 = Cai*kon_tnchca
+    _x107 = _x106 + koff_tnchca
+    _x108 = -kon_tnchca*(-Bmax_TnChigh + TnCHc + TnCHm)
+    _x109 = Mgi*kon_tnchmg
+    _x110 = _x109 + koff_tnchmg
+    _x111 = Cai*kon_cam + koff_cam
+    _x112 = kon_cam*(Bmax_CaM - CaM)
+    _x113 = Cai*kon_myoca
+    _x114 = _x113 + koff_myoca
+    _x115 = -kon_myoca*(-Bmax_myosin + Myoc + Myom)
+    _x116 = Mgi*kon_myomg
+    _x117 = _x116 + koff_myomg
+    _x118 = Cai*kon_sr + koff_sr
+    _x119 = kon_sr*(Bmax_SR - SRB)
+    _x120 = Caj*kon_sll + koff_sll
+    _x121 = kon_sll*(Bmax_SLlowj - SLLj)
+    _x122 = Casl*kon_sll + koff_sll
+    _x123 = kon_sll*(Bmax_SLlowsl - SLLsl)
+    _x124 = Caj*kon_slh + koff_slh
+    _x125 = kon_slh*(Bmax_SLhighj - SLHj)
+    _x126 = Casl*kon_slh + koff_slh
+    _x127 = kon_slh*(Bmax_SLhighsl - SLHsl)
+    _x128 = Ca_sr*kon_csqn + koff_csqn
+    _x129 = kon_csqn*(Bmax_Csqn - Csqnb)
+    _x130 = ks*(Ca_sr - Caj)
+    _x131 = (Ca_sr/Kmr)**hillSRCaP
+    _x132 = (Cai/Kmf)**hillSRCaP
+    _x133 = _x131 + _x132 + 1
+    _x134 = 1/_x133
+    _x135 = hillSRCaP*serca
+    _x136 = _x134*_x135
+    _x137 = _x131*_x136*_x83
+    _x138 = _x131 - _x132
+    _x139 = _x133**(-2)
+    _x140 = RyRo*ks
+    _x141 = 5.348e-6*Vmyo_Vsr + _x140
+    _x142 = _x134*_x138
+    _x143 = _x132/Cai
+    _x144 = _x136*_x143
+    _x145 = -Vm
+    _x146 = 1/Naj
+    _x147 = GNa_junc*(RToF*log(Nao*_x146) + _x145)
+    _x148 = Cmem_FVjunc*_x147
+    _x149 = 3*h*j*m**2
+    _x150 = m**3
+    _x151 = _x150*j
+    _x152 = _x150*h
+    _x153 = Vm*f
+    _x154 = FoRT*Vm
+    _x155 = exp(_x154)
+    _x156 = Naj*_x155
+    _x157 = -Nao + _x156
+    _x158 = _x155 - 1
+    _x159 = 1/_x158
+    _x160 = _x159*caNa_junc
+    _x161 = _x157*_x160
+    _x162 = _x161*_x46
+    _x163 = Cmem_FVjunc*_x162
+    _x164 = Vm*d
+    _x165 = d*f
+    _x166 = Vm*_x165
+    _x167 = Cmem_FVjunc*_x166
+    _x168 = KmNaip**4
+    _x169 = exp(-FoRT*_x17)
+    _x170 = nak_sigma*exp(-_x154)
+    _x171 = 0.1245*_x169 + _x170 + 1
+    _x172 = _x168/_x171
+    _x173 = 12*_x172
+    _x174 = 1 + _x168/Naj**4
+    _x175 = nak_junc/(Naj**5*_x174**2)
+    _x176 = _x155*_x166
+    _x177 = exp(Vm*nu1FoRT)
+    _x178 = Caj*Nao3
+    _x179 = _x177*_x178
+    _x180 = Naj**3
+    _x181 = exp(Vm*nuFoRT)
+    _x182 = -Cao*_x180*_x181 + _x179
+    _x183 = -_x182
+    _x184 = 1/_x89
+    _x185 = Kdact**2
+    _x186 = _x184*_x185 + 1
+    _x187 = 1/_x186
+    _x188 = _x177*ksat
+    _x189 = _x188 + 1
+    _x190 = 1/_x189
+    _x191 = _x190*ncx_junc
+    _x192 = _x187*_x191
+    _x193 = _x183*_x192
+    _x194 = Naj**2
+    _x195 = 9*_x194
+    _x196 = KmNai**(-3)
+    _x197 = Cao + KmCaiNao3*_x196 + KmCao
+    _x198 = Cao*_x180
+    _x199 = 1/KmCai
+    _x200 = Caj*_x199
+    _x201 = KmNao3*(_x200 + 1)
+    _x202 = Caj*_x201 + KmCaiNao3*(_x180*_x196 + 1) + KmCao*_x180 + _x178 + _x198
+    _x203 = _x202**(-2)
+    _x204 = _x197*_x203
+    _x205 = Cao*_x181
+    _x206 = 1/_x202
+    _x207 = _x192*_x206
+    _x208 = _x205*_x207
+    _x209 = RToF*_x146
+    _x210 = _x151*h
+    _x211 = GNa_junc*_x210
+    _x212 = GNaB_junc*_x209 + _x209*_x211
+    _x213 = Nao3*_x177
+    _x214 = _x182*_x187
+    _x215 = Caj**(-3)
+    _x216 = 2*_x185
+    _x217 = KmNao3*_x200 + Nao3 + _x201
+    _x218 = Cmem_FVjunc*_x207
+    _x219 = _x179*nu1FoRT - _x181*_x198*nuFoRT
+    _x220 = FoRT*(0.01245*_x169 + _x170)/_x171**2
+    _x221 = _x220*nak_junc/_x174
+    _x222 = _x182*_x206
+    _x223 = _x189**(-2)
+    _x224 = _x188*_x223*nu1FoRT
+    _x225 = _x187*_x222*_x224*ncx_junc
+    _x226 = _x154*_x165
+    _x227 = _x226*_x46
+    _x228 = _x155/_x158**2
+    _x229 = GNaB_junc - _x156*_x160*_x227 + _x157*_x227*_x228*caNa_junc - _x162*_x165 + _x211
+    _x230 = 1/Nasl
+    _x231 = GNa_sl*(RToF*log(Nao*_x230) + _x145)
+    _x232 = Cmem_FVsl*_x231
+    _x233 = Nasl*_x155
+    _x234 = Nao - _x233
+    _x235 = _x159*caNa_sl
+    _x236 = _x234*_x235
+    _x237 = _x236*_x48
+    _x238 = Cmem_FVsl*_x237
+    _x239 = Cmem_FVsl*_x166
+    _x240 = 1 + _x168/Nasl**4
+    _x241 = nak_sl/(Nasl**5*_x240**2)
+    _x242 = Nasl**2
+    _x243 = 9*_x242
+    _x244 = Nasl**3
+    _x245 = Cao*_x244
+    _x246 = Casl*_x199
+    _x247 = KmNao3*(_x246 + 1)
+    _x248 = Casl*Nao3 + Casl*_x247 + KmCaiNao3*(_x196*_x244 + 1) + KmCao*_x244 + _x245
+    _x249 = _x248**(-2)
+    _x250 = Casl*_x213
+    _x251 = _x181*_x245
+    _x252 = -_x250 + _x251
+    _x253 = Casl**(-2)
+    _x254 = _x185*_x253 + 1
+    _x255 = 1/_x254
+    _x256 = _x190*ncx_sl
+    _x257 = _x249*_x252*_x255*_x256
+    _x258 = 1/_x248
+    _x259 = _x255*_x256*_x258
+    _x260 = _x205*_x259
+    _x261 = RToF*_x230
+    _x262 = GNa_sl*_x210
+    _x263 = GNaB_sl*_x261 + _x261*_x262
+    _x264 = Casl**(-3)
+    _x265 = KmNao3*_x246 + Nao3 + _x247
+    _x266 = _x252*_x258
+    _x267 = Cmem_FVsl*_x259
+    _x268 = _x220*nak_sl/_x240
+    _x269 = _x259*(-_x250*nu1FoRT + _x251*nuFoRT)
+    _x270 = _x226*_x48
+    _x271 = GNaB_sl + _x165*_x237 - _x228*_x234*_x270*caNa_sl - _x233*_x235*_x270 + _x262
+    _x272 = 0.5*_x153
+    _x273 = 2*_x154
+    _x274 = exp(_x273)
+    _x275 = Caj*_x274
+    _x276 = -Cao + _x275
+    _x277 = _x274 - 1
+    _x278 = 1/_x277
+    _x279 = _x278*ca_junc
+    _x280 = _x276*_x279
+    _x281 = _x280*_x46
+    _x282 = Cmem_FVjunc*_x281
+    _x283 = 0.5*_x164
+    _x284 = 5.348e-6*Vmyo_Vjunc + Vsr_Vjunc*_x140
+    _x285 = 1/Caj
+    _x286 = 0.25*RToF
+    _x287 = 0.8*pca_junc
+    _x288 = Caj**1.6 + KmPCa16
+    _x289 = Caj**0.6/_x288
+    _x290 = Caj**2.2
+    _x291 = _x288**(-2)
+    _x292 = _x166*_x274
+    _x293 = 2.0*_x185
+    _x294 = _x186**(-2)
+    _x295 = _x203*_x217
+    _x296 = _x277**(-2)
+    _x297 = Casl*_x274
+    _x298 = Cao - _x297
+    _x299 = _x278*ca_sl
+    _x300 = _x298*_x299
+    _x301 = _x300*_x48
+    _x302 = Cmem_FVsl*_x301
+    _x303 = 1/Casl
+    _x304 = 0.8*pca_sl
+    _x305 = Casl**1.6 + KmPCa16
+    _x306 = Casl**0.6/_x305
+    _x307 = Casl**2.2
+    _x308 = _x305**(-2)
+    _x309 = _x256*_x266/_x254**2
+    _x310 = _x274*_x296
+    _x311 = _x147 + _x231
+    _x312 = _x150*_x311
+    _x313 = Fjunc_CaL*_x46 + Fsl_CaL*_x48
+    _x314 = Ki*_x155 - Ko
+    _x315 = _x159*_x314*caK
+    _x316 = Vm*(_x162 - _x237 + _x281 - _x301 + _x313*_x315)
+    _x317 = 1/Ki
+    _x318 = RToF*log(Ko*_x317)
+    _x319 = _x145 + _x318
+    _x320 = GtoSlow*_x319
+    _x321 = GtoFast*_x319
+    _x322 = exp((1/24)*(Vm + 74)) + 1
+    _x323 = gkr/_x322
+    _x324 = 1/(Ki + Nai*pNaK)
+    _x325 = 4*_x172
+    _x326 = 3*_x194
+    _x327 = _x191*_x214
+    _x328 = Gks*xks**2
+    _x329 = RToF*_x324*_x328
+    _x330 = GtoFast*xtof*ytof + GtoSlow*xtos*ytos
+    _x331 = RToF*_x317
+    _x332 = exp(-0.167224080267559*Vm)
+    _x333 = 1786.47556537862*_x332 + 1
+    _x334 = Gkp/_x333
+    _x335 = _x323*xkr
+    _x336 = exp(0.2385*Vm - 0.2385*_x318)
+    _x337 = 7.35454251046446e-7*_x336 + 1
+    _x338 = 1.02/_x337
+    _x339 = exp(-0.5143*Vm + 0.5143*_x318)
+    _x340 = 0.0867722941576933*_x339 + 1
+    _x341 = 1/_x340
+    _x342 = exp(0.08032*Vm - 0.08032*_x318)
+    _x343 = exp(0.06175*Vm - 0.06175*_x318)
+    _x344 = 0.762624006506308*_x342 + 1.15340563518656e-16*_x343
+    _x345 = _x338 + _x341*_x344
+    _x346 = 1/_x345
+    _x347 = _x338*gki
+    _x348 = _x346*_x347
+    _x349 = _x336/_x337**2
+    _x350 = 1.78913955652069e-7*_x349
+    _x351 = _x319*_x346*gki
+    _x352 = _x319*_x347*(0.0446269908853017*_x339*_x344/_x340**2 + _x341*(0.0612539602025867*_x342 + 7.12227979727698e-18*_x343) - _x350)/_x345**2
+    _x353 = KdClCa*_x285 + 1
+    _x354 = KdClCa*(Vm - ecl)
+    _x355 = KdClCa*_x303 + 1
+    J = np.zeros((39, 39))
+    J[0, 0] = -_x2
+    J[0, 38] = _x2*(-_x2*(m - 1/_x4**2)*(_x0*(4.96469077025184e-5*Vm - 0.000239447035849246) + _x1*(0.00107001651403196*Vm + 0.0489960561775234)) + 0.000408020283757505*_x3/_x4**3)
+    J[1, 1] = -_x11
+    J[1, 38] = -_x11*_x14 - (_x15 + h)*((0.00582170832852916*_x5/_x6**2) if _x7 else (108035.0*_x10 - 6.51657048467723e-8*_x8 + 0.2133*_x9))
+    J[2, 2] = -_x30
+    J[2, 38] = -_x14*_x30 - (_x15 + j)*((_x18*(0.0342*_x16 + 0.00244573223870197*_x18*exp(-0.043*Vm))) if _x7 else (-0.0002550048*_x19*_x21 + 15631713951.8717*_x22*_x23*_x28/_x24**2 - _x22*_x25*(-3.0508668e-7*_x26 + 6214.6032*_x27) - _x29 + 1.32303776114687e-5*exp(-0.14832*Vm)/_x20**2))
+    J[3, 3] = -_x36
+    J[3, 38] = _x35*(_x31*_x39 + _x32*_x37*(0.00253515621629129*Vm + 0.0126757810814564) - 0.035*_x34*_x38 + _x36*_x39)
+    J[4, 4] = -_x41
+    J[4, 38] = -0.0197*_x40*(0.00227138*Vm + 0.03293501)*(-f + 0.6/_x43 + 1/_x42) - 1/9*_x41*(-0.27*exp(5/2 - _x45)/_x43**2 + exp(_x44 + 35/9)/_x42**2)
+    J[5, 5] = -1.7*Caj - 0.0119
+    J[5, 35] = 1.7*_x47
+    J[6, 6] = -1.7*Casl - 0.0119
+    J[6, 36] = 1.7*_x49
+    J[7, 7] = -_x52
+    J[7, 38] = _x52*(-0.732841654896102*_x50*_x52*(_x56 + xtos)/_x51**2 + 0.331737629222313*_x53*_x55)
+    J[8, 8] = -1/10*_x59
+    J[8, 38] = -_x59*(322.743034794188*_x57*_x59*(_x64 + ytos)/_x58**2 + 0.988048982110604*_x63)
+    J[9, 9] = -_x67
+    J[9, 38] = (1/1800)*_x67*(597.127732600164*_x53*_x55 - _x65*_x66*_x67*(_x56 + xtof))
+    J[10, 10] = -_x70
+    J[10, 38] = -1/22*_x70*(217.370776064333*_x63 + 17*_x68*_x69*_x70*(_x64 + ytof))
+    J[11, 11] = -1/10*_x77
+    J[11, 38] = (1/600)*_x77*(-_x77*(xkr - 1/_x79)*(69*_x71/_x72**2 + 2200*_x74*exp(_x44 + 11/9)/_x75**2 - 2200*_x76*exp(-_x44 - 22/9)/_x73**2) + 12*exp(-_x78)/_x79**2)
+    J[12, 12] = -0.00084995496300182*_x80 - 0.00100999899000101
+    J[12, 38] = _x80*(6.01951106941799e-5*xks - 6.01951106941799e-5/_x82) + _x81*(4.56845328067909e-5*_x80 + 5.42867963622068e-5)/_x82**2
+    J[13, 13] = -_x88 - _x92
+    J[13, 14] = -kim + kom
+    J[13, 15] = -kim
+    J[13, 30] = RyRr*_x94*(-_x93 + kiCa)
+    J[13, 35] = -RyRr*(_x87 + _x96)
+    J[14, 13] = _x91
+    J[14, 14] = -_x88 - kom
+    J[14, 15] = kim
+    J[14, 30] = _x94*(RyRr*_x93 + _x97)
+    J[14, 35] = RyRr*_x96 + _x98
+    J[15, 13] = -_x91
+    J[15, 14] = Caj*(_x86*kiCa - _x95)
+    J[15, 15] = -_x92 - kom
+    J[15, 30] = -_x94*(_x93*_x99 + _x97)
+    J[15, 35] = -_x96*_x99 - _x98
+    J[16, 16] = -_x100
+    J[16, 31] = _x101
+    J[17, 17] = -_x102
+    J[17, 32] = _x103
+    J[18, 18] = -_x104
+    J[18, 37] = _x105
+    J[19, 19] = -_x107
+    J[19, 20] = -_x106
+    J[19, 37] = _x108
+    J[20, 19] = -_x109
+    J[20, 20] = -_x110
+    J[21, 21] = -_x111
+    J[21, 37] = _x112
+    J[22, 22] = -_x114
+    J[22, 23] = -_x113
+    J[22, 37] = _x115
+    J[23, 22] = -_x116
+    J[23, 23] = -_x117
+    J[24, 24] = -_x118
+    J[24, 37] = _x119
+    J[25, 25] = -_x120
+    J[25, 35] = _x121
+    J[26, 26] = -_x122
+    J[26, 36] = _x123
+    J[27, 27] = -_x124
+    J[27, 35] = _x125
+    J[28, 28] = -_x126
+    J[28, 36] = _x127
+    J[29, 29] = -_x128
+    J[29, 30] = _x129
+    J[30, 14] = -_x130
+    J[30, 29] = _x128
+    J[30, 30] = -_x129 + _x131*_x138*_x139*_x83*hillSRCaP*serca - _x137 - _x141
+    J[30, 35] = _x141
+    J[30, 37] = _x144*(_x142 + 1)
+    J[31, 0] = _x148*_x149
+    J[31, 1] = _x148*_x151
+    J[31, 2] = _x148*_x152
+    J[31, 3] = _x153*_x163
+    J[31, 4] = _x163*_x164
+    J[31, 5] = _x161*_x167
+    J[31, 16] = _x100
+    J[31, 31] = -Cmem_FVjunc*(_x160*_x176*_x47 + _x173*_x175 - _x193*_x195*_x204 + _x195*_x208 + _x212) - Jna_juncsl_Vjunc - _x101
+    J[31, 32] = Jna_juncsl_Vjunc
+    J[31, 35] = -3*_x218*(_x182*_x206*_x217 - _x213 - _x214*_x215*_x216)
+    J[31, 38] = -Cmem_FVjunc*(-3*_x207*_x219 + 3*_x221 + 3*_x225 + _x229)
+    J[32, 0] = _x149*_x232
+    J[32, 1] = _x151*_x232
+    J[32, 2] = _x152*_x232
+    J[32, 3] = -_x153*_x238
+    J[32, 4] = -_x164*_x238
+    J[32, 6] = -_x236*_x239
+    J[32, 17] = _x102
+    J[32, 31] = Jna_juncsl_Vsl
+    J[32, 32] = -Cmem_FVsl*(_x173*_x241 + _x176*_x235*_x49 - _x197*_x243*_x257 + _x243*_x260 + _x263) - Jna_juncsl_Vsl - Jna_slmyo_Vsl - _x103
+    J[32, 33] = Jna_slmyo_Vsl
+    J[32, 36] = -3*_x267*(2*_x185*_x252*_x255*_x264 - _x213 - _x265*_x266)
+    J[32, 38] = -Cmem_FVsl*(-3*_x224*_x255*_x266*ncx_sl + 3*_x268 + 3*_x269 + _x271)
+    J[33, 32] = Jna_slmyo_Vmyo
+    J[33, 33] = -Jna_slmyo_Vmyo
+    J[35, 3] = _x272*_x282
+    J[35, 4] = _x282*_x283
+    J[35, 5] = 0.5*_x167*_x280
+    J[35, 14] = Vsr_Vjunc*_x130
+    J[35, 25] = _x120
+    J[35, 27] = _x124
+    J[35, 30] = _x284
+    J[35, 31] = 3.0*_x194*_x218*(_x197*_x222 + _x205)
+    J[35, 35] = -Cmem_FVjunc*(GCaB_junc*_x285*_x286 - _x183*_x191*_x206*_x215*_x293*_x294 + 1.0*_x193*_x295 + 1.0*_x207*_x213 + 0.5*_x279*_x292*_x47 + _x287*_x289 - _x287*_x290*_x291) - Jca_juncsl_Vjunc - _x121 - _x125 - _x284
+    J[35, 36] = Jca_juncsl_Vjunc
+    J[35, 38] = -Cmem_FVjunc*(1.0*FoRT*Vm*_x274*_x276*_x296*_x46*ca_junc*d*f + 0.5*GCaB_junc - 0.5*_x165*_x281 + 1.0*_x187*_x190*_x206*_x219*ncx_junc - 1.0*_x225 - 1.0*_x226*_x275*_x279*_x46)
+    J[36, 3] = -_x272*_x302
+    J[36, 4] = -_x283*_x302
+    J[36, 6] = -0.5*_x239*_x300
+    J[36, 26] = _x122
+    J[36, 28] = _x126
+    J[36, 32] = 3.0*_x242*_x267*(-_x197*_x266 + _x205)
+    J[36, 35] = Jca_juncsl_Vsl
+    J[36, 36] = -Cmem_FVsl*(GCaB_sl*_x286*_x303 + 1.0*_x213*_x259 + 1.0*_x257*_x265 - _x264*_x293*_x309 + 0.5*_x292*_x299*_x49 + _x304*_x306 - _x304*_x307*_x308) - Jca_juncsl_Vsl - Jca_slmyo_Vsl - _x123 - _x127
+    J[36, 37] = Jca_slmyo_Vsl
+    J[36, 38] = -Cmem_FVsl*(0.5*GCaB_sl + 1.0*_x177*_x223*_x252*_x255*_x258*ksat*ncx_sl*nu1FoRT - 1.0*_x269 - 1.0*_x270*_x297*_x299 - 1.0*_x270*_x298*_x310*ca_sl + 0.5*_x278*_x298*_x48*ca_sl*d*f)
+    J[37, 18] = _x104
+    J[37, 19] = _x107 + _x109
+    J[37, 20] = _x106 + _x110
+    J[37, 21] = _x111
+    J[37, 22] = _x114 + _x116
+    J[37, 23] = _x113 + _x117
+    J[37, 24] = _x118
+    J[37, 30] = Vsr_Vmyo*_x137*(1 - _x142)
+    J[37, 36] = Jca_slmyo_Vmyo
+    J[37, 37] = -Jca_slmyo_Vmyo - Vsr_Vmyo*_x135*_x138*_x139*_x143 - Vsr_Vmyo*_x144 - _x105 - _x108 - _x112 - _x115 - _x119
+    J[38, 0] = _x149*_x311
+    J[38, 1] = _x312*j
+    J[38, 2] = _x312*h
+    J[38, 3] = _x316*f
+    J[38, 4] = _x316*d
+    J[38, 5] = _x166*(Fjunc_CaL*_x315 + _x161 + _x280)
+    J[38, 6] = _x166*(Fsl_CaL*_x159*_x314*caK - _x236 - _x300)
+    J[38, 7] = _x320*ytos
+    J[38, 8] = _x320*xtos
+    J[38, 9] = _x321*ytof
+    J[38, 10] = _x321*xtof
+    J[38, 11] = _x319*_x323
+    J[38, 12] = 2*Gks*xks*(RToF*log(_x324*eks_num) + _x145)
+    J[38, 31] = Vm*_x155*_x159*_x46*caNa_junc*d*f - _x175*_x325 - _x204*_x326*_x327 - _x208*_x326 - _x212
+    J[38, 32] = Vm*_x155*_x159*_x48*caNa_sl*d*f + 3*_x190*_x197*_x242*_x249*_x252*_x255*ncx_sl - _x241*_x325 - 3*_x242*_x260 - _x263
+    J[38, 33] = -_x329*pNaK
+    J[38, 34] = Vm*_x155*_x159*_x313*caK*d*f - _x329 - _x330*_x331 - _x331*_x334 - _x331*_x335 - _x331*_x348 - _x331*_x350*_x351 - _x331*_x352
+    J[38, 35] = -0.5*GCaB_junc*RToF*_x285 - GClCa_junc*_x184*_x354/_x353**2 + Nao3*_x177*_x187*_x190*_x206*ncx_junc + Vm*_x274*_x278*_x46*ca_junc*d*f + 2*_x182*_x185*_x190*_x206*_x215*_x294*ncx_junc - 1.6*_x289*pca_junc + 1.6*_x290*_x291*pca_junc - _x295*_x327
+    J[38, 36] = -0.5*GCaB_sl*RToF*_x303 - GClCa_sl*_x253*_x354/_x355**2 + Nao3*_x177*_x190*_x255*_x258*ncx_sl + Vm*_x274*_x278*_x48*ca_sl*d*f + _x190*_x249*_x252*_x255*_x265*ncx_sl - _x216*_x264*_x309 - 1.6*_x306*pca_sl + 1.6*_x307*_x308*pca_sl
+    J[38, 38] = 2*Caj*FoRT*Vm*_x274*_x278*_x46*ca_junc*d*f + 2*Casl*FoRT*Vm*_x274*_x278*_x48*ca_sl*d*f + FoRT*Ki*Vm*_x155*_x159*_x313*caK*d*f + 2*FoRT*Vm*_x274*_x296*_x298*_x48*ca_sl*d*f - GCaB_junc - GCaB_sl - GClB - GClCa_junc/_x353 - GClCa_sl/_x355 + 298.741733340907*Gkp*_x319*_x332/_x333**2 + _x159*_x313*_x314*caK*d*f - _x165*_x273*_x276*_x310*_x46*ca_junc - _x165*_x301 + _x177*_x223*_x252*_x255*_x258*ksat*ncx_sl*nu1FoRT + _x187*_x190*_x206*_x219*ncx_junc - _x221 - _x225 - _x226*_x228*_x313*_x314*caK - _x229 - _x268 - _x269 - _x271 + _x276*_x278*_x46*ca_junc*d*f - 1/24*_x319*gkr*xkr*exp((1/24)*Vm + 37/12)/_x322**2 - _x328 - _x330 - _x334 - _x335 - _x348 - 1.78913955652069e-7*_x349*_x351 - _x352
+    if P.dynamic is not None:
+        J *= np.asarray(P.dynamic)[:, None]
+    return J
+
+
+def grandi_bers_atrial_jacobian(y, t, P):
+    """Analytic Jacobian of grandi_bers_atrial_prepared, usable as odeint Dfun with args (P,)."""
+    (m, h, j, d, f, fcaBj, fcaBsl, xtof, ytof, xkr, xks, RyRr, RyRo, RyRi, NaBj,
+     NaBsl, TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl, SLHj, SLHsl,
+     Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai, Vm, rkuro, skuro, ml, hl,
+     INal) = y
+    FoRT = P.FoRT
+    RToF = P.RToF
+    Ko = P.Ko
+    Nao = P.Nao
+    Cao = P.Cao
+    Mgi = P.Mgi
+    ecl = P.ecl
+    GNa_junc = P.GNa_junc
+    GNa_sl = P.GNa_sl
+    nak_sigma = P.nak_sigma
+    nak_junc = P.nak_junc
+    nak_sl = P.nak_sl
+    KmNaip = P.KmNaip
+    gkr = P.gkr
+    gki = P.gki
+    Gks = P.Gks
+    Gkp = P.Gkp
+    GtoFast = P.GtoFast
+    pNaK = P.pNaK
+    eks_num = P.eks_num
+    GClCa_junc = P.GClCa_junc
+    GClCa_sl = P.GClCa_sl
+    KdClCa = P.KdClCa
+    GClB = P.GClB
+    ca_junc = P.ca_junc
+    ca_sl = P.ca_sl
+    caK = P.caK
+    Fjunc_CaL = P.Fjunc_CaL
+    Fsl_CaL = P.Fsl_CaL
+    caNa_junc = P.caNa_junc
+    caNa_sl = P.caNa_sl
+    ncx_junc = P.ncx_junc
+    ncx_sl = P.ncx_sl
+    Kdact = P.Kdact
+    nuFoRT = P.nuFoRT
+    nu1FoRT = P.nu1FoRT
+    ksat = P.ksat
+    Nao3 = P.Nao3
+    KmCaiNao3 = P.KmCaiNao3
+    KmNai = P.KmNai
+    KmNao3 = P.KmNao3
+    KmCai = P.KmCai
+    KmCao = P.KmCao
+    pca_junc = P.pca_junc
+    pca_sl = P.pca_sl
+    KmPCa16 = P.KmPCa16
+    GNaB_junc = P.GNaB_junc
+    GNaB_sl = P.GNaB_sl
+    GCaB_junc = P.GCaB_junc
+    GCaB_sl = P.GCaB_sl
+    ec50SR = P.ec50SR
+    koCa = P.koCa
+    kiCa = P.kiCa
+    kom = P.kom
+    kim = P.kim
+    ks = P.ks
+    serca = P.serca
+    Kmf = P.Kmf
+    Kmr = P.Kmr
+    hillSRCaP = P.hillSRCaP
+    kon_na = P.kon_na
+    koff_na = P.koff_na
+    Bmax_Naj = P.Bmax_Naj
+    Bmax_Nasl = P.Bmax_Nasl
+    kon_tncl = P.kon_tncl
+    koff_tncl = P.koff_tncl
+    Bmax_TnClow = P.Bmax_TnClow
+    kon_tnchca = P.kon_tnchca
+    koff_tnchca = P.koff_tnchca
+    kon_tnchmg = P.kon_tnchmg
+    koff_tnchmg = P.koff_tnchmg
+    Bmax_TnChigh = P.Bmax_TnChigh
+    kon_cam = P.kon_cam
+    koff_cam = P.koff_cam
+    Bmax_CaM = P.Bmax_CaM
+    kon_myoca = P.kon_myoca
+    koff_myoca = P.koff_myoca
+    kon_myomg = P.kon_myomg
+    koff_myomg = P.koff_myomg
+    Bmax_myosin = P.Bmax_myosin
+    kon_sr = P.kon_sr
+    koff_sr = P.koff_sr
+    Bmax_SR = P.Bmax_SR
+    kon_sll = P.kon_sll
+    koff_sll = P.koff_sll
+    Bmax_SLlowsl = P.Bmax_SLlowsl
+    Bmax_SLlowj = P.Bmax_SLlowj
+    kon_slh = P.kon_slh
+    koff_slh = P.koff_slh
+    Bmax_SLhighsl = P.Bmax_SLhighsl
+    Bmax_SLhighj = P.Bmax_SLhighj
+    kon_csqn = P.kon_csqn
+    koff_csqn = P.koff_csqn
+    Bmax_Csqn = P.Bmax_Csqn
+    Cmem_FVjunc = P.Cmem_FVjunc
+    Cmem_FVsl = P.Cmem_FVsl
+    Jna_juncsl_Vjunc = P.Jna_juncsl_Vjunc
+    Jna_juncsl_Vsl = P.Jna_juncsl_Vsl
+    Jna_slmyo_Vsl = P.Jna_slmyo_Vsl
+    Jna_slmyo_Vmyo = P.Jna_slmyo_Vmyo
+    Jca_juncsl_Vjunc = P.Jca_juncsl_Vjunc
+    Jca_juncsl_Vsl = P.Jca_juncsl_Vsl
+    Jca_slmyo_Vsl = P.Jca_slmyo_Vsl
+    Jca_slmyo_Vmyo = P.Jca_slmyo_Vmyo
+    Vmyo_Vsr = P.Vmyo_Vsr
+    Vsr_Vjunc = P.Vsr_Vjunc
+    Vmyo_Vjunc = P.Vmyo_Vjunc
+    Vsr_Vmyo = P.Vsr_Vmyo
+    ISO = P.ISO
+    GNaL_junc = P.GNaL_junc
+    GNaL_sl = P.GNaL_sl
+    tauhl = P.tauhl
+    Gkur = P.Gkur
+    GkAch = P.GkAch
+    SRleak = P.SRleak
+    _x0 = exp(-(0.0195618153364632*Vm - 0.0943466353677621)**2)
+    _x1 = exp(-(0.0643500643500644*Vm + 2.94658944658945)**2)
+    _x2 = 1/(0.06487*_x0 + 0.1292*_x1)
+    _x3 = exp(-0.110741971207087*Vm)
+    _x4 = 0.00184221158116513*_x3 + 1
+    _x5 = exp(-0.0900900900900901*Vm)
+    _x6 = 0.0646209624466736*_x5 + 0.168831168831169
+    _x7 = (Vm >= -40)
+    _x8 = exp(-0.147058823529412*Vm)
+    _x9 = exp(0.079*Vm)
+    _x10 = exp(0.3485*Vm)
+    _x11 = ((1/_x6) if _x7 else (310000.0*_x10 + 4.43126792958051e-7*_x8 + 2.7*_x9))
+    _x12 = exp(0.134589502018843*Vm)
+    _x13 = 15212.5932856544*_x12 + 1
+    _x14 = 4094.91070946283*_x12/_x13**3
+    _x15 = -1/_x13**2
+    _x16 = exp(0.057*Vm)
+    _x17 = 0.1*Vm
+    _x18 = exp(-_x17)
+    _x19 = 1/(0.0407622039783662*_x18 + 1)
+    _x20 = exp(-0.01052*Vm)
+    _x21 = 1 + 0.00396086833990426*exp(-0.1378*Vm)
+    _x22 = 1/_x21
+    _x23 = Vm + 37.78
+    _x24 = exp(0.311*Vm)
+    _x25 = 50262745825.954*_x24 + 1
+    _x26 = 1/_x25
+    _x27 = exp(-0.04391*Vm)
+    _x28 = exp(0.2444*Vm)
+    _x29 = 6.948e-6*_x27 + 25428.0*_x28
+    _x30 = _x26*_x29
+    _x31 = ((0.6*_x16*_x19) if _x7 else (0.02424*_x20*_x22 - _x23*_x30))
+    _x32 = 0.105*ISO + 0.035*Vm + 0.315
+    _x33 = exp(-0.5*ISO - 0.166666666666667*Vm)
+    _x34 = 0.22313016014843*_x33
+    _x35 = _x34 + 1
+    _x36 = 1/(_x34 - 1)
+    _x37 = _x32*_x35*_x36
+    _x38 = 1/_x35
+    _x39 = 0.0371883600247383*_x33
+    _x40 = _x32*_x39
+    _x41 = -_x38 + d
+    _x42 = exp(-(0.1011*ISO + 0.0337*Vm + 0.8425)**2)
+    _x43 = 0.0197*_x42 + 0.02
+    _x44 = exp((1/9)*(Vm + 35)) + 1
+    _x45 = exp((1/20)*(50 - Vm)) + 1
+    _x46 = (1/9)*Vm
+    _x47 = (1/20)*Vm
+    _x48 = fcaBj - 1
+    _x49 = -_x48
+    _x50 = fcaBsl - 1
+    _x51 = -_x50
+    _x52 = Vm + 45
+    _x53 = exp(-1/900*_x52**2)
+    _x54 = 1/(3.5*_x53 + 1.5)
+    _x55 = exp(-0.0909090909090909*Vm)
+    _x56 = 1.09516943987466*_x55 + 1
+    _x57 = 0.0629615871356885*Vm + 3.30233524526686
+    _x58 = exp(-_x57**2.0)
+    _x59 = 1/(25.635*_x58 + 24.14)
+    _x60 = exp(0.0869565217391304*Vm)
+    _x61 = 33.8432351130073*_x60 + 1
+    _x62 = exp(_x47 + 2)
+    _x63 = _x62 + 1
+    _x64 = 1 + exp(-1/9*(Vm + 22))
+    _x65 = 1/_x64
+    _x66 = exp((1/9)*(Vm + 11)) + 1
+    _x67 = 1/_x66
+    _x68 = 1/(330*_x65*_x67 + 23/_x63)
+    _x69 = (1/5)*Vm + 2
+    _x70 = 1 + exp(-_x69)
+    _x71 = exp(-2.8328611898017*ISO - 0.0708215297450425*Vm)
+    _x72 = 0.00084995496300182*_x71 + 0.00100999899000101
+    _x73 = exp(-2.80701754385965*ISO - 0.0701754385964912*Vm)
+    _x74 = 0.765928338364649*_x73 + 1
+    _x75 = 1/Ca_sr
+    _x76 = (_x75*ec50SR)**2.5
+    _x77 = _x76 + 1
+    _x78 = 15 - 14/_x77
+    _x79 = _x78*kiCa
+    _x80 = Caj*_x79
+    _x81 = Caj**2
+    _x82 = koCa/_x78
+    _x83 = _x81*_x82
+    _x84 = _x83 + kim
+    _x85 = Caj*koCa/_x78**2
+    _x86 = 35.0*Caj*_x75*_x76/_x77**2
+    _x87 = Caj*_x82
+    _x88 = 2*_x87
+    _x89 = RyRo*kiCa
+    _x90 = -RyRo*_x79
+    _x91 = RyRi + RyRo + RyRr - 1
+    _x92 = Naj*kon_na + koff_na
+    _x93 = kon_na*(Bmax_Naj - NaBj)
+    _x94 = Nasl*kon_na + koff_na
+    _x95 = kon_na*(Bmax_Nasl - NaBsl)
+    _x96 = Cai*kon_tncl + koff_tncl
+    _x97 = kon_tncl*(Bmax_TnClow - TnCL)
+    _x98 = Cai*kon_tnchca
+    _x99 = _x98 + koff_tnchca
+    _x100 = -kon_tnchca*(-Bmax_TnChigh + TnCHc + TnCHm)
+    _x101 = Mgi*kon_tnchmg
+    _x102 = _x101 + koff_tnchmg
+    _x103 = Cai*kon_cam + koff_cam
+    _x104 = kon_cam*(Bmax_CaM - CaM)
+    _x105 = Cai*kon_myoca
+    _x106 = _x105 + koff_myoca
+    _x107 = -kon_myoca*(-Bmax_myosin + Myoc + Myom)
+    _x108 = Mgi*kon_myomg
+    _x109 = _x108 + koff_myomg
+    _x110 = Cai*kon_sr + koff_sr
+    _x111 = kon_sr*(Bmax_SR - SRB)
+    _x112 = Caj*kon_sll + koff_sll
+    _x113 = kon_sll*(Bmax_SLlowj - SLLj)
+    _x114 = Casl*kon_sll + koff_sll
+    _x115 = kon_sll*(Bmax_SLlowsl - SLLsl)
+    _x116 = Caj*kon_slh + koff_slh
+    _x117 = kon_slh*(Bmax_SLhighj - SLHj)
+    _x118 = Casl*kon_slh + koff_slh
+    _x119 = kon_slh*(Bmax_SLhighsl - SLHsl)
+    _x120 = Ca_sr*kon_csqn + koff_csqn
+    _x121 = kon_csqn*(Bmax_Csqn - Csqnb)
+    _x122 = ks*(Ca_sr - Caj)
+    _x123 = (Ca_sr/Kmr)**hillSRCaP
+    _x124 = (Cai/Kmf)**hillSRCaP
+    _x125 = _x123 + _x124 + 1
+    _x126 = 1/_x125
+    _x127 = hillSRCaP*serca
+    _x128 = _x126*_x127
+    _x129 = _x123*_x128*_x75
+    _x130 = _x123 - _x124
+    _x131 = _x125**(-2)
+    _x132 = RyRo*ks
+    _x133 = SRleak*Vmyo_Vsr + _x132
+    _x134 = _x126*_x130
+    _x135 = _x124/Cai
+    _x136 = _x128*_x135
+    _x137 = -Vm
+    _x138 = 1/Naj
+    _x139 = RToF*log(Nao*_x138) + _x137
+    _x140 = GNa_junc*_x139
+    _x141 = Cmem_FVjunc*_x140
+    _x142 = 3*h*j*m**2
+    _x143 = m**3
+    _x144 = _x143*j
+    _x145 = _x143*h
+    _x146 = Vm*f
+    _x147 = FoRT*Vm
+    _x148 = exp(_x147)
+    _x149 = Naj*_x148
+    _x150 = -Nao + _x149
+    _x151 = _x148 - 1
+    _x152 = 1/_x151
+    _x153 = _x152*caNa_junc
+    _x154 = _x150*_x153
+    _x155 = _x154*_x48
+    _x156 = Cmem_FVjunc*_x155
+    _x157 = Vm*d
+    _x158 = d*f
+    _x159 = Vm*_x158
+    _x160 = Cmem_FVjunc*_x159
+    _x161 = KmNaip**4
+    _x162 = exp(-FoRT*_x17)
+    _x163 = nak_sigma*exp(-_x147)
+    _x164 = 0.1245*_x162 + _x163 + 1
+    _x165 = _x161/_x164
+    _x166 = 12*_x165
+    _x167 = 1 + _x161/Naj**4
+    _x168 = nak_junc/(Naj**5*_x167**2)
+    _x169 = _x148*_x159
+    _x170 = exp(Vm*nu1FoRT)
+    _x171 = Caj*Nao3
+    _x172 = _x170*_x171
+    _x173 = Naj**3
+    _x174 = exp(Vm*nuFoRT)
+    _x175 = -Cao*_x173*_x174 + _x172
+    _x176 = -_x175
+    _x177 = 1/_x81
+    _x178 = Kdact**2
+    _x179 = _x177*_x178 + 1
+    _x180 = 1/_x179
+    _x181 = _x170*ksat
+    _x182 = _x181 + 1
+    _x183 = 1/_x182
+    _x184 = _x183*ncx_junc
+    _x185 = _x180*_x184
+    _x186 = _x176*_x185
+    _x187 = Naj**2
+    _x188 = 9*_x187
+    _x189 = KmNai**(-3)
+    _x190 = Cao + KmCaiNao3*_x189 + KmCao
+    _x191 = Cao*_x173
+    _x192 = 1/KmCai
+    _x193 = Caj*_x192
+    _x194 = KmNao3*(_x193 + 1)
+    _x195 = Caj*_x194 + KmCaiNao3*(_x173*_x189 + 1) + KmCao*_x173 + _x171 + _x191
+    _x196 = _x195**(-2)
+    _x197 = _x190*_x196
+    _x198 = Cao*_x174
+    _x199 = 1/_x195
+    _x200 = _x185*_x199
+    _x201 = _x198*_x200
+    _x202 = RToF*_x138
+    _x203 = ml**3
+    _x204 = _x203*hl
+    _x205 = GNaL_junc*_x204
+    _x206 = _x202*_x205
+    _x207 = _x144*h
+    _x208 = GNa_junc*_x207
+    _x209 = GNaB_junc*_x202 + _x202*_x208 + _x206
+    _x210 = Nao3*_x170
+    _x211 = _x175*_x180
+    _x212 = Caj**(-3)
+    _x213 = 2*_x178
+    _x214 = KmNao3*_x193 + Nao3 + _x194
+    _x215 = Cmem_FVjunc*_x200
+    _x216 = _x172*nu1FoRT - _x174*_x191*nuFoRT
+    _x217 = FoRT*(0.01245*_x162 + _x163)/_x164**2
+    _x218 = _x217*nak_junc/_x167
+    _x219 = _x175*_x199
+    _x220 = _x182**(-2)
+    _x221 = _x181*_x220*nu1FoRT
+    _x222 = _x180*_x219*_x221*ncx_junc
+    _x223 = _x147*_x158
+    _x224 = _x223*_x48
+    _x225 = _x148/_x151**2
+    _x226 = GNaB_junc - _x149*_x153*_x224 + _x150*_x224*_x225*caNa_junc - _x155*_x158 + _x205 + _x208
+    _x227 = GNaL_junc*_x139
+    _x228 = Cmem_FVjunc*_x227
+    _x229 = 3*hl*ml**2
+    _x230 = 1/Nasl
+    _x231 = RToF*log(Nao*_x230) + _x137
+    _x232 = GNa_sl*_x231
+    _x233 = Cmem_FVsl*_x232
+    _x234 = Nasl*_x148
+    _x235 = Nao - _x234
+    _x236 = _x152*caNa_sl
+    _x237 = _x235*_x236
+    _x238 = _x237*_x50
+    _x239 = Cmem_FVsl*_x238
+    _x240 = Cmem_FVsl*_x159
+    _x241 = 1 + _x161/Nasl**4
+    _x242 = nak_sl/(Nasl**5*_x241**2)
+    _x243 = Nasl**2
+    _x244 = 9*_x243
+    _x245 = Nasl**3
+    _x246 = Cao*_x245
+    _x247 = Casl*_x192
+    _x248 = KmNao3*(_x247 + 1)
+    _x249 = Casl*Nao3 + Casl*_x248 + KmCaiNao3*(_x189*_x245 + 1) + KmCao*_x245 + _x246
+    _x250 = _x249**(-2)
+    _x251 = Casl*_x210
+    _x252 = _x174*_x246
+    _x253 = -_x251 + _x252
+    _x254 = Casl**(-2)
+    _x255 = _x178*_x254 + 1
+    _x256 = 1/_x255
+    _x257 = _x183*ncx_sl
+    _x258 = _x250*_x253*_x256*_x257
+    _x259 = 1/_x249
+    _x260 = _x256*_x257*_x259
+    _x261 = _x198*_x260
+    _x262 = RToF*_x230
+    _x263 = GNaL_sl*_x204
+    _x264 = _x262*_x263
+    _x265 = GNa_sl*_x207
+    _x266 = GNaB_sl*_x262 + _x262*_x265 + _x264
+    _x267 = Casl**(-3)
+    _x268 = KmNao3*_x247 + Nao3 + _x248
+    _x269 = _x253*_x259
+    _x270 = Cmem_FVsl*_x260
+    _x271 = _x217*nak_sl/_x241
+    _x272 = _x260*(-_x251*nu1FoRT + _x252*nuFoRT)
+    _x273 = _x223*_x50
+    _x274 = GNaB_sl + _x158*_x238 - _x225*_x235*_x273*caNa_sl - _x234*_x236*_x273 + _x263 + _x265
+    _x275 = GNaL_sl*_x231
+    _x276 = Cmem_FVsl*_x275
+    _x277 = 0.5*_x146
+    _x278 = 2*_x147
+    _x279 = exp(_x278)
+    _x280 = Caj*_x279
+    _x281 = -Cao + _x280
+    _x282 = _x279 - 1
+    _x283 = 1/_x282
+    _x284 = _x283*ca_junc
+    _x285 = _x281*_x284
+    _x286 = _x285*_x48
+    _x287 = Cmem_FVjunc*_x286
+    _x288 = 0.5*_x157
+    _x289 = SRleak*Vmyo_Vjunc + Vsr_Vjunc*_x132
+    _x290 = 1/Caj
+    _x291 = 0.25*RToF
+    _x292 = 0.8*pca_junc
+    _x293 = Caj**1.6 + KmPCa16
+    _x294 = Caj**0.6/_x293
+    _x295 = Caj**2.2
+    _x296 = _x293**(-2)
+    _x297 = _x159*_x279
+    _x298 = 2.0*_x178
+    _x299 = _x179**(-2)
+    _x300 = _x196*_x214
+    _x301 = _x282**(-2)
+    _x302 = Casl*_x279
+    _x303 = Cao - _x302
+    _x304 = _x283*ca_sl
+    _x305 = _x303*_x304
+    _x306 = _x305*_x50
+    _x307 = Cmem_FVsl*_x306
+    _x308 = 1/Casl
+    _x309 = 0.8*pca_sl
+    _x310 = Casl**1.6 + KmPCa16
+    _x311 = Casl**0.6/_x310
+    _x312 = Casl**2.2
+    _x313 = _x310**(-2)
+    _x314 = _x257*_x269/_x255**2
+    _x315 = _x279*_x301
+    _x316 = _x140 + _x232
+    _x317 = _x143*_x316
+    _x318 = Fjunc_CaL*_x48 + Fsl_CaL*_x50
+    _x319 = Ki*_x148 - Ko
+    _x320 = _x152*_x319*caK
+    _x321 = Vm*(_x155 - _x238 + _x286 - _x306 + _x318*_x320)
+    _x322 = 1/Ki
+    _x323 = RToF*log(Ko*_x322)
+    _x324 = _x137 + _x323
+    _x325 = GtoFast*_x324
+    _x326 = exp((1/24)*(Vm + 74)) + 1
+    _x327 = gkr/_x326
+    _x328 = 1/(Ki + Nai*pNaK)
+    _x329 = 4*_x165
+    _x330 = 3*_x187
+    _x331 = _x184*_x211
+    _x332 = Gks*xks**2
+    _x333 = RToF*_x328*_x332
+    _x334 = Gkur*skuro
+    _x335 = _x334*rkuro
+    _x336 = RToF*_x322
+    _x337 = GtoFast*xtof*ytof
+    _x338 = exp(-0.167224080267559*Vm)
+    _x339 = 1786.47556537862*_x338 + 1
+    _x340 = Gkp/_x339
+    _x341 = _x327*xkr
+    _x342 = exp((1/12)*(Vm + 91)) + 1
+    _x343 = GkAch*(0.08 + 0.4/_x342)
+    _x344 = exp(0.2385*Vm - 0.2385*_x323)
+    _x345 = 7.35454251046446e-7*_x344 + 1
+    _x346 = 1.02/_x345
+    _x347 = exp(-0.5143*Vm + 0.5143*_x323)
+    _x348 = 0.0867722941576933*_x347 + 1
+    _x349 = 1/_x348
+    _x350 = exp(0.08032*Vm - 0.08032*_x323)
+    _x351 = exp(0.06175*Vm - 0.06175*_x323)
+    _x352 = 0.762624006506308*_x350 + 1.15340563518656e-16*_x351
+    _x353 = _x346 + _x349*_x352
+    _x354 = 1/_x353
+    _x355 = _x346*gki
+    _x356 = _x354*_x355
+    _x357 = _x344/_x345**2
+    _x358 = 1.78913955652069e-7*_x357
+    _x359 = _x324*_x354*gki
+    _x360 = _x324*_x355*(0.0446269908853017*_x347*_x352/_x348**2 + _x349*(0.0612539602025867*_x350 + 7.12227979727698e-18*_x351) - _x358)/_x353**2
+    _x361 = KdClCa*_x290 + 1
+    _x362 = KdClCa*(Vm - ecl)
+    _x363 = KdClCa*_x308 + 1
+    _x364 = _x227 + _x275
+    _x365 = _x229*_x364
+    _x366 = _x203*_x364
+    _x367 = exp(0.0833333333333333*Vm)
+    _x368 = 1.51689679638821*_x367 + 1.0
+    _x369 = 1/(0.5 + 9.0/_x368)
+    _x370 = exp(-0.116279069767442*Vm)
+    _x371 = 0.49774149722499*_x370 + 1.0
+    _x372 = exp(_x17)
+    _x373 = 403.428793492735*_x372 + 1.0
+    _x374 = 1/(3050.0 + 590.0/_x373)
+    _x375 = 2.11700001661267*_x372 + 1.0
+    _x376 = exp(-1/11*Vm)
+    _x377 = 1 - 0.00897780373069724*_x18
+    _x378 = 1/_x377
+    _x379 = 0.32*Vm + 15.0816
+    _x380 = 1/tauhl
+    _x381 = exp(0.163934426229508*Vm)
+    J = np.zeros((42, 42))
+    J[0, 0] = -_x2
+    J[0, 36] = _x2*(-_x2*(m - 1/_x4**2)*(_x0*(4.96469077025184e-5*Vm - 0.000239447035849246) + _x1*(0.00107001651403196*Vm + 0.0489960561775234)) + 0.000408020283757505*_x3/_x4**3)
+    J[1, 1] = -_x11
+    J[1, 36] = -_x11*_x14 - (_x15 + h)*((0.00582170832852916*_x5/_x6**2) if _x7 else (108035.0*_x10 - 6.51657048467723e-8*_x8 + 0.2133*_x9))
+    J[2, 2] = -_x31
+    J[2, 36] = -_x14*_x31 - (_x15 + j)*((_x19*(0.0342*_x16 + 0.00244573223870197*_x19*exp(-0.043*Vm))) if _x7 else (-0.0002550048*_x20*_x22 + 15631713951.8717*_x23*_x24*_x29/_x25**2 - _x23*_x26*(-3.0508668e-7*_x27 + 6214.6032*_x28) - _x30 + 1.32303776114687e-5*exp(-0.14832*Vm)/_x21**2))
+    J[3, 3] = _x37
+    J[3, 36] = _x36*(0.035*_x35*_x41 + _x37*_x39*_x41 - _x38*_x40 - _x40*_x41)
+    J[4, 4] = -_x43
+    J[4, 36] = -0.0197*_x42*(0.00681414*ISO + 0.00227138*Vm + 0.0567845)*(-f + 0.6/_x45 + 1/_x44) - 1/9*_x43*(-0.27*exp(5/2 - _x47)/_x45**2 + exp(_x46 + 35/9)/_x44**2)
+    J[5, 5] = -1.7*Caj - 0.0119
+    J[5, 33] = 1.7*_x49
+    J[6, 6] = -1.7*Casl - 0.0119
+    J[6, 34] = 1.7*_x51
+    J[7, 7] = -_x54
+    J[7, 36] = _x54*(-0.00777777777777778*_x52*_x53*_x54*(xtof - 1/_x56) + 0.099560858170424*_x55/_x56**2)
+    J[8, 8] = -_x59
+    J[8, 36] = -_x59*(3.22804057244675*_x57**1.0*_x58*_x59*(ytof - 1/_x61) + 2.94289000982672*_x60/_x61**2)
+    J[9, 9] = -1/10*_x68
+    J[9, 36] = (1/600)*_x68*(-_x68*(xkr - 1/_x70)*(69*_x62/_x63**2 + 2200*_x65*exp(_x46 + 11/9)/_x66**2 - 2200*_x67*exp(-_x46 - 22/9)/_x64**2) + 12*exp(-_x69)/_x70**2)
+    J[10, 10] = -_x72
+    J[10, 36] = 6.01951106941799e-5*_x71*(xks - 1/_x74) + 0.053749357078221*_x72*_x73/_x74**2
+    J[11, 11] = -_x80 - _x84
+    J[11, 12] = -kim + kom
+    J[11, 13] = -kim
+    J[11, 28] = RyRr*_x86*(-_x85 + kiCa)
+    J[11, 33] = -RyRr*(_x79 + _x88)
+    J[12, 11] = _x83
+    J[12, 12] = -_x80 - kom
+    J[12, 13] = kim
+    J[12, 28] = _x86*(RyRr*_x85 + _x89)
+    J[12, 33] = RyRr*_x88 + _x90
+    J[13, 11] = -_x83
+    J[13, 12] = Caj*(_x78*kiCa - _x87)
+    J[13, 13] = -_x84 - kom
+    J[13, 28] = -_x86*(_x85*_x91 + _x89)
+    J[13, 33] = -_x88*_x91 - _x90
+    J[14, 14] = -_x92
+    J[14, 29] = _x93
+    J[15, 15] = -_x94
+    J[15, 30] = _x95
+    J[16, 16] = -_x96
+    J[16, 35] = _x97
+    J[17, 17] = -_x99
+    J[17, 18] = -_x98
+    J[17, 35] = _x100
+    J[18, 17] = -_x101
+    J[18, 18] = -_x102
+    J[19, 19] = -_x103
+    J[19, 35] = _x104
+    J[20, 20] = -_x106
+    J[20, 21] = -_x105
+    J[20, 35] = _x107
+    J[21, 20] = -_x108
+    J[21, 21] = -_x109
+    J[22, 22] = -_x110
+    J[22, 35] = _x111
+    J[23, 23] = -_x112
+    J[23, 33] = _x113
+    J[24, 24] = -_x114
+    J[24, 34] = _x115
+    J[25, 25] = -_x116
+    J[25, 33] = _x117
+    J[26, 26] = -_x118
+    J[26, 34] = _x119
+    J[27, 27] = -_x120
+    J[27, 28] = _x121
+    J[28, 12] = -_x122
+    J[28, 27] = _x120
+    J[28, 28] = -_x121 + _x123*_x130*_x131*_x75*hillSRCaP*serca - _x129 - _x133
+    J[28, 33] = _x133
+    J[28, 35] = _x136*(_x134 + 1)
+    J[29, 0] = _x141*_x142
+    J[29, 1] = _x141*_x144
+    J[29, 2] = _x141*_x145
+    J[29, 3] = _x146*_x156
+    J[29, 4] = _x156*_x157
+    J[29, 5] = _x154*_x160
+    J[29, 14] = _x92
+    J[29, 29] = -Cmem_FVjunc*(_x153*_x169*_x49 + _x166*_x168 - _x186*_x188*_x197 + _x188*_x201 + _x209) - Jna_juncsl_Vjunc - _x93
+    J[29, 30] = Jna_juncsl_Vjunc
+    J[29, 33] = -3*_x215*(_x175*_x199*_x214 - _x210 - _x211*_x212*_x213)
+    J[29, 36] = -Cmem_FVjunc*(-3*_x200*_x216 + 3*_x218 + 3*_x222 + _x226)
+    J[29, 39] = _x228*_x229
+    J[29, 40] = _x203*_x228
+    J[30, 0] = _x142*_x233
+    J[30, 1] = _x144*_x233
+    J[30, 2] = _x145*_x233
+    J[30, 3] = -_x146*_x239
+    J[30, 4] = -_x157*_x239
+    J[30, 6] = -_x237*_x240
+    J[30, 15] = _x94
+    J[30, 29] = Jna_juncsl_Vsl
+    J[30, 30] = -Cmem_FVsl*(_x166*_x242 + _x169*_x236*_x51 - _x190*_x244*_x258 + _x244*_x261 + _x266) - Jna_juncsl_Vsl - Jna_slmyo_Vsl - _x95
+    J[30, 31] = Jna_slmyo_Vsl
+    J[30, 34] = -3*_x270*(2*_x178*_x253*_x256*_x267 - _x210 - _x268*_x269)
+    J[30, 36] = -Cmem_FVsl*(-3*_x221*_x256*_x269*ncx_sl + 3*_x271 + 3*_x272 + _x274)
+    J[30, 39] = _x229*_x276
+    J[30, 40] = _x203*_x276
+    J[31, 30] = Jna_slmyo_Vmyo
+    J[31, 31] = -Jna_slmyo_Vmyo
+    J[33, 3] = _x277*_x287
+    J[33, 4] = _x287*_x288
+    J[33, 5] = 0.5*_x160*_x285
+    J[33, 12] = Vsr_Vjunc*_x122
+    J[33, 23] = _x112
+    J[33, 25] = _x116
+    J[33, 28] = _x289
+    J[33, 29] = 3.0*_x187*_x215*(_x190*_x219 + _x198)
+    J[33, 33] = -Cmem_FVjunc*(GCaB_junc*_x290*_x291 - _x176*_x184*_x199*_x212*_x298*_x299 + 1.0*_x186*_x300 + 1.0*_x200*_x210 + 0.5*_x284*_x297*_x49 + _x292*_x294 - _x292*_x295*_x296) - Jca_juncsl_Vjunc - _x113 - _x117 - _x289
+    J[33, 34] = Jca_juncsl_Vjunc
+    J[33, 36] = -Cmem_FVjunc*(1.0*FoRT*Vm*_x279*_x281*_x301*_x48*ca_junc*d*f + 0.5*GCaB_junc - 0.5*_x158*_x286 + 1.0*_x180*_x183*_x199*_x216*ncx_junc - 1.0*_x222 - 1.0*_x223*_x280*_x284*_x48)
+    J[34, 3] = -_x277*_x307
+    J[34, 4] = -_x288*_x307
+    J[34, 6] = -0.5*_x240*_x305
+    J[34, 24] = _x114
+    J[34, 26] = _x118
+    J[34, 30] = 3.0*_x243*_x270*(-_x190*_x269 + _x198)
+    J[34, 33] = Jca_juncsl_Vsl
+    J[34, 34] = -Cmem_FVsl*(GCaB_sl*_x291*_x308 + 1.0*_x210*_x260 + 1.0*_x258*_x268 - _x267*_x298*_x314 + 0.5*_x297*_x304*_x51 + _x309*_x311 - _x309*_x312*_x313) - Jca_juncsl_Vsl - Jca_slmyo_Vsl - _x115 - _x119
+    J[34, 35] = Jca_slmyo_Vsl
+    J[34, 36] = -Cmem_FVsl*(0.5*GCaB_sl + 1.0*_x170*_x220*_x253*_x256*_x259*ksat*ncx_sl*nu1FoRT - 1.0*_x272 - 1.0*_x273*_x302*_x304 - 1.0*_x273*_x303*_x315*ca_sl + 0.5*_x283*_x303*_x50*ca_sl*d*f)
+    J[35, 16] = _x96
+    J[35, 17] = _x101 + _x99
+    J[35, 18] = _x102 + _x98
+    J[35, 19] = _x103
+    J[35, 20] = _x106 + _x108
+    J[35, 21] = _x105 + _x109
+    J[35, 22] = _x110
+    J[35, 28] = Vsr_Vmyo*_x129*(1 - _x134)
+    J[35, 34] = Jca_slmyo_Vmyo
+    J[35, 35] = -Jca_slmyo_Vmyo - Vsr_Vmyo*_x127*_x130*_x131*_x135 - Vsr_Vmyo*_x136 - _x100 - _x104 - _x107 - _x111 - _x97
+    J[36, 0] = _x142*_x316
+    J[36, 1] = _x317*j
+    J[36, 2] = _x317*h
+    J[36, 3] = _x321*f
+    J[36, 4] = _x321*d
+    J[36, 5] = _x159*(Fjunc_CaL*_x320 + _x154 + _x285)
+    J[36, 6] = _x159*(Fsl_CaL*_x152*_x319*caK - _x237 - _x305)
+    J[36, 7] = _x325*ytof
+    J[36, 8] = _x325*xtof
+    J[36, 9] = _x324*_x327
+    J[36, 10] = 2*Gks*xks*(RToF*log(_x328*eks_num) + _x137)
+    J[36, 29] = Vm*_x148*_x152*_x48*caNa_junc*d*f - _x168*_x329 - _x197*_x330*_x331 - _x201*_x330 - _x209
+    J[36, 30] = Vm*_x148*_x152*_x50*caNa_sl*d*f + 3*_x183*_x190*_x243*_x250*_x253*_x256*ncx_sl - _x242*_x329 - 3*_x243*_x261 - _x266
+    J[36, 31] = -_x333*pNaK
+    J[36, 32] = Vm*_x148*_x152*_x318*caK*d*f - _x333 - _x335*_x336 - _x336*_x337 - _x336*_x340 - _x336*_x341 - _x336*_x343 - _x336*_x356 - _x336*_x358*_x359 - _x336*_x360
+    J[36, 33] = -0.5*GCaB_junc*RToF*_x290 - GClCa_junc*_x177*_x362/_x361**2 + Nao3*_x170*_x180*_x183*_x199*ncx_junc + Vm*_x279*_x283*_x48*ca_junc*d*f + 2*_x175*_x178*_x183*_x199*_x212*_x299*ncx_junc - 1.6*_x294*pca_junc + 1.6*_x295*_x296*pca_junc - _x300*_x331
+    J[36, 34] = -0.5*GCaB_sl*RToF*_x308 - GClCa_sl*_x254*_x362/_x363**2 + Nao3*_x170*_x183*_x256*_x259*ncx_sl + Vm*_x279*_x283*_x50*ca_sl*d*f + _x183*_x250*_x253*_x256*_x268*ncx_sl - _x213*_x267*_x314 - 1.6*_x311*pca_sl + 1.6*_x312*_x313*pca_sl
+    J[36, 36] = 2*Caj*FoRT*Vm*_x279*_x283*_x48*ca_junc*d*f + 2*Casl*FoRT*Vm*_x279*_x283*_x50*ca_sl*d*f + FoRT*Ki*Vm*_x148*_x152*_x318*caK*d*f + 2*FoRT*Vm*_x279*_x301*_x303*_x50*ca_sl*d*f - GCaB_junc - GCaB_sl - GClB - GClCa_junc/_x361 - GClCa_sl/_x363 - 0.0333333333333333*GkAch*_x324*exp((1/12)*Vm + 91/12)/_x342**2 + 298.741733340907*Gkp*_x324*_x338/_x339**2 + _x152*_x318*_x319*caK*d*f - _x158*_x278*_x281*_x315*_x48*ca_junc - _x158*_x306 + _x170*_x220*_x253*_x256*_x259*ksat*ncx_sl*nu1FoRT + _x180*_x183*_x199*_x216*ncx_junc - _x218 - _x222 - _x223*_x225*_x318*_x319*caK - _x226 - _x271 - _x272 - _x274 + _x281*_x283*_x48*ca_junc*d*f - 1/24*_x324*gkr*xkr*exp((1/24)*Vm + 37/12)/_x326**2 - _x332 - _x335 - _x337 - _x340 - _x341 - _x343 - _x356 - 1.78913955652069e-7*_x357*_x359 - _x360
+    J[36, 37] = _x324*_x334
+    J[36, 38] = Gkur*_x324*rkuro
+    J[36, 39] = _x365
+    J[36, 40] = _x366
+    J[37, 36] = _x369*(-1.13767259729116*_x367*_x369*(rkuro - 1.0/_x371)/_x368**2 + 0.0578769182819756*_x370/_x371**2)
+    J[37, 37] = -_x369
+    J[38, 36] = -_x372*_x374*(0.211700001661267/_x375**2 + _x374*(23802.2988160714*skuro - 23802.2988160714/_x375)/_x373**2)
+    J[38, 38] = -_x374
+    J[39, 36] = 0.000897780373069724*_x18*_x379*(ml - 1)/_x377**2 + 0.00727272727272727*_x376*ml - _x378*(0.32*ml - 0.32)
+    J[39, 39] = -0.08*_x376 - _x378*_x379
+    J[40, 36] = -493729.964282601*_x380*_x381/(3011752.78212386*_x381 + 1.0)**2
+    J[40, 40] = -_x380
+    J[41, 29] = _x206
+    J[41, 30] = _x264
+    J[41, 36] = _x204*(GNaL_junc + GNaL_sl)
+    J[41, 39] = -_x365
+    J[41, 40] = -_x366
+    if P.dynamic is not None:
+        J *= np.asarray(P.dynamic)[:, None]
+    return J
+
+
+def grandi_bers_parameter_jacobian(y, t, P):
+    """Derivative of grandi_bers_prepared with respect to the fields of the prepared record,
+    J[i, k] = d ydot[i]/d P[k], in the order of GBVParameters._fields."""
+    (m, h, j, d, f, fcaBj, fcaBsl, xtos, ytos, xtof, ytof, xkr, xks, RyRr, RyRo,
+     RyRi, NaBj, NaBsl, TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl,
+     SLHj, SLHsl, Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai, Vm) = y
+    FoRT = P.FoRT
+    RToF = P.RToF
+    Ko = P.Ko
+    Nao = P.Nao
+    Cao = P.Cao
+    Mgi = P.Mgi
+    ecl = P.ecl
+    GNa_junc = P.GNa_junc
+    GNa_sl = P.GNa_sl
+    nak_sigma = P.nak_sigma
+    nak_junc = P.nak_junc
+    nak_sl = P.nak_sl
+    KmNaip = P.KmNaip
+    gkr = P.gkr
+    gki = P.gki
+    Gks = P.Gks
+    Gkp = P.Gkp
+    GtoFast = P.GtoFast
+    pNaK = P.pNaK
+    eks_num = P.eks_num
+    GClCa_junc = P.GClCa_junc
+    GClCa_sl = P.GClCa_sl
+    KdClCa = P.KdClCa
+    GClB = P.GClB
+    ca_junc = P.ca_junc
+    ca_sl = P.ca_sl
+    caK = P.caK
+    Fjunc_CaL = P.Fjunc_CaL
+    Fsl_CaL = P.Fsl_CaL
+    caNa_junc = P.caNa_junc
+    caNa_sl = P.caNa_sl
+    ncx_junc = P.ncx_junc
+    ncx_sl = P.ncx_sl
+    Kdact = P.Kdact
+    nuFoRT = P.nuFoRT
+    nu1FoRT = P.nu1FoRT
+    ksat = P.ksat
+    Nao3 = P.Nao3
+    KmCaiNao3 = P.KmCaiNao3
+    KmNai = P.KmNai
+    KmNao3 = P.KmNao3
+    KmCai = P.KmCai
+    KmCao = P.KmCao
+    pca_junc = P.pca_junc
+    pca_sl = P.pca_sl
+    KmPCa16 = P.KmPCa16
+    GNaB_junc = P.GNaB_junc
+    GNaB_sl = P.GNaB_sl
+    GCaB_junc = P.GCaB_junc
+    GCaB_sl = P.GCaB_sl
+    ec50SR = P.ec50SR
+    koCa = P.koCa
+    kiCa = P.kiCa
+    ks = P.ks
+    serca = P.serca
+    Kmf = P.Kmf
+    Kmr = P.Kmr
+    hillSRCaP = P.hillSRCaP
+    kon_na = P.kon_na
+    Bmax_Naj = P.Bmax_Naj
+    Bmax_Nasl = P.Bmax_Nasl
+    kon_tncl = P.kon_tncl
+    Bmax_TnClow = P.Bmax_TnClow
+    kon_tnchca = P.kon_tnchca
+    kon_tnchmg = P.kon_tnchmg
+    Bmax_TnChigh = P.Bmax_TnChigh
+    kon_cam = P.kon_cam
+    Bmax_CaM = P.Bmax_CaM
+    kon_myoca = P.kon_myoca
+    kon_myomg = P.kon_myomg
+    Bmax_myosin = P.Bmax_myosin
+    kon_sr = P.kon_sr
+    Bmax_SR = P.Bmax_SR
+    kon_sll = P.kon_sll
+    Bmax_SLlowsl = P.Bmax_SLlowsl
+    Bmax_SLlowj = P.Bmax_SLlowj
+    kon_slh = P.kon_slh
+    Bmax_SLhighsl = P.Bmax_SLhighsl
+    Bmax_SLhighj = P.Bmax_SLhighj
+    kon_csqn = P.kon_csqn
+    Bmax_Csqn = P.Bmax_Csqn
+    Cmem_FVjunc = P.Cmem_FVjunc
+    Cmem_FVsl = P.Cmem_FVsl
+    Vsr_Vjunc = P.Vsr_Vjunc
+    Vsr_Vmyo = P.Vsr_Vmyo
+    GtoSlow = P.GtoSlow
+    _x0 = (ec50SR/Ca_sr)**2.5
+    _x1 = _x0 + 1
+    _x2 = 15 - 14/_x1
+    _x3 = Caj*koCa/_x2**2
+    _x4 = 35.0*Caj*_x0/(_x1**2*ec50SR)
+    _x5 = Caj**2
+    _x6 = _x5/_x2
+    _x7 = RyRr*_x6
+    _x8 = Caj*_x2
+    _x9 = RyRi + RyRo + RyRr - 1
+    _x10 = RyRo*kiCa
+    _x11 = RyRo*_x8
+    _x12 = -RyRi
+    _x13 = -NaBj
+    _x14 = Naj*(Bmax_Naj + _x13)
+    _x15 = Naj*kon_na
+    _x16 = -NaBsl
+    _x17 = Nasl*(Bmax_Nasl + _x16)
+    _x18 = Nasl*kon_na
+    _x19 = -TnCL
+    _x20 = Cai*(Bmax_TnClow + _x19)
+    _x21 = Cai*kon_tncl
+    _x22 = -Bmax_TnChigh + TnCHc + TnCHm
+    _x23 = Cai*_x22
+    _x24 = Cai*kon_tnchca
+    _x25 = _x22*kon_tnchmg
+    _x26 = Mgi*_x22
+    _x27 = Mgi*kon_tnchmg
+    _x28 = -CaM
+    _x29 = Cai*(Bmax_CaM + _x28)
+    _x30 = Cai*kon_cam
+    _x31 = -Bmax_myosin + Myoc + Myom
+    _x32 = Cai*_x31
+    _x33 = Cai*kon_myoca
+    _x34 = _x31*kon_myomg
+    _x35 = Mgi*_x31
+    _x36 = Mgi*kon_myomg
+    _x37 = -SRB
+    _x38 = Cai*(Bmax_SR + _x37)
+    _x39 = Cai*kon_sr
+    _x40 = -SLLj
+    _x41 = Caj*(Bmax_SLlowj + _x40)
+    _x42 = Caj*kon_sll
+    _x43 = -SLLsl
+    _x44 = Casl*(Bmax_SLlowsl + _x43)
+    _x45 = Casl*kon_sll
+    _x46 = -SLHj
+    _x47 = Caj*(Bmax_SLhighj + _x46)
+    _x48 = Caj*kon_slh
+    _x49 = -SLHsl
+    _x50 = Casl*(Bmax_SLhighsl + _x49)
+    _x51 = Casl*kon_slh
+    _x52 = -Csqnb
+    _x53 = Ca_sr*(Bmax_Csqn + _x52)
+    _x54 = Ca_sr*kon_csqn
+    _x55 = Ca_sr - Caj
+    _x56 = RyRo*_x55
+    _x57 = 1/Kmr
+    _x58 = Ca_sr*_x57
+    _x59 = _x58**hillSRCaP
+    _x60 = 1/Kmf
+    _x61 = Cai*_x60
+    _x62 = _x61**hillSRCaP
+    _x63 = 1/(_x59 + _x62 + 1)
+    _x64 = _x63*(_x59 - _x62)
+    _x65 = _x63*serca
+    _x66 = _x65*hillSRCaP
+    _x67 = _x60*_x62*(_x64 + 1)
+    _x68 = _x64 - 1
+    _x69 = _x57*_x59
+    _x70 = _x62*log(_x61)
+    _x71 = _x59*log(_x58)
+    _x72 = _x64*(_x70 + _x71) + _x70 - _x71
+    _x73 = FoRT*Vm
+    _x74 = exp(_x73)
+    _x75 = Naj*_x74
+    _x76 = fcaBj - 1
+    _x77 = _x74 - 1
+    _x78 = 1/_x77
+    _x79 = d*f
+    _x80 = Vm*_x79
+    _x81 = _x78*_x80
+    _x82 = _x76*_x81
+    _x83 = _x82*caNa_junc
+    _x84 = _x75*_x83
+    _x85 = -Nao + _x75
+    _x86 = _x76*_x80
+    _x87 = _x74/_x77**2
+    _x88 = _x85*_x86*_x87*caNa_junc
+    _x89 = KmNaip**4
+    _x90 = Naj**(-4)
+    _x91 = _x89*_x90 + 1
+    _x92 = 1/_x91
+    _x93 = _x92*nak_junc
+    _x94 = exp(-0.1*_x73)
+    _x95 = exp(-_x73)
+    _x96 = _x95*nak_sigma
+    _x97 = 0.1245*_x94 + _x96 + 1
+    _x98 = _x97**(-2)
+    _x99 = 0.01245*_x94 + _x96
+    _x100 = _x98*_x99
+    _x101 = _x100*_x93
+    _x102 = Cmem_FVjunc*Vm
+    _x103 = log(Nao/Naj)
+    _x104 = m**3
+    _x105 = _x104*h*j
+    _x106 = GNa_junc*_x105
+    _x107 = RToF/Nao
+    _x108 = GNaB_junc*_x107 + _x106*_x107 - _x83
+    _x109 = exp(Vm*nuFoRT)
+    _x110 = exp(Vm*nu1FoRT)
+    _x111 = Caj*Nao3
+    _x112 = Naj**3
+    _x113 = Cao*_x112
+    _x114 = _x109*_x113
+    _x115 = _x110*_x111 - _x114
+    _x116 = 1/KmCai
+    _x117 = Caj*(Caj*_x116 + 1)
+    _x118 = KmNai**(-3)
+    _x119 = _x112*_x118 + 1
+    _x120 = KmCaiNao3*_x119 + KmCao*_x112 + KmNao3*_x117 + _x111 + _x113
+    _x121 = 1/_x120
+    _x122 = _x115*_x121
+    _x123 = 1/_x5
+    _x124 = Kdact**2
+    _x125 = _x123*_x124 + 1
+    _x126 = 1/_x125
+    _x127 = _x126*ncx_junc
+    _x128 = _x121*_x127
+    _x129 = _x112*_x128
+    _x130 = _x110*ksat + 1
+    _x131 = 1/_x130
+    _x132 = 3*Cmem_FVjunc
+    _x133 = _x131*_x132
+    _x134 = -Vm
+    _x135 = RToF*_x103 + _x134
+    _x136 = Cmem_FVjunc*_x135
+    _x137 = _x95*_x98
+    _x138 = 1/_x97
+    _x139 = _x138*_x92
+    _x140 = _x90*nak_junc/_x91**2
+    _x141 = KmNaip**3*_x138
+    _x142 = 12*_x141
+    _x143 = _x78*_x79
+    _x144 = _x122*_x126
+    _x145 = _x131*_x144
+    _x146 = Kdact*_x131
+    _x147 = 6*_x146
+    _x148 = _x122*_x123*ncx_junc/_x125**2
+    _x149 = Cmem_FVjunc*_x148
+    _x150 = 3*_x131
+    _x151 = _x102*_x128
+    _x152 = _x114*_x151
+    _x153 = _x110*_x150
+    _x154 = _x131*ksat
+    _x155 = _x151*(_x111 - _x115*_x154)
+    _x156 = _x110/_x130**2
+    _x157 = _x144*ncx_junc
+    _x158 = _x156*_x157
+    _x159 = -_x110 + _x122
+    _x160 = Caj*_x128
+    _x161 = _x115*_x127/_x120**2
+    _x162 = _x119*_x161
+    _x163 = KmCaiNao3/KmNai**4
+    _x164 = 9*_x163
+    _x165 = _x112*_x161
+    _x166 = _x131*_x165
+    _x167 = Cmem_FVjunc*_x166
+    _x168 = _x117*_x161
+    _x169 = KmNao3*_x131/KmCai**2
+    _x170 = _x161*_x5
+    _x171 = _x169*_x170
+    _x172 = 3*_x138
+    _x173 = _x145*ncx_junc
+    _x174 = -Nasl
+    _x175 = Naj + _x174
+    _x176 = Nasl**(-4)
+    _x177 = _x176*_x89 + 1
+    _x178 = 1/_x177
+    _x179 = Nasl*_x74
+    _x180 = fcaBsl - 1
+    _x181 = _x180*_x81
+    _x182 = _x181*caNa_sl
+    _x183 = Nao - _x179
+    _x184 = _x180*_x80
+    _x185 = _x179*_x182 + _x183*_x184*_x87*caNa_sl
+    _x186 = Cmem_FVsl*Vm
+    _x187 = log(Nao/Nasl)
+    _x188 = GNa_sl*_x105
+    _x189 = GNaB_sl*_x107 + _x107*_x188 - _x182
+    _x190 = Casl*Nao3
+    _x191 = Nasl**3
+    _x192 = Cao*_x191
+    _x193 = _x109*_x192
+    _x194 = -_x110*_x190 + _x193
+    _x195 = Casl*_x116 + 1
+    _x196 = Casl*_x195
+    _x197 = _x118*_x191 + 1
+    _x198 = KmCaiNao3*_x197 + KmCao*_x191 + KmNao3*_x196 + _x190 + _x192
+    _x199 = 1/_x198
+    _x200 = _x194*_x199
+    _x201 = Casl**2
+    _x202 = 1/_x201
+    _x203 = _x124*_x202 + 1
+    _x204 = 1/_x203
+    _x205 = _x204*ncx_sl
+    _x206 = _x199*_x205
+    _x207 = _x191*_x206
+    _x208 = 3*Cmem_FVsl
+    _x209 = _x131*_x208
+    _x210 = RToF*_x187 + _x134
+    _x211 = Cmem_FVsl*_x210
+    _x212 = _x178*nak_sl
+    _x213 = _x138*_x178
+    _x214 = _x176*nak_sl/_x177**2
+    _x215 = _x200*_x204
+    _x216 = _x131*_x215
+    _x217 = _x200*_x202*ncx_sl/_x203**2
+    _x218 = Cmem_FVsl*_x217
+    _x219 = _x186*_x206
+    _x220 = _x193*_x219
+    _x221 = _x219*(_x154*_x194 + _x190)
+    _x222 = _x215*ncx_sl
+    _x223 = _x156*_x222
+    _x224 = Casl*_x206
+    _x225 = _x224*(_x110 + _x200)
+    _x226 = _x198**(-2)
+    _x227 = _x194*_x205*_x226
+    _x228 = _x197*_x227
+    _x229 = _x191*_x227
+    _x230 = _x131*_x229
+    _x231 = Cmem_FVsl*_x230
+    _x232 = _x196*_x227
+    _x233 = _x201*_x227
+    _x234 = _x169*_x233
+    _x235 = Nai + _x174
+    _x236 = exp(2*_x73)
+    _x237 = _x236 - 1
+    _x238 = 1/_x237
+    _x239 = Caj*_x236
+    _x240 = -Cao + _x239
+    _x241 = 1.0*Cmem_FVjunc
+    _x242 = _x76*ca_junc
+    _x243 = _x236*_x242
+    _x244 = Vm**2*_x238*_x79
+    _x245 = 1/Caj
+    _x246 = log(Cao*_x245)
+    _x247 = 0.25*GCaB_junc
+    _x248 = 1/Cao
+    _x249 = RToF*_x248
+    _x250 = 0.5*Vm
+    _x251 = _x250*_x79
+    _x252 = _x238*_x251
+    _x253 = _x109*_x131
+    _x254 = _x129*_x253
+    _x255 = _x238*_x240
+    _x256 = 2.0*_x146
+    _x257 = 1.0*_x131
+    _x258 = _x110*_x257
+    _x259 = _x131*_x241
+    _x260 = 3.0*_x163
+    _x261 = Caj**1.6
+    _x262 = KmPCa16 + _x261
+    _x263 = _x261/_x262
+    _x264 = 0.5*_x263
+    _x265 = _x261*pca_junc/_x262**2
+    _x266 = -_x250
+    _x267 = RToF*_x246
+    _x268 = _x134 + 0.5*_x267
+    _x269 = -Casl
+    _x270 = Caj + _x269
+    _x271 = Casl*_x236
+    _x272 = Cao - _x271
+    _x273 = _x238*_x272
+    _x274 = 1.0*Cmem_FVsl
+    _x275 = _x180*ca_sl
+    _x276 = _x236*_x275
+    _x277 = 1/Casl
+    _x278 = log(Cao*_x277)
+    _x279 = 0.25*GCaB_sl
+    _x280 = _x207*_x253
+    _x281 = _x251*_x273
+    _x282 = _x131*_x274
+    _x283 = Casl**1.6
+    _x284 = KmPCa16 + _x283
+    _x285 = _x283/_x284
+    _x286 = 0.5*_x285
+    _x287 = _x283*pca_sl/_x284**2
+    _x288 = RToF*_x278
+    _x289 = _x134 + 0.5*_x288
+    _x290 = Cai + _x269
+    _x291 = Vsr_Vmyo*_x65
+    _x292 = _x291*hillSRCaP
+    _x293 = Ki*_x74
+    _x294 = Fjunc_CaL*_x76 + Fsl_CaL*_x180
+    _x295 = _x294*_x81
+    _x296 = _x295*caK
+    _x297 = -Ko + _x293
+    _x298 = _x297*caK
+    _x299 = 2*_x80/_x237**2
+    _x300 = _x238*_x80
+    _x301 = _x242*_x300
+    _x302 = _x275*_x300
+    _x303 = 1/(Ki + Nai*pNaK)
+    _x304 = log(_x303*eks_num)
+    _x305 = xks**2
+    _x306 = Gks*_x305
+    _x307 = log(Ko/Ki)
+    _x308 = xtof*ytof
+    _x309 = xtos*ytos
+    _x310 = GtoFast*_x308 + GtoSlow*_x309
+    _x311 = 1/(1 + 1786.47556537862*exp(-0.167224080267559*Vm))
+    _x312 = Gkp*_x311
+    _x313 = xkr/(exp((1/24)*(Vm + 74)) + 1)
+    _x314 = _x313*gkr
+    _x315 = RToF*_x307
+    _x316 = exp(0.2385*Vm - 0.2385*_x315)
+    _x317 = 7.35454251046446e-7*_x316 + 1
+    _x318 = 1.02/_x317
+    _x319 = exp(-0.5143*Vm + 0.5143*_x315)
+    _x320 = 0.0867722941576933*_x319 + 1
+    _x321 = 1/_x320
+    _x322 = exp(0.08032*Vm - 0.08032*_x315)
+    _x323 = exp(0.06175*Vm - 0.06175*_x315)
+    _x324 = 0.762624006506308*_x322 + 1.15340563518656e-16*_x323
+    _x325 = _x318 + _x321*_x324
+    _x326 = 1/_x325
+    _x327 = _x318*_x326
+    _x328 = _x327*gki
+    _x329 = _x134 + _x315
+    _x330 = _x329*gki
+    _x331 = _x307*_x330
+    _x332 = _x317**(-2)
+    _x333 = 1.78913955652069e-7*_x316*_x326*_x332
+    _x334 = _x318*(1.78913955652069e-7*_x316*_x332 - 0.0446269908853017*_x319*_x324/_x320**2 - _x321*(0.0612539602025867*_x322 + 7.12227979727698e-18*_x323))/_x325**2
+    _x335 = RToF/Ko
+    _x336 = _x330*_x335
+    _x337 = KdClCa*_x245 + 1
+    _x338 = 1/_x337
+    _x339 = KdClCa*_x277 + 1
+    _x340 = 1/_x339
+    _x341 = RToF*_x306
+    _x342 = Vm - ecl
+    _x343 = Vm*_x131
+    _x344 = _x165 - _x229
+    Jp = np.zeros((39, 110))
+    Jp[13, 50] = RyRr*_x4*(_x3 - kiCa)
+    Jp[13, 51] = -_x7
+    Jp[13, 52] = -RyRr*_x8
+    Jp[13, 53] = RyRo
+    Jp[13, 54] = -_x9
+    Jp[14, 50] = -_x4*(RyRr*_x3 + _x10)
+    Jp[14, 51] = _x7
+    Jp[14, 52] = -_x11
+    Jp[14, 53] = -RyRo
+    Jp[14, 54] = RyRi
+    Jp[15, 50] = _x4*(_x10 + _x3*_x9)
+    Jp[15, 51] = -_x6*_x9
+    Jp[15, 52] = _x11
+    Jp[15, 53] = _x12
+    Jp[15, 54] = _x12
+    Jp[16, 60] = _x14
+    Jp[16, 61] = _x13
+    Jp[16, 62] = _x15
+    Jp[17, 60] = _x17
+    Jp[17, 61] = _x16
+    Jp[17, 63] = _x18
+    Jp[18, 64] = _x20
+    Jp[18, 65] = _x19
+    Jp[18, 66] = _x21
+    Jp[19, 67] = -_x23
+    Jp[19, 68] = -TnCHc
+    Jp[19, 71] = _x24
+    Jp[20, 5] = -_x25
+    Jp[20, 69] = -_x26
+    Jp[20, 70] = -TnCHm
+    Jp[20, 71] = _x27
+    Jp[21, 72] = _x29
+    Jp[21, 73] = _x28
+    Jp[21, 74] = _x30
+    Jp[22, 75] = -_x32
+    Jp[22, 76] = -Myoc
+    Jp[22, 79] = _x33
+    Jp[23, 5] = -_x34
+    Jp[23, 77] = -_x35
+    Jp[23, 78] = -Myom
+    Jp[23, 79] = _x36
+    Jp[24, 80] = _x38
+    Jp[24, 81] = _x37
+    Jp[24, 82] = _x39
+    Jp[25, 83] = _x41
+    Jp[25, 84] = _x40
+    Jp[25, 86] = _x42
+    Jp[26, 83] = _x44
+    Jp[26, 84] = _x43
+    Jp[26, 85] = _x45
+    Jp[27, 87] = _x47
+    Jp[27, 88] = _x46
+    Jp[27, 90] = _x48
+    Jp[28, 87] = _x50
+    Jp[28, 88] = _x49
+    Jp[28, 89] = _x51
+    Jp[29, 91] = _x53
+    Jp[29, 92] = _x52
+    Jp[29, 93] = _x54
+    Jp[30, 55] = -_x56
+    Jp[30, 56] = -_x64
+    Jp[30, 57] = -_x66*_x67
+    Jp[30, 58] = -_x66*_x68*_x69
+    Jp[30, 59] = _x65*_x72
+    Jp[30, 91] = -_x53
+    Jp[30, 92] = Csqnb
+    Jp[30, 93] = -_x54
+    Jp[30, 104] = -5.348e-6*_x55
+    Jp[31, 0] = -_x102*(3*_x101 - _x84 + _x88)
+    Jp[31, 1] = Cmem_FVjunc*_x103*(GNaB_junc + _x106)
+    Jp[31, 3] = Cmem_FVjunc*_x108
+    Jp[31, 4] = -_x129*_x133*(_x109 + _x122)
+    Jp[31, 7] = _x105*_x136
+    Jp[31, 9] = _x132*_x137*_x93
+    Jp[31, 10] = -_x132*_x139
+    Jp[31, 12] = Cmem_FVjunc*_x140*_x142
+    Jp[31, 29] = _x102*_x143*_x76*_x85
+    Jp[31, 31] = _x132*_x145
+    Jp[31, 33] = -_x147*_x149
+    Jp[31, 34] = -_x150*_x152
+    Jp[31, 35] = _x153*_x155
+    Jp[31, 36] = -_x132*_x158
+    Jp[31, 37] = -_x133*_x159*_x160
+    Jp[31, 38] = -_x133*_x162
+    Jp[31, 39] = _x164*_x167
+    Jp[31, 40] = -_x133*_x168
+    Jp[31, 41] = _x132*_x171
+    Jp[31, 42] = -_x132*_x166
+    Jp[31, 46] = _x136
+    Jp[31, 60] = -_x14
+    Jp[31, 61] = NaBj
+    Jp[31, 62] = -_x15
+    Jp[31, 94] = GNaB_junc*_x135 + _x106*_x135 - _x172*_x93 + 3*_x173 + _x83*_x85
+    Jp[31, 96] = -_x175
+    Jp[32, 0] = -_x186*(3*_x178*_x98*_x99*nak_sl - _x185)
+    Jp[32, 1] = Cmem_FVsl*_x187*(GNaB_sl + _x188)
+    Jp[32, 3] = Cmem_FVsl*_x189
+    Jp[32, 4] = _x207*_x209*(-_x109 + _x200)
+    Jp[32, 8] = _x105*_x211
+    Jp[32, 9] = _x137*_x208*_x212
+    Jp[32, 11] = -_x208*_x213
+    Jp[32, 12] = Cmem_FVsl*_x142*_x214
+    Jp[32, 30] = -_x143*_x180*_x183*_x186
+    Jp[32, 32] = -_x208*_x216
+    Jp[32, 33] = _x147*_x218
+    Jp[32, 34] = -_x150*_x220
+    Jp[32, 35] = _x153*_x221
+    Jp[32, 36] = _x208*_x223
+    Jp[32, 37] = _x209*_x225
+    Jp[32, 38] = _x209*_x228
+    Jp[32, 39] = -_x164*_x231
+    Jp[32, 40] = _x209*_x232
+    Jp[32, 41] = -_x208*_x234
+    Jp[32, 42] = _x208*_x230
+    Jp[32, 47] = _x211
+    Jp[32, 60] = -_x17
+    Jp[32, 61] = NaBsl
+    Jp[32, 63] = -_x18
+    Jp[32, 95] = GNaB_sl*_x210 + GNa_sl*_x104*_x210*h*j - _x172*_x212 - _x182*_x183 - 3*_x216*ncx_sl
+    Jp[32, 97] = _x175
+    Jp[32, 98] = _x235
+    Jp[33, 99] = -_x235
+    Jp[35, 0] = -_x241*_x243*_x244*(-Caj + _x238*_x240)
+    Jp[35, 1] = Cmem_FVjunc*_x246*_x247
+    Jp[35, 4] = Cmem_FVjunc*(1.0*_x166 - _x242*_x252 + _x247*_x249 + 1.0*_x254)
+    Jp[35, 24] = Cmem_FVjunc*_x251*_x255*_x76
+    Jp[35, 31] = -_x145*_x241
+    Jp[35, 33] = _x149*_x256
+    Jp[35, 34] = _x152*_x257
+    Jp[35, 35] = -_x155*_x258
+    Jp[35, 36] = _x158*_x241
+    Jp[35, 37] = _x159*_x160*_x259
+    Jp[35, 38] = _x162*_x259
+    Jp[35, 39] = -_x167*_x260
+    Jp[35, 40] = _x168*_x259
+    Jp[35, 41] = -_x171*_x241
+    Jp[35, 42] = _x166*_x241
+    Jp[35, 43] = -Cmem_FVjunc*_x264
+    Jp[35, 45] = 0.5*Cmem_FVjunc*_x265
+    Jp[35, 48] = Cmem_FVjunc*(_x266 + 0.25*_x267)
+    Jp[35, 55] = Vsr_Vjunc*_x56
+    Jp[35, 83] = -_x41
+    Jp[35, 84] = SLLj
+    Jp[35, 86] = -_x42
+    Jp[35, 87] = -_x47
+    Jp[35, 88] = SLHj
+    Jp[35, 90] = -_x48
+    Jp[35, 94] = 0.5*GCaB_junc*_x268 + 0.5*Vm*_x238*_x240*_x76*ca_junc*d*f - 1.0*_x173 - _x264*pca_junc
+    Jp[35, 100] = -_x270
+    Jp[35, 105] = _x56*ks
+    Jp[35, 106] = 5.348e-6*_x55
+    Jp[36, 0] = _x244*_x274*_x276*(Casl + _x273)
+    Jp[36, 1] = Cmem_FVsl*_x278*_x279
+    Jp[36, 4] = -Cmem_FVsl*(1.0*_x230 - _x249*_x279 + _x252*_x275 - 1.0*_x280)
+    Jp[36, 25] = -Cmem_FVsl*_x180*_x281
+    Jp[36, 32] = _x216*_x274
+    Jp[36, 33] = -_x218*_x256
+    Jp[36, 34] = _x220*_x257
+    Jp[36, 35] = -_x221*_x258
+    Jp[36, 36] = -_x223*_x274
+    Jp[36, 37] = -_x225*_x282
+    Jp[36, 38] = -_x228*_x282
+    Jp[36, 39] = _x231*_x260
+    Jp[36, 40] = -_x232*_x282
+    Jp[36, 41] = _x234*_x274
+    Jp[36, 42] = -_x230*_x274
+    Jp[36, 44] = -Cmem_FVsl*_x286
+    Jp[36, 45] = 0.5*Cmem_FVsl*_x287
+    Jp[36, 49] = Cmem_FVsl*(_x266 + 0.25*_x288)
+    Jp[36, 83] = -_x44
+    Jp[36, 84] = SLLsl
+    Jp[36, 85] = -_x45
+    Jp[36, 87] = -_x50
+    Jp[36, 88] = SLHsl
+    Jp[36, 89] = -_x51
+    Jp[36, 95] = 0.5*GCaB_sl*_x289 + 1.0*_x131*_x194*_x199*_x204*ncx_sl - _x275*_x281 - _x286*pca_sl
+    Jp[36, 101] = _x270
+    Jp[36, 102] = _x290
+    Jp[37, 5] = _x25 + _x34
+    Jp[37, 56] = Vsr_Vmyo*_x64
+    Jp[37, 57] = _x292*_x67
+    Jp[37, 58] = _x292*_x68*_x69
+    Jp[37, 59] = -_x291*_x72
+    Jp[37, 64] = -_x20
+    Jp[37, 65] = TnCL
+    Jp[37, 66] = -_x21
+    Jp[37, 67] = _x23
+    Jp[37, 68] = TnCHc
+    Jp[37, 69] = _x26
+    Jp[37, 70] = TnCHm
+    Jp[37, 71] = -_x24 - _x27
+    Jp[37, 72] = -_x29
+    Jp[37, 73] = CaM
+    Jp[37, 74] = -_x30
+    Jp[37, 75] = _x32
+    Jp[37, 76] = Myoc
+    Jp[37, 77] = _x35
+    Jp[37, 78] = Myom
+    Jp[37, 79] = -_x33 - _x36
+    Jp[37, 80] = -_x38
+    Jp[37, 81] = SRB
+    Jp[37, 82] = -_x39
+    Jp[37, 103] = -_x290
+    Jp[37, 107] = _x64*serca
+    Jp[38, 0] = Vm*(-_x100*_x212 - _x101 + _x185 + 2*_x239*_x301 - _x240*_x243*_x299 + 2*_x271*_x302 + _x272*_x276*_x299 + _x293*_x296 - _x294*_x298*_x80*_x87 + _x84 - _x88)
+    Jp[38, 1] = 0.5*GCaB_junc*_x246 + 0.5*GCaB_sl*_x278 + GNaB_junc*_x103 + GNaB_sl*_x187 + _x103*_x106 + _x187*_x188 + _x304*_x306 + _x307*_x310 + _x307*_x312 + _x307*_x314 + _x307*_x328 + _x331*_x333 - _x331*_x334
+    Jp[38, 2] = -_x296 + _x310*_x335 + _x312*_x335 + _x314*_x335 + _x328*_x335 + _x333*_x336 - _x334*_x336
+    Jp[38, 3] = _x108 + _x189
+    Jp[38, 4] = 0.5*GCaB_junc*RToF*_x248 + 0.5*GCaB_sl*RToF*_x248 + _x131*_x191*_x194*_x204*_x226*ncx_sl - _x166 - _x254 - _x280 - _x301 - _x302
+    Jp[38, 6] = GClB + GClCa_junc*_x338 + GClCa_sl*_x340
+    Jp[38, 7] = _x105*_x135
+    Jp[38, 8] = _x105*_x210
+    Jp[38, 9] = _x137*(_x212 + _x93)
+    Jp[38, 10] = -_x139
+    Jp[38, 11] = -_x213
+    Jp[38, 12] = 4*_x141*(_x140 + _x214)
+    Jp[38, 13] = _x313*_x329
+    Jp[38, 14] = _x327*_x329
+    Jp[38, 15] = _x305*(RToF*_x304 + _x134)
+    Jp[38, 16] = _x311*_x329
+    Jp[38, 17] = _x308*_x329
+    Jp[38, 18] = -Nai*_x303*_x341
+    Jp[38, 19] = _x341/eks_num
+    Jp[38, 20] = -_x338*_x342
+    Jp[38, 21] = -_x340*_x342
+    Jp[38, 22] = _x342*(GClCa_junc*_x245/_x337**2 + GClCa_sl*_x277/_x339**2)
+    Jp[38, 23] = -_x342
+    Jp[38, 24] = _x255*_x86
+    Jp[38, 25] = -_x184*_x273
+    Jp[38, 26] = _x295*_x297
+    Jp[38, 27] = _x298*_x82
+    Jp[38, 28] = _x181*_x298
+    Jp[38, 29] = _x82*_x85
+    Jp[38, 30] = -_x181*_x183
+    Jp[38, 31] = _x145
+    Jp[38, 32] = -_x216
+    Jp[38, 33] = 2*_x146*(-_x148 + _x217)
+    Jp[38, 34] = -Cao*_x109*_x343*(_x129 + _x207)
+    Jp[38, 35] = _x110*_x343*(_x111*_x128 - _x154*_x157 + _x154*_x222 + _x190*_x206)
+    Jp[38, 36] = _x156*(-_x157 + _x194*_x199*_x204*ncx_sl)
+    Jp[38, 37] = _x131*(-Caj*_x161 + Casl*_x227 + _x110*_x160 + _x110*_x224)
+    Jp[38, 38] = _x131*(-_x162 + _x194*_x197*_x204*_x226*ncx_sl)
+    Jp[38, 39] = _x150*_x163*_x344
+    Jp[38, 40] = _x131*(Casl*_x194*_x195*_x204*_x226*ncx_sl - _x168)
+    Jp[38, 41] = _x169*(_x170 - _x233)
+    Jp[38, 42] = -_x131*_x344
+    Jp[38, 43] = -_x263
+    Jp[38, 44] = -_x285
+    Jp[38, 45] = _x265 + _x287
+    Jp[38, 46] = _x135
+    Jp[38, 47] = _x210
+    Jp[38, 48] = _x268
+    Jp[38, 49] = _x289
+    Jp[38, 108] = 1
+    Jp[38, 109] = _x309*_x329
+    if t >= 5:
+        Jp[:, 108] = 0.0
+    if P.dynamic is not None:
+        Jp *= np.asarray(P.dynamic)[:, None]
+    return Jp
+
+
+def grandi_bers_atrial_parameter_jacobian(y, t, P):
+    """Derivative of grandi_bers_atrial_prepared with respect to the fields of the prepared record,
+    J[i, k] = d ydot[i]/d P[k], in the order of GBVAtrialParameters._fields."""
+    (m, h, j, d, f, fcaBj, fcaBsl, xtof, ytof, xkr, xks, RyRr, RyRo, RyRi, NaBj,
+     NaBsl, TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl, SLHj, SLHsl,
+     Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai, Vm, rkuro, skuro, ml, hl,
+     INal) = y
+    FoRT = P.FoRT
+    RToF = P.RToF
+    Ko = P.Ko
+    Nao = P.Nao
+    Cao = P.Cao
+    Mgi = P.Mgi
+    ecl = P.ecl
+    GNa_junc = P.GNa_junc
+    GNa_sl = P.GNa_sl
+    nak_sigma = P.nak_sigma
+    nak_junc = P.nak_junc
+    nak_sl = P.nak_sl
+    KmNaip = P.KmNaip
+    gkr = P.gkr
+    gki = P.gki
+    Gks = P.Gks
+    Gkp = P.Gkp
+    GtoFast = P.GtoFast
+    pNaK = P.pNaK
+    eks_num = P.eks_num
+    GClCa_junc = P.GClCa_junc
+    GClCa_sl = P.GClCa_sl
+    KdClCa = P.KdClCa
+    GClB = P.GClB
+    ca_junc = P.ca_junc
+    ca_sl = P.ca_sl
+    caK = P.caK
+    Fjunc_CaL = P.Fjunc_CaL
+    Fsl_CaL = P.Fsl_CaL
+    caNa_junc = P.caNa_junc
+    caNa_sl = P.caNa_sl
+    ncx_junc = P.ncx_junc
+    ncx_sl = P.ncx_sl
+    Kdact = P.Kdact
+    nuFoRT = P.nuFoRT
+    nu1FoRT = P.nu1FoRT
+    ksat = P.ksat
+    Nao3 = P.Nao3
+    KmCaiNao3 = P.KmCaiNao3
+    KmNai = P.KmNai
+    KmNao3 = P.KmNao3
+    KmCai = P.KmCai
+    KmCao = P.KmCao
+    pca_junc = P.pca_junc
+    pca_sl = P.pca_sl
+    KmPCa16 = P.KmPCa16
+    GNaB_junc = P.GNaB_junc
+    GNaB_sl = P.GNaB_sl
+    GCaB_junc = P.GCaB_junc
+    GCaB_sl = P.GCaB_sl
+    ec50SR = P.ec50SR
+    koCa = P.koCa
+    kiCa = P.kiCa
+    ks = P.ks
+    serca = P.serca
+    Kmf = P.Kmf
+    Kmr = P.Kmr
+    hillSRCaP = P.hillSRCaP
+    kon_na = P.kon_na
+    Bmax_Naj = P.Bmax_Naj
+    Bmax_Nasl = P.Bmax_Nasl
+    kon_tncl = P.kon_tncl
+    Bmax_TnClow = P.Bmax_TnClow
+    kon_tnchca = P.kon_tnchca
+    kon_tnchmg = P.kon_tnchmg
+    Bmax_TnChigh = P.Bmax_TnChigh
+    kon_cam = P.kon_cam
+    Bmax_CaM = P.Bmax_CaM
+    kon_myoca = P.kon_myoca
+    kon_myomg = P.kon_myomg
+    Bmax_myosin = P.Bmax_myosin
+    kon_sr = P.kon_sr
+    Bmax_SR = P.Bmax_SR
+    kon_sll = P.kon_sll
+    Bmax_SLlowsl = P.Bmax_SLlowsl
+    Bmax_SLlowj = P.Bmax_SLlowj
+    kon_slh = P.kon_slh
+    Bmax_SLhighsl = P.Bmax_SLhighsl
+    Bmax_SLhighj = P.Bmax_SLhighj
+    kon_csqn = P.kon_csqn
+    Bmax_Csqn = P.Bmax_Csqn
+    Cmem_FVjunc = P.Cmem_FVjunc
+    Cmem_FVsl = P.Cmem_FVsl
+    Vmyo_Vsr = P.Vmyo_Vsr
+    Vsr_Vjunc = P.Vsr_Vjunc
+    Vmyo_Vjunc = P.Vmyo_Vjunc
+    Vsr_Vmyo = P.Vsr_Vmyo
+    ISO = P.ISO
+    GNaL_junc = P.GNaL_junc
+    GNaL_sl = P.GNaL_sl
+    tauhl = P.tauhl
+    Gkur = P.Gkur
+    GkAch = P.GkAch
+    SRleak = P.SRleak
+    _x0 = exp(-0.5*ISO - 0.166666666666667*Vm)
+    _x1 = 0.22313016014843*_x0
+    _x2 = 1/(_x1 - 1)
+    _x3 = _x1 + 1
+    _x4 = 1/_x3
+    _x5 = 0.111565080074215*_x0*(0.105*ISO + 0.035*Vm + 0.315)
+    _x6 = -_x4 + d
+    _x7 = _x3*_x6
+    _x8 = exp(-2.8328611898017*ISO - 0.0708215297450425*Vm)
+    _x9 = exp(-2.80701754385965*ISO - 0.0701754385964912*Vm)
+    _x10 = 0.765928338364649*_x9 + 1
+    _x11 = (ec50SR/Ca_sr)**2.5
+    _x12 = _x11 + 1
+    _x13 = 15 - 14/_x12
+    _x14 = Caj*koCa/_x13**2
+    _x15 = 35.0*Caj*_x11/(_x12**2*ec50SR)
+    _x16 = Caj**2
+    _x17 = _x16/_x13
+    _x18 = RyRr*_x17
+    _x19 = Caj*_x13
+    _x20 = RyRi + RyRo + RyRr - 1
+    _x21 = RyRo*kiCa
+    _x22 = RyRo*_x19
+    _x23 = -RyRi
+    _x24 = -NaBj
+    _x25 = Naj*(Bmax_Naj + _x24)
+    _x26 = Naj*kon_na
+    _x27 = -NaBsl
+    _x28 = Nasl*(Bmax_Nasl + _x27)
+    _x29 = Nasl*kon_na
+    _x30 = -TnCL
+    _x31 = Cai*(Bmax_TnClow + _x30)
+    _x32 = Cai*kon_tncl
+    _x33 = -Bmax_TnChigh + TnCHc + TnCHm
+    _x34 = Cai*_x33
+    _x35 = Cai*kon_tnchca
+    _x36 = _x33*kon_tnchmg
+    _x37 = Mgi*_x33
+    _x38 = Mgi*kon_tnchmg
+    _x39 = -CaM
+    _x40 = Cai*(Bmax_CaM + _x39)
+    _x41 = Cai*kon_cam
+    _x42 = -Bmax_myosin + Myoc + Myom
+    _x43 = Cai*_x42
+    _x44 = Cai*kon_myoca
+    _x45 = _x42*kon_myomg
+    _x46 = Mgi*_x42
+    _x47 = Mgi*kon_myomg
+    _x48 = -SRB
+    _x49 = Cai*(Bmax_SR + _x48)
+    _x50 = Cai*kon_sr
+    _x51 = -SLLj
+    _x52 = Caj*(Bmax_SLlowj + _x51)
+    _x53 = Caj*kon_sll
+    _x54 = -SLLsl
+    _x55 = Casl*(Bmax_SLlowsl + _x54)
+    _x56 = Casl*kon_sll
+    _x57 = -SLHj
+    _x58 = Caj*(Bmax_SLhighj + _x57)
+    _x59 = Caj*kon_slh
+    _x60 = -SLHsl
+    _x61 = Casl*(Bmax_SLhighsl + _x60)
+    _x62 = Casl*kon_slh
+    _x63 = -Csqnb
+    _x64 = Ca_sr*(Bmax_Csqn + _x63)
+    _x65 = Ca_sr*kon_csqn
+    _x66 = Ca_sr - Caj
+    _x67 = RyRo*_x66
+    _x68 = 1/Kmr
+    _x69 = Ca_sr*_x68
+    _x70 = _x69**hillSRCaP
+    _x71 = 1/Kmf
+    _x72 = Cai*_x71
+    _x73 = _x72**hillSRCaP
+    _x74 = 1/(_x70 + _x73 + 1)
+    _x75 = _x74*(_x70 - _x73)
+    _x76 = _x74*serca
+    _x77 = _x76*hillSRCaP
+    _x78 = _x71*_x73*(_x75 + 1)
+    _x79 = _x75 - 1
+    _x80 = _x68*_x70
+    _x81 = _x73*log(_x72)
+    _x82 = _x70*log(_x69)
+    _x83 = _x75*(_x81 + _x82) + _x81 - _x82
+    _x84 = SRleak*_x66
+    _x85 = FoRT*Vm
+    _x86 = exp(_x85)
+    _x87 = Naj*_x86
+    _x88 = fcaBj - 1
+    _x89 = _x86 - 1
+    _x90 = 1/_x89
+    _x91 = d*f
+    _x92 = Vm*_x91
+    _x93 = _x90*_x92
+    _x94 = _x88*_x93
+    _x95 = _x94*caNa_junc
+    _x96 = _x87*_x95
+    _x97 = -Nao + _x87
+    _x98 = _x88*_x92
+    _x99 = _x86/_x89**2
+    _x100 = _x97*_x98*_x99*caNa_junc
+    _x101 = KmNaip**4
+    _x102 = Naj**(-4)
+    _x103 = _x101*_x102 + 1
+    _x104 = 1/_x103
+    _x105 = _x104*nak_junc
+    _x106 = exp(-0.1*_x85)
+    _x107 = exp(-_x85)
+    _x108 = _x107*nak_sigma
+    _x109 = 0.1245*_x106 + _x108 + 1
+    _x110 = _x109**(-2)
+    _x111 = 0.01245*_x106 + _x108
+    _x112 = _x110*_x111
+    _x113 = _x105*_x112
+    _x114 = Cmem_FVjunc*Vm
+    _x115 = log(Nao/Naj)
+    _x116 = hl*ml**3
+    _x117 = GNaL_junc*_x116
+    _x118 = h*j*m**3
+    _x119 = GNa_junc*_x118
+    _x120 = RToF/Nao
+    _x121 = GNaB_junc*_x120 + _x117*_x120 + _x119*_x120 - _x95
+    _x122 = exp(Vm*nuFoRT)
+    _x123 = exp(Vm*nu1FoRT)
+    _x124 = Caj*Nao3
+    _x125 = Naj**3
+    _x126 = Cao*_x125
+    _x127 = _x122*_x126
+    _x128 = _x123*_x124 - _x127
+    _x129 = 1/KmCai
+    _x130 = Caj*(Caj*_x129 + 1)
+    _x131 = KmNai**(-3)
+    _x132 = _x125*_x131 + 1
+    _x133 = KmCaiNao3*_x132 + KmCao*_x125 + KmNao3*_x130 + _x124 + _x126
+    _x134 = 1/_x133
+    _x135 = _x128*_x134
+    _x136 = 1/_x16
+    _x137 = Kdact**2
+    _x138 = _x136*_x137 + 1
+    _x139 = 1/_x138
+    _x140 = _x139*ncx_junc
+    _x141 = _x134*_x140
+    _x142 = _x125*_x141
+    _x143 = _x123*ksat + 1
+    _x144 = 1/_x143
+    _x145 = 3*Cmem_FVjunc
+    _x146 = _x144*_x145
+    _x147 = -Vm
+    _x148 = RToF*_x115 + _x147
+    _x149 = Cmem_FVjunc*_x148
+    _x150 = _x107*_x110
+    _x151 = 1/_x109
+    _x152 = _x104*_x151
+    _x153 = _x102*nak_junc/_x103**2
+    _x154 = KmNaip**3*_x151
+    _x155 = 12*_x154
+    _x156 = _x90*_x91
+    _x157 = _x135*_x139
+    _x158 = _x144*_x157
+    _x159 = Kdact*_x144
+    _x160 = 6*_x159
+    _x161 = _x135*_x136*ncx_junc/_x138**2
+    _x162 = Cmem_FVjunc*_x161
+    _x163 = 3*_x144
+    _x164 = _x114*_x141
+    _x165 = _x127*_x164
+    _x166 = _x123*_x163
+    _x167 = _x144*ksat
+    _x168 = _x164*(_x124 - _x128*_x167)
+    _x169 = _x123/_x143**2
+    _x170 = _x157*ncx_junc
+    _x171 = _x169*_x170
+    _x172 = -_x123 + _x135
+    _x173 = Caj*_x141
+    _x174 = _x128*_x140/_x133**2
+    _x175 = _x132*_x174
+    _x176 = KmCaiNao3/KmNai**4
+    _x177 = 9*_x176
+    _x178 = _x125*_x174
+    _x179 = _x144*_x178
+    _x180 = Cmem_FVjunc*_x179
+    _x181 = _x130*_x174
+    _x182 = KmNao3*_x144/KmCai**2
+    _x183 = _x16*_x174
+    _x184 = _x182*_x183
+    _x185 = 3*_x151
+    _x186 = _x158*ncx_junc
+    _x187 = -Nasl
+    _x188 = Naj + _x187
+    _x189 = Nasl**(-4)
+    _x190 = _x101*_x189 + 1
+    _x191 = 1/_x190
+    _x192 = Nasl*_x86
+    _x193 = fcaBsl - 1
+    _x194 = _x193*_x93
+    _x195 = _x194*caNa_sl
+    _x196 = Nao - _x192
+    _x197 = _x193*_x92
+    _x198 = _x192*_x195 + _x196*_x197*_x99*caNa_sl
+    _x199 = Cmem_FVsl*Vm
+    _x200 = log(Nao/Nasl)
+    _x201 = GNaL_sl*_x116
+    _x202 = GNa_sl*_x118
+    _x203 = GNaB_sl*_x120 + _x120*_x201 + _x120*_x202 - _x195
+    _x204 = Casl*Nao3
+    _x205 = Nasl**3
+    _x206 = Cao*_x205
+    _x207 = _x122*_x206
+    _x208 = -_x123*_x204 + _x207
+    _x209 = Casl*_x129 + 1
+    _x210 = Casl*_x209
+    _x211 = _x131*_x205 + 1
+    _x212 = KmCaiNao3*_x211 + KmCao*_x205 + KmNao3*_x210 + _x204 + _x206
+    _x213 = 1/_x212
+    _x214 = _x208*_x213
+    _x215 = Casl**2
+    _x216 = 1/_x215
+    _x217 = _x137*_x216 + 1
+    _x218 = 1/_x217
+    _x219 = _x218*ncx_sl
+    _x220 = _x213*_x219
+    _x221 = _x205*_x220
+    _x222 = 3*Cmem_FVsl
+    _x223 = _x144*_x222
+    _x224 = RToF*_x200 + _x147
+    _x225 = Cmem_FVsl*_x224
+    _x226 = _x191*nak_sl
+    _x227 = _x151*_x191
+    _x228 = _x189*nak_sl/_x190**2
+    _x229 = _x214*_x218
+    _x230 = _x144*_x229
+    _x231 = _x214*_x216*ncx_sl/_x217**2
+    _x232 = Cmem_FVsl*_x231
+    _x233 = _x199*_x220
+    _x234 = _x207*_x233
+    _x235 = _x233*(_x167*_x208 + _x204)
+    _x236 = _x229*ncx_sl
+    _x237 = _x169*_x236
+    _x238 = Casl*_x220
+    _x239 = _x238*(_x123 + _x214)
+    _x240 = _x212**(-2)
+    _x241 = _x208*_x219*_x240
+    _x242 = _x211*_x241
+    _x243 = _x205*_x241
+    _x244 = _x144*_x243
+    _x245 = Cmem_FVsl*_x244
+    _x246 = _x210*_x241
+    _x247 = _x215*_x241
+    _x248 = _x182*_x247
+    _x249 = Nai + _x187
+    _x250 = exp(2*_x85)
+    _x251 = _x250 - 1
+    _x252 = 1/_x251
+    _x253 = Caj*_x250
+    _x254 = -Cao + _x253
+    _x255 = 1.0*Cmem_FVjunc
+    _x256 = _x88*ca_junc
+    _x257 = _x250*_x256
+    _x258 = Vm**2*_x252*_x91
+    _x259 = 1/Caj
+    _x260 = log(Cao*_x259)
+    _x261 = 0.25*GCaB_junc
+    _x262 = 1/Cao
+    _x263 = RToF*_x262
+    _x264 = 0.5*Vm
+    _x265 = _x264*_x91
+    _x266 = _x252*_x265
+    _x267 = _x122*_x144
+    _x268 = _x142*_x267
+    _x269 = _x252*_x254
+    _x270 = 2.0*_x159
+    _x271 = 1.0*_x144
+    _x272 = _x123*_x271
+    _x273 = _x144*_x255
+    _x274 = 3.0*_x176
+    _x275 = Caj**1.6
+    _x276 = KmPCa16 + _x275
+    _x277 = _x275/_x276
+    _x278 = 0.5*_x277
+    _x279 = _x275*pca_junc/_x276**2
+    _x280 = -_x264
+    _x281 = RToF*_x260
+    _x282 = _x147 + 0.5*_x281
+    _x283 = -Casl
+    _x284 = Caj + _x283
+    _x285 = Casl*_x250
+    _x286 = Cao - _x285
+    _x287 = _x252*_x286
+    _x288 = 1.0*Cmem_FVsl
+    _x289 = _x193*ca_sl
+    _x290 = _x250*_x289
+    _x291 = 1/Casl
+    _x292 = log(Cao*_x291)
+    _x293 = 0.25*GCaB_sl
+    _x294 = _x221*_x267
+    _x295 = _x265*_x287
+    _x296 = _x144*_x288
+    _x297 = Casl**1.6
+    _x298 = KmPCa16 + _x297
+    _x299 = _x297/_x298
+    _x300 = 0.5*_x299
+    _x301 = _x297*pca_sl/_x298**2
+    _x302 = RToF*_x292
+    _x303 = _x147 + 0.5*_x302
+    _x304 = Cai + _x283
+    _x305 = Vsr_Vmyo*_x76
+    _x306 = _x305*hillSRCaP
+    _x307 = Ki*_x86
+    _x308 = Fjunc_CaL*_x88 + Fsl_CaL*_x193
+    _x309 = _x308*_x93
+    _x310 = _x309*caK
+    _x311 = -Ko + _x307
+    _x312 = _x311*caK
+    _x313 = 2*_x92/_x251**2
+    _x314 = _x252*_x92
+    _x315 = _x256*_x314
+    _x316 = _x289*_x314
+    _x317 = log(Ko/Ki)
+    _x318 = rkuro*skuro
+    _x319 = Gkur*_x318
+    _x320 = xtof*ytof
+    _x321 = GtoFast*_x320
+    _x322 = GNaL_junc*_x115
+    _x323 = GNaL_sl*_x200
+    _x324 = 1/(Ki + Nai*pNaK)
+    _x325 = log(_x324*eks_num)
+    _x326 = xks**2
+    _x327 = Gks*_x326
+    _x328 = 1/(1 + 1786.47556537862*exp(-0.167224080267559*Vm))
+    _x329 = Gkp*_x328
+    _x330 = xkr/(exp((1/24)*(Vm + 74)) + 1)
+    _x331 = _x330*gkr
+    _x332 = 0.08 + 0.4/(exp((1/12)*(Vm + 91)) + 1)
+    _x333 = GkAch*_x332
+    _x334 = RToF*_x317
+    _x335 = exp(0.2385*Vm - 0.2385*_x334)
+    _x336 = 7.35454251046446e-7*_x335 + 1
+    _x337 = 1.02/_x336
+    _x338 = exp(-0.5143*Vm + 0.5143*_x334)
+    _x339 = 0.0867722941576933*_x338 + 1
+    _x340 = 1/_x339
+    _x341 = exp(0.08032*Vm - 0.08032*_x334)
+    _x342 = exp(0.06175*Vm - 0.06175*_x334)
+    _x343 = 0.762624006506308*_x341 + 1.15340563518656e-16*_x342
+    _x344 = _x337 + _x340*_x343
+    _x345 = 1/_x344
+    _x346 = _x337*_x345
+    _x347 = _x346*gki
+    _x348 = _x147 + _x334
+    _x349 = _x348*gki
+    _x350 = _x317*_x349
+    _x351 = _x336**(-2)
+    _x352 = 1.78913955652069e-7*_x335*_x345*_x351
+    _x353 = _x337*(1.78913955652069e-7*_x335*_x351 - 0.0446269908853017*_x338*_x343/_x339**2 - _x340*(0.0612539602025867*_x341 + 7.12227979727698e-18*_x342))/_x344**2
+    _x354 = RToF/Ko
+    _x355 = _x349*_x354
+    _x356 = KdClCa*_x259 + 1
+    _x357 = 1/_x356
+    _x358 = KdClCa*_x291 + 1
+    _x359 = 1/_x358
+    _x360 = RToF*_x327
+    _x361 = Vm - ecl
+    _x362 = Vm*_x144
+    _x363 = _x178 - _x243
+    _x364 = _x116*_x148
+    _x365 = _x116*_x224
+    Jp = np.zeros((42, 116))
+    Jp[3, 109] = _x2*(_x2*_x5*_x7 - _x4*_x5 - _x5*_x6 + 0.105*_x7)
+    Jp[4, 109] = -0.0197*(0.02044242*ISO + 0.00681414*Vm + 0.1703535)*(-f + 1/(exp((1/9)*(Vm + 35)) + 1) + 0.6/(exp((1/20)*(50 - Vm)) + 1))*exp(-(0.1011*ISO + 0.0337*Vm + 0.8425)**2)
+    Jp[10, 109] = 0.00240780442776719*_x8*(xks - 1/_x10) + 2.14997428312884*_x9*(0.00084995496300182*_x8 + 0.00100999899000101)/_x10**2
+    Jp[11, 50] = RyRr*_x15*(_x14 - kiCa)
+    Jp[11, 51] = -_x18
+    Jp[11, 52] = -RyRr*_x19
+    Jp[11, 53] = RyRo
+    Jp[11, 54] = -_x20
+    Jp[12, 50] = -_x15*(RyRr*_x14 + _x21)
+    Jp[12, 51] = _x18
+    Jp[12, 52] = -_x22
+    Jp[12, 53] = -RyRo
+    Jp[12, 54] = RyRi
+    Jp[13, 50] = _x15*(_x14*_x20 + _x21)
+    Jp[13, 51] = -_x17*_x20
+    Jp[13, 52] = _x22
+    Jp[13, 53] = _x23
+    Jp[13, 54] = _x23
+    Jp[14, 60] = _x25
+    Jp[14, 61] = _x24
+    Jp[14, 62] = _x26
+    Jp[15, 60] = _x28
+    Jp[15, 61] = _x27
+    Jp[15, 63] = _x29
+    Jp[16, 64] = _x31
+    Jp[16, 65] = _x30
+    Jp[16, 66] = _x32
+    Jp[17, 67] = -_x34
+    Jp[17, 68] = -TnCHc
+    Jp[17, 71] = _x35
+    Jp[18, 5] = -_x36
+    Jp[18, 69] = -_x37
+    Jp[18, 70] = -TnCHm
+    Jp[18, 71] = _x38
+    Jp[19, 72] = _x40
+    Jp[19, 73] = _x39
+    Jp[19, 74] = _x41
+    Jp[20, 75] = -_x43
+    Jp[20, 76] = -Myoc
+    Jp[20, 79] = _x44
+    Jp[21, 5] = -_x45
+    Jp[21, 77] = -_x46
+    Jp[21, 78] = -Myom
+    Jp[21, 79] = _x47
+    Jp[22, 80] = _x49
+    Jp[22, 81] = _x48
+    Jp[22, 82] = _x50
+    Jp[23, 83] = _x52
+    Jp[23, 84] = _x51
+    Jp[23, 86] = _x53
+    Jp[24, 83] = _x55
+    Jp[24, 84] = _x54
+    Jp[24, 85] = _x56
+    Jp[25, 87] = _x58
+    Jp[25, 88] = _x57
+    Jp[25, 90] = _x59
+    Jp[26, 87] = _x61
+    Jp[26, 88] = _x60
+    Jp[26, 89] = _x62
+    Jp[27, 91] = _x64
+    Jp[27, 92] = _x63
+    Jp[27, 93] = _x65
+    Jp[28, 55] = -_x67
+    Jp[28, 56] = -_x75
+    Jp[28, 57] = -_x77*_x78
+    Jp[28, 58] = -_x77*_x79*_x80
+    Jp[28, 59] = _x76*_x83
+    Jp[28, 91] = -_x64
+    Jp[28, 92] = Csqnb
+    Jp[28, 93] = -_x65
+    Jp[28, 104] = -_x84
+    Jp[28, 115] = -Vmyo_Vsr*_x66
+    Jp[29, 0] = -_x114*(_x100 + 3*_x113 - _x96)
+    Jp[29, 1] = Cmem_FVjunc*_x115*(GNaB_junc + _x117 + _x119)
+    Jp[29, 3] = Cmem_FVjunc*_x121
+    Jp[29, 4] = -_x142*_x146*(_x122 + _x135)
+    Jp[29, 7] = _x118*_x149
+    Jp[29, 9] = _x105*_x145*_x150
+    Jp[29, 10] = -_x145*_x152
+    Jp[29, 12] = Cmem_FVjunc*_x153*_x155
+    Jp[29, 29] = _x114*_x156*_x88*_x97
+    Jp[29, 31] = _x145*_x158
+    Jp[29, 33] = -_x160*_x162
+    Jp[29, 34] = -_x163*_x165
+    Jp[29, 35] = _x166*_x168
+    Jp[29, 36] = -_x145*_x171
+    Jp[29, 37] = -_x146*_x172*_x173
+    Jp[29, 38] = -_x146*_x175
+    Jp[29, 39] = _x177*_x180
+    Jp[29, 40] = -_x146*_x181
+    Jp[29, 41] = _x145*_x184
+    Jp[29, 42] = -_x145*_x179
+    Jp[29, 46] = _x149
+    Jp[29, 60] = -_x25
+    Jp[29, 61] = NaBj
+    Jp[29, 62] = -_x26
+    Jp[29, 94] = GNaB_junc*_x148 - _x105*_x185 + _x117*_x148 + _x119*_x148 + 3*_x186 + _x95*_x97
+    Jp[29, 96] = -_x188
+    Jp[29, 110] = _x116*_x149
+    Jp[30, 0] = -_x199*(3*_x110*_x111*_x191*nak_sl - _x198)
+    Jp[30, 1] = Cmem_FVsl*_x200*(GNaB_sl + _x201 + _x202)
+    Jp[30, 3] = Cmem_FVsl*_x203
+    Jp[30, 4] = _x221*_x223*(-_x122 + _x214)
+    Jp[30, 8] = _x118*_x225
+    Jp[30, 9] = _x150*_x222*_x226
+    Jp[30, 11] = -_x222*_x227
+    Jp[30, 12] = Cmem_FVsl*_x155*_x228
+    Jp[30, 30] = -_x156*_x193*_x196*_x199
+    Jp[30, 32] = -_x222*_x230
+    Jp[30, 33] = _x160*_x232
+    Jp[30, 34] = -_x163*_x234
+    Jp[30, 35] = _x166*_x235
+    Jp[30, 36] = _x222*_x237
+    Jp[30, 37] = _x223*_x239
+    Jp[30, 38] = _x223*_x242
+    Jp[30, 39] = -_x177*_x245
+    Jp[30, 40] = _x223*_x246
+    Jp[30, 41] = -_x222*_x248
+    Jp[30, 42] = _x222*_x244
+    Jp[30, 47] = _x225
+    Jp[30, 60] = -_x28
+    Jp[30, 61] = NaBsl
+    Jp[30, 63] = -_x29
+    Jp[30, 95] = GNaB_sl*_x224 - _x185*_x226 - _x195*_x196 + _x201*_x224 + _x202*_x224 - 3*_x230*ncx_sl
+    Jp[30, 97] = _x188
+    Jp[30, 98] = _x249
+    Jp[30, 111] = _x116*_x225
+    Jp[31, 99] = -_x249
+    Jp[33, 0] = -_x255*_x257*_x258*(-Caj + _x252*_x254)
+    Jp[33, 1] = Cmem_FVjunc*_x260*_x261
+    Jp[33, 4] = Cmem_FVjunc*(1.0*_x179 - _x256*_x266 + _x261*_x263 + 1.0*_x268)
+    Jp[33, 24] = Cmem_FVjunc*_x265*_x269*_x88
+    Jp[33, 31] = -_x158*_x255
+    Jp[33, 33] = _x162*_x270
+    Jp[33, 34] = _x165*_x271
+    Jp[33, 35] = -_x168*_x272
+    Jp[33, 36] = _x171*_x255
+    Jp[33, 37] = _x172*_x173*_x273
+    Jp[33, 38] = _x175*_x273
+    Jp[33, 39] = -_x180*_x274
+    Jp[33, 40] = _x181*_x273
+    Jp[33, 41] = -_x184*_x255
+    Jp[33, 42] = _x179*_x255
+    Jp[33, 43] = -Cmem_FVjunc*_x278
+    Jp[33, 45] = 0.5*Cmem_FVjunc*_x279
+    Jp[33, 48] = Cmem_FVjunc*(_x280 + 0.25*_x281)
+    Jp[33, 55] = Vsr_Vjunc*_x67
+    Jp[33, 83] = -_x52
+    Jp[33, 84] = SLLj
+    Jp[33, 86] = -_x53
+    Jp[33, 87] = -_x58
+    Jp[33, 88] = SLHj
+    Jp[33, 90] = -_x59
+    Jp[33, 94] = 0.5*GCaB_junc*_x282 + 0.5*Vm*_x252*_x254*_x88*ca_junc*d*f - 1.0*_x186 - _x278*pca_junc
+    Jp[33, 100] = -_x284
+    Jp[33, 105] = _x67*ks
+    Jp[33, 106] = _x84
+    Jp[33, 115] = Vmyo_Vjunc*_x66
+    Jp[34, 0] = _x258*_x288*_x290*(Casl + _x287)
+    Jp[34, 1] = Cmem_FVsl*_x292*_x293
+    Jp[34, 4] = -Cmem_FVsl*(1.0*_x244 - _x263*_x293 + _x266*_x289 - 1.0*_x294)
+    Jp[34, 25] = -Cmem_FVsl*_x193*_x295
+    Jp[34, 32] = _x230*_x288
+    Jp[34, 33] = -_x232*_x270
+    Jp[34, 34] = _x234*_x271
+    Jp[34, 35] = -_x235*_x272
+    Jp[34, 36] = -_x237*_x288
+    Jp[34, 37] = -_x239*_x296
+    Jp[34, 38] = -_x242*_x296
+    Jp[34, 39] = _x245*_x274
+    Jp[34, 40] = -_x246*_x296
+    Jp[34, 41] = _x248*_x288
+    Jp[34, 42] = -_x244*_x288
+    Jp[34, 44] = -Cmem_FVsl*_x300
+    Jp[34, 45] = 0.5*Cmem_FVsl*_x301
+    Jp[34, 49] = Cmem_FVsl*(_x280 + 0.25*_x302)
+    Jp[34, 83] = -_x55
+    Jp[34, 84] = SLLsl
+    Jp[34, 85] = -_x56
+    Jp[34, 87] = -_x61
+    Jp[34, 88] = SLHsl
+    Jp[34, 89] = -_x62
+    Jp[34, 95] = 0.5*GCaB_sl*_x303 + 1.0*_x144*_x208*_x213*_x218*ncx_sl - _x289*_x295 - _x300*pca_sl
+    Jp[34, 101] = _x284
+    Jp[34, 102] = _x304
+    Jp[35, 5] = _x36 + _x45
+    Jp[35, 56] = Vsr_Vmyo*_x75
+    Jp[35, 57] = _x306*_x78
+    Jp[35, 58] = _x306*_x79*_x80
+    Jp[35, 59] = -_x305*_x83
+    Jp[35, 64] = -_x31
+    Jp[35, 65] = TnCL
+    Jp[35, 66] = -_x32
+    Jp[35, 67] = _x34
+    Jp[35, 68] = TnCHc
+    Jp[35, 69] = _x37
+    Jp[35, 70] = TnCHm
+    Jp[35, 71] = -_x35 - _x38
+    Jp[35, 72] = -_x40
+    Jp[35, 73] = CaM
+    Jp[35, 74] = -_x41
+    Jp[35, 75] = _x43
+    Jp[35, 76] = Myoc
+    Jp[35, 77] = _x46
+    Jp[35, 78] = Myom
+    Jp[35, 79] = -_x44 - _x47
+    Jp[35, 80] = -_x49
+    Jp[35, 81] = SRB
+    Jp[35, 82] = -_x50
+    Jp[35, 103] = -_x304
+    Jp[35, 107] = _x75*serca
+    Jp[36, 0] = Vm*(-_x100 - _x112*_x226 - _x113 + _x198 + 2*_x253*_x315 - _x254*_x257*_x313 + 2*_x285*_x316 + _x286*_x290*_x313 + _x307*_x310 - _x308*_x312*_x92*_x99 + _x96)
+    Jp[36, 1] = 0.5*GCaB_junc*_x260 + 0.5*GCaB_sl*_x292 + GNaB_junc*_x115 + GNaB_sl*_x200 + _x115*_x119 + _x116*_x322 + _x116*_x323 + _x200*_x202 + _x317*_x319 + _x317*_x321 + _x317*_x329 + _x317*_x331 + _x317*_x333 + _x317*_x347 + _x325*_x327 + _x350*_x352 - _x350*_x353
+    Jp[36, 2] = -_x310 + _x319*_x354 + _x321*_x354 + _x329*_x354 + _x331*_x354 + _x333*_x354 + _x347*_x354 + _x352*_x355 - _x353*_x355
+    Jp[36, 3] = _x121 + _x203
+    Jp[36, 4] = 0.5*GCaB_junc*RToF*_x262 + 0.5*GCaB_sl*RToF*_x262 + _x144*_x205*_x208*_x218*_x240*ncx_sl - _x179 - _x268 - _x294 - _x315 - _x316
+    Jp[36, 6] = GClB + GClCa_junc*_x357 + GClCa_sl*_x359
+    Jp[36, 7] = _x118*_x148
+    Jp[36, 8] = _x118*_x224
+    Jp[36, 9] = _x150*(_x105 + _x226)
+    Jp[36, 10] = -_x152
+    Jp[36, 11] = -_x227
+    Jp[36, 12] = 4*_x154*(_x153 + _x228)
+    Jp[36, 13] = _x330*_x348
+    Jp[36, 14] = _x346*_x348
+    Jp[36, 15] = _x326*(RToF*_x325 + _x147)
+    Jp[36, 16] = _x328*_x348
+    Jp[36, 17] = _x320*_x348
+    Jp[36, 18] = -Nai*_x324*_x360
+    Jp[36, 19] = _x360/eks_num
+    Jp[36, 20] = -_x357*_x361
+    Jp[36, 21] = -_x359*_x361
+    Jp[36, 22] = _x361*(GClCa_junc*_x259/_x356**2 + GClCa_sl*_x291/_x358**2)
+    Jp[36, 23] = -_x361
+    Jp[36, 24] = _x269*_x98
+    Jp[36, 25] = -_x197*_x287
+    Jp[36, 26] = _x309*_x311
+    Jp[36, 27] = _x312*_x94
+    Jp[36, 28] = _x194*_x312
+    Jp[36, 29] = _x94*_x97
+    Jp[36, 30] = -_x194*_x196
+    Jp[36, 31] = _x158
+    Jp[36, 32] = -_x230
+    Jp[36, 33] = 2*_x159*(-_x161 + _x231)
+    Jp[36, 34] = -Cao*_x122*_x362*(_x142 + _x221)
+    Jp[36, 35] = _x123*_x362*(_x124*_x141 - _x167*_x170 + _x167*_x236 + _x204*_x220)
+    Jp[36, 36] = _x169*(-_x170 + _x208*_x213*_x218*ncx_sl)
+    Jp[36, 37] = _x144*(-Caj*_x174 + Casl*_x241 + _x123*_x173 + _x123*_x238)
+    Jp[36, 38] = _x144*(-_x175 + _x208*_x211*_x218*_x240*ncx_sl)
+    Jp[36, 39] = _x163*_x176*_x363
+    Jp[36, 40] = _x144*(Casl*_x208*_x209*_x218*_x240*ncx_sl - _x181)
+    Jp[36, 41] = _x182*(_x183 - _x247)
+    Jp[36, 42] = -_x144*_x363
+    Jp[36, 43] = -_x277
+    Jp[36, 44] = -_x299
+    Jp[36, 45] = _x279 + _x301
+    Jp[36, 46] = _x148
+    Jp[36, 47] = _x224
+    Jp[36, 48] = _x282
+    Jp[36, 49] = _x303
+    Jp[36, 108] = 1
+    Jp[36, 110] = _x364
+    Jp[36, 111] = _x365
+    Jp[36, 113] = _x318*_x348
+    Jp[36, 114] = _x332*_x348
+    Jp[40, 112] = (hl - 1/(3011752.78212386*exp(0.163934426229508*Vm) + 1.0))/tauhl**2
+    Jp[41, 1] = -_x116*(_x322 + _x323)
+    Jp[41, 3] = -_x116*_x120*(GNaL_junc + GNaL_sl)
+    Jp[41, 110] = -_x364
+    Jp[41, 111] = -_x365
+    if t >= 5:
+        Jp[:, 108] = 0.0
+    if P.dynamic is not None:
+        Jp *= np.asarray(P.dynamic)[:, None]
+    return Jp
+
+
+def grandi_bers_diagonal(Y, t, P):
+    """Diagonal D of the grandi_bers_prepared Jacobian for an (..., n_states) array with the gate rows
+    left at zero, and the entries C[..., k] = (J[i, j], J[j, i]) of the coupled pairs (i, j)."""
+    Y = np.asarray(Y, dtype=float)
+    (m, h, j, d, f, fcaBj, fcaBsl, xtos, ytos, xtof, ytof, xkr, xks, RyRr, RyRo,
+     RyRi, NaBj, NaBsl, TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl,
+     SLHj, SLHsl, Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai,
+     Vm) = np.moveaxis(Y, -1, 0)
+    FoRT = P.FoRT
+    RToF = P.RToF
+    Ko = P.Ko
+    Nao = P.Nao
+    Cao = P.Cao
+    Mgi = P.Mgi
+    GNa_junc = P.GNa_junc
+    GNa_sl = P.GNa_sl
+    nak_sigma = P.nak_sigma
+    nak_junc = P.nak_junc
+    nak_sl = P.nak_sl
+    KmNaip = P.KmNaip
+    gkr = P.gkr
+    gki = P.gki
+    Gks = P.Gks
+    Gkp = P.Gkp
+    GtoFast = P.GtoFast
+    GClCa_junc = P.GClCa_junc
+    GClCa_sl = P.GClCa_sl
+    KdClCa = P.KdClCa
+    GClB = P.GClB
+    ca_junc = P.ca_junc
+    ca_sl = P.ca_sl
+    caK = P.caK
+    Fjunc_CaL = P.Fjunc_CaL
+    Fsl_CaL = P.Fsl_CaL
+    caNa_junc = P.caNa_junc
+    caNa_sl = P.caNa_sl
+    ncx_junc = P.ncx_junc
+    ncx_sl = P.ncx_sl
+    Kdact = P.Kdact
+    nuFoRT = P.nuFoRT
+    nu1FoRT = P.nu1FoRT
+    ksat = P.ksat
+    Nao3 = P.Nao3
+    KmCaiNao3 = P.KmCaiNao3
+    KmNai = P.KmNai
+    KmNao3 = P.KmNao3
+    KmCai = P.KmCai
+    KmCao = P.KmCao
+    pca_junc = P.pca_junc
+    pca_sl = P.pca_sl
+    KmPCa16 = P.KmPCa16
+    GNaB_junc = P.GNaB_junc
+    GNaB_sl = P.GNaB_sl
+    GCaB_junc = P.GCaB_junc
+    GCaB_sl = P.GCaB_sl
+    ec50SR = P.ec50SR
+    koCa = P.koCa
+    kiCa = P.kiCa
+    kom = P.kom
+    kim = P.kim
+    ks = P.ks
+    serca = P.serca
+    Kmf = P.Kmf
+    Kmr = P.Kmr
+    hillSRCaP = P.hillSRCaP
+    kon_na = P.kon_na
+    koff_na = P.koff_na
+    Bmax_Naj = P.Bmax_Naj
+    Bmax_Nasl = P.Bmax_Nasl
+    kon_tncl = P.kon_tncl
+    koff_tncl = P.koff_tncl
+    Bmax_TnClow = P.Bmax_TnClow
+    kon_tnchca = P.kon_tnchca
+    koff_tnchca = P.koff_tnchca
+    kon_tnchmg = P.kon_tnchmg
+    koff_tnchmg = P.koff_tnchmg
+    Bmax_TnChigh = P.Bmax_TnChigh
+    kon_cam = P.kon_cam
+    koff_cam = P.koff_cam
+    Bmax_CaM = P.Bmax_CaM
+    kon_myoca = P.kon_myoca
+    koff_myoca = P.koff_myoca
+    kon_myomg = P.kon_myomg
+    koff_myomg = P.koff_myomg
+    Bmax_myosin = P.Bmax_myosin
+    kon_sr = P.kon_sr
+    koff_sr = P.koff_sr
+    Bmax_SR = P.Bmax_SR
+    kon_sll = P.kon_sll
+    koff_sll = P.koff_sll
+    Bmax_SLlowsl = P.Bmax_SLlowsl
+    Bmax_SLlowj = P.Bmax_SLlowj
+    kon_slh = P.kon_slh
+    koff_slh = P.koff_slh
+    Bmax_SLhighsl = P.Bmax_SLhighsl
+    Bmax_SLhighj = P.Bmax_SLhighj
+    kon_csqn = P.kon_csqn
+    koff_csqn = P.koff_csqn
+    Bmax_Csqn = P.Bmax_Csqn
+    Cmem_FVjunc = P.Cmem_FVjunc
+    Cmem_FVsl = P.Cmem_FVsl
+    Jna_juncsl_Vjunc = P.Jna_juncsl_Vjunc
+    Jna_juncsl_Vsl = P.Jna_juncsl_Vsl
+    Jna_slmyo_Vsl = P.Jna_slmyo_Vsl
+    Jna_slmyo_Vmyo = P.Jna_slmyo_Vmyo
+    Jca_juncsl_Vjunc = P.Jca_juncsl_Vjunc
+    Jca_juncsl_Vsl = P.Jca_juncsl_Vsl
+    Jca_slmyo_Vsl = P.Jca_slmyo_Vsl
+    Jca_slmyo_Vmyo = P.Jca_slmyo_Vmyo
+    Vmyo_Vsr = P.Vmyo_Vsr
+    Vsr_Vjunc = P.Vsr_Vjunc
+    Vmyo_Vjunc = P.Vmyo_Vjunc
+    Vsr_Vmyo = P.Vsr_Vmyo
+    GtoSlow = P.GtoSlow
+    _x0 = Ca_sr**(-1.0)
+    _x1 = 15 - 14/((_x0*ec50SR)**2.5 + 1)
+    _x2 = Caj*_x1*kiCa
+    _x3 = Caj**2
+    _x4 = kim + _x3*koCa/_x1
+    _x5 = Ca_sr*kon_csqn + koff_csqn
+    _x6 = RyRo*ks
+    _x7 = kon_csqn*(Bmax_Csqn - Csqnb)
+    _x8 = (Ca_sr/Kmr)**hillSRCaP
+    _x9 = (Cai/Kmf)**hillSRCaP
+    _x10 = _x8 + _x9 + 1
+    _x11 = hillSRCaP*serca
+    _x12 = _x11/_x10
+    _x13 = _x8 - _x9
+    _x14 = _x10**(-2.0)
+    _x15 = RToF/Naj
+    _x16 = h*j*m**3
+    _x17 = GNa_junc*_x16
+    _x18 = fcaBj - 1
+    _x19 = -_x18
+    _x20 = FoRT*Vm
+    _x21 = np.exp(_x20)
+    _x22 = _x21 - 1
+    _x23 = _x22**(-1.0)
+    _x24 = d*f
+    _x25 = _x23*_x24
+    _x26 = Vm*_x21
+    _x27 = KmNaip**4
+    _x28 = 1 + _x27/Naj**4
+    _x29 = np.exp(-0.1*_x20)
+    _x30 = nak_sigma*np.exp(-_x20)
+    _x31 = 0.1245*_x29 + _x30 + 1
+    _x32 = 12*_x27/_x31
+    _x33 = Caj*Nao3
+    _x34 = Naj**3
+    _x35 = Cao*_x34
+    _x36 = KmCai**(-1.0)
+    _x37 = Caj*_x36
+    _x38 = KmNao3*(_x37 + 1)
+    _x39 = KmNai**(-3.0)
+    _x40 = Caj*_x38 + KmCaiNao3*(_x34*_x39 + 1) + KmCao*_x34 + _x33 + _x35
+    _x41 = _x40**(-1.0)
+    _x42 = np.exp(Vm*nu1FoRT)
+    _x43 = _x42*ksat
+    _x44 = _x43 + 1
+    _x45 = _x44**(-1.0)
+    _x46 = Kdact**2
+    _x47 = 1 + _x46/_x3
+    _x48 = _x47**(-1.0)
+    _x49 = _x45*_x48*ncx_junc
+    _x50 = _x41*_x49
+    _x51 = 9*Naj**2
+    _x52 = np.exp(Vm*nuFoRT)
+    _x53 = Cao*_x52
+    _x54 = Cao + KmCaiNao3*_x39 + KmCao
+    _x55 = _x33*_x42
+    _x56 = -Cao*_x34*_x52 + _x55
+    _x57 = -_x56
+    _x58 = _x49*_x57/_x40**2
+    _x59 = RToF/Nasl
+    _x60 = GNa_sl*_x16
+    _x61 = fcaBsl - 1
+    _x62 = -_x61
+    _x63 = _x25*caNa_sl
+    _x64 = 1 + _x27/Nasl**4
+    _x65 = Casl*Nao3
+    _x66 = Nasl**3
+    _x67 = Cao*_x66
+    _x68 = Casl*_x36
+    _x69 = KmNao3*(_x68 + 1)
+    _x70 = Casl*_x69 + KmCaiNao3*(_x39*_x66 + 1) + KmCao*_x66 + _x65 + _x67
+    _x71 = _x70**(-1.0)
+    _x72 = 1 + _x46/Casl**2
+    _x73 = _x72**(-1.0)
+    _x74 = _x45*_x73*ncx_sl
+    _x75 = _x71*_x74
+    _x76 = 9*Nasl**2
+    _x77 = _x42*_x65
+    _x78 = _x52*_x67
+    _x79 = -_x77 + _x78
+    _x80 = _x74*_x79/_x70**2
+    _x81 = Caj**(-1.0)
+    _x82 = 0.25*RToF
+    _x83 = Caj**1.6 + KmPCa16
+    _x84 = 0.8*pca_junc
+    _x85 = 2*_x20
+    _x86 = np.exp(_x85)
+    _x87 = _x86 - 1
+    _x88 = _x87**(-1.0)
+    _x89 = _x24*_x88
+    _x90 = 0.5*Vm*_x86
+    _x91 = 1.0*Nao3*_x42
+    _x92 = _x41*ncx_junc
+    _x93 = 2.0*_x45*_x46
+    _x94 = Casl**(-1.0)
+    _x95 = Casl**1.6 + KmPCa16
+    _x96 = 0.8*pca_sl
+    _x97 = _x89*ca_sl
+    _x98 = Vsr_Vmyo*_x9/Cai
+    _x99 = np.exp(-0.167224080267559*Vm)
+    _x100 = 1786.47556537862*_x99 + 1
+    _x101 = np.exp((1/24)*(Vm + 74)) + 1
+    _x102 = gkr*xkr
+    _x103 = Nao - Nasl*_x21
+    _x104 = Naj*_x21 - Nao
+    _x105 = Cao - Casl*_x86
+    _x106 = RToF*np.log(Ko/Ki)
+    _x107 = -Vm + _x106
+    _x108 = Caj*_x86 - Cao
+    _x109 = Fjunc_CaL*_x18 + Fsl_CaL*_x61
+    _x110 = _x22**(-2.0)
+    _x111 = _x110*_x20*_x21*_x24
+    _x112 = Ki*_x21 - Ko
+    _x113 = _x87**(-2.0)
+    _x114 = FoRT*(0.01245*_x29 + _x30)/_x31**2
+    _x115 = _x44**(-2.0)
+    _x116 = np.exp(0.2385*Vm - 0.2385*_x106)
+    _x117 = 7.35454251046446e-7*_x116 + 1
+    _x118 = 1.02/_x117
+    _x119 = np.exp(-0.5143*Vm + 0.5143*_x106)
+    _x120 = 0.0867722941576933*_x119 + 1
+    _x121 = _x120**(-1.0)
+    _x122 = np.exp(0.08032*Vm - 0.08032*_x106)
+    _x123 = np.exp(0.06175*Vm - 0.06175*_x106)
+    _x124 = 0.762624006506308*_x122 + 1.15340563518656e-16*_x123
+    _x125 = _x118 + _x121*_x124
+    _x126 = _x125**(-1.0)
+    _x127 = _x118*gki
+    _x128 = _x116/_x117**2
+    D = np.zeros(Y.shape)
+    C = np.zeros(Y.shape[:-1] + (1, 2))
+    D[..., 5] = -1.7*Caj - 0.0119
+    D[..., 6] = -1.7*Casl - 0.0119
+    D[..., 13] = -_x2 - _x4
+    D[..., 14] = -_x2 - kom
+    D[..., 15] = -_x4 - kom
+    D[..., 16] = -Naj*kon_na - koff_na
+    D[..., 17] = -Nasl*kon_na - koff_na
+    D[..., 18] = -Cai*kon_tncl - koff_tncl
+    D[..., 19] = -Cai*kon_tnchca - koff_tnchca
+    D[..., 20] = -Mgi*kon_tnchmg - koff_tnchmg
+    D[..., 21] = -Cai*kon_cam - koff_cam
+    D[..., 22] = -Cai*kon_myoca - koff_myoca
+    D[..., 23] = -Mgi*kon_myomg - koff_myomg
+    D[..., 24] = -Cai*kon_sr - koff_sr
+    D[..., 25] = -Caj*kon_sll - koff_sll
+    D[..., 26] = -Casl*kon_sll - koff_sll
+    D[..., 27] = -Caj*kon_slh - koff_slh
+    D[..., 28] = -Casl*kon_slh - koff_slh
+    D[..., 29] = -_x5
+    D[..., 30] = -5.348e-6*Vmyo_Vsr - _x0*_x12*_x8 + _x0*_x13*_x14*_x8*hillSRCaP*serca - _x6 - _x7
+    D[..., 31] = -Cmem_FVjunc*(GNaB_junc*_x15 + _x15*_x17 + _x19*_x25*_x26*caNa_junc + _x50*_x51*_x53 - _x51*_x54*_x58 + _x32*nak_junc/(Naj**5*_x28**2)) - Jna_juncsl_Vjunc - kon_na*(Bmax_Naj - NaBj)
+    D[..., 32] = -Cmem_FVsl*(GNaB_sl*_x59 + _x26*_x62*_x63 + _x53*_x75*_x76 - _x54*_x76*_x80 + _x59*_x60 + _x32*nak_sl/(Nasl**5*_x64**2)) - Jna_juncsl_Vsl - Jna_slmyo_Vsl - kon_na*(Bmax_Nasl - NaBsl)
+    D[..., 33] = -Jna_slmyo_Vmyo
+    D[..., 35] = -Cmem_FVjunc*(Caj**0.6*_x84/_x83 - Caj**2.2*_x84/_x83**2 + GCaB_junc*_x81*_x82 + _x19*_x89*_x90*ca_junc + _x50*_x91 + 1.0*_x58*(KmNao3*_x37 + Nao3 + _x38) - _x57*_x92*_x93/(Caj**3*_x47**2)) - Jca_juncsl_Vjunc - 5.348e-6*Vmyo_Vjunc - Vsr_Vjunc*_x6 - kon_slh*(Bmax_SLhighj - SLHj) - kon_sll*(Bmax_SLlowj - SLLj)
+    D[..., 36] = -Cmem_FVsl*(Casl**0.6*_x96/_x95 - Casl**2.2*_x96/_x95**2 + GCaB_sl*_x82*_x94 + _x62*_x90*_x97 + _x75*_x91 + 1.0*_x80*(KmNao3*_x68 + Nao3 + _x69) - _x71*_x79*_x93*ncx_sl/(Casl**3*_x72**2)) - Jca_juncsl_Vsl - Jca_slmyo_Vsl - kon_slh*(Bmax_SLhighsl - SLHsl) - kon_sll*(Bmax_SLlowsl - SLLsl)
+    D[..., 37] = -Jca_slmyo_Vmyo - _x11*_x13*_x14*_x98 - _x12*_x98 - kon_cam*(Bmax_CaM - CaM) + kon_myoca*(-Bmax_myosin + Myoc + Myom) - kon_sr*(Bmax_SR - SRB) + kon_tnchca*(-Bmax_TnChigh + TnCHc + TnCHm) - kon_tncl*(Bmax_TnClow - TnCL)
+    D[..., 38] = 2*Caj*FoRT*Vm*_x18*_x86*_x88*ca_junc*d*f + 2*Casl*FoRT*Vm*_x61*_x86*_x88*ca_sl*d*f + FoRT*Ki*Vm*_x109*_x21*_x23*caK*d*f + FoRT*Naj*Vm*_x18*_x21*_x23*caNa_junc*d*f + FoRT*Nasl*Vm*_x21*_x23*_x61*caNa_sl*d*f + FoRT*Vm*_x103*_x110*_x21*_x61*caNa_sl*d*f + 2*FoRT*Vm*_x105*_x113*_x61*_x86*ca_sl*d*f - GCaB_junc - GCaB_sl - GClB - GClCa_junc/(KdClCa*_x81 + 1) - GClCa_sl/(KdClCa*_x94 + 1) - GNaB_junc - GNaB_sl - Gkp/_x100 + 298.741733340907*Gkp*_x107*_x99/_x100**2 - Gks*xks**2 - GtoFast*xtof*ytof - GtoSlow*xtos*ytos - _x103*_x61*_x63 - _x104*_x111*_x18*caNa_junc + _x104*_x18*_x23*caNa_junc*d*f - _x105*_x61*_x97 - 1.78913955652069e-7*_x107*_x126*_x128*gki - _x107*_x127*(0.0446269908853017*_x119*_x124/_x120**2 + _x121*(0.0612539602025867*_x122 + 7.12227979727698e-18*_x123) - 1.78913955652069e-7*_x128)/_x125**2 - _x108*_x113*_x18*_x24*_x85*_x86*ca_junc + _x108*_x18*_x88*ca_junc*d*f - _x109*_x111*_x112*caK + _x109*_x112*_x23*caK*d*f - _x114*nak_sl/_x64 - _x114*nak_junc/_x28 + _x115*_x42*_x71*_x73*_x79*ksat*ncx_sl*nu1FoRT - _x115*_x43*_x48*_x56*_x92*nu1FoRT - _x126*_x127 - _x17 + _x41*_x45*_x48*ncx_junc*(-_x35*_x52*nuFoRT + _x55*nu1FoRT) - _x60 - _x75*(-_x77*nu1FoRT + _x78*nuFoRT) - _x102/_x101 - 1/24*_x102*_x107*np.exp((1/24)*Vm + 37/12)/_x101**2
+    C[..., 0, 0] = _x5
+    C[..., 0, 1] = _x7
+    return D, C
+
+
+def grandi_bers_atrial_diagonal(Y, t, P):
+    """Diagonal D of the grandi_bers_atrial_prepared Jacobian for an (..., n_states) array with the gate rows
+    left at zero, and the entries C[..., k] = (J[i, j], J[j, i]) of the coupled pairs (i, j)."""
+    Y = np.asarray(Y, dtype=float)
+    (m, h, j, d, f, fcaBj, fcaBsl, xtof, ytof, xkr, xks, RyRr, RyRo, RyRi, NaBj,
+     NaBsl, TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl, SLHj, SLHsl,
+     Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai, Vm, rkuro, skuro, ml, hl,
+     INal) = np.moveaxis(Y, -1, 0)
+    FoRT = P.FoRT
+    RToF = P.RToF
+    Ko = P.Ko
+    Nao = P.Nao
+    Cao = P.Cao
+    Mgi = P.Mgi
+    GNa_junc = P.GNa_junc
+    GNa_sl = P.GNa_sl
+    nak_sigma = P.nak_sigma
+    nak_junc = P.nak_junc
+    nak_sl = P.nak_sl
+    KmNaip = P.KmNaip
+    gkr = P.gkr
+    gki = P.gki
+    Gks = P.Gks
+    Gkp = P.Gkp
+    GtoFast = P.GtoFast
+    GClCa_junc = P.GClCa_junc
+    GClCa_sl = P.GClCa_sl
+    KdClCa = P.KdClCa
+    GClB = P.GClB
+    ca_junc = P.ca_junc
+    ca_sl = P.ca_sl
+    caK = P.caK
+    Fjunc_CaL = P.Fjunc_CaL
+    Fsl_CaL = P.Fsl_CaL
+    caNa_junc = P.caNa_junc
+    caNa_sl = P.caNa_sl
+    ncx_junc = P.ncx_junc
+    ncx_sl = P.ncx_sl
+    Kdact = P.Kdact
+    nuFoRT = P.nuFoRT
+    nu1FoRT = P.nu1FoRT
+    ksat = P.ksat
+    Nao3 = P.Nao3
+    KmCaiNao3 = P.KmCaiNao3
+    KmNai = P.KmNai
+    KmNao3 = P.KmNao3
+    KmCai = P.KmCai
+    KmCao = P.KmCao
+    pca_junc = P.pca_junc
+    pca_sl = P.pca_sl
+    KmPCa16 = P.KmPCa16
+    GNaB_junc = P.GNaB_junc
+    GNaB_sl = P.GNaB_sl
+    GCaB_junc = P.GCaB_junc
+    GCaB_sl = P.GCaB_sl
+    ec50SR = P.ec50SR
+    koCa = P.koCa
+    kiCa = P.kiCa
+    kom = P.kom
+    kim = P.kim
+    ks = P.ks
+    serca = P.serca
+    Kmf = P.Kmf
+    Kmr = P.Kmr
+    hillSRCaP = P.hillSRCaP
+    kon_na = P.kon_na
+    koff_na = P.koff_na
+    Bmax_Naj = P.Bmax_Naj
+    Bmax_Nasl = P.Bmax_Nasl
+    kon_tncl = P.kon_tncl
+    koff_tncl = P.koff_tncl
+    Bmax_TnClow = P.Bmax_TnClow
+    kon_tnchca = P.kon_tnchca
+    koff_tnchca = P.koff_tnchca
+    kon_tnchmg = P.kon_tnchmg
+    koff_tnchmg = P.koff_tnchmg
+    Bmax_TnChigh = P.Bmax_TnChigh
+    kon_cam = P.kon_cam
+    koff_cam = P.koff_cam
+    Bmax_CaM = P.Bmax_CaM
+    kon_myoca = P.kon_myoca
+    koff_myoca = P.koff_myoca
+    kon_myomg = P.kon_myomg
+    koff_myomg = P.koff_myomg
+    Bmax_myosin = P.Bmax_myosin
+    kon_sr = P.kon_sr
+    koff_sr = P.koff_sr
+    Bmax_SR = P.Bmax_SR
+    kon_sll = P.kon_sll
+    koff_sll = P.koff_sll
+    Bmax_SLlowsl = P.Bmax_SLlowsl
+    Bmax_SLlowj = P.Bmax_SLlowj
+    kon_slh = P.kon_slh
+    koff_slh = P.koff_slh
+    Bmax_SLhighsl = P.Bmax_SLhighsl
+    Bmax_SLhighj = P.Bmax_SLhighj
+    kon_csqn = P.kon_csqn
+    koff_csqn = P.koff_csqn
+    Bmax_Csqn = P.Bmax_Csqn
+    Cmem_FVjunc = P.Cmem_FVjunc
+    Cmem_FVsl = P.Cmem_FVsl
+    Jna_juncsl_Vjunc = P.Jna_juncsl_Vjunc
+    Jna_juncsl_Vsl = P.Jna_juncsl_Vsl
+    Jna_slmyo_Vsl = P.Jna_slmyo_Vsl
+    Jna_slmyo_Vmyo = P.Jna_slmyo_Vmyo
+    Jca_juncsl_Vjunc = P.Jca_juncsl_Vjunc
+    Jca_juncsl_Vsl = P.Jca_juncsl_Vsl
+    Jca_slmyo_Vsl = P.Jca_slmyo_Vsl
+    Jca_slmyo_Vmyo = P.Jca_slmyo_Vmyo
+    Vmyo_Vsr = P.Vmyo_Vsr
+    Vsr_Vjunc = P.Vsr_Vjunc
+    Vmyo_Vjunc = P.Vmyo_Vjunc
+    Vsr_Vmyo = P.Vsr_Vmyo
+    GNaL_junc = P.GNaL_junc
+    GNaL_sl = P.GNaL_sl
+    Gkur = P.Gkur
+    GkAch = P.GkAch
+    SRleak = P.SRleak
+    _x0 = Ca_sr**(-1.0)
+    _x1 = 15 - 14/((_x0*ec50SR)**2.5 + 1)
+    _x2 = Caj*_x1*kiCa
+    _x3 = Caj**2
+    _x4 = kim + _x3*koCa/_x1
+    _x5 = Ca_sr*kon_csqn + koff_csqn
+    _x6 = RyRo*ks
+    _x7 = kon_csqn*(Bmax_Csqn - Csqnb)
+    _x8 = (Ca_sr/Kmr)**hillSRCaP
+    _x9 = (Cai/Kmf)**hillSRCaP
+    _x10 = _x8 + _x9 + 1
+    _x11 = hillSRCaP*serca
+    _x12 = _x11/_x10
+    _x13 = _x8 - _x9
+    _x14 = _x10**(-2.0)
+    _x15 = RToF/Naj
+    _x16 = hl*ml**3
+    _x17 = GNaL_junc*_x16
+    _x18 = h*j*m**3
+    _x19 = GNa_junc*_x18
+    _x20 = fcaBj - 1
+    _x21 = -_x20
+    _x22 = FoRT*Vm
+    _x23 = np.exp(_x22)
+    _x24 = _x23 - 1
+    _x25 = _x24**(-1.0)
+    _x26 = d*f
+    _x27 = _x25*_x26
+    _x28 = Vm*_x23
+    _x29 = KmNaip**4
+    _x30 = 1 + _x29/Naj**4
+    _x31 = np.exp(-0.1*_x22)
+    _x32 = nak_sigma*np.exp(-_x22)
+    _x33 = 0.1245*_x31 + _x32 + 1
+    _x34 = 12*_x29/_x33
+    _x35 = Caj*Nao3
+    _x36 = Naj**3
+    _x37 = Cao*_x36
+    _x38 = KmCai**(-1.0)
+    _x39 = Caj*_x38
+    _x40 = KmNao3*(_x39 + 1)
+    _x41 = KmNai**(-3.0)
+    _x42 = Caj*_x40 + KmCaiNao3*(_x36*_x41 + 1) + KmCao*_x36 + _x35 + _x37
+    _x43 = _x42**(-1.0)
+    _x44 = np.exp(Vm*nu1FoRT)
+    _x45 = _x44*ksat
+    _x46 = _x45 + 1
+    _x47 = _x46**(-1.0)
+    _x48 = Kdact**2
+    _x49 = 1 + _x48/_x3
+    _x50 = _x49**(-1.0)
+    _x51 = _x47*_x50*ncx_junc
+    _x52 = _x43*_x51
+    _x53 = 9*Naj**2
+    _x54 = np.exp(Vm*nuFoRT)
+    _x55 = Cao*_x54
+    _x56 = Cao + KmCaiNao3*_x41 + KmCao
+    _x57 = _x35*_x44
+    _x58 = -Cao*_x36*_x54 + _x57
+    _x59 = -_x58
+    _x60 = _x51*_x59/_x42**2
+    _x61 = RToF/Nasl
+    _x62 = GNaL_sl*_x16
+    _x63 = GNa_sl*_x18
+    _x64 = fcaBsl - 1
+    _x65 = -_x64
+    _x66 = _x27*caNa_sl
+    _x67 = 1 + _x29/Nasl**4
+    _x68 = Casl*Nao3
+    _x69 = Nasl**3
+    _x70 = Cao*_x69
+    _x71 = Casl*_x38
+    _x72 = KmNao3*(_x71 + 1)
+    _x73 = Casl*_x72 + KmCaiNao3*(_x41*_x69 + 1) + KmCao*_x69 + _x68 + _x70
+    _x74 = _x73**(-1.0)
+    _x75 = 1 + _x48/Casl**2
+    _x76 = _x75**(-1.0)
+    _x77 = _x47*_x76*ncx_sl
+    _x78 = _x74*_x77
+    _x79 = 9*Nasl**2
+    _x80 = _x44*_x68
+    _x81 = _x54*_x70
+    _x82 = -_x80 + _x81
+    _x83 = _x77*_x82/_x73**2
+    _x84 = Caj**(-1.0)
+    _x85 = 0.25*RToF
+    _x86 = Caj**1.6 + KmPCa16
+    _x87 = 0.8*pca_junc
+    _x88 = 2*_x22
+    _x89 = np.exp(_x88)
+    _x90 = _x89 - 1
+    _x91 = _x90**(-1.0)
+    _x92 = _x26*_x91
+    _x93 = 0.5*Vm*_x89
+    _x94 = 1.0*Nao3*_x44
+    _x95 = _x43*ncx_junc
+    _x96 = 2.0*_x47*_x48
+    _x97 = Casl**(-1.0)
+    _x98 = Casl**1.6 + KmPCa16
+    _x99 = 0.8*pca_sl
+    _x100 = _x92*ca_sl
+    _x101 = Vsr_Vmyo*_x9/Cai
+    _x102 = np.exp(-0.167224080267559*Vm)
+    _x103 = 1786.47556537862*_x102 + 1
+    _x104 = np.exp((1/24)*(Vm + 74)) + 1
+    _x105 = gkr*xkr
+    _x106 = np.exp((1/12)*(Vm + 91)) + 1
+    _x107 = Nao - Nasl*_x23
+    _x108 = Naj*_x23 - Nao
+    _x109 = Cao - Casl*_x89
+    _x110 = RToF*np.log(Ko/Ki)
+    _x111 = -Vm + _x110
+    _x112 = Caj*_x89 - Cao
+    _x113 = Fjunc_CaL*_x20 + Fsl_CaL*_x64
+    _x114 = _x24**(-2.0)
+    _x115 = _x114*_x22*_x23*_x26
+    _x116 = Ki*_x23 - Ko
+    _x117 = _x90**(-2.0)
+    _x118 = FoRT*(0.01245*_x31 + _x32)/_x33**2
+    _x119 = _x46**(-2.0)
+    _x120 = np.exp(0.2385*Vm - 0.2385*_x110)
+    _x121 = 7.35454251046446e-7*_x120 + 1
+    _x122 = 1.02/_x121
+    _x123 = np.exp(-0.5143*Vm + 0.5143*_x110)
+    _x124 = 0.0867722941576933*_x123 + 1
+    _x125 = _x124**(-1.0)
+    _x126 = np.exp(0.08032*Vm - 0.08032*_x110)
+    _x127 = np.exp(0.06175*Vm - 0.06175*_x110)
+    _x128 = 0.762624006506308*_x126 + 1.15340563518656e-16*_x127
+    _x129 = _x122 + _x125*_x128
+    _x130 = _x129**(-1.0)
+    _x131 = _x122*gki
+    _x132 = _x120/_x121**2
+    D = np.zeros(Y.shape)
+    C = np.zeros(Y.shape[:-1] + (1, 2))
+    D[..., 5] = -1.7*Caj - 0.0119
+    D[..., 6] = -1.7*Casl - 0.0119
+    D[..., 11] = -_x2 - _x4
+    D[..., 12] = -_x2 - kom
+    D[..., 13] = -_x4 - kom
+    D[..., 14] = -Naj*kon_na - koff_na
+    D[..., 15] = -Nasl*kon_na - koff_na
+    D[..., 16] = -Cai*kon_tncl - koff_tncl
+    D[..., 17] = -Cai*kon_tnchca - koff_tnchca
+    D[..., 18] = -Mgi*kon_tnchmg - koff_tnchmg
+    D[..., 19] = -Cai*kon_cam - koff_cam
+    D[..., 20] = -Cai*kon_myoca - koff_myoca
+    D[..., 21] = -Mgi*kon_myomg - koff_myomg
+    D[..., 22] = -Cai*kon_sr - koff_sr
+    D[..., 23] = -Caj*kon_sll - koff_sll
+    D[..., 24] = -Casl*kon_sll - koff_sll
+    D[..., 25] = -Caj*kon_slh - koff_slh
+    D[..., 26] = -Casl*kon_slh - koff_slh
+    D[..., 27] = -_x5
+    D[..., 28] = -SRleak*Vmyo_Vsr - _x0*_x12*_x8 + _x0*_x13*_x14*_x8*hillSRCaP*serca - _x6 - _x7
+    D[..., 29] = -Cmem_FVjunc*(GNaB_junc*_x15 + _x15*_x17 + _x15*_x19 + _x21*_x27*_x28*caNa_junc + _x52*_x53*_x55 - _x53*_x56*_x60 + _x34*nak_junc/(Naj**5*_x30**2)) - Jna_juncsl_Vjunc - kon_na*(Bmax_Naj - NaBj)
+    D[..., 30] = -Cmem_FVsl*(GNaB_sl*_x61 + _x28*_x65*_x66 + _x55*_x78*_x79 - _x56*_x79*_x83 + _x61*_x62 + _x61*_x63 + _x34*nak_sl/(Nasl**5*_x67**2)) - Jna_juncsl_Vsl - Jna_slmyo_Vsl - kon_na*(Bmax_Nasl - NaBsl)
+    D[..., 31] = -Jna_slmyo_Vmyo
+    D[..., 33] = -Cmem_FVjunc*(Caj**0.6*_x87/_x86 - Caj**2.2*_x87/_x86**2 + GCaB_junc*_x84*_x85 + _x21*_x92*_x93*ca_junc + _x52*_x94 + 1.0*_x60*(KmNao3*_x39 + Nao3 + _x40) - _x59*_x95*_x96/(Caj**3*_x49**2)) - Jca_juncsl_Vjunc - SRleak*Vmyo_Vjunc - Vsr_Vjunc*_x6 - kon_slh*(Bmax_SLhighj - SLHj) - kon_sll*(Bmax_SLlowj - SLLj)
+    D[..., 34] = -Cmem_FVsl*(Casl**0.6*_x99/_x98 - Casl**2.2*_x99/_x98**2 + GCaB_sl*_x85*_x97 + _x100*_x65*_x93 + _x78*_x94 + 1.0*_x83*(KmNao3*_x71 + Nao3 + _x72) - _x74*_x82*_x96*ncx_sl/(Casl**3*_x75**2)) - Jca_juncsl_Vsl - Jca_slmyo_Vsl - kon_slh*(Bmax_SLhighsl - SLHsl) - kon_sll*(Bmax_SLlowsl - SLLsl)
+    D[..., 35] = -Jca_slmyo_Vmyo - _x101*_x11*_x13*_x14 - _x101*_x12 - kon_cam*(Bmax_CaM - CaM) + kon_myoca*(-Bmax_myosin + Myoc + Myom) - kon_sr*(Bmax_SR - SRB) + kon_tnchca*(-Bmax_TnChigh + TnCHc + TnCHm) - kon_tncl*(Bmax_TnClow - TnCL)
+    D[..., 36] = 2*Caj*FoRT*Vm*_x20*_x89*_x91*ca_junc*d*f + 2*Casl*FoRT*Vm*_x64*_x89*_x91*ca_sl*d*f + FoRT*Ki*Vm*_x113*_x23*_x25*caK*d*f + FoRT*Naj*Vm*_x20*_x23*_x25*caNa_junc*d*f + FoRT*Nasl*Vm*_x23*_x25*_x64*caNa_sl*d*f + FoRT*Vm*_x107*_x114*_x23*_x64*caNa_sl*d*f + 2*FoRT*Vm*_x109*_x117*_x64*_x89*ca_sl*d*f - GCaB_junc - GCaB_sl - GClB - GClCa_junc/(KdClCa*_x84 + 1) - GClCa_sl/(KdClCa*_x97 + 1) - GNaB_junc - GNaB_sl - GkAch*(0.08 + 0.4/_x106) - 0.0333333333333333*GkAch*_x111*np.exp((1/12)*Vm + 91/12)/_x106**2 + 298.741733340907*Gkp*_x102*_x111/_x103**2 - Gkp/_x103 - Gks*xks**2 - Gkur*rkuro*skuro - GtoFast*xtof*ytof - _x100*_x109*_x64 - _x107*_x64*_x66 - _x108*_x115*_x20*caNa_junc + _x108*_x20*_x25*caNa_junc*d*f - 1.78913955652069e-7*_x111*_x130*_x132*gki - _x111*_x131*(0.0446269908853017*_x123*_x128/_x124**2 + _x125*(0.0612539602025867*_x126 + 7.12227979727698e-18*_x127) - 1.78913955652069e-7*_x132)/_x129**2 - _x112*_x117*_x20*_x26*_x88*_x89*ca_junc + _x112*_x20*_x91*ca_junc*d*f - _x113*_x115*_x116*caK + _x113*_x116*_x25*caK*d*f - _x118*nak_sl/_x67 - _x118*nak_junc/_x30 + _x119*_x44*_x74*_x76*_x82*ksat*ncx_sl*nu1FoRT - _x119*_x45*_x50*_x58*_x95*nu1FoRT - _x130*_x131 - _x17 - _x19 + _x43*_x47*_x50*ncx_junc*(-_x37*_x54*nuFoRT + _x57*nu1FoRT) - _x62 - _x63 - _x78*(-_x80*nu1FoRT + _x81*nuFoRT) - _x105/_x104 - 1/24*_x105*_x111*np.exp((1/24)*Vm + 37/12)/_x104**2
+    C[..., 0, 0] = _x5
+    C[..., 0, 1] = _x7
+    return D, C
@@ -0,0 +1,338 @@
+"""
+Generate analytic Jacobians of the Grandi-Bers ventricular and atrial models.
+
+The prepared right hand sides in GBV_prepared.py are evaluated with sympy
+symbols in place of the states and the prepared parameters, differentiated,
+and the nonzero entries are written as Python code to GBV_jacobian.py. The
+generated functions take the same prepared record as the right hand sides,
+so one generated file serves every parameter set. The diagonal of the
+Jacobian is also written in NumPy form for whole populations, for the
+generalized Rush-Larsen integrator in GBV_batch.py, and the derivatives
+with respect to the prepared parameters for the forward sensitivities in
+GBV_sensitivity.py.
+
+Usage:
+======
+python GBV_jacobian_codegen.py              # regenerate GBV_jacobian.py
+python GBV_jacobian_codegen.py benchmark    # compare against finite differences
+"""
+
+import sys
+import types
+import textwrap
+import numpy as np
+import sympy as sp
+from sympy.printing.pycode import PythonCodePrinter
+from sympy.printing.numpy import NumPyPrinter
+
+import GBV_prepared
+from GBV_batch import VENTRICULAR_GATES, ATRIAL_GATES, VENTRICULAR_PAIRS, ATRIAL_PAIRS
+
+
+VENTRICULAR_STATES = ["m", "h", "j", "d", "f", "fcaBj", "fcaBsl", "xtos", "ytos",
+                      "xtof", "ytof", "xkr", "xks", "RyRr", "RyRo", "RyRi", "NaBj",
+                      "NaBsl", "TnCL", "TnCHc", "TnCHm", "CaM", "Myoc", "Myom", "SRB",
+                      "SLLj", "SLLsl", "SLHj", "SLHsl", "Csqnb", "Ca_sr", "Naj", "Nasl",
+                      "Nai", "Ki", "Caj", "Casl", "Cai", "Vm"]
+
+ATRIAL_STATES = ["m", "h", "j", "d", "f", "fcaBj", "fcaBsl", "xtof", "ytof", "xkr",
+                 "xks", "RyRr", "RyRo", "RyRi", "NaBj", "NaBsl", "TnCL", "TnCHc",
+                 "TnCHm", "CaM", "Myoc", "Myom", "SRB", "SLLj", "SLLsl", "SLHj",
+                 "SLHsl", "Csqnb", "Ca_sr", "Naj", "Nasl", "Nai", "Ki", "Caj", "Casl",
+                 "Cai", "Vm", "rkuro", "skuro", "ml", "hl", "INal"]
+
+
+def _ina_gates(Vm):
+    """Symbolic version of GBV_prepared._ina_gates with the Vm >= -40 branch
+    written as a Piecewise."""
+    exp = sp.exp
+    mss = 1 / ((1 + exp( -(56.86 + Vm) / 9.03 ))**2)
+    taum = 0.1292 * exp(-((Vm+45.79)/15.54)**2) + 0.06487 * exp(-((Vm-4.823)/51.12)**2)
+    hss = 1 / ((1 + exp( (Vm + 71.55)/7.43 ))**2)
+    ah = 0.057 * exp( -(Vm + 80) / 6.8 )
+    bh = 2.7 * exp( 0.079 * Vm) + 3.1*10**5 * exp(0.3485 * Vm)
+    aj = ((-2.5428 * 10**4*exp(0.2444*Vm) - 6.948*10**-6 * exp(-0.04391*Vm)) * (Vm + 37.78)) /(1 + exp( 0.311 * (Vm + 79.23) ))
+    bj = (0.02424 * exp( -0.01052 * Vm )) / (1 + exp( -0.1378 * (Vm + 40.14) ))
+    tauh = sp.Piecewise((1 / (0.77 / (0.13*(1 + exp( -(Vm + 10.66) / 11.1 )))), Vm >= -40),
+                        (1 / (ah + bh), True))
+    tauj = sp.Piecewise((1 / ((0.6 * exp( 0.057 * Vm)) / (1 + exp( -0.1 * (Vm + 32) ))), Vm >= -40),
+                        (1 / (aj + bj), True))
+    return mss, taum, hss, tauh, tauj
+
+
+def _symbolic_namespace():
+    """Rebind the prepared right hand sides to sympy functions."""
+    ns = dict(vars(GBV_prepared))
+    ns.update(exp=sp.exp, log=sp.log, _ina_gates=_ina_gates)
+    for name in ('_common_fluxes', '_concentrations', 'grandi_bers_prepared',
+                 'grandi_bers_atrial_prepared'):
+        function = getattr(GBV_prepared, name)
+        ns[name] = types.FunctionType(function.__code__, ns, name)
+    return ns
+
+
+def symbolic_rhs(rhs_name, record_type, state_names, t=10.0):
+    """Return the state symbols, the parameter symbols and the right hand
+    side of a prepared RHS at time t as sympy expressions."""
+    y = sp.symbols(state_names, real=True)
+    fields = record_type._fields[:-1]
+    P = record_type(*sp.symbols(fields, real=True), None)
+    rhs = _symbolic_namespace()[rhs_name]
+    return y, P, [sp.sympify(expr) for expr in rhs(list(y), t, P)]
+
+
+def symbolic_jacobian(rhs_name, record_type, state_names):
+    """Return the state symbols, the parameter symbols and the nonzero
+    entries {(i, j): expression} of the Jacobian of a prepared RHS."""
+    # I_app does not depend on the states, so any t gives the same Jacobian
+    y, P, ydot = symbolic_rhs(rhs_name, record_type, state_names)
+    entries = {}
+    for i, expr in enumerate(ydot):
+        for j in sorted(y.index(s) for s in expr.free_symbols & set(y)):
+            entries[i, j] = sp.diff(expr, y[j])
+    return y, P, entries
+
+
+def symbolic_parameter_jacobian(rhs_name, record_type, state_names):
+    """Return the state symbols, the parameter symbols and the nonzero
+    entries {(i, k): expression} of the derivative of a prepared RHS with
+    respect to the fields of the prepared record, with the stimulus on."""
+    y, P, ydot = symbolic_rhs(rhs_name, record_type, state_names, t=0.0)
+    fields = list(P[:-1])
+    entries = {}
+    for i, expr in enumerate(ydot):
+        for k in sorted(fields.index(s) for s in expr.free_symbols & set(fields)):
+            entries[i, k] = sp.diff(expr, fields[k])
+    return y, P, entries
+
+
+def _unpack(y, value):
+    """Lines unpacking value into the state names, wrapped at 80 columns."""
+    names = '(' + ', '.join(str(s) for s in y) + ')\xa0=\xa0' + value
+    return [line.replace('\xa0', ' ') for line in
+            textwrap.wrap(names, 80, initial_indent=' '*4, subsequent_indent=' '*5)]
+
+
+def _function_code(name, doc, y, P, entries):
+    """Python source of one Jacobian function."""
+    keys = sorted(entries)
+    replacements, reduced = sp.cse([entries[k] for k in keys],
+                                   symbols=sp.numbered_symbols('_x'), optimizations='basic')
+    used = set().union(*(expr.free_symbols for _, expr in replacements),
+                       *(expr.free_symbols for expr in reduced))
+    printer = PythonCodePrinter({'standard': 'python3'})
+
+    lines = ['def {}(y, t, P):'.format(name),
+             '    """{}"""'.format(doc),
+             *_unpack(y, 'y')]
+    for field in P[:-1]:
+        if field in used:
+            lines.append('    {0} = P.{0}'.format(field))
+    for symbol, expr in replacements:
+        lines.append('    {} = {}'.format(symbol, printer.doprint(expr)))
+    lines.append('    J = np.zeros(({0}, {0}))'.format(len(y)))
+    for (i, j), expr in zip(keys, reduced):
+        lines.append('    J[{}, {}] = {}'.format(i, j, printer.doprint(expr)))
+    lines.append('    if P.dynamic is not None:')
+    lines.append('        J *= np.asarray(P.dynamic)[:, None]')
+    lines.append('    return J')
+    return '\n'.join(lines).replace('math.', '')
+
+
+def _parameter_function_code(name, doc, y, P, entries):
+    """Python source of one derivative with respect to the prepared record,
+    with the I_app column switched off after the stimulus."""
+    keys = sorted(entries)
+    replacements, reduced = sp.cse([entries[k] for k in keys],
+                                   symbols=sp.numbered_symbols('_x'), optimizations='basic')
+    used = set().union(*(expr.free_symbols for _, expr in replacements),
+                       *(expr.free_symbols for expr in reduced))
+    printer = PythonCodePrinter({'standard': 'python3'})
+    fields = [str(field) for field in P[:-1]]
+
+    lines = ['def {}(y, t, P):'.format(name),
+             '    """{}"""'.format(doc),
+             *_unpack(y, 'y')]
+    for field in P[:-1]:
+        if field in used:
+            lines.append('    {0} = P.{0}'.format(field))
+    for symbol, expr in replacements:
+        lines.append('    {} = {}'.format(symbol, printer.doprint(expr)))
+    lines.append('    Jp = np.zeros(({}, {}))'.format(len(y), len(fields)))
+    for (i, k), expr in zip(keys, reduced):
+        lines.append('    Jp[{}, {}] = {}'.format(i, k, printer.doprint(expr)))
+    lines.append('    if t >= 5:')
+    lines.append('        Jp[:, {}] = 0.0'.format(fields.index('I_app')))
+    lines.append('    if P.dynamic is not None:')
+    lines.append('        Jp *= np.asarray(P.dynamic)[:, None]')
+    lines.append('    return Jp')
+    return '\n'.join(lines).replace('math.', '')
+
+
+def _diagonal_code(name, doc, y, P, entries, gates, pairs):
+    """NumPy source of the Jacobian diagonal for (..., n_states) arrays, leaving
+    out the gate rows, followed by the off-diagonal entries of the coupled
+    pairs."""
+    keys = [(i, i) for i in range(len(y)) if (i, i) in entries and i not in gates]
+    coupled = [key for i, j in pairs for key in ((i, j), (j, i))]
+    replacements, reduced = sp.cse([entries[k] for k in keys + coupled],
+                                   symbols=sp.numbered_symbols('_x'), optimizations='basic')
+    used = set().union(*(expr.free_symbols for _, expr in replacements),
+                       *(expr.free_symbols for expr in reduced))
+    printer = NumPyPrinter({'standard': 'python3'})
+
+    lines = ['def {}(Y, t, P):'.format(name),
+             '    """{}"""'.format(doc),
+             '    Y = np.asarray(Y, dtype=float)',
+             *_unpack(y, 'np.moveaxis(Y, -1, 0)')]
+    for field in P[:-1]:
+        if field in used:
+            lines.append('    {0} = P.{0}'.format(field))
+    for symbol, expr in replacements:
+        lines.append('    {} = {}'.format(symbol, printer.doprint(expr)))
+    lines.append('    D = np.zeros(Y.shape)')
+    lines.append('    C = np.zeros(Y.shape[:-1] + ({}, 2))'.format(len(pairs)))
+    for (i, _), expr in zip(keys, reduced):
+        lines.append('    D[..., {}] = {}'.format(i, printer.doprint(expr)))
+    for n, expr in enumerate(reduced[len(keys):]):
+        lines.append('    C[..., {}, {}] = {}'.format(n//2, n % 2, printer.doprint(expr)))
+    lines.append('    return D, C')
+    return '\n'.join(lines).replace('numpy.', 'np.')
+
+
+def generate(filename='GBV_jacobian.py'):
+    """Write the generated Jacobian module."""
+    models = [('grandi_bers_jacobian', 'grandi_bers_prepared', GBV_prepared.GBVParameters,
+               VENTRICULAR_STATES, 'VENTRICULAR_SPARSITY',
+               'Analytic Jacobian of grandi_bers_prepared, usable as odeint Dfun with args (P,).'),
+              ('grandi_bers_atrial_jacobian', 'grandi_bers_atrial_prepared', GBV_prepared.GBVAtrialParameters,
+               ATRIAL_STATES, 'ATRIAL_SPARSITY',
+               'Analytic Jacobian of grandi_bers_atrial_prepared, usable as odeint Dfun with args (P,).')]
+
+    code = ['# Generated by GBV_jacobian_codegen.py from GBV_prepared.py, do not edit by hand',
+            '"""',
+            'Analytic Jacobians and sparsity patterns of the Grandi-Bers models, and',
+            'NumPy Jacobian diagonals for the generalized Rush-Larsen steps in GBV_batch.py.',
+            'The parameter Jacobians differentiate with respect to the prepared record',
+            'instead of the states, for the forward sensitivities in GBV_sensitivity.py.',
+            '',
+            'Example:',
+            '========',
+            'from GBV_prepared import prepare, grandi_bers_prepared',
+            'from GBV_jacobian import grandi_bers_jacobian, jacobian_sparsity',
+            '',
+            'P = prepare(set_Pd())',
+            'Y = odeint(grandi_bers_prepared, y0, t, (P,), Dfun=grandi_bers_jacobian)',
+            'sol = solve_ivp(lambda t, y: grandi_bers_prepared(y, t, P), (0, 1000), y0,',
+            "                method='BDF', jac_sparsity=jacobian_sparsity(VENTRICULAR_SPARSITY))",
+            '"""',
+            '',
+            'import numpy as np',
+            'from math import exp, log',
+            'from scipy.sparse import csc_matrix',
+            '']
+    jacobians = []
+    for name, rhs_name, record_type, states, pattern_name, doc in models:
+        print('Differentiating', rhs_name)
+        y, P, entries = symbolic_jacobian(rhs_name, record_type, states)
+        jacobians.append((y, P, entries))
+        rows, cols = zip(*sorted(entries))
+        code.append('{} = ('.format(pattern_name))
+        for index in (rows, cols):
+            code.append('    np.array([')
+            code += textwrap.wrap(', '.join(str(i) for i in index), 80,
+                                  initial_indent=' '*8, subsequent_indent=' '*8)
+            code.append('    ]),')
+        code += [')', '']
+    code += ['',
+             'def jacobian_sparsity(pattern):',
+             '    """Return a sparsity pattern as a 0/1 csc_matrix for solve_ivp(jac_sparsity=...)."""',
+             '    rows, cols = pattern',
+             '    n = max(rows.max(), cols.max()) + 1',
+             '    return csc_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))',
+             '',
+             '',
+             'def sparse_jacobian(jacobian, pattern):',
+             '    """Wrap a generated Jacobian for solve_ivp(jac=...) as a sparse matrix."""',
+             '    rows, cols = pattern',
+             '    n = max(rows.max(), cols.max()) + 1',
+             '    def jac(t, y, P):',
+             '        return csc_matrix((jacobian(y, t, P)[rows, cols], (rows, cols)), shape=(n, n))',
+             '    return jac',
+             '']
+    for (name, _, _, _, _, doc), (y, P, entries) in zip(models, jacobians):
+        print('Generating code for', name, '({} nonzeros)'.format(len(entries)))
+        code += ['', _function_code(name, doc, y, P, entries), '']
+    for name, rhs_name, record_type, states, _, _ in models:
+        name = name.replace('jacobian', 'parameter_jacobian')
+        print('Differentiating', rhs_name, 'with respect to the parameters')
+        y, P, entries = symbolic_parameter_jacobian(rhs_name, record_type, states)
+        doc = ('Derivative of {} with respect to the fields of the prepared record,\n'
+               '    J[i, k] = d ydot[i]/d P[k], in the order of {}._fields.'
+               .format(rhs_name, record_type.__name__))
+        print('Generating code for', name, '({} nonzeros)'.format(len(entries)))
+        code += ['', _parameter_function_code(name, doc, y, P, entries), '']
+    for (name, rhs_name, _, _, _, _), (y, P, entries), gates, pairs in zip(
+            models, jacobians, (VENTRICULAR_GATES, ATRIAL_GATES), (VENTRICULAR_PAIRS, ATRIAL_PAIRS)):
+        name = name.replace('jacobian', 'diagonal')
+        doc = ('Diagonal D of the {} Jacobian for an (..., n_states) array with the gate rows\n'
+               '    left at zero, and the entries C[..., k] = (J[i, j], J[j, i]) of the coupled pairs (i, j).'
+               .format(rhs_name))
+        print('Generating code for', name)
+        code += ['', _diagonal_code(name, doc, y, P, entries, gates, pairs), '']
+
+    with open(filename, 'w') as outfile:
+        outfile.write('\n'.join(code))
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark():
+    """Count RHS evaluations and wall time over one 1000 ms beat, with and
+    without the analytic Jacobian."""
+    from time import perf_counter
+    from scipy.integrate import odeint, solve_ivp
+    from L6_widgets import set_Pd, set_Pd_atrial
+    from GBV_prepared import prepare, prepare_atrial, grandi_bers_prepared, grandi_bers_atrial_prepared
+    import GBV_jacobian as gj
+
+    t = np.linspace(0, 1000, 1001)
+    cases = [('ventricular', grandi_bers_prepared, gj.grandi_bers_jacobian, gj.VENTRICULAR_SPARSITY,
+              prepare(set_Pd()), np.load('Widget_init.npy')),
+             ('atrial', grandi_bers_atrial_prepared, gj.grandi_bers_atrial_jacobian, gj.ATRIAL_SPARSITY,
+              prepare_atrial(set_Pd_atrial()), np.load('Widget_init_atrial.npy'))]
+
+    for name, rhs, jac, pattern, P, y0 in cases:
+        print(name, '({} states, {} nonzeros in the Jacobian)'.format(len(y0), len(pattern[0])))
+        calls = [0]
+        def counted(y, t, P):
+            calls[0] += 1
+            return rhs(y, t, P)
+
+        for label, Dfun in (('odeint, finite differences', None), ('odeint, analytic Dfun', jac)):
+            calls[0] = 0
+            start = perf_counter()
+            Y, info = odeint(counted, y0, t, (P,), Dfun=Dfun, full_output=True)
+            elapsed = perf_counter() - start
+            print('  {:32s} RHS calls: {:6d}  Jacobians: {:4d}  time: {:6.3f} s'.format(
+                label, calls[0], info['nje'][-1], elapsed))
+
+        fun = lambda t, y: counted(y, t, P)
+        sparse_jac = gj.sparse_jacobian(jac, pattern)
+        for label, kwargs in (('BDF, dense finite differences', {}),
+                              ('BDF, jac_sparsity', {'jac_sparsity': gj.jacobian_sparsity(pattern)}),
+                              ('BDF, analytic sparse jac', {'jac': lambda t, y: sparse_jac(t, y, P)})):
+            calls[0] = 0
+            start = perf_counter()
+            sol = solve_ivp(fun, (0, 1000), y0, method='BDF', t_eval=t, rtol=1e-6, atol=1e-9, **kwargs)
+            elapsed = perf_counter() - start
+            print('  {:32s} RHS calls: {:6d}  Jacobians: {:4d}  time: {:6.3f} s'.format(
+                label, calls[0], sol.njev, elapsed))
+
+
+if __name__ == '__main__':
+    if 'benchmark' in sys.argv[1:]:
+        benchmark()
+    else:
+        generate()
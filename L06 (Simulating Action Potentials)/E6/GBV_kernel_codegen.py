@@ -0,0 +1,106 @@
+"""
+Generate scalar kernels of the Grandi-Bers models for numba.
+
+The prepared right hand sides in GBV_prepared.py are evaluated with sympy
+symbols (see GBV_jacobian_codegen.py) and written to GBV_kernels.py as
+flat scalar code that reads the parameters from the vector as_array(P)
+and writes its results into output arrays, which is what numba compiles
+best. Two kernels are written per model: the right hand side alone, and
+the right hand side together with the Jacobian diagonal and the entries of
+the coupled pairs, sharing their common subexpressions, for the
+generalized Rush-Larsen steps of GBV_compiled.py.
+
+Usage:
+======
+python GBV_kernel_codegen.py              # regenerate GBV_kernels.py
+"""
+
+import sympy as sp
+from sympy.printing.pycode import PythonCodePrinter
+
+import GBV_prepared
+from GBV_batch import VENTRICULAR_PAIRS, ATRIAL_PAIRS
+from GBV_jacobian_codegen import VENTRICULAR_STATES, ATRIAL_STATES, symbolic_rhs, symbolic_jacobian
+
+
+def _kernel_code(name, arguments, doc, y, P, outputs):
+    """Python source of one kernel assigning the expressions of outputs, a
+    list of (target, expression), after loading the states and parameters
+    they use. The stimulus I_app is only applied for t < 5."""
+    replacements, reduced = sp.cse([expr for _, expr in outputs],
+                                   symbols=sp.numbered_symbols('_x'), optimizations='basic')
+    used = set().union(*(expr.free_symbols for _, expr in replacements),
+                       *(expr.free_symbols for expr in reduced))
+    printer = PythonCodePrinter({'standard': 'python3'})
+
+    lines = ['def {}({}):'.format(name, arguments),
+             '    """{}"""'.format(doc)]
+    for i, state in enumerate(y):
+        if state in used:
+            lines.append('    {} = y[{}]'.format(state, i))
+    for i, field in enumerate(P[:-1]):
+        if field in used:
+            if str(field) == 'I_app':
+                lines.append('    I_app = p[{}] if t < 5 else 0.0'.format(i))
+            else:
+                lines.append('    {} = p[{}]'.format(field, i))
+    for symbol, expr in replacements:
+        lines.append('    {} = {}'.format(symbol, printer.doprint(expr)))
+    for (target, _), expr in zip(outputs, reduced):
+        lines.append('    {} = {}'.format(target, printer.doprint(expr)))
+    return '\n'.join(lines).replace('math.', '')
+
+
+def generate(filename='GBV_kernels.py'):
+    """Write the generated kernel module."""
+    models = [('grandi_bers', 'grandi_bers_prepared', GBV_prepared.GBVParameters, VENTRICULAR_STATES,
+               VENTRICULAR_PAIRS),
+              ('grandi_bers_atrial', 'grandi_bers_atrial_prepared', GBV_prepared.GBVAtrialParameters,
+               ATRIAL_STATES, ATRIAL_PAIRS)]
+
+    code = ['# Generated by GBV_kernel_codegen.py from GBV_prepared.py, do not edit by hand',
+            '"""',
+            'Scalar kernels of the Grandi-Bers models, written for numba.',
+            '',
+            'Each kernel takes one state vector y, the time t within the beat and the',
+            'prepared parameter vector p = as_array(P) (GBV_prepared.py), and writes',
+            'into the arrays passed after them. The dynamic flags of P are not applied.',
+            'GBV_compiled.py compiles these functions; they also run as plain Python.',
+            '',
+            'Example:',
+            '========',
+            'from GBV_prepared import prepare, as_array',
+            'from GBV_kernels import grandi_bers_kernel',
+            '',
+            'ydot = np.empty(39)',
+            'grandi_bers_kernel(y, 0.0, as_array(prepare(set_Pd())), ydot)',
+            '"""',
+            '',
+            'from math import exp, log',
+            '']
+    for name, rhs_name, record_type, states, pairs in models:
+        print('Differentiating', rhs_name)
+        # t = 0 keeps the stimulus in the expressions, the kernels switch it off after 5 ms
+        y, P, ydot = symbolic_rhs(rhs_name, record_type, states, t=0.0)
+        _, _, entries = symbolic_jacobian(rhs_name, record_type, states)
+
+        print('Generating code for', name + '_kernel')
+        outputs = [('ydot[{}]'.format(i), expr) for i, expr in enumerate(ydot)]
+        doc = 'Write the {} right hand side into ydot.'.format(rhs_name)
+        code += ['', _kernel_code(name + '_kernel', 'y, t, p, ydot', doc, y, P, outputs), '']
+
+        print('Generating code for', name + '_linearized')
+        outputs += [('a[{}]'.format(i), entries.get((i, i), sp.S.Zero)) for i in range(len(y))]
+        outputs += [('c[{}]'.format(2*k + n), entries[key]) for k, (i, j) in enumerate(pairs)
+                    for n, key in enumerate(((i, j), (j, i)))]
+        doc = ('Write the {} right hand side into ydot, the diagonal of its Jacobian into a\n'
+               '    and the entries c[2*k], c[2*k + 1] = J[i, j], J[j, i] of the coupled pairs (i, j) into c.'
+               .format(rhs_name))
+        code += ['', _kernel_code(name + '_linearized', 'y, t, p, ydot, a, c', doc, y, P, outputs), '']
+
+    with open(filename, 'w') as outfile:
+        outfile.write('\n'.join(code))
+
+
+if __name__ == '__main__':
+    generate()
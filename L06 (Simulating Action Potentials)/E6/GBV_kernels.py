@@ -0,0 +1,1593 @@
+# Generated by GBV_kernel_codegen.py from GBV_prepared.py, do not edit by hand
+"""
+Scalar kernels of the Grandi-Bers models, written for numba.
+
+Each kernel takes one state vector y, the time t within the beat and the
+prepared parameter vector p = as_array(P) (GBV_prepared.py), and writes
+into the arrays passed after them. The dynamic flags of P are not applied.
+GBV_compiled.py compiles these functions; they also run as plain Python.
+
+Example:
+========
+from GBV_prepared import prepare, as_array
+from GBV_kernels import grandi_bers_kernel
+
+ydot = np.empty(39)
+grandi_bers_kernel(y, 0.0, as_array(prepare(set_Pd())), ydot)
+"""
+
+from math import exp, log
+
+
+def grandi_bers_kernel(y, t, p, ydot):
+    """Write the grandi_bers_prepared right hand side into ydot."""
+    m = y[0]
+    h = y[1]
+    j = y[2]
+    d = y[3]
+    f = y[4]
+    fcaBj = y[5]
+    fcaBsl = y[6]
+    xtos = y[7]
+    ytos = y[8]
+    xtof = y[9]
+    ytof = y[10]
+    xkr = y[11]
+    xks = y[12]
+    RyRr = y[13]
+    RyRo = y[14]
+    RyRi = y[15]
+    NaBj = y[16]
+    NaBsl = y[17]
+    TnCL = y[18]
+    TnCHc = y[19]
+    TnCHm = y[20]
+    CaM = y[21]
+    Myoc = y[22]
+    Myom = y[23]
+    SRB = y[24]
+    SLLj = y[25]
+    SLLsl = y[26]
+    SLHj = y[27]
+    SLHsl = y[28]
+    Csqnb = y[29]
+    Ca_sr = y[30]
+    Naj = y[31]
+    Nasl = y[32]
+    Nai = y[33]
+    Ki = y[34]
+    Caj = y[35]
+    Casl = y[36]
+    Cai = y[37]
+    Vm = y[38]
+    FoRT = p[0]
+    RToF = p[1]
+    Ko = p[2]
+    Nao = p[3]
+    Cao = p[4]
+    Mgi = p[5]
+    ecl = p[6]
+    GNa_junc = p[7]
+    GNa_sl = p[8]
+    nak_sigma = p[9]
+    nak_junc = p[10]
+    nak_sl = p[11]
+    KmNaip = p[12]
+    gkr = p[13]
+    gki = p[14]
+    Gks = p[15]
+    Gkp = p[16]
+    GtoFast = p[17]
+    pNaK = p[18]
+    eks_num = p[19]
+    GClCa_junc = p[20]
+    GClCa_sl = p[21]
+    KdClCa = p[22]
+    GClB = p[23]
+    ca_junc = p[24]
+    ca_sl = p[25]
+    caK = p[26]
+    Fjunc_CaL = p[27]
+    Fsl_CaL = p[28]
+    caNa_junc = p[29]
+    caNa_sl = p[30]
+    ncx_junc = p[31]
+    ncx_sl = p[32]
+    Kdact = p[33]
+    nuFoRT = p[34]
+    nu1FoRT = p[35]
+    ksat = p[36]
+    Nao3 = p[37]
+    KmCaiNao3 = p[38]
+    KmNai = p[39]
+    KmNao3 = p[40]
+    KmCai = p[41]
+    KmCao = p[42]
+    pca_junc = p[43]
+    pca_sl = p[44]
+    KmPCa16 = p[45]
+    GNaB_junc = p[46]
+    GNaB_sl = p[47]
+    GCaB_junc = p[48]
+    GCaB_sl = p[49]
+    ec50SR = p[50]
+    koCa = p[51]
+    kiCa = p[52]
+    kom = p[53]
+    kim = p[54]
+    ks = p[55]
+    serca = p[56]
+    Kmf = p[57]
+    Kmr = p[58]
+    hillSRCaP = p[59]
+    kon_na = p[60]
+    koff_na = p[61]
+    Bmax_Naj = p[62]
+    Bmax_Nasl = p[63]
+    kon_tncl = p[64]
+    koff_tncl = p[65]
+    Bmax_TnClow = p[66]
+    kon_tnchca = p[67]
+    koff_tnchca = p[68]
+    kon_tnchmg = p[69]
+    koff_tnchmg = p[70]
+    Bmax_TnChigh = p[71]
+    kon_cam = p[72]
+    koff_cam = p[73]
+    Bmax_CaM = p[74]
+    kon_myoca = p[75]
+    koff_myoca = p[76]
+    kon_myomg = p[77]
+    koff_myomg = p[78]
+    Bmax_myosin = p[79]
+    kon_sr = p[80]
+    koff_sr = p[81]
+    Bmax_SR = p[82]
+    kon_sll = p[83]
+    koff_sll = p[84]
+    Bmax_SLlowsl = p[85]
+    Bmax_SLlowj = p[86]
+    kon_slh = p[87]
+    koff_slh = p[88]
+    Bmax_SLhighsl = p[89]
+    Bmax_SLhighj = p[90]
+    kon_csqn = p[91]
+    koff_csqn = p[92]
+    Bmax_Csqn = p[93]
+    Cmem_FVjunc = p[94]
+    Cmem_FVsl = p[95]
+    Jna_juncsl_Vjunc = p[96]
+    Jna_juncsl_Vsl = p[97]
+    Jna_slmyo_Vsl = p[98]
+    Jna_slmyo_Vmyo = p[99]
+    Jca_juncsl_Vjunc = p[100]
+    Jca_juncsl_Vsl = p[101]
+    Jca_slmyo_Vsl = p[102]
+    Jca_slmyo_Vmyo = p[103]
+    Vmyo_Vsr = p[104]
+    Vsr_Vjunc = p[105]
+    Vmyo_Vjunc = p[106]
+    Vsr_Vmyo = p[107]
+    I_app = p[108] if t < 5 else 0.0
+    GtoSlow = p[109]
+    _x0 = -1/(15212.5932856544*exp(0.134589502018843*Vm) + 1)**2
+    _x1 = (Vm >= -40)
+    _x2 = 0.1*Vm
+    _x3 = 0.434598208507078*exp(-0.166666666666667*Vm)
+    _x4 = _x3 + 1
+    _x5 = fcaBj - 1
+    _x6 = fcaBsl - 1
+    _x7 = -1/(1 + 4.31258917989007*exp(-1/13*Vm))
+    _x8 = (1/5)*Vm
+    _x9 = -1/(49.4024491055302*exp(_x8) + 1)
+    _x10 = RyRi + RyRo + RyRr - 1
+    _x11 = 15 - 14/((ec50SR/Ca_sr)**2.5 + 1)
+    _x12 = Caj*_x11*kiCa
+    _x13 = Caj**2
+    _x14 = _x13*koCa/_x11
+    _x15 = -RyRo*kom + RyRr*_x14
+    _x16 = RyRi*kim - RyRo*_x12
+    _x17 = NaBj*koff_na
+    _x18 = Naj*kon_na*(Bmax_Naj - NaBj)
+    _x19 = NaBsl*koff_na - Nasl*kon_na*(Bmax_Nasl - NaBsl)
+    _x20 = TnCL*koff_tncl
+    _x21 = Cai*kon_tncl*(Bmax_TnClow - TnCL)
+    _x22 = -Bmax_TnChigh + TnCHc + TnCHm
+    _x23 = Cai*_x22*kon_tnchca + TnCHc*koff_tnchca
+    _x24 = Mgi*_x22*kon_tnchmg + TnCHm*koff_tnchmg
+    _x25 = CaM*koff_cam - Cai*kon_cam*(Bmax_CaM - CaM)
+    _x26 = -Bmax_myosin + Myoc + Myom
+    _x27 = Cai*_x26*kon_myoca + Myoc*koff_myoca
+    _x28 = Mgi*_x26*kon_myomg + Myom*koff_myomg
+    _x29 = SRB*koff_sr
+    _x30 = Cai*kon_sr*(Bmax_SR - SRB)
+    _x31 = Caj*kon_sll*(Bmax_SLlowj - SLLj) - SLLj*koff_sll
+    _x32 = SLLsl*koff_sll
+    _x33 = Casl*kon_sll*(Bmax_SLlowsl - SLLsl)
+    _x34 = Caj*kon_slh*(Bmax_SLhighj - SLHj) - SLHj*koff_slh
+    _x35 = SLHsl*koff_slh
+    _x36 = Casl*kon_slh*(Bmax_SLhighsl - SLHsl)
+    _x37 = Ca_sr*kon_csqn*(Bmax_Csqn - Csqnb) - Csqnb*koff_csqn
+    _x38 = Ca_sr - Caj
+    _x39 = (Ca_sr/Kmr)**hillSRCaP
+    _x40 = (Cai/Kmf)**hillSRCaP
+    _x41 = serca*(_x39 - _x40)/(_x39 + _x40 + 1)
+    _x42 = -Nasl
+    _x43 = Naj + _x42
+    _x44 = -Vm
+    _x45 = RToF*log(Nao/Naj) + _x44
+    _x46 = -_x45
+    _x47 = h*j*m**3
+    _x48 = GNa_junc*_x47
+    _x49 = -_x5
+    _x50 = FoRT*Vm
+    _x51 = exp(_x50)
+    _x52 = Vm*d*f
+    _x53 = _x52/(_x51 - 1)
+    _x54 = _x53*caNa_junc*(Naj*_x51 - Nao)
+    _x55 = KmNaip**4
+    _x56 = 1/(nak_sigma*exp(-_x50) + 1 + 0.1245*exp(-FoRT*_x2))
+    _x57 = _x56*nak_junc/(1 + _x55/Naj**4)
+    _x58 = exp(Vm*nu1FoRT)
+    _x59 = Caj*Nao3
+    _x60 = Naj**3
+    _x61 = exp(Vm*nuFoRT)
+    _x62 = -Cao*_x60*_x61 + _x58*_x59
+    _x63 = 1/(_x58*ksat + 1)
+    _x64 = Kdact**2
+    _x65 = 1/KmCai
+    _x66 = KmNai**(-3)
+    _x67 = _x63*ncx_junc/((1 + _x64/_x13)*(Caj*KmNao3*(Caj*_x65 + 1) + Cao*_x60 + KmCaiNao3*(_x60*_x66 + 1) + KmCao*_x60 + _x59))
+    _x68 = -_x62*_x67
+    _x69 = Nai + _x42
+    _x70 = RToF*log(Nao/Nasl) + _x44
+    _x71 = GNaB_sl*_x70
+    _x72 = GNa_sl*_x47*_x70
+    _x73 = _x53*_x6*caNa_sl*(Nao - Nasl*_x51)
+    _x74 = _x56*nak_sl/(1 + _x55/Nasl**4)
+    _x75 = Casl*Nao3
+    _x76 = Nasl**3
+    _x77 = Cao*_x76
+    _x78 = _x63*ncx_sl*(-_x58*_x75 + _x61*_x77)/((1 + _x64/Casl**2)*(Casl*KmNao3*(Casl*_x65 + 1) + KmCaiNao3*(_x66*_x76 + 1) + KmCao*_x76 + _x75 + _x77))
+    _x79 = Caj**1.6
+    _x80 = _x79*pca_junc/(KmPCa16 + _x79)
+    _x81 = 1/Caj
+    _x82 = 0.5*RToF
+    _x83 = _x44 + _x82*log(Cao*_x81)
+    _x84 = exp(2*_x50)
+    _x85 = _x52/(_x84 - 1)
+    _x86 = _x85*ca_junc*(Caj*_x84 - Cao)
+    _x87 = -Casl
+    _x88 = Caj + _x87
+    _x89 = Cai + _x87
+    _x90 = Casl**1.6
+    _x91 = _x90*pca_sl/(KmPCa16 + _x90)
+    _x92 = 1/Casl
+    _x93 = GCaB_sl*(_x44 + _x82*log(Cao*_x92))
+    _x94 = _x6*_x85*ca_sl*(Cao - Casl*_x84)
+    _x95 = Vm - ecl
+    _x96 = RToF*log(Ko/Ki)
+    _x97 = _x44 + _x96
+    _x98 = 1.02/(7.35454251046446e-7*exp(0.2385*Vm - 0.2385*_x96) + 1)
+    ydot[0] = -(m - 1/(1 + 0.00184221158116513*exp(-0.110741971207087*Vm))**2)/(0.1292*exp(-(0.0643500643500644*Vm + 2.94658944658945)**2) + 0.06487*exp(-(0.0195618153364632*Vm - 0.0943466353677621)**2))
+    ydot[1] = -(_x0 + h)*((1/(0.168831168831169 + 0.0646209624466736*exp(-0.0900900900900901*Vm))) if _x1 else (2.7*exp(0.079*Vm) + 310000.0*exp(0.3485*Vm) + 4.43126792958051e-7*exp(-0.147058823529412*Vm)))
+    ydot[2] = -(_x0 + j)*((0.6*exp(0.057*Vm)/(1 + 0.0407622039783662*exp(-_x2))) if _x1 else (-(Vm + 37.78)*(25428.0*exp(0.2444*Vm) + 6.948e-6*exp(-0.04391*Vm))/(50262745825.954*exp(0.311*Vm) + 1) + 0.02424*exp(-0.01052*Vm)/(1 + 0.00396086833990426*exp(-0.1378*Vm))))
+    ydot[3] = -_x4*(0.035*Vm + 0.175)*(d - 1/_x4)/(1 - _x3)
+    ydot[4] = (0.02 + 0.0197*exp(-(0.0337*Vm + 0.48865)**2))*(-f + 1/(exp((1/9)*(Vm + 35)) + 1) + 0.6/(exp((1/20)*(50 - Vm)) + 1))
+    ydot[5] = -1.7*Caj*_x5 - 0.0119*fcaBj
+    ydot[6] = -1.7*Casl*_x6 - 0.0119*fcaBsl
+    ydot[7] = -(_x7 + xtos)/(0.5 + 9/(1.22140275816017*exp((1/15)*Vm) + 1))
+    ydot[8] = -1/10*(_x9 + ytos)/(3 + 80/(403.428793492735*exp((1/10)*Vm) + 1))
+    ydot[9] = -(_x7 + xtof)/(1.0 + 11*exp(-1/3600*(Vm + 45)**2))
+    ydot[10] = -(_x9 + ytof)/(7 + 85*exp(-1/220*(Vm + 40)**2))
+    ydot[11] = -1/10*(xkr - 1/(exp(-_x8 - 2) + 1))/(23/(exp((1/20)*Vm + 2) + 1) + 330/((1 + exp(-1/9*(Vm + 22)))*(exp((1/9)*(Vm + 11)) + 1)))
+    ydot[12] = -(0.00100999899000101 + 0.00084995496300182*exp(-0.0708215297450425*Vm))*(xks - 1/(1 + 0.765928338364649*exp(-0.0701754385964912*Vm)))
+    ydot[13] = -RyRr*_x12 - _x10*kim - _x15
+    ydot[14] = _x15 + _x16
+    ydot[15] = -RyRi*kom - _x10*_x14 - _x16
+    ydot[16] = -_x17 + _x18
+    ydot[17] = -_x19
+    ydot[18] = -_x20 + _x21
+    ydot[19] = -_x23
+    ydot[20] = -_x24
+    ydot[21] = -_x25
+    ydot[22] = -_x27
+    ydot[23] = -_x28
+    ydot[24] = -_x29 + _x30
+    ydot[25] = _x31
+    ydot[26] = -_x32 + _x33
+    ydot[27] = _x34
+    ydot[28] = -_x35 + _x36
+    ydot[29] = _x37
+    ydot[30] = -RyRo*_x38*ks - 5.348e-6*Vmyo_Vsr*_x38 - _x37 - _x41
+    ydot[31] = -Cmem_FVjunc*(GNaB_junc*_x46 + _x46*_x48 + _x49*_x54 + 3*_x57 + 3*_x68) - Jna_juncsl_Vjunc*_x43 + _x17 - _x18
+    ydot[32] = -Cmem_FVsl*(-_x71 - _x72 + _x73 + 3*_x74 + 3*_x78) + Jna_juncsl_Vsl*_x43 + Jna_slmyo_Vsl*_x69 + _x19
+    ydot[33] = -Jna_slmyo_Vmyo*_x69
+    ydot[34] = 0
+    ydot[35] = -Cmem_FVjunc*(-0.5*GCaB_junc*_x83 + 0.5*_x49*_x86 - 1.0*_x68 + 0.5*_x80) - Jca_juncsl_Vjunc*_x88 + RyRo*Vsr_Vjunc*_x38*ks + 5.348e-6*Vmyo_Vjunc*_x38 - _x31 - _x34
+    ydot[36] = -Cmem_FVsl*(-1.0*_x78 + 0.5*_x91 - 0.5*_x93 + 0.5*_x94) + Jca_juncsl_Vsl*_x88 + Jca_slmyo_Vsl*_x89 + _x32 - _x33 + _x35 - _x36
+    ydot[37] = -Jca_slmyo_Vmyo*_x89 + Vsr_Vmyo*_x41 + _x20 - _x21 + _x23 + _x24 + _x25 + _x27 + _x28 + _x29 - _x30
+    ydot[38] = GCaB_junc*_x83 - GClB*_x95 + GNaB_junc*_x45 + Gkp*_x97/(1 + 1786.47556537862*exp(-0.167224080267559*Vm)) + Gks*xks**2*(RToF*log(eks_num/(Ki + Nai*pNaK)) + _x44) + I_app + _x45*_x48 + _x5*_x54 + _x5*_x86 + _x53*caK*(Fjunc_CaL*_x5 + Fsl_CaL*_x6)*(Ki*_x51 - Ko) - _x57 + _x62*_x67 + _x71 + _x72 - _x73 - _x74 - _x78 - _x80 - _x91 + _x93 - _x94 - _x95*(GClCa_junc/(KdClCa*_x81 + 1) + GClCa_sl/(KdClCa*_x92 + 1)) + _x97*_x98*gki/(_x98 + (1.15340563518656e-16*exp(0.06175*Vm - 0.06175*_x96) + 0.762624006506308*exp(0.08032*Vm - 0.08032*_x96))/(0.0867722941576933*exp(-0.5143*Vm + 0.5143*_x96) + 1)) + _x97*gkr*xkr/(exp((1/24)*(Vm + 74)) + 1) + _x97*(GtoFast*xtof*ytof + GtoSlow*xtos*ytos)
+
+
+def grandi_bers_linearized(y, t, p, ydot, a, c):
+    """Write the grandi_bers_prepared right hand side into ydot, the diagonal of its Jacobian into a
+    and the entries c[2*k], c[2*k + 1] = J[i, j], J[j, i] of the coupled pairs (i, j) into c."""
+    m = y[0]
+    h = y[1]
+    j = y[2]
+    d = y[3]
+    f = y[4]
+    fcaBj = y[5]
+    fcaBsl = y[6]
+    xtos = y[7]
+    ytos = y[8]
+    xtof = y[9]
+    ytof = y[10]
+    xkr = y[11]
+    xks = y[12]
+    RyRr = y[13]
+    RyRo = y[14]
+    RyRi = y[15]
+    NaBj = y[16]
+    NaBsl = y[17]
+    TnCL = y[18]
+    TnCHc = y[19]
+    TnCHm = y[20]
+    CaM = y[21]
+    Myoc = y[22]
+    Myom = y[23]
+    SRB = y[24]
+    SLLj = y[25]
+    SLLsl = y[26]
+    SLHj = y[27]
+    SLHsl = y[28]
+    Csqnb = y[29]
+    Ca_sr = y[30]
+    Naj = y[31]
+    Nasl = y[32]
+    Nai = y[33]
+    Ki = y[34]
+    Caj = y[35]
+    Casl = y[36]
+    Cai = y[37]
+    Vm = y[38]
+    FoRT = p[0]
+    RToF = p[1]
+    Ko = p[2]
+    Nao = p[3]
+    Cao = p[4]
+    Mgi = p[5]
+    ecl = p[6]
+    GNa_junc = p[7]
+    GNa_sl = p[8]
+    nak_sigma = p[9]
+    nak_junc = p[10]
+    nak_sl = p[11]
+    KmNaip = p[12]
+    gkr = p[13]
+    gki = p[14]
+    Gks = p[15]
+    Gkp = p[16]
+    GtoFast = p[17]
+    pNaK = p[18]
+    eks_num = p[19]
+    GClCa_junc = p[20]
+    GClCa_sl = p[21]
+    KdClCa = p[22]
+    GClB = p[23]
+    ca_junc = p[24]
+    ca_sl = p[25]
+    caK = p[26]
+    Fjunc_CaL = p[27]
+    Fsl_CaL = p[28]
+    caNa_junc = p[29]
+    caNa_sl = p[30]
+    ncx_junc = p[31]
+    ncx_sl = p[32]
+    Kdact = p[33]
+    nuFoRT = p[34]
+    nu1FoRT = p[35]
+    ksat = p[36]
+    Nao3 = p[37]
+    KmCaiNao3 = p[38]
+    KmNai = p[39]
+    KmNao3 = p[40]
+    KmCai = p[41]
+    KmCao = p[42]
+    pca_junc = p[43]
+    pca_sl = p[44]
+    KmPCa16 = p[45]
+    GNaB_junc = p[46]
+    GNaB_sl = p[47]
+    GCaB_junc = p[48]
+    GCaB_sl = p[49]
+    ec50SR = p[50]
+    koCa = p[51]
+    kiCa = p[52]
+    kom = p[53]
+    kim = p[54]
+    ks = p[55]
+    serca = p[56]
+    Kmf = p[57]
+    Kmr = p[58]
+    hillSRCaP = p[59]
+    kon_na = p[60]
+    koff_na = p[61]
+    Bmax_Naj = p[62]
+    Bmax_Nasl = p[63]
+    kon_tncl = p[64]
+    koff_tncl = p[65]
+    Bmax_TnClow = p[66]
+    kon_tnchca = p[67]
+    koff_tnchca = p[68]
+    kon_tnchmg = p[69]
+    koff_tnchmg = p[70]
+    Bmax_TnChigh = p[71]
+    kon_cam = p[72]
+    koff_cam = p[73]
+    Bmax_CaM = p[74]
+    kon_myoca = p[75]
+    koff_myoca = p[76]
+    kon_myomg = p[77]
+    koff_myomg = p[78]
+    Bmax_myosin = p[79]
+    kon_sr = p[80]
+    koff_sr = p[81]
+    Bmax_SR = p[82]
+    kon_sll = p[83]
+    koff_sll = p[84]
+    Bmax_SLlowsl = p[85]
+    Bmax_SLlowj = p[86]
+    kon_slh = p[87]
+    koff_slh = p[88]
+    Bmax_SLhighsl = p[89]
+    Bmax_SLhighj = p[90]
+    kon_csqn = p[91]
+    koff_csqn = p[92]
+    Bmax_Csqn = p[93]
+    Cmem_FVjunc = p[94]
+    Cmem_FVsl = p[95]
+    Jna_juncsl_Vjunc = p[96]
+    Jna_juncsl_Vsl = p[97]
+    Jna_slmyo_Vsl = p[98]
+    Jna_slmyo_Vmyo = p[99]
+    Jca_juncsl_Vjunc = p[100]
+    Jca_juncsl_Vsl = p[101]
+    Jca_slmyo_Vsl = p[102]
+    Jca_slmyo_Vmyo = p[103]
+    Vmyo_Vsr = p[104]
+    Vsr_Vjunc = p[105]
+    Vmyo_Vjunc = p[106]
+    Vsr_Vmyo = p[107]
+    I_app = p[108] if t < 5 else 0.0
+    GtoSlow = p[109]
+    _x0 = 1/(0.1292*exp(-(0.0643500643500644*Vm + 2.94658944658945)**2) + 0.06487*exp(-(0.0195618153364632*Vm - 0.0943466353677621)**2))
+    _x1 = -1/(15212.5932856544*exp(0.134589502018843*Vm) + 1)**2
+    _x2 = (Vm >= -40)
+    _x3 = ((1/(0.168831168831169 + 0.0646209624466736*exp(-0.0900900900900901*Vm))) if _x2 else (2.7*exp(0.079*Vm) + 310000.0*exp(0.3485*Vm) + 4.43126792958051e-7*exp(-0.147058823529412*Vm)))
+    _x4 = 0.1*Vm
+    _x5 = ((0.6*exp(0.057*Vm)/(1 + 0.0407622039783662*exp(-_x4))) if _x2 else (-(Vm + 37.78)*(25428.0*exp(0.2444*Vm) + 6.948e-6*exp(-0.04391*Vm))/(50262745825.954*exp(0.311*Vm) + 1) + 0.02424*exp(-0.01052*Vm)/(1 + 0.00396086833990426*exp(-0.1378*Vm))))
+    _x6 = 0.434598208507078*exp(-0.166666666666667*Vm)
+    _x7 = _x6 + 1
+    _x8 = _x7*(0.035*Vm + 0.175)/(1 - _x6)
+    _x9 = 0.02 + 0.0197*exp(-(0.0337*Vm + 0.48865)**2)
+    _x10 = fcaBj - 1
+    _x11 = 1.7*Caj
+    _x12 = fcaBsl - 1
+    _x13 = 1.7*Casl
+    _x14 = -1/(1 + 4.31258917989007*exp(-1/13*Vm))
+    _x15 = 1/(0.5 + 9/(1.22140275816017*exp((1/15)*Vm) + 1))
+    _x16 = (1/5)*Vm
+    _x17 = -1/(49.4024491055302*exp(_x16) + 1)
+    _x18 = (1/10)/(3 + 80/(403.428793492735*exp((1/10)*Vm) + 1))
+    _x19 = 1/(1.0 + 11*exp(-1/3600*(Vm + 45)**2))
+    _x20 = 1/(7 + 85*exp(-1/220*(Vm + 40)**2))
+    _x21 = (1/10)/(23/(exp((1/20)*Vm + 2) + 1) + 330/((1 + exp(-1/9*(Vm + 22)))*(exp((1/9)*(Vm + 11)) + 1)))
+    _x22 = 0.00100999899000101 + 0.00084995496300182*exp(-0.0708215297450425*Vm)
+    _x23 = RyRi + RyRo + RyRr - 1
+    _x24 = 1/Ca_sr
+    _x25 = 15 - 14/((_x24*ec50SR)**2.5 + 1)
+    _x26 = Caj*_x25*kiCa
+    _x27 = Caj**2
+    _x28 = _x27*koCa/_x25
+    _x29 = -RyRo*kom + RyRr*_x28
+    _x30 = RyRi*kim - RyRo*_x26
+    _x31 = NaBj*koff_na
+    _x32 = Bmax_Naj - NaBj
+    _x33 = Naj*kon_na
+    _x34 = _x32*_x33
+    _x35 = Bmax_Nasl - NaBsl
+    _x36 = Nasl*kon_na
+    _x37 = NaBsl*koff_na - _x35*_x36
+    _x38 = TnCL*koff_tncl
+    _x39 = Bmax_TnClow - TnCL
+    _x40 = Cai*kon_tncl
+    _x41 = _x39*_x40
+    _x42 = -Bmax_TnChigh + TnCHc + TnCHm
+    _x43 = Cai*kon_tnchca
+    _x44 = TnCHc*koff_tnchca + _x42*_x43
+    _x45 = Mgi*kon_tnchmg
+    _x46 = TnCHm*koff_tnchmg + _x42*_x45
+    _x47 = Bmax_CaM - CaM
+    _x48 = Cai*kon_cam
+    _x49 = CaM*koff_cam - _x47*_x48
+    _x50 = -Bmax_myosin + Myoc + Myom
+    _x51 = Cai*kon_myoca
+    _x52 = Myoc*koff_myoca + _x50*_x51
+    _x53 = Mgi*kon_myomg
+    _x54 = Myom*koff_myomg + _x50*_x53
+    _x55 = SRB*koff_sr
+    _x56 = Bmax_SR - SRB
+    _x57 = Cai*kon_sr
+    _x58 = _x56*_x57
+    _x59 = Bmax_SLlowj - SLLj
+    _x60 = Caj*kon_sll
+    _x61 = -SLLj*koff_sll + _x59*_x60
+    _x62 = SLLsl*koff_sll
+    _x63 = Bmax_SLlowsl - SLLsl
+    _x64 = Casl*kon_sll
+    _x65 = _x63*_x64
+    _x66 = Bmax_SLhighj - SLHj
+    _x67 = Caj*kon_slh
+    _x68 = -SLHj*koff_slh + _x66*_x67
+    _x69 = SLHsl*koff_slh
+    _x70 = Bmax_SLhighsl - SLHsl
+    _x71 = Casl*kon_slh
+    _x72 = _x70*_x71
+    _x73 = Bmax_Csqn - Csqnb
+    _x74 = Ca_sr*kon_csqn
+    _x75 = -Csqnb*koff_csqn + _x73*_x74
+    _x76 = Ca_sr - Caj
+    _x77 = 5.348e-6*Vmyo_Vsr
+    _x78 = RyRo*ks
+    _x79 = (Ca_sr/Kmr)**hillSRCaP
+    _x80 = (Cai/Kmf)**hillSRCaP
+    _x81 = _x79 - _x80
+    _x82 = _x79 + _x80 + 1
+    _x83 = serca/_x82
+    _x84 = _x81*_x83
+    _x85 = -Nasl
+    _x86 = Naj + _x85
+    _x87 = -Vm
+    _x88 = 1/Naj
+    _x89 = RToF*log(Nao*_x88) + _x87
+    _x90 = -_x89
+    _x91 = h*j*m**3
+    _x92 = GNa_junc*_x91
+    _x93 = FoRT*Vm
+    _x94 = exp(_x93)
+    _x95 = Naj*_x94 - Nao
+    _x96 = _x94 - 1
+    _x97 = 1/_x96
+    _x98 = d*f
+    _x99 = _x97*_x98
+    _x100 = _x99*caNa_junc
+    _x101 = _x100*_x95
+    _x102 = -Vm*_x10
+    _x103 = exp(-FoRT*_x4)
+    _x104 = nak_sigma*exp(-_x93)
+    _x105 = 0.1245*_x103 + _x104 + 1
+    _x106 = 1/_x105
+    _x107 = KmNaip**4
+    _x108 = 1 + _x107/Naj**4
+    _x109 = nak_junc/_x108
+    _x110 = _x106*_x109
+    _x111 = exp(Vm*nu1FoRT)
+    _x112 = Caj*Nao3
+    _x113 = _x111*_x112
+    _x114 = Naj**3
+    _x115 = exp(Vm*nuFoRT)
+    _x116 = -Cao*_x114*_x115 + _x113
+    _x117 = -_x116
+    _x118 = Cao*_x114
+    _x119 = 1/KmCai
+    _x120 = Caj*_x119
+    _x121 = KmNao3*(_x120 + 1)
+    _x122 = KmNai**(-3)
+    _x123 = Caj*_x121 + KmCaiNao3*(_x114*_x122 + 1) + KmCao*_x114 + _x112 + _x118
+    _x124 = 1/_x123
+    _x125 = _x111*ksat
+    _x126 = _x125 + 1
+    _x127 = 1/_x126
+    _x128 = Kdact**2
+    _x129 = _x128/_x27 + 1
+    _x130 = 1/_x129
+    _x131 = _x127*_x130*ncx_junc
+    _x132 = _x124*_x131
+    _x133 = _x117*_x132
+    _x134 = Nai + _x85
+    _x135 = 1/Nasl
+    _x136 = RToF*log(Nao*_x135) + _x87
+    _x137 = GNaB_sl*_x136
+    _x138 = GNa_sl*_x91
+    _x139 = _x136*_x138
+    _x140 = Nao - Nasl*_x94
+    _x141 = _x99*caNa_sl
+    _x142 = _x12*_x140*_x141
+    _x143 = Vm*_x142
+    _x144 = 1 + _x107/Nasl**4
+    _x145 = nak_sl/_x144
+    _x146 = _x106*_x145
+    _x147 = Casl*Nao3
+    _x148 = _x111*_x147
+    _x149 = Nasl**3
+    _x150 = Cao*_x149
+    _x151 = _x115*_x150
+    _x152 = -_x148 + _x151
+    _x153 = 1 + _x128/Casl**2
+    _x154 = 1/_x153
+    _x155 = Casl*_x119
+    _x156 = KmNao3*(_x155 + 1)
+    _x157 = Casl*_x156 + KmCaiNao3*(_x122*_x149 + 1) + KmCao*_x149 + _x147 + _x150
+    _x158 = 1/_x157
+    _x159 = _x127*_x154*_x158*ncx_sl
+    _x160 = _x152*_x159
+    _x161 = Caj**1.6
+    _x162 = KmPCa16 + _x161
+    _x163 = pca_junc/_x162
+    _x164 = _x161*_x163
+    _x165 = 1/Caj
+    _x166 = 0.5*RToF
+    _x167 = _x166*log(Cao*_x165) + _x87
+    _x168 = 2*_x93
+    _x169 = exp(_x168)
+    _x170 = Caj*_x169 - Cao
+    _x171 = _x169 - 1
+    _x172 = 1/_x171
+    _x173 = _x172*_x98
+    _x174 = _x173*ca_junc
+    _x175 = _x170*_x174
+    _x176 = 0.5*_x102
+    _x177 = -Casl
+    _x178 = Caj + _x177
+    _x179 = Cai + _x177
+    _x180 = Casl**1.6
+    _x181 = KmPCa16 + _x180
+    _x182 = pca_sl/_x181
+    _x183 = _x180*_x182
+    _x184 = 1/Casl
+    _x185 = GCaB_sl*(_x166*log(Cao*_x184) + _x87)
+    _x186 = Cao - Casl*_x169
+    _x187 = _x173*ca_sl
+    _x188 = _x12*_x186*_x187
+    _x189 = Vm*_x188
+    _x190 = Vm - ecl
+    _x191 = Gks*xks**2
+    _x192 = GtoFast*xtof*ytof + GtoSlow*xtos*ytos
+    _x193 = RToF*log(Ko/Ki)
+    _x194 = _x193 + _x87
+    _x195 = exp(-0.167224080267559*Vm)
+    _x196 = 1786.47556537862*_x195 + 1
+    _x197 = Gkp/_x196
+    _x198 = exp((1/24)*(Vm + 74)) + 1
+    _x199 = gkr*xkr
+    _x200 = _x199/_x198
+    _x201 = GClCa_junc/(KdClCa*_x165 + 1) + GClCa_sl/(KdClCa*_x184 + 1)
+    _x202 = Ki*_x94 - Ko
+    _x203 = Fjunc_CaL*_x10 + Fsl_CaL*_x12
+    _x204 = exp(0.2385*Vm - 0.2385*_x193)
+    _x205 = 7.35454251046446e-7*_x204 + 1
+    _x206 = 1.02/_x205
+    _x207 = exp(-0.5143*Vm + 0.5143*_x193)
+    _x208 = 0.0867722941576933*_x207 + 1
+    _x209 = 1/_x208
+    _x210 = exp(0.08032*Vm - 0.08032*_x193)
+    _x211 = exp(0.06175*Vm - 0.06175*_x193)
+    _x212 = 0.762624006506308*_x210 + 1.15340563518656e-16*_x211
+    _x213 = _x206 + _x209*_x212
+    _x214 = 1/_x213
+    _x215 = _x206*gki
+    _x216 = _x214*_x215
+    _x217 = _x28 + kim
+    _x218 = _x74 + koff_csqn
+    _x219 = _x73*kon_csqn
+    _x220 = _x83*hillSRCaP
+    _x221 = _x82**(-2)
+    _x222 = RToF*_x88
+    _x223 = 12*_x106*_x107
+    _x224 = 9*Naj**2
+    _x225 = Cao*_x115
+    _x226 = Cao + KmCaiNao3*_x122 + KmCao
+    _x227 = _x117*_x131/_x123**2
+    _x228 = RToF*_x135
+    _x229 = -Vm*_x12
+    _x230 = 9*Nasl**2
+    _x231 = _x127*_x152*ncx_sl
+    _x232 = _x154*_x231/_x157**2
+    _x233 = 0.25*RToF
+    _x234 = 1.0*Nao3*_x111
+    _x235 = 2.0*_x128
+    _x236 = _x124*ncx_junc
+    _x237 = Vsr_Vmyo*_x80/Cai
+    _x238 = FoRT*(0.01245*_x103 + _x104)/_x105**2
+    _x239 = _x204/_x205**2
+    _x240 = _x126**(-2)
+    _x241 = _x96**(-2)
+    _x242 = _x241*_x94
+    _x243 = _x171**(-2)
+    ydot[0] = -_x0*(m - 1/(1 + 0.00184221158116513*exp(-0.110741971207087*Vm))**2)
+    ydot[1] = -_x3*(_x1 + h)
+    ydot[2] = -_x5*(_x1 + j)
+    ydot[3] = -_x8*(d - 1/_x7)
+    ydot[4] = _x9*(-f + 1/(exp((1/9)*(Vm + 35)) + 1) + 0.6/(exp((1/20)*(50 - Vm)) + 1))
+    ydot[5] = -_x10*_x11 - 0.0119*fcaBj
+    ydot[6] = -_x12*_x13 - 0.0119*fcaBsl
+    ydot[7] = -_x15*(_x14 + xtos)
+    ydot[8] = -_x18*(_x17 + ytos)
+    ydot[9] = -_x19*(_x14 + xtof)
+    ydot[10] = -_x20*(_x17 + ytof)
+    ydot[11] = -_x21*(xkr - 1/(exp(-_x16 - 2) + 1))
+    ydot[12] = -_x22*(xks - 1/(1 + 0.765928338364649*exp(-0.0701754385964912*Vm)))
+    ydot[13] = -RyRr*_x26 - _x23*kim - _x29
+    ydot[14] = _x29 + _x30
+    ydot[15] = -RyRi*kom - _x23*_x28 - _x30
+    ydot[16] = -_x31 + _x34
+    ydot[17] = -_x37
+    ydot[18] = -_x38 + _x41
+    ydot[19] = -_x44
+    ydot[20] = -_x46
+    ydot[21] = -_x49
+    ydot[22] = -_x52
+    ydot[23] = -_x54
+    ydot[24] = -_x55 + _x58
+    ydot[25] = _x61
+    ydot[26] = -_x62 + _x65
+    ydot[27] = _x68
+    ydot[28] = -_x69 + _x72
+    ydot[29] = _x75
+    ydot[30] = -_x75 - _x76*_x77 - _x76*_x78 - _x84
+    ydot[31] = -Cmem_FVjunc*(GNaB_junc*_x90 + _x101*_x102 + 3*_x110 + 3*_x133 + _x90*_x92) - Jna_juncsl_Vjunc*_x86 + _x31 - _x34
+    ydot[32] = -Cmem_FVsl*(-_x137 - _x139 + _x143 + 3*_x146 + 3*_x160) + Jna_juncsl_Vsl*_x86 + Jna_slmyo_Vsl*_x134 + _x37
+    ydot[33] = -Jna_slmyo_Vmyo*_x134
+    ydot[34] = 0
+    ydot[35] = -Cmem_FVjunc*(-0.5*GCaB_junc*_x167 - 1.0*_x133 + 0.5*_x164 + _x175*_x176) - Jca_juncsl_Vjunc*_x178 + RyRo*Vsr_Vjunc*_x76*ks + 5.348e-6*Vmyo_Vjunc*_x76 - _x61 - _x68
+    ydot[36] = -Cmem_FVsl*(-1.0*_x160 + 0.5*_x183 - 0.5*_x185 + 0.5*_x189) + Jca_juncsl_Vsl*_x178 + Jca_slmyo_Vsl*_x179 + _x62 - _x65 + _x69 - _x72
+    ydot[37] = -Jca_slmyo_Vmyo*_x179 + Vsr_Vmyo*_x84 + _x38 - _x41 + _x44 + _x46 + _x49 + _x52 + _x54 + _x55 - _x58
+    ydot[38] = GCaB_junc*_x167 - GClB*_x190 + GNaB_junc*_x89 + I_app + Vm*_x10*_x101 + Vm*_x10*_x175 + Vm*_x202*_x203*_x99*caK - _x110 + _x116*_x132 + _x137 + _x139 - _x143 - _x146 - _x160 - _x164 - _x183 + _x185 - _x189 - _x190*_x201 + _x191*(RToF*log(eks_num/(Ki + Nai*pNaK)) + _x87) + _x192*_x194 + _x194*_x197 + _x194*_x200 + _x194*_x216 + _x89*_x92
+    a[0] = -_x0
+    a[1] = -_x3
+    a[2] = -_x5
+    a[3] = -_x8
+    a[4] = -_x9
+    a[5] = -_x11 - 0.0119
+    a[6] = -_x13 - 0.0119
+    a[7] = -_x15
+    a[8] = -_x18
+    a[9] = -_x19
+    a[10] = -_x20
+    a[11] = -_x21
+    a[12] = -_x22
+    a[13] = -_x217 - _x26
+    a[14] = -_x26 - kom
+    a[15] = -_x217 - kom
+    a[16] = -_x33 - koff_na
+    a[17] = -_x36 - koff_na
+    a[18] = -_x40 - koff_tncl
+    a[19] = -_x43 - koff_tnchca
+    a[20] = -_x45 - koff_tnchmg
+    a[21] = -_x48 - koff_cam
+    a[22] = -_x51 - koff_myoca
+    a[23] = -_x53 - koff_myomg
+    a[24] = -_x57 - koff_sr
+    a[25] = -_x60 - koff_sll
+    a[26] = -_x64 - koff_sll
+    a[27] = -_x67 - koff_slh
+    a[28] = -_x71 - koff_slh
+    a[29] = -_x218
+    a[30] = -_x219 - _x220*_x24*_x79 + _x221*_x24*_x79*_x81*hillSRCaP*serca - _x77 - _x78
+    a[31] = -Cmem_FVjunc*(GNaB_junc*_x222 + _x100*_x102*_x94 + _x132*_x224*_x225 + _x222*_x92 - _x224*_x226*_x227 + _x223*nak_junc/(Naj**5*_x108**2)) - Jna_juncsl_Vjunc - _x32*kon_na
+    a[32] = -Cmem_FVsl*(GNaB_sl*_x228 + _x138*_x228 + _x141*_x229*_x94 + _x159*_x225*_x230 - _x226*_x230*_x232 + _x223*nak_sl/(Nasl**5*_x144**2)) - Jna_juncsl_Vsl - Jna_slmyo_Vsl - _x35*kon_na
+    a[33] = -Jna_slmyo_Vmyo
+    a[34] = 0
+    a[35] = -Cmem_FVjunc*(0.8*Caj**0.6*_x163 - 0.8*Caj**2.2*pca_junc/_x162**2 + GCaB_junc*_x165*_x233 + _x132*_x234 + _x169*_x174*_x176 + 1.0*_x227*(KmNao3*_x120 + Nao3 + _x121) - _x117*_x127*_x235*_x236/(Caj**3*_x129**2)) - Jca_juncsl_Vjunc - 5.348e-6*Vmyo_Vjunc - Vsr_Vjunc*_x78 - _x59*kon_sll - _x66*kon_slh
+    a[36] = -Cmem_FVsl*(0.8*Casl**0.6*_x182 - 0.8*Casl**2.2*pca_sl/_x181**2 + GCaB_sl*_x184*_x233 + _x159*_x234 + 0.5*_x169*_x187*_x229 + 1.0*_x232*(KmNao3*_x155 + Nao3 + _x156) - _x158*_x231*_x235/(Casl**3*_x153**2)) - Jca_juncsl_Vsl - Jca_slmyo_Vsl - _x63*kon_sll - _x70*kon_slh
+    a[37] = -Jca_slmyo_Vmyo - _x220*_x237 - _x221*_x237*_x81*hillSRCaP*serca - _x39*kon_tncl + _x42*kon_tnchca - _x47*kon_cam + _x50*kon_myoca - _x56*kon_sr
+    a[38] = 2*Caj*FoRT*Vm*_x10*_x169*_x172*ca_junc*d*f + 2*Casl*FoRT*Vm*_x12*_x169*_x172*ca_sl*d*f + FoRT*Ki*Vm*_x203*_x94*_x97*caK*d*f + FoRT*Naj*Vm*_x10*_x94*_x97*caNa_junc*d*f + FoRT*Nasl*Vm*_x12*_x94*_x97*caNa_sl*d*f + FoRT*Vm*_x12*_x140*_x241*_x94*caNa_sl*d*f + 2*FoRT*Vm*_x12*_x169*_x186*_x243*ca_sl*d*f - GCaB_junc - GCaB_sl - GClB - GNaB_junc - GNaB_sl + 298.741733340907*Gkp*_x194*_x195/_x196**2 - _x10*_x168*_x169*_x170*_x243*_x98*ca_junc + _x10*_x170*_x172*ca_junc*d*f - _x10*_x242*_x93*_x95*_x98*caNa_junc + _x10*_x95*_x97*caNa_junc*d*f - _x109*_x238 + _x111*_x152*_x154*_x158*_x240*ksat*ncx_sl*nu1FoRT - _x116*_x125*_x130*_x236*_x240*nu1FoRT + _x124*_x127*_x130*ncx_junc*(_x113*nu1FoRT - _x115*_x118*nuFoRT) - _x138 - _x142 - _x145*_x238 - _x159*(-_x148*nu1FoRT + _x151*nuFoRT) - _x188 - _x191 - _x192 - 1.78913955652069e-7*_x194*_x214*_x239*gki - _x194*_x215*(0.0446269908853017*_x207*_x212/_x208**2 + _x209*(0.0612539602025867*_x210 + 7.12227979727698e-18*_x211) - 1.78913955652069e-7*_x239)/_x213**2 - 1/24*_x194*_x199*exp((1/24)*Vm + 37/12)/_x198**2 - _x197 - _x200 - _x201 - _x202*_x203*_x242*_x93*_x98*caK + _x202*_x203*_x97*caK*d*f - _x216 - _x92
+    c[0] = _x218
+    c[1] = _x219
+
+
+def grandi_bers_atrial_kernel(y, t, p, ydot):
+    """Write the grandi_bers_atrial_prepared right hand side into ydot."""
+    m = y[0]
+    h = y[1]
+    j = y[2]
+    d = y[3]
+    f = y[4]
+    fcaBj = y[5]
+    fcaBsl = y[6]
+    xtof = y[7]
+    ytof = y[8]
+    xkr = y[9]
+    xks = y[10]
+    RyRr = y[11]
+    RyRo = y[12]
+    RyRi = y[13]
+    NaBj = y[14]
+    NaBsl = y[15]
+    TnCL = y[16]
+    TnCHc = y[17]
+    TnCHm = y[18]
+    CaM = y[19]
+    Myoc = y[20]
+    Myom = y[21]
+    SRB = y[22]
+    SLLj = y[23]
+    SLLsl = y[24]
+    SLHj = y[25]
+    SLHsl = y[26]
+    Csqnb = y[27]
+    Ca_sr = y[28]
+    Naj = y[29]
+    Nasl = y[30]
+    Nai = y[31]
+    Ki = y[32]
+    Caj = y[33]
+    Casl = y[34]
+    Cai = y[35]
+    Vm = y[36]
+    rkuro = y[37]
+    skuro = y[38]
+    ml = y[39]
+    hl = y[40]
+    FoRT = p[0]
+    RToF = p[1]
+    Ko = p[2]
+    Nao = p[3]
+    Cao = p[4]
+    Mgi = p[5]
+    ecl = p[6]
+    GNa_junc = p[7]
+    GNa_sl = p[8]
+    nak_sigma = p[9]
+    nak_junc = p[10]
+    nak_sl = p[11]
+    KmNaip = p[12]
+    gkr = p[13]
+    gki = p[14]
+    Gks = p[15]
+    Gkp = p[16]
+    GtoFast = p[17]
+    pNaK = p[18]
+    eks_num = p[19]
+    GClCa_junc = p[20]
+    GClCa_sl = p[21]
+    KdClCa = p[22]
+    GClB = p[23]
+    ca_junc = p[24]
+    ca_sl = p[25]
+    caK = p[26]
+    Fjunc_CaL = p[27]
+    Fsl_CaL = p[28]
+    caNa_junc = p[29]
+    caNa_sl = p[30]
+    ncx_junc = p[31]
+    ncx_sl = p[32]
+    Kdact = p[33]
+    nuFoRT = p[34]
+    nu1FoRT = p[35]
+    ksat = p[36]
+    Nao3 = p[37]
+    KmCaiNao3 = p[38]
+    KmNai = p[39]
+    KmNao3 = p[40]
+    KmCai = p[41]
+    KmCao = p[42]
+    pca_junc = p[43]
+    pca_sl = p[44]
+    KmPCa16 = p[45]
+    GNaB_junc = p[46]
+    GNaB_sl = p[47]
+    GCaB_junc = p[48]
+    GCaB_sl = p[49]
+    ec50SR = p[50]
+    koCa = p[51]
+    kiCa = p[52]
+    kom = p[53]
+    kim = p[54]
+    ks = p[55]
+    serca = p[56]
+    Kmf = p[57]
+    Kmr = p[58]
+    hillSRCaP = p[59]
+    kon_na = p[60]
+    koff_na = p[61]
+    Bmax_Naj = p[62]
+    Bmax_Nasl = p[63]
+    kon_tncl = p[64]
+    koff_tncl = p[65]
+    Bmax_TnClow = p[66]
+    kon_tnchca = p[67]
+    koff_tnchca = p[68]
+    kon_tnchmg = p[69]
+    koff_tnchmg = p[70]
+    Bmax_TnChigh = p[71]
+    kon_cam = p[72]
+    koff_cam = p[73]
+    Bmax_CaM = p[74]
+    kon_myoca = p[75]
+    koff_myoca = p[76]
+    kon_myomg = p[77]
+    koff_myomg = p[78]
+    Bmax_myosin = p[79]
+    kon_sr = p[80]
+    koff_sr = p[81]
+    Bmax_SR = p[82]
+    kon_sll = p[83]
+    koff_sll = p[84]
+    Bmax_SLlowsl = p[85]
+    Bmax_SLlowj = p[86]
+    kon_slh = p[87]
+    koff_slh = p[88]
+    Bmax_SLhighsl = p[89]
+    Bmax_SLhighj = p[90]
+    kon_csqn = p[91]
+    koff_csqn = p[92]
+    Bmax_Csqn = p[93]
+    Cmem_FVjunc = p[94]
+    Cmem_FVsl = p[95]
+    Jna_juncsl_Vjunc = p[96]
+    Jna_juncsl_Vsl = p[97]
+    Jna_slmyo_Vsl = p[98]
+    Jna_slmyo_Vmyo = p[99]
+    Jca_juncsl_Vjunc = p[100]
+    Jca_juncsl_Vsl = p[101]
+    Jca_slmyo_Vsl = p[102]
+    Jca_slmyo_Vmyo = p[103]
+    Vmyo_Vsr = p[104]
+    Vsr_Vjunc = p[105]
+    Vmyo_Vjunc = p[106]
+    Vsr_Vmyo = p[107]
+    I_app = p[108] if t < 5 else 0.0
+    ISO = p[109]
+    GNaL_junc = p[110]
+    GNaL_sl = p[111]
+    tauhl = p[112]
+    Gkur = p[113]
+    GkAch = p[114]
+    SRleak = p[115]
+    _x0 = -1/(15212.5932856544*exp(0.134589502018843*Vm) + 1)**2
+    _x1 = (Vm >= -40)
+    _x2 = 0.1*Vm
+    _x3 = exp(-_x2)
+    _x4 = 0.22313016014843*exp(-0.5*ISO - 0.166666666666667*Vm)
+    _x5 = _x4 + 1
+    _x6 = fcaBj - 1
+    _x7 = fcaBsl - 1
+    _x8 = RyRi + RyRo + RyRr - 1
+    _x9 = 15 - 14/((ec50SR/Ca_sr)**2.5 + 1)
+    _x10 = Caj*_x9*kiCa
+    _x11 = Caj**2
+    _x12 = _x11*koCa/_x9
+    _x13 = -RyRo*kom + RyRr*_x12
+    _x14 = RyRi*kim - RyRo*_x10
+    _x15 = NaBj*koff_na
+    _x16 = Naj*kon_na*(Bmax_Naj - NaBj)
+    _x17 = NaBsl*koff_na - Nasl*kon_na*(Bmax_Nasl - NaBsl)
+    _x18 = TnCL*koff_tncl
+    _x19 = Cai*kon_tncl*(Bmax_TnClow - TnCL)
+    _x20 = -Bmax_TnChigh + TnCHc + TnCHm
+    _x21 = Cai*_x20*kon_tnchca + TnCHc*koff_tnchca
+    _x22 = Mgi*_x20*kon_tnchmg + TnCHm*koff_tnchmg
+    _x23 = CaM*koff_cam - Cai*kon_cam*(Bmax_CaM - CaM)
+    _x24 = -Bmax_myosin + Myoc + Myom
+    _x25 = Cai*_x24*kon_myoca + Myoc*koff_myoca
+    _x26 = Mgi*_x24*kon_myomg + Myom*koff_myomg
+    _x27 = SRB*koff_sr
+    _x28 = Cai*kon_sr*(Bmax_SR - SRB)
+    _x29 = Caj*kon_sll*(Bmax_SLlowj - SLLj) - SLLj*koff_sll
+    _x30 = SLLsl*koff_sll
+    _x31 = Casl*kon_sll*(Bmax_SLlowsl - SLLsl)
+    _x32 = Caj*kon_slh*(Bmax_SLhighj - SLHj) - SLHj*koff_slh
+    _x33 = SLHsl*koff_slh
+    _x34 = Casl*kon_slh*(Bmax_SLhighsl - SLHsl)
+    _x35 = Ca_sr*kon_csqn*(Bmax_Csqn - Csqnb) - Csqnb*koff_csqn
+    _x36 = Ca_sr - Caj
+    _x37 = (Ca_sr/Kmr)**hillSRCaP
+    _x38 = (Cai/Kmf)**hillSRCaP
+    _x39 = serca*(_x37 - _x38)/(_x37 + _x38 + 1)
+    _x40 = -Nasl
+    _x41 = Naj + _x40
+    _x42 = -Vm
+    _x43 = RToF*log(Nao/Naj) + _x42
+    _x44 = -_x43
+    _x45 = hl*ml**3
+    _x46 = h*j*m**3
+    _x47 = GNa_junc*_x46
+    _x48 = -_x6
+    _x49 = FoRT*Vm
+    _x50 = exp(_x49)
+    _x51 = Vm*d*f
+    _x52 = _x51/(_x50 - 1)
+    _x53 = _x52*caNa_junc*(Naj*_x50 - Nao)
+    _x54 = KmNaip**4
+    _x55 = 1/(nak_sigma*exp(-_x49) + 1 + 0.1245*exp(-FoRT*_x2))
+    _x56 = _x55*nak_junc/(1 + _x54/Naj**4)
+    _x57 = exp(Vm*nu1FoRT)
+    _x58 = Caj*Nao3
+    _x59 = Naj**3
+    _x60 = exp(Vm*nuFoRT)
+    _x61 = -Cao*_x59*_x60 + _x57*_x58
+    _x62 = 1/(_x57*ksat + 1)
+    _x63 = Kdact**2
+    _x64 = 1/KmCai
+    _x65 = KmNai**(-3)
+    _x66 = _x62*ncx_junc/((1 + _x63/_x11)*(Caj*KmNao3*(Caj*_x64 + 1) + Cao*_x59 + KmCaiNao3*(_x59*_x65 + 1) + KmCao*_x59 + _x58))
+    _x67 = -_x61*_x66
+    _x68 = Nai + _x40
+    _x69 = 1/(1 + _x54/Nasl**4)
+    _x70 = 1/(1 + _x63/Casl**2)
+    _x71 = Casl*Nao3
+    _x72 = Nasl**3
+    _x73 = Cao*_x72
+    _x74 = -_x57*_x71 + _x60*_x73
+    _x75 = 1/(Casl*KmNao3*(Casl*_x64 + 1) + KmCaiNao3*(_x65*_x72 + 1) + KmCao*_x72 + _x71 + _x73)
+    _x76 = RToF*log(Nao/Nasl) + _x42
+    _x77 = GNaL_sl*_x76
+    _x78 = GNaB_sl*_x76 + GNa_sl*_x46*_x76 + _x45*_x77 - _x52*_x7*caNa_sl*(Nao - Nasl*_x50)
+    _x79 = Caj**1.6
+    _x80 = _x79*pca_junc/(KmPCa16 + _x79)
+    _x81 = 1/Caj
+    _x82 = 0.5*RToF
+    _x83 = _x42 + _x82*log(Cao*_x81)
+    _x84 = exp(2*_x49)
+    _x85 = _x51/(_x84 - 1)
+    _x86 = _x85*ca_junc*(Caj*_x84 - Cao)
+    _x87 = -Casl
+    _x88 = Caj + _x87
+    _x89 = Cai + _x87
+    _x90 = Casl**1.6
+    _x91 = _x90*pca_sl/(KmPCa16 + _x90)
+    _x92 = 1/Casl
+    _x93 = GCaB_sl*(_x42 + _x82*log(Cao*_x92))
+    _x94 = _x7*_x85*ca_sl*(Cao - Casl*_x84)
+    _x95 = _x62*_x70*_x74*_x75*ncx_sl
+    _x96 = Vm - ecl
+    _x97 = RToF*log(Ko/Ki)
+    _x98 = _x42 + _x97
+    _x99 = GNaL_junc*_x43
+    _x100 = 1.02/(7.35454251046446e-7*exp(0.2385*Vm - 0.2385*_x97) + 1)
+    _x101 = exp(_x2)
+    ydot[0] = -(m - 1/(1 + 0.00184221158116513*exp(-0.110741971207087*Vm))**2)/(0.1292*exp(-(0.0643500643500644*Vm + 2.94658944658945)**2) + 0.06487*exp(-(0.0195618153364632*Vm - 0.0943466353677621)**2))
+    ydot[1] = -(_x0 + h)*((1/(0.168831168831169 + 0.0646209624466736*exp(-0.0900900900900901*Vm))) if _x1 else (2.7*exp(0.079*Vm) + 310000.0*exp(0.3485*Vm) + 4.43126792958051e-7*exp(-0.147058823529412*Vm)))
+    ydot[2] = -(_x0 + j)*((0.6*exp(0.057*Vm)/(0.0407622039783662*_x3 + 1)) if _x1 else (-(Vm + 37.78)*(25428.0*exp(0.2444*Vm) + 6.948e-6*exp(-0.04391*Vm))/(50262745825.954*exp(0.311*Vm) + 1) + 0.02424*exp(-0.01052*Vm)/(1 + 0.00396086833990426*exp(-0.1378*Vm))))
+    ydot[3] = _x5*(d - 1/_x5)*(0.105*ISO + 0.035*Vm + 0.315)/(_x4 - 1)
+    ydot[4] = (0.02 + 0.0197*exp(-(0.1011*ISO + 0.0337*Vm + 0.8425)**2))*(-f + 1/(exp((1/9)*(Vm + 35)) + 1) + 0.6/(exp((1/20)*(50 - Vm)) + 1))
+    ydot[5] = -1.7*Caj*_x6 - 0.0119*fcaBj
+    ydot[6] = -1.7*Casl*_x7 - 0.0119*fcaBsl
+    ydot[7] = -(xtof - 1/(1 + 1.09516943987466*exp(-0.0909090909090909*Vm)))/(1.5 + 3.5*exp(-1/900*(Vm + 45)**2))
+    ydot[8] = -(ytof - 1/(33.8432351130073*exp(0.0869565217391304*Vm) + 1))/(24.14 + 25.635*exp(-(0.0629615871356885*Vm + 3.30233524526686)**2.0))
+    ydot[9] = -1/10*(xkr - 1/(exp(-1/5*Vm - 2) + 1))/(23/(exp((1/20)*Vm + 2) + 1) + 330/((1 + exp(-1/9*(Vm + 22)))*(exp((1/9)*(Vm + 11)) + 1)))
+    ydot[10] = -(xks - 1/(0.765928338364649*exp(-2.80701754385965*ISO - 0.0701754385964912*Vm) + 1))*(0.00084995496300182*exp(-2.8328611898017*ISO - 0.0708215297450425*Vm) + 0.00100999899000101)
+    ydot[11] = -RyRr*_x10 - _x13 - _x8*kim
+    ydot[12] = _x13 + _x14
+    ydot[13] = -RyRi*kom - _x12*_x8 - _x14
+    ydot[14] = -_x15 + _x16
+    ydot[15] = -_x17
+    ydot[16] = -_x18 + _x19
+    ydot[17] = -_x21
+    ydot[18] = -_x22
+    ydot[19] = -_x23
+    ydot[20] = -_x25
+    ydot[21] = -_x26
+    ydot[22] = -_x27 + _x28
+    ydot[23] = _x29
+    ydot[24] = -_x30 + _x31
+    ydot[25] = _x32
+    ydot[26] = -_x33 + _x34
+    ydot[27] = _x35
+    ydot[28] = -RyRo*_x36*ks - SRleak*Vmyo_Vsr*_x36 - _x35 - _x39
+    ydot[29] = -Cmem_FVjunc*(GNaB_junc*_x44 + GNaL_junc*_x44*_x45 + _x44*_x47 + _x48*_x53 + 3*_x56 + 3*_x67) - Jna_juncsl_Vjunc*_x41 + _x15 - _x16
+    ydot[30] = -Cmem_FVsl*(3*_x55*_x69*nak_sl + 3*_x62*_x70*_x74*_x75*ncx_sl - _x78) + Jna_juncsl_Vsl*_x41 + Jna_slmyo_Vsl*_x68 + _x17
+    ydot[31] = -Jna_slmyo_Vmyo*_x68
+    ydot[32] = 0
+    ydot[33] = -Cmem_FVjunc*(-0.5*GCaB_junc*_x83 + 0.5*_x48*_x86 - 1.0*_x67 + 0.5*_x80) - Jca_juncsl_Vjunc*_x88 + RyRo*Vsr_Vjunc*_x36*ks + SRleak*Vmyo_Vjunc*_x36 - _x29 - _x32
+    ydot[34] = -Cmem_FVsl*(0.5*_x91 - 0.5*_x93 + 0.5*_x94 - 1.0*_x95) + Jca_juncsl_Vsl*_x88 + Jca_slmyo_Vsl*_x89 + _x30 - _x31 + _x33 - _x34
+    ydot[35] = -Jca_slmyo_Vmyo*_x89 + Vsr_Vmyo*_x39 + _x18 - _x19 + _x21 + _x22 + _x23 + _x25 + _x26 + _x27 - _x28
+    ydot[36] = GCaB_junc*_x83 - GClB*_x96 + GNaB_junc*_x43 + GkAch*_x98*(0.08 + 0.4/(exp((1/12)*(Vm + 91)) + 1)) + Gkp*_x98/(1 + 1786.47556537862*exp(-0.167224080267559*Vm)) + Gks*xks**2*(RToF*log(eks_num/(Ki + Nai*pNaK)) + _x42) + Gkur*_x98*rkuro*skuro + GtoFast*_x98*xtof*ytof + I_app + _x100*_x98*gki/(_x100 + (1.15340563518656e-16*exp(0.06175*Vm - 0.06175*_x97) + 0.762624006506308*exp(0.08032*Vm - 0.08032*_x97))/(0.0867722941576933*exp(-0.5143*Vm + 0.5143*_x97) + 1)) + _x43*_x47 + _x45*_x99 + _x52*caK*(Fjunc_CaL*_x6 + Fsl_CaL*_x7)*(Ki*_x50 - Ko) + _x53*_x6 - _x55*_x69*nak_sl - _x56 + _x6*_x86 + _x61*_x66 + _x78 - _x80 - _x91 + _x93 - _x94 - _x95 - _x96*(GClCa_junc/(KdClCa*_x81 + 1) + GClCa_sl/(KdClCa*_x92 + 1)) + _x98*gkr*xkr/(exp((1/24)*(Vm + 74)) + 1)
+    ydot[37] = -(rkuro - 1.0/(1.0 + 0.49774149722499*exp(-0.116279069767442*Vm)))/(0.5 + 9.0/(1.51689679638821*exp(0.0833333333333333*Vm) + 1.0))
+    ydot[38] = -(skuro - 1.0/(2.11700001661267*_x101 + 1.0))/(3050.0 + 590.0/(403.428793492735*_x101 + 1.0))
+    ydot[39] = -0.08*ml*exp(-1/11*Vm) - (0.32*Vm + 15.0816)*(ml - 1)/(1 - 0.00897780373069724*_x3)
+    ydot[40] = -(hl - 1/(3011752.78212386*exp(0.163934426229508*Vm) + 1.0))/tauhl
+    ydot[41] = -_x45*(_x77 + _x99)
+
+
+def grandi_bers_atrial_linearized(y, t, p, ydot, a, c):
+    """Write the grandi_bers_atrial_prepared right hand side into ydot, the diagonal of its Jacobian into a
+    and the entries c[2*k], c[2*k + 1] = J[i, j], J[j, i] of the coupled pairs (i, j) into c."""
+    m = y[0]
+    h = y[1]
+    j = y[2]
+    d = y[3]
+    f = y[4]
+    fcaBj = y[5]
+    fcaBsl = y[6]
+    xtof = y[7]
+    ytof = y[8]
+    xkr = y[9]
+    xks = y[10]
+    RyRr = y[11]
+    RyRo = y[12]
+    RyRi = y[13]
+    NaBj = y[14]
+    NaBsl = y[15]
+    TnCL = y[16]
+    TnCHc = y[17]
+    TnCHm = y[18]
+    CaM = y[19]
+    Myoc = y[20]
+    Myom = y[21]
+    SRB = y[22]
+    SLLj = y[23]
+    SLLsl = y[24]
+    SLHj = y[25]
+    SLHsl = y[26]
+    Csqnb = y[27]
+    Ca_sr = y[28]
+    Naj = y[29]
+    Nasl = y[30]
+    Nai = y[31]
+    Ki = y[32]
+    Caj = y[33]
+    Casl = y[34]
+    Cai = y[35]
+    Vm = y[36]
+    rkuro = y[37]
+    skuro = y[38]
+    ml = y[39]
+    hl = y[40]
+    FoRT = p[0]
+    RToF = p[1]
+    Ko = p[2]
+    Nao = p[3]
+    Cao = p[4]
+    Mgi = p[5]
+    ecl = p[6]
+    GNa_junc = p[7]
+    GNa_sl = p[8]
+    nak_sigma = p[9]
+    nak_junc = p[10]
+    nak_sl = p[11]
+    KmNaip = p[12]
+    gkr = p[13]
+    gki = p[14]
+    Gks = p[15]
+    Gkp = p[16]
+    GtoFast = p[17]
+    pNaK = p[18]
+    eks_num = p[19]
+    GClCa_junc = p[20]
+    GClCa_sl = p[21]
+    KdClCa = p[22]
+    GClB = p[23]
+    ca_junc = p[24]
+    ca_sl = p[25]
+    caK = p[26]
+    Fjunc_CaL = p[27]
+    Fsl_CaL = p[28]
+    caNa_junc = p[29]
+    caNa_sl = p[30]
+    ncx_junc = p[31]
+    ncx_sl = p[32]
+    Kdact = p[33]
+    nuFoRT = p[34]
+    nu1FoRT = p[35]
+    ksat = p[36]
+    Nao3 = p[37]
+    KmCaiNao3 = p[38]
+    KmNai = p[39]
+    KmNao3 = p[40]
+    KmCai = p[41]
+    KmCao = p[42]
+    pca_junc = p[43]
+    pca_sl = p[44]
+    KmPCa16 = p[45]
+    GNaB_junc = p[46]
+    GNaB_sl = p[47]
+    GCaB_junc = p[48]
+    GCaB_sl = p[49]
+    ec50SR = p[50]
+    koCa = p[51]
+    kiCa = p[52]
+    kom = p[53]
+    kim = p[54]
+    ks = p[55]
+    serca = p[56]
+    Kmf = p[57]
+    Kmr = p[58]
+    hillSRCaP = p[59]
+    kon_na = p[60]
+    koff_na = p[61]
+    Bmax_Naj = p[62]
+    Bmax_Nasl = p[63]
+    kon_tncl = p[64]
+    koff_tncl = p[65]
+    Bmax_TnClow = p[66]
+    kon_tnchca = p[67]
+    koff_tnchca = p[68]
+    kon_tnchmg = p[69]
+    koff_tnchmg = p[70]
+    Bmax_TnChigh = p[71]
+    kon_cam = p[72]
+    koff_cam = p[73]
+    Bmax_CaM = p[74]
+    kon_myoca = p[75]
+    koff_myoca = p[76]
+    kon_myomg = p[77]
+    koff_myomg = p[78]
+    Bmax_myosin = p[79]
+    kon_sr = p[80]
+    koff_sr = p[81]
+    Bmax_SR = p[82]
+    kon_sll = p[83]
+    koff_sll = p[84]
+    Bmax_SLlowsl = p[85]
+    Bmax_SLlowj = p[86]
+    kon_slh = p[87]
+    koff_slh = p[88]
+    Bmax_SLhighsl = p[89]
+    Bmax_SLhighj = p[90]
+    kon_csqn = p[91]
+    koff_csqn = p[92]
+    Bmax_Csqn = p[93]
+    Cmem_FVjunc = p[94]
+    Cmem_FVsl = p[95]
+    Jna_juncsl_Vjunc = p[96]
+    Jna_juncsl_Vsl = p[97]
+    Jna_slmyo_Vsl = p[98]
+    Jna_slmyo_Vmyo = p[99]
+    Jca_juncsl_Vjunc = p[100]
+    Jca_juncsl_Vsl = p[101]
+    Jca_slmyo_Vsl = p[102]
+    Jca_slmyo_Vmyo = p[103]
+    Vmyo_Vsr = p[104]
+    Vsr_Vjunc = p[105]
+    Vmyo_Vjunc = p[106]
+    Vsr_Vmyo = p[107]
+    I_app = p[108] if t < 5 else 0.0
+    ISO = p[109]
+    GNaL_junc = p[110]
+    GNaL_sl = p[111]
+    tauhl = p[112]
+    Gkur = p[113]
+    GkAch = p[114]
+    SRleak = p[115]
+    _x0 = 1/(0.1292*exp(-(0.0643500643500644*Vm + 2.94658944658945)**2) + 0.06487*exp(-(0.0195618153364632*Vm - 0.0943466353677621)**2))
+    _x1 = -1/(15212.5932856544*exp(0.134589502018843*Vm) + 1)**2
+    _x2 = (Vm >= -40)
+    _x3 = ((1/(0.168831168831169 + 0.0646209624466736*exp(-0.0900900900900901*Vm))) if _x2 else (2.7*exp(0.079*Vm) + 310000.0*exp(0.3485*Vm) + 4.43126792958051e-7*exp(-0.147058823529412*Vm)))
+    _x4 = 0.1*Vm
+    _x5 = exp(-_x4)
+    _x6 = ((0.6*exp(0.057*Vm)/(0.0407622039783662*_x5 + 1)) if _x2 else (-(Vm + 37.78)*(25428.0*exp(0.2444*Vm) + 6.948e-6*exp(-0.04391*Vm))/(50262745825.954*exp(0.311*Vm) + 1) + 0.02424*exp(-0.01052*Vm)/(1 + 0.00396086833990426*exp(-0.1378*Vm))))
+    _x7 = 0.22313016014843*exp(-0.5*ISO - 0.166666666666667*Vm)
+    _x8 = _x7 + 1
+    _x9 = _x8*(0.105*ISO + 0.035*Vm + 0.315)/(_x7 - 1)
+    _x10 = 0.02 + 0.0197*exp(-(0.1011*ISO + 0.0337*Vm + 0.8425)**2)
+    _x11 = fcaBj - 1
+    _x12 = 1.7*Caj
+    _x13 = fcaBsl - 1
+    _x14 = 1.7*Casl
+    _x15 = 1/(1.5 + 3.5*exp(-1/900*(Vm + 45)**2))
+    _x16 = 1/(24.14 + 25.635*exp(-(0.0629615871356885*Vm + 3.30233524526686)**2.0))
+    _x17 = (1/10)/(23/(exp((1/20)*Vm + 2) + 1) + 330/((1 + exp(-1/9*(Vm + 22)))*(exp((1/9)*(Vm + 11)) + 1)))
+    _x18 = 0.00084995496300182*exp(-2.8328611898017*ISO - 0.0708215297450425*Vm) + 0.00100999899000101
+    _x19 = RyRi + RyRo + RyRr - 1
+    _x20 = 1/Ca_sr
+    _x21 = 15 - 14/((_x20*ec50SR)**2.5 + 1)
+    _x22 = Caj*_x21*kiCa
+    _x23 = Caj**2
+    _x24 = _x23*koCa/_x21
+    _x25 = -RyRo*kom + RyRr*_x24
+    _x26 = RyRi*kim - RyRo*_x22
+    _x27 = NaBj*koff_na
+    _x28 = Bmax_Naj - NaBj
+    _x29 = Naj*kon_na
+    _x30 = _x28*_x29
+    _x31 = Bmax_Nasl - NaBsl
+    _x32 = Nasl*kon_na
+    _x33 = NaBsl*koff_na - _x31*_x32
+    _x34 = TnCL*koff_tncl
+    _x35 = Bmax_TnClow - TnCL
+    _x36 = Cai*kon_tncl
+    _x37 = _x35*_x36
+    _x38 = -Bmax_TnChigh + TnCHc + TnCHm
+    _x39 = Cai*kon_tnchca
+    _x40 = TnCHc*koff_tnchca + _x38*_x39
+    _x41 = Mgi*kon_tnchmg
+    _x42 = TnCHm*koff_tnchmg + _x38*_x41
+    _x43 = Bmax_CaM - CaM
+    _x44 = Cai*kon_cam
+    _x45 = CaM*koff_cam - _x43*_x44
+    _x46 = -Bmax_myosin + Myoc + Myom
+    _x47 = Cai*kon_myoca
+    _x48 = Myoc*koff_myoca + _x46*_x47
+    _x49 = Mgi*kon_myomg
+    _x50 = Myom*koff_myomg + _x46*_x49
+    _x51 = SRB*koff_sr
+    _x52 = Bmax_SR - SRB
+    _x53 = Cai*kon_sr
+    _x54 = _x52*_x53
+    _x55 = Bmax_SLlowj - SLLj
+    _x56 = Caj*kon_sll
+    _x57 = -SLLj*koff_sll + _x55*_x56
+    _x58 = SLLsl*koff_sll
+    _x59 = Bmax_SLlowsl - SLLsl
+    _x60 = Casl*kon_sll
+    _x61 = _x59*_x60
+    _x62 = Bmax_SLhighj - SLHj
+    _x63 = Caj*kon_slh
+    _x64 = -SLHj*koff_slh + _x62*_x63
+    _x65 = SLHsl*koff_slh
+    _x66 = Bmax_SLhighsl - SLHsl
+    _x67 = Casl*kon_slh
+    _x68 = _x66*_x67
+    _x69 = Bmax_Csqn - Csqnb
+    _x70 = Ca_sr*kon_csqn
+    _x71 = -Csqnb*koff_csqn + _x69*_x70
+    _x72 = Ca_sr - Caj
+    _x73 = RyRo*ks
+    _x74 = SRleak*Vmyo_Vsr
+    _x75 = (Ca_sr/Kmr)**hillSRCaP
+    _x76 = (Cai/Kmf)**hillSRCaP
+    _x77 = _x75 - _x76
+    _x78 = _x75 + _x76 + 1
+    _x79 = serca/_x78
+    _x80 = _x77*_x79
+    _x81 = -Nasl
+    _x82 = Naj + _x81
+    _x83 = -Vm
+    _x84 = 1/Naj
+    _x85 = RToF*log(Nao*_x84) + _x83
+    _x86 = -_x85
+    _x87 = hl*ml**3
+    _x88 = GNaL_junc*_x87
+    _x89 = h*j*m**3
+    _x90 = GNa_junc*_x89
+    _x91 = FoRT*Vm
+    _x92 = exp(_x91)
+    _x93 = Naj*_x92 - Nao
+    _x94 = _x92 - 1
+    _x95 = 1/_x94
+    _x96 = d*f
+    _x97 = _x95*_x96
+    _x98 = _x97*caNa_junc
+    _x99 = _x93*_x98
+    _x100 = -Vm*_x11
+    _x101 = exp(-FoRT*_x4)
+    _x102 = nak_sigma*exp(-_x91)
+    _x103 = 0.1245*_x101 + _x102 + 1
+    _x104 = 1/_x103
+    _x105 = KmNaip**4
+    _x106 = 1 + _x105/Naj**4
+    _x107 = nak_junc/_x106
+    _x108 = _x104*_x107
+    _x109 = exp(Vm*nu1FoRT)
+    _x110 = Caj*Nao3
+    _x111 = _x109*_x110
+    _x112 = Naj**3
+    _x113 = exp(Vm*nuFoRT)
+    _x114 = -Cao*_x112*_x113 + _x111
+    _x115 = -_x114
+    _x116 = Cao*_x112
+    _x117 = 1/KmCai
+    _x118 = Caj*_x117
+    _x119 = KmNao3*(_x118 + 1)
+    _x120 = KmNai**(-3)
+    _x121 = Caj*_x119 + KmCaiNao3*(_x112*_x120 + 1) + KmCao*_x112 + _x110 + _x116
+    _x122 = 1/_x121
+    _x123 = _x109*ksat
+    _x124 = _x123 + 1
+    _x125 = 1/_x124
+    _x126 = Kdact**2
+    _x127 = _x126/_x23 + 1
+    _x128 = 1/_x127
+    _x129 = _x125*_x128*ncx_junc
+    _x130 = _x122*_x129
+    _x131 = _x115*_x130
+    _x132 = Nai + _x81
+    _x133 = 1 + _x105/Nasl**4
+    _x134 = 1/_x133
+    _x135 = 1 + _x126/Casl**2
+    _x136 = 1/_x135
+    _x137 = Casl*Nao3
+    _x138 = _x109*_x137
+    _x139 = Nasl**3
+    _x140 = Cao*_x139
+    _x141 = _x113*_x140
+    _x142 = -_x138 + _x141
+    _x143 = Casl*_x117
+    _x144 = KmNao3*(_x143 + 1)
+    _x145 = Casl*_x144 + KmCaiNao3*(_x120*_x139 + 1) + KmCao*_x139 + _x137 + _x140
+    _x146 = 1/_x145
+    _x147 = 1/Nasl
+    _x148 = RToF*log(Nao*_x147) + _x83
+    _x149 = GNaL_sl*_x148
+    _x150 = GNa_sl*_x89
+    _x151 = Nao - Nasl*_x92
+    _x152 = _x97*caNa_sl
+    _x153 = _x13*_x151*_x152
+    _x154 = GNaB_sl*_x148 - Vm*_x153 + _x148*_x150 + _x149*_x87
+    _x155 = Caj**1.6
+    _x156 = KmPCa16 + _x155
+    _x157 = pca_junc/_x156
+    _x158 = _x155*_x157
+    _x159 = 1/Caj
+    _x160 = 0.5*RToF
+    _x161 = _x160*log(Cao*_x159) + _x83
+    _x162 = 2*_x91
+    _x163 = exp(_x162)
+    _x164 = Caj*_x163 - Cao
+    _x165 = _x163 - 1
+    _x166 = 1/_x165
+    _x167 = _x166*_x96
+    _x168 = _x167*ca_junc
+    _x169 = _x164*_x168
+    _x170 = 0.5*_x100
+    _x171 = -Casl
+    _x172 = Caj + _x171
+    _x173 = Cai + _x171
+    _x174 = Casl**1.6
+    _x175 = KmPCa16 + _x174
+    _x176 = pca_sl/_x175
+    _x177 = _x174*_x176
+    _x178 = 1/Casl
+    _x179 = GCaB_sl*(_x160*log(Cao*_x178) + _x83)
+    _x180 = Cao - Casl*_x163
+    _x181 = _x167*ca_sl
+    _x182 = _x13*_x180*_x181
+    _x183 = Vm*_x182
+    _x184 = _x125*_x136*_x146*ncx_sl
+    _x185 = _x142*_x184
+    _x186 = Vm - ecl
+    _x187 = GClCa_junc/(KdClCa*_x159 + 1) + GClCa_sl/(KdClCa*_x178 + 1)
+    _x188 = RToF*log(Ko/Ki)
+    _x189 = _x188 + _x83
+    _x190 = exp((1/12)*(Vm + 91)) + 1
+    _x191 = GkAch*(0.08 + 0.4/_x190)
+    _x192 = exp(-0.167224080267559*Vm)
+    _x193 = 1786.47556537862*_x192 + 1
+    _x194 = Gkp/_x193
+    _x195 = Gks*xks**2
+    _x196 = _x134*nak_sl
+    _x197 = GNaL_junc*_x85
+    _x198 = Gkur*rkuro*skuro
+    _x199 = GtoFast*xtof*ytof
+    _x200 = exp((1/24)*(Vm + 74)) + 1
+    _x201 = gkr*xkr
+    _x202 = _x201/_x200
+    _x203 = exp(0.2385*Vm - 0.2385*_x188)
+    _x204 = 7.35454251046446e-7*_x203 + 1
+    _x205 = 1.02/_x204
+    _x206 = exp(-0.5143*Vm + 0.5143*_x188)
+    _x207 = 0.0867722941576933*_x206 + 1
+    _x208 = 1/_x207
+    _x209 = exp(0.08032*Vm - 0.08032*_x188)
+    _x210 = exp(0.06175*Vm - 0.06175*_x188)
+    _x211 = 0.762624006506308*_x209 + 1.15340563518656e-16*_x210
+    _x212 = _x205 + _x208*_x211
+    _x213 = 1/_x212
+    _x214 = _x205*gki
+    _x215 = _x213*_x214
+    _x216 = Ki*_x92 - Ko
+    _x217 = Fjunc_CaL*_x11 + Fsl_CaL*_x13
+    _x218 = 1/(0.5 + 9.0/(1.51689679638821*exp(0.0833333333333333*Vm) + 1.0))
+    _x219 = exp(_x4)
+    _x220 = 1/(3050.0 + 590.0/(403.428793492735*_x219 + 1.0))
+    _x221 = 0.08*exp(-1/11*Vm)
+    _x222 = (0.32*Vm + 15.0816)/(1 - 0.00897780373069724*_x5)
+    _x223 = 1/tauhl
+    _x224 = _x24 + kim
+    _x225 = _x70 + koff_csqn
+    _x226 = _x69*kon_csqn
+    _x227 = _x79*hillSRCaP
+    _x228 = _x78**(-2)
+    _x229 = RToF*_x84
+    _x230 = 12*_x104*_x105
+    _x231 = 9*Naj**2
+    _x232 = Cao*_x113
+    _x233 = Cao + KmCaiNao3*_x120 + KmCao
+    _x234 = _x115*_x129/_x121**2
+    _x235 = RToF*_x147
+    _x236 = GNaL_sl*_x87
+    _x237 = -Vm*_x13
+    _x238 = 9*Nasl**2
+    _x239 = _x125*_x142*ncx_sl
+    _x240 = _x136*_x239/_x145**2
+    _x241 = 0.25*RToF
+    _x242 = 1.0*Nao3*_x109
+    _x243 = 2.0*_x126
+    _x244 = _x122*ncx_junc
+    _x245 = Vsr_Vmyo*_x76/Cai
+    _x246 = FoRT*(0.01245*_x101 + _x102)/_x103**2
+    _x247 = _x203/_x204**2
+    _x248 = _x124**(-2)
+    _x249 = _x94**(-2)
+    _x250 = _x249*_x92
+    _x251 = _x165**(-2)
+    ydot[0] = -_x0*(m - 1/(1 + 0.00184221158116513*exp(-0.110741971207087*Vm))**2)
+    ydot[1] = -_x3*(_x1 + h)
+    ydot[2] = -_x6*(_x1 + j)
+    ydot[3] = _x9*(d - 1/_x8)
+    ydot[4] = _x10*(-f + 1/(exp((1/9)*(Vm + 35)) + 1) + 0.6/(exp((1/20)*(50 - Vm)) + 1))
+    ydot[5] = -_x11*_x12 - 0.0119*fcaBj
+    ydot[6] = -_x13*_x14 - 0.0119*fcaBsl
+    ydot[7] = -_x15*(xtof - 1/(1 + 1.09516943987466*exp(-0.0909090909090909*Vm)))
+    ydot[8] = -_x16*(ytof - 1/(33.8432351130073*exp(0.0869565217391304*Vm) + 1))
+    ydot[9] = -_x17*(xkr - 1/(exp(-1/5*Vm - 2) + 1))
+    ydot[10] = -_x18*(xks - 1/(0.765928338364649*exp(-2.80701754385965*ISO - 0.0701754385964912*Vm) + 1))
+    ydot[11] = -RyRr*_x22 - _x19*kim - _x25
+    ydot[12] = _x25 + _x26
+    ydot[13] = -RyRi*kom - _x19*_x24 - _x26
+    ydot[14] = -_x27 + _x30
+    ydot[15] = -_x33
+    ydot[16] = -_x34 + _x37
+    ydot[17] = -_x40
+    ydot[18] = -_x42
+    ydot[19] = -_x45
+    ydot[20] = -_x48
+    ydot[21] = -_x50
+    ydot[22] = -_x51 + _x54
+    ydot[23] = _x57
+    ydot[24] = -_x58 + _x61
+    ydot[25] = _x64
+    ydot[26] = -_x65 + _x68
+    ydot[27] = _x71
+    ydot[28] = -_x71 - _x72*_x73 - _x72*_x74 - _x80
+    ydot[29] = -Cmem_FVjunc*(GNaB_junc*_x86 + _x100*_x99 + 3*_x108 + 3*_x131 + _x86*_x88 + _x86*_x90) - Jna_juncsl_Vjunc*_x82 + _x27 - _x30
+    ydot[30] = -Cmem_FVsl*(3*_x104*_x134*nak_sl + 3*_x125*_x136*_x142*_x146*ncx_sl - _x154) + Jna_juncsl_Vsl*_x82 + Jna_slmyo_Vsl*_x132 + _x33
+    ydot[31] = -Jna_slmyo_Vmyo*_x132
+    ydot[32] = 0
+    ydot[33] = -Cmem_FVjunc*(-0.5*GCaB_junc*_x161 - 1.0*_x131 + 0.5*_x158 + _x169*_x170) - Jca_juncsl_Vjunc*_x172 + RyRo*Vsr_Vjunc*_x72*ks + SRleak*Vmyo_Vjunc*_x72 - _x57 - _x64
+    ydot[34] = -Cmem_FVsl*(0.5*_x177 - 0.5*_x179 + 0.5*_x183 - 1.0*_x185) + Jca_juncsl_Vsl*_x172 + Jca_slmyo_Vsl*_x173 + _x58 - _x61 + _x65 - _x68
+    ydot[35] = -Jca_slmyo_Vmyo*_x173 + Vsr_Vmyo*_x80 + _x34 - _x37 + _x40 + _x42 + _x45 + _x48 + _x50 + _x51 - _x54
+    ydot[36] = GCaB_junc*_x161 - GClB*_x186 + GNaB_junc*_x85 + I_app + Vm*_x11*_x169 + Vm*_x11*_x99 + Vm*_x216*_x217*_x97*caK - _x104*_x196 - _x108 + _x114*_x130 + _x154 - _x158 - _x177 + _x179 - _x183 - _x185 - _x186*_x187 + _x189*_x191 + _x189*_x194 + _x189*_x198 + _x189*_x199 + _x189*_x202 + _x189*_x215 + _x195*(RToF*log(eks_num/(Ki + Nai*pNaK)) + _x83) + _x197*_x87 + _x85*_x90
+    ydot[37] = -_x218*(rkuro - 1.0/(1.0 + 0.49774149722499*exp(-0.116279069767442*Vm)))
+    ydot[38] = -_x220*(skuro - 1.0/(2.11700001661267*_x219 + 1.0))
+    ydot[39] = -_x221*ml - _x222*(ml - 1)
+    ydot[40] = -_x223*(hl - 1/(3011752.78212386*exp(0.163934426229508*Vm) + 1.0))
+    ydot[41] = -_x87*(_x149 + _x197)
+    a[0] = -_x0
+    a[1] = -_x3
+    a[2] = -_x6
+    a[3] = _x9
+    a[4] = -_x10
+    a[5] = -_x12 - 0.0119
+    a[6] = -_x14 - 0.0119
+    a[7] = -_x15
+    a[8] = -_x16
+    a[9] = -_x17
+    a[10] = -_x18
+    a[11] = -_x22 - _x224
+    a[12] = -_x22 - kom
+    a[13] = -_x224 - kom
+    a[14] = -_x29 - koff_na
+    a[15] = -_x32 - koff_na
+    a[16] = -_x36 - koff_tncl
+    a[17] = -_x39 - koff_tnchca
+    a[18] = -_x41 - koff_tnchmg
+    a[19] = -_x44 - koff_cam
+    a[20] = -_x47 - koff_myoca
+    a[21] = -_x49 - koff_myomg
+    a[22] = -_x53 - koff_sr
+    a[23] = -_x56 - koff_sll
+    a[24] = -_x60 - koff_sll
+    a[25] = -_x63 - koff_slh
+    a[26] = -_x67 - koff_slh
+    a[27] = -_x225
+    a[28] = -_x20*_x227*_x75 + _x20*_x228*_x75*_x77*hillSRCaP*serca - _x226 - _x73 - _x74
+    a[29] = -Cmem_FVjunc*(GNaB_junc*_x229 + _x100*_x92*_x98 + _x130*_x231*_x232 + _x229*_x88 + _x229*_x90 - _x231*_x233*_x234 + _x230*nak_junc/(Naj**5*_x106**2)) - Jna_juncsl_Vjunc - _x28*kon_na
+    a[30] = -Cmem_FVsl*(GNaB_sl*_x235 + _x150*_x235 + _x152*_x237*_x92 + _x184*_x232*_x238 - _x233*_x238*_x240 + _x235*_x236 + _x230*nak_sl/(Nasl**5*_x133**2)) - Jna_juncsl_Vsl - Jna_slmyo_Vsl - _x31*kon_na
+    a[31] = -Jna_slmyo_Vmyo
+    a[32] = 0
+    a[33] = -Cmem_FVjunc*(0.8*Caj**0.6*_x157 - 0.8*Caj**2.2*pca_junc/_x156**2 + GCaB_junc*_x159*_x241 + _x130*_x242 + _x163*_x168*_x170 + 1.0*_x234*(KmNao3*_x118 + Nao3 + _x119) - _x115*_x125*_x243*_x244/(Caj**3*_x127**2)) - Jca_juncsl_Vjunc - SRleak*Vmyo_Vjunc - Vsr_Vjunc*_x73 - _x55*kon_sll - _x62*kon_slh
+    a[34] = -Cmem_FVsl*(0.8*Casl**0.6*_x176 - 0.8*Casl**2.2*pca_sl/_x175**2 + GCaB_sl*_x178*_x241 + 0.5*_x163*_x181*_x237 + _x184*_x242 + 1.0*_x240*(KmNao3*_x143 + Nao3 + _x144) - _x146*_x239*_x243/(Casl**3*_x135**2)) - Jca_juncsl_Vsl - Jca_slmyo_Vsl - _x59*kon_sll - _x66*kon_slh
+    a[35] = -Jca_slmyo_Vmyo - _x227*_x245 - _x228*_x245*_x77*hillSRCaP*serca - _x35*kon_tncl + _x38*kon_tnchca - _x43*kon_cam + _x46*kon_myoca - _x52*kon_sr
+    a[36] = 2*Caj*FoRT*Vm*_x11*_x163*_x166*ca_junc*d*f + 2*Casl*FoRT*Vm*_x13*_x163*_x166*ca_sl*d*f + FoRT*Ki*Vm*_x217*_x92*_x95*caK*d*f + FoRT*Naj*Vm*_x11*_x92*_x95*caNa_junc*d*f + FoRT*Nasl*Vm*_x13*_x92*_x95*caNa_sl*d*f + FoRT*Vm*_x13*_x151*_x249*_x92*caNa_sl*d*f + 2*FoRT*Vm*_x13*_x163*_x180*_x251*ca_sl*d*f - GCaB_junc - GCaB_sl - GClB - GNaB_junc - GNaB_sl - 0.0333333333333333*GkAch*_x189*exp((1/12)*Vm + 91/12)/_x190**2 + 298.741733340907*Gkp*_x189*_x192/_x193**2 - _x107*_x246 + _x109*_x136*_x142*_x146*_x248*ksat*ncx_sl*nu1FoRT - _x11*_x162*_x163*_x164*_x251*_x96*ca_junc + _x11*_x164*_x166*ca_junc*d*f - _x11*_x250*_x91*_x93*_x96*caNa_junc + _x11*_x93*_x95*caNa_junc*d*f - _x114*_x123*_x128*_x244*_x248*nu1FoRT + _x122*_x125*_x128*ncx_junc*(_x111*nu1FoRT - _x113*_x116*nuFoRT) - _x150 - _x153 - _x182 - _x184*(-_x138*nu1FoRT + _x141*nuFoRT) - _x187 - 1.78913955652069e-7*_x189*_x213*_x247*gki - _x189*_x214*(0.0446269908853017*_x206*_x211/_x207**2 + _x208*(0.0612539602025867*_x209 + 7.12227979727698e-18*_x210) - 1.78913955652069e-7*_x247)/_x212**2 - 1/24*_x189*_x201*exp((1/24)*Vm + 37/12)/_x200**2 - _x191 - _x194 - _x195 - _x196*_x246 - _x198 - _x199 - _x202 - _x215 - _x216*_x217*_x250*_x91*_x96*caK + _x216*_x217*_x95*caK*d*f - _x236 - _x88 - _x90
+    a[37] = -_x218
+    a[38] = -_x220
+    a[39] = -_x221 - _x222
+    a[40] = -_x223
+    a[41] = 0
+    c[0] = _x225
+    c[1] = _x226
@@ -0,0 +1,57 @@
+"""
+Paced limit cycles of the Grandi-Bers ventricular and atrial models.
+
+The widgets start every simulation from Widget_init.npy or
+Widget_init_atrial.npy, which are on the limit cycle of the default
+parameters only. ventricular_limit_cycle and atrial_limit_cycle pace the
+model with a modified parameter dictionary until it settles, using the
+prepared right hand side and the generated Jacobian, and cache the result
+on disk (see sscp_tools/limit_cycle.py), so the next call with the same
+parameters and BCL returns immediately and a call with nearby parameters
+starts from the closest cached state.
+
+Example:
+========
+from L6_widgets import set_Pd
+from GBV_limit_cycle import ventricular_limit_cycle
+
+Pd = set_Pd([1, 1, 1, 1, 2] + [1]*10)
+cycle = ventricular_limit_cycle(Pd, bcl=1000, newton=True)
+Y = odeint(grandi_bers_rhs, cycle.y, np.linspace(0, 1000, 1001), (Pd,))
+"""
+
+import os
+import numpy as np
+
+from GBV_prepared import prepare, prepare_atrial, grandi_bers_prepared, grandi_bers_atrial_prepared
+from GBV_jacobian import grandi_bers_jacobian, grandi_bers_atrial_jacobian
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from sscp_tools.limit_cycle import limit_cycle
+
+_here = os.path.dirname(os.path.abspath(__file__))
+
+
+def ventricular_limit_cycle(Pd, bcl=1000, y0=None, **kwargs):
+    """Start-of-beat state of the ventricular model paced every bcl ms.
+
+    y0 defaults to Widget_init.npy. Keyword arguments go to limit_cycle,
+    e.g. newton=True, tol or cache=False.
+    """
+    y0 = np.load(os.path.join(_here, 'Widget_init.npy')) if y0 is None else y0
+    return limit_cycle('grandi_bers', grandi_bers_prepared, y0, bcl, (prepare(Pd),),
+                       Dfun=grandi_bers_jacobian, breaks=(5.0,), **kwargs)
+
+
+def atrial_limit_cycle(Pd, bcl=1000, y0=None, **kwargs):
+    """Start-of-beat state of the atrial model paced every bcl ms.
+
+    y0 defaults to Widget_init_atrial.npy.
+    """
+    y0 = np.load(os.path.join(_here, 'Widget_init_atrial.npy')) if y0 is None else y0
+    return limit_cycle('grandi_bers_atrial', grandi_bers_atrial_prepared, y0, bcl, (prepare_atrial(Pd),),
+                       Dfun=grandi_bers_atrial_jacobian, breaks=(5.0,), **kwargs)
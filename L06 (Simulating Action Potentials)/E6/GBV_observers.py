@@ -0,0 +1,263 @@
+"""
+Streaming observers: biomarkers computed during integration.
+
+odeint returns the whole trajectory at the requested time points, and the
+biomarkers are read from it afterwards. For multi-beat and population runs
+that only need a few numbers per beat, pace advances the model one LSODA
+step at a time and hands every accepted step to a list of observers, so
+nothing but the current step is kept in memory.
+
+BiomarkerObserver records, for every beat, the upstroke time and dV/dt max,
+the resting and peak potential, APD at several repolarization levels, and
+the Ca peak, time to peak and transient duration (CaTD90, defined as in
+GBV_biomarkers). Crossing times and the Ca peak are located on the dense
+output of the step they fall in.
+TrajectoryRecorder keeps selected state columns, either at every step or on
+a regular, decimated time grid.
+
+Example:
+========
+from L6_widgets import set_Pd, name2index
+from GBV_prepared import prepare, grandi_bers_prepared
+from GBV_jacobian import grandi_bers_jacobian
+from GBV_observers import BiomarkerObserver, TrajectoryRecorder, pace
+
+P = prepare(set_Pd())
+markers = BiomarkerObserver(name2index("Vmo"), name2index("Caio"), levels=(0.3, 0.5, 0.9))
+trace = TrajectoryRecorder(columns=[name2index("Vmo")], every=1.0)
+y = pace(grandi_bers_prepared, y0, 1000, 10, (P,), [markers, trace], Dfun=grandi_bers_jacobian)
+beats = markers.result()        # one row per beat: beats['APD90'], beats['Ca_peak'], ...
+t, V = trace.result()
+"""
+
+import numpy as np
+from scipy.integrate import LSODA
+from scipy.optimize import brentq, minimize_scalar
+
+
+#----------------------------------------------------------------------------
+# Drivers
+
+def integrate(rhs, y0, t0, t1, args=(), observers=(), Dfun=None, tfirst=False, rtol=1e-6, atol=1e-8,
+              start=True, **options):
+    """Integrate rhs from t0 to t1 with LSODA and pass every accepted step to
+    the observers, after starting them at t0 (start=False leaves that to the
+    caller, as pace does once per beat). rhs and Dfun take the arguments in
+    the order of odeint (y, t, *args) unless tfirst is True. Returns the
+    state at t1."""
+    if tfirst:
+        fun = lambda t, y: rhs(t, y, *args)
+        jac = None if Dfun is None else (lambda t, y: Dfun(t, y, *args))
+    else:
+        fun = lambda t, y: rhs(y, t, *args)
+        jac = None if Dfun is None else (lambda t, y: Dfun(y, t, *args))
+    wants_derivative = any(observer.derivative for observer in observers)
+    y0 = np.array(y0, dtype=float)
+    if start:
+        dydt = np.asarray(fun(t0, y0)) if wants_derivative else None
+        for observer in observers:
+            observer.start(t0, y0, dydt)
+
+    solver = LSODA(fun, t0, y0, t1, rtol=rtol, atol=atol, jac=jac, **options)
+    while solver.status == 'running':
+        message = solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError("integration failed at t = {:g}: {}".format(solver.t, message))
+        dydt = np.asarray(fun(solver.t, solver.y)) if wants_derivative else None
+        interpolant = solver.dense_output()
+        for observer in observers:
+            observer.step(solver.t, solver.y, dydt, interpolant)
+    return solver.y
+
+
+def pace(rhs, y0, bcl, beats, args=(), observers=(), breaks=(5.0,), **kwargs):
+    """Run beats beats of bcl ms, restarting time at zero for every beat as
+    the Grandi-Bers right hand sides expect, and integrating separately
+    between the breaks (the end of the stimulus). Each observer is told
+    where a beat starts. Keyword arguments go to integrate. Returns the
+    final state."""
+    t = [0.0] + sorted(b for b in breaks if 0 < b < bcl) + [bcl]
+    y = np.array(y0, dtype=float)
+    for beat in range(beats):
+        dydt = None
+        if any(observer.derivative for observer in observers):
+            tfirst = kwargs.get('tfirst', False)
+            dydt = np.asarray(rhs(0.0, y, *args) if tfirst else rhs(y, 0.0, *args))
+        for observer in observers:
+            observer.start(beat*bcl, y, dydt)
+        for t0, t1 in zip(t[:-1], t[1:]):
+            y = integrate(rhs, y, t0, t1, args, [_Shifted(o, beat*bcl) for o in observers], start=False,
+                          **kwargs)
+    return y
+
+
+class _Shifted():
+    """Pass steps on to an observer with the beat's start time added to t."""
+
+    def __init__(self, observer, offset):
+        self.observer = observer
+        self.offset = offset
+        self.derivative = observer.derivative
+
+    def step(self, t, y, dydt, interpolant):
+        offset = self.offset
+        self.observer.step(t + offset, y, dydt, lambda s: interpolant(s - offset))
+
+
+#----------------------------------------------------------------------------
+# Observers
+
+class Observer():
+    """Base class. start is called at the start of every beat by pace, or at
+    the start of the interval by integrate alone, step after every accepted
+    step with the new time and state, dy/dt there when derivative is True,
+    and the dense output of the step as a function of time."""
+
+    derivative = False
+
+    def start(self, t, y, dydt=None):
+        pass
+
+    def step(self, t, y, dydt, interpolant):
+        pass
+
+    def result(self):
+        pass
+
+
+class BiomarkerObserver(Observer):
+    """Per-beat AP and Ca transient biomarkers, computed on the fly.
+
+    iV and iCa are the state indices of the membrane potential and the Ca
+    concentration. APD at each fraction in levels is measured like
+    GBV_biomarkers.apd, from the time of maximum dV/dt to the first time
+    after the peak that V falls below V0 + (1-level)*(peak - V0), V0 being
+    the value at the start of the beat. The Ca transient duration (CaTD90
+    for ca_level=0.9) is measured like GBV_biomarkers.ca_duration, from the
+    fastest rise of Ca to its fall by ca_level of the way back to the value
+    at the start of the beat, so it is the CaTD90 of GBV_sweep. Levels not
+    reached within the beat give nan. dV/dt max and the fastest Ca rise are
+    taken at the accepted steps, which are short during the upstroke.
+    """
+
+    derivative = True
+
+    def __init__(self, iV, iCa=None, levels=(0.5, 0.9), ca_level=0.9):
+        self.iV = iV
+        self.iCa = iCa
+        self.levels = tuple(levels)
+        self.ca_level = ca_level
+        self.beats = []
+
+    def start(self, t, y, dydt=None):
+        self._finish()
+        self.t_start = self.t_prev = self.t_up = t
+        self.V0 = self.V_peak = self.V_prev = self.V_min = self.V_rest = y[self.iV]
+        self.dVdt_max = -np.inf if dydt is None else dydt[self.iV]
+        self.t_down = dict.fromkeys(self.levels, np.nan)
+        if self.iCa is not None:
+            self.Ca0 = self.Ca_peak = self.Ca_prev = y[self.iCa]
+            self.t_Ca_peak = self.t_Ca_up = t
+            self.dCa_prev = 0.0 if dydt is None else dydt[self.iCa]
+            self.dCa_max = -np.inf if dydt is None else dydt[self.iCa]
+            self.t_Ca_down = np.nan
+        self.active = True
+
+    def step(self, t, y, dydt, interpolant):
+        V = y[self.iV]
+        self.V_min = min(self.V_min, V)
+        if dydt[self.iV] > self.dVdt_max:
+            # The resting potential is the lowest V before the upstroke
+            self.dVdt_max, self.t_up, self.V_rest = dydt[self.iV], t, self.V_min
+        if V > self.V_peak:
+            self.V_peak = V
+            self.t_down = dict.fromkeys(self.levels, np.nan)
+        elif V < self.V_prev and self.V_peak > self.V0:
+            # Only a fall from above the starting value is a repolarization
+            for level in self.levels:
+                if np.isnan(self.t_down[level]):
+                    threshold = self.V_peak - level*(self.V_peak - self.V0)
+                    if V < threshold <= self.V_prev:
+                        self.t_down[level] = self._crossing(interpolant, self.iV, threshold, self.t_prev, t)
+        if self.iCa is not None:
+            self._step_ca(t, y, dydt, interpolant)
+        self.V_prev, self.t_prev = V, t
+
+    def _step_ca(self, t, y, dydt, interpolant):
+        Ca, dCa = y[self.iCa], dydt[self.iCa]
+        if dCa > self.dCa_max:
+            self.dCa_max, self.t_Ca_up = dCa, t
+        if self.dCa_prev > 0 >= dCa or Ca > self.Ca_peak:
+            # A maximum inside the step or at its end, located on the dense output
+            found = minimize_scalar(lambda s: -interpolant(s)[self.iCa], bounds=(self.t_prev, t), method='bounded')
+            t_max, Ca_max = (found.x, -found.fun) if -found.fun > Ca else (t, Ca)
+            if Ca_max > self.Ca_peak:
+                self.Ca_peak, self.t_Ca_peak = Ca_max, t_max
+                self.t_Ca_down = np.nan
+        if np.isnan(self.t_Ca_down) and t > self.t_Ca_peak and self.Ca_peak > self.Ca0:
+            threshold = self.Ca_peak - self.ca_level*(self.Ca_peak - self.Ca0)
+            if Ca < threshold <= self.Ca_prev:
+                self.t_Ca_down = self._crossing(interpolant, self.iCa, threshold, self.t_prev, t)
+        self.Ca_prev, self.dCa_prev = Ca, dCa
+
+    @staticmethod
+    def _crossing(interpolant, index, threshold, t0, t1):
+        return brentq(lambda s: interpolant(s)[index] - threshold, t0, t1, xtol=1e-6)
+
+    def _finish(self):
+        if not getattr(self, 'active', False):
+            return
+        row = dict(t_start=self.t_start, t_upstroke=self.t_up - self.t_start, dVdt_max=self.dVdt_max,
+                   V_rest=self.V_rest, V_peak=self.V_peak)
+        for level in self.levels:
+            row['APD{:g}'.format(100*level)] = self.t_down[level] - self.t_up
+        if self.iCa is not None:
+            row.update(Ca_peak=self.Ca_peak, Ca_amplitude=self.Ca_peak - self.Ca0,
+                       Ca_time_to_peak=self.t_Ca_peak - self.t_up,
+                       **{'CaTD{:g}'.format(100*self.ca_level): self.t_Ca_down - self.t_Ca_up})
+        self.beats.append(row)
+        self.active = False
+
+    def result(self):
+        """Structured array with one row per beat."""
+        self._finish()
+        if not self.beats:
+            return None
+        names = list(self.beats[0])
+        table = np.zeros(len(self.beats), dtype=[(name, float) for name in names])
+        for name in names:
+            table[name] = [row[name] for row in self.beats]
+        return table
+
+
+class TrajectoryRecorder(Observer):
+    """Keep the state columns in columns (all by default) at every accepted
+    step, or every `every` time units, interpolated on the dense output."""
+
+    def __init__(self, columns=None, every=None):
+        self.columns = slice(None) if columns is None else list(columns)
+        self.every = every
+        self.t = []
+        self.Y = []
+        self.t_next = None
+
+    def start(self, t, y, dydt=None):
+        if not self.t:
+            self._record(t, y)
+            self.t_next = None if self.every is None else t + self.every
+
+    def _record(self, t, y):
+        self.t.append(t)
+        self.Y.append(np.array(y[self.columns], dtype=float))
+
+    def step(self, t, y, dydt, interpolant):
+        if self.every is None:
+            self._record(t, y)
+            return
+        while self.t_next <= t:
+            self._record(self.t_next, interpolant(self.t_next))
+            self.t_next += self.every
+
+    def result(self):
+        """The recorded times and an array of states, one row per time."""
+        return np.array(self.t), np.array(self.Y)
@@ -0,0 +1,583 @@
+"""
+Prepared parameter records for the Grandi-Bers ventricular and atrial models.
+
+grandi_bers (GBV_RHS.py) and grandi_bers_rhs_atrial (L6_widgets.py) look up
+about 80 entries of the parameter dictionary and recompute derived constants
+such as FoRT, the cell volumes and the Q10 factors at every call, even though
+none of them change during a run. prepare and prepare_atrial do that work once
+and return a frozen record, which the right hand sides in this module take
+in place of the dictionary.
+
+Example:
+========
+from L6_widgets import set_Pd
+from GBV_prepared import prepare, grandi_bers_prepared
+
+P = prepare(set_Pd())
+Y = odeint(grandi_bers_prepared, y0, t, (P,))
+
+Run this file as a script for a micro-benchmark of the time per RHS call.
+"""
+
+import numpy as np
+from collections import namedtuple
+from math import exp, log, pi
+
+
+#----------------------------------------------------------------------------
+# Compile step
+
+def _derived(Pd):
+    """Derived constants shared by the ventricular and atrial models."""
+    Frdy = Pd['Frdy']
+    Temp = Pd['Temp']
+    FoRT = Frdy/Pd['R']/Temp
+    Qpow = (Temp-310)/10
+    Cmem = Pd['Cmem']
+
+    # Cell geometry
+    Vcell = pi*Pd['cellRadius']**2*Pd['cellLength']*1e-15
+    Vmyo = Pd['Vmyo_ratio']*Vcell
+    Vsr = Pd['Vsr_ratio']*Vcell
+    Vsl = Pd['Vsl_ratio']*Vcell
+    Vjunc = Pd['Vjunc_ratio']*Vcell
+
+    # Fractional currents in compartments
+    Fjunc = Pd['Fjunc']
+    Fsl = 1-Fjunc
+    Fjunc_CaL = Pd['Fjunc_CaL']
+    Fsl_CaL = 1-Fjunc_CaL
+
+    Ko = Pd['Ko']
+    Nao = Pd['Nao']
+    Cao = Pd['Cao']
+    Q10CaL = Pd['Q10CaL']**Qpow*0.45
+    Q10NCX = Pd['Q10NCX']**Qpow
+    sigma = (np.exp(Nao/67.3)-1)/7
+
+    return dict(
+        FoRT = FoRT,
+        RToF = 1/FoRT,
+        Ko = Ko,
+        Nao = Nao,
+        Cao = Cao,
+        Mgi = Pd['Mgi'],
+        ecl = (1/FoRT)*np.log(Pd['Cli']/Pd['Clo']),
+
+        # Na currents and Na/K pump
+        GNa_junc = Fjunc*Pd['GNa'],
+        GNa_sl = Fsl*Pd['GNa'],
+        nak_sigma = 0.0365*sigma,
+        nak_junc = Fjunc*Pd['IbarNaK']*Ko/(Ko+Pd['KmKo']),
+        nak_sl = Fsl*Pd['IbarNaK']*Ko/(Ko+Pd['KmKo']),
+        KmNaip = Pd['KmNaip'],
+
+        # K currents
+        gkr = Pd['Gkr']*np.sqrt(Ko/5.4),
+        gki = Pd['Gki']*np.sqrt(Ko/5.4),
+        Gks = Pd['Gks'],
+        Gkp = Pd['Gkp'],
+        GtoFast = Pd['GtoFast'],
+        pNaK = Pd['pNaK'],
+        eks_num = Ko+Pd['pNaK']*Nao,
+
+        # Cl currents
+        GClCa_junc = Fjunc*Pd['GClCa'],
+        GClCa_sl = Fsl*Pd['GClCa'],
+        KdClCa = Pd['KdClCa'],
+        GClB = Pd['GClB'],
+
+        # L-type Ca current, GHK prefactors including Q10 and the 0.45 scaling
+        ca_junc = Fjunc_CaL*Pd['pCa']*4*Frdy*FoRT*0.341*Q10CaL,
+        ca_sl = Fsl_CaL*Pd['pCa']*4*Frdy*FoRT*0.341*Q10CaL,
+        caK = Pd['pK']*Frdy*FoRT*0.75*Q10CaL,
+        Fjunc_CaL = Fjunc_CaL,
+        Fsl_CaL = Fsl_CaL,
+        caNa_junc = Fjunc_CaL*Pd['pNa']*Frdy*FoRT*0.75*Q10CaL,
+        caNa_sl = Fsl_CaL*Pd['pNa']*Frdy*FoRT*0.75*Q10CaL,
+
+        # Na/Ca exchanger
+        ncx_junc = Fjunc*Pd['IbarNCX']*Q10NCX,
+        ncx_sl = Fsl*Pd['IbarNCX']*Q10NCX,
+        Kdact = Pd['Kdact'],
+        nuFoRT = Pd['nu']*FoRT,
+        nu1FoRT = (Pd['nu']-1)*FoRT,
+        ksat = Pd['ksat'],
+        Nao3 = Nao**3,
+        KmCaiNao3 = Pd['KmCai']*Nao**3,
+        KmNai = Pd['KmNai'],
+        KmNao3 = Pd['KmNao']**3,
+        KmCai = Pd['KmCai'],
+        KmCao = Pd['KmCao'],
+
+        # Sarcolemmal Ca pump and background currents
+        pca_junc = Fjunc*Pd['Q10SLCaP']**Qpow*Pd['IbarSLCaP'],
+        pca_sl = Fsl*Pd['Q10SLCaP']**Qpow*Pd['IbarSLCaP'],
+        KmPCa16 = Pd['KmPCa']**1.6,
+        GNaB_junc = Fjunc*Pd['GNaB'],
+        GNaB_sl = Fsl*Pd['GNaB'],
+        GCaB_junc = Fjunc*Pd['GCaB'],
+        GCaB_sl = Fsl*Pd['GCaB'],
+
+        # SR fluxes
+        ec50SR = Pd['ec50SR'],
+        koCa = Pd['koCa'],
+        kiCa = Pd['kiCa'],
+        kom = Pd['kom'],
+        kim = Pd['kim'],
+        ks = Pd['ks'],
+        serca = Pd['Q10SRCaP']**Qpow*Pd['Vmax_SRCaP'],
+        Kmf = Pd['Kmf'],
+        Kmr = Pd['Kmr'],
+        hillSRCaP = Pd['hillSRCaP'],
+
+        # Buffers
+        kon_na = Pd['kon_na'],
+        koff_na = Pd['koff_na'],
+        Bmax_Naj = Pd['Bmax_Naj'],
+        Bmax_Nasl = Pd['Bmax_Nasl'],
+        kon_tncl = Pd['kon_tncl'],
+        koff_tncl = Pd['koff_tncl'],
+        Bmax_TnClow = Pd['Bmax_TnClow'],
+        kon_tnchca = Pd['kon_tnchca'],
+        koff_tnchca = Pd['koff_tnchca'],
+        kon_tnchmg = Pd['kon_tnchmg'],
+        koff_tnchmg = Pd['koff_tnchmg'],
+        Bmax_TnChigh = Pd['Bmax_TnChigh'],
+        kon_cam = Pd['kon_cam'],
+        koff_cam = Pd['koff_cam'],
+        Bmax_CaM = Pd['Bmax_CaM'],
+        kon_myoca = Pd['kon_myoca'],
+        koff_myoca = Pd['koff_myoca'],
+        kon_myomg = Pd['kon_myomg'],
+        koff_myomg = Pd['koff_myomg'],
+        Bmax_myosin = Pd['Bmax_myosin'],
+        kon_sr = Pd['kon_sr'],
+        koff_sr = Pd['koff_sr'],
+        Bmax_SR = Pd['Bmax_SR'],
+        kon_sll = Pd['kon_sll'],
+        koff_sll = Pd['koff_sll'],
+        Bmax_SLlowsl = Pd['Bmax_SLlowsl']*Vmyo/Vsl,
+        Bmax_SLlowj = Pd['Bmax_SLlowj']*Vmyo/Vjunc,
+        kon_slh = Pd['kon_slh'],
+        koff_slh = Pd['koff_slh'],
+        Bmax_SLhighsl = Pd['Bmax_SLhighsl']*Vmyo/Vsl,
+        Bmax_SLhighj = Pd['Bmax_SLhighj']*Vmyo/Vjunc,
+        kon_csqn = Pd['kon_csqn'],
+        koff_csqn = Pd['koff_csqn'],
+        Bmax_Csqn = Pd['Bmax_Csqn']*Vmyo/Vsr,
+
+        # Ion concentrations: membrane current to flux and volume ratios
+        Cmem_FVjunc = Cmem/(Vjunc*Frdy),
+        Cmem_FVsl = Cmem/(Vsl*Frdy),
+        Jna_juncsl_Vjunc = Pd['J_na_juncsl']/Vjunc,
+        Jna_juncsl_Vsl = Pd['J_na_juncsl']/Vsl,
+        Jna_slmyo_Vsl = Pd['J_na_slmyo']/Vsl,
+        Jna_slmyo_Vmyo = Pd['J_na_slmyo']/Vmyo,
+        Jca_juncsl_Vjunc = Pd['J_ca_juncsl']/Vjunc,
+        Jca_juncsl_Vsl = Pd['J_ca_juncsl']/Vsl,
+        Jca_slmyo_Vsl = Pd['J_ca_slmyo']/Vsl,
+        Jca_slmyo_Vmyo = Pd['J_ca_slmyo']/Vmyo,
+        Vmyo_Vsr = Vmyo/Vsr,
+        Vsr_Vjunc = Vsr/Vjunc,
+        Vmyo_Vjunc = Vmyo/Vjunc,
+        Vsr_Vmyo = Vsr/Vmyo,
+
+        I_app = Pd['I_app'],
+    )
+
+
+def _freeze(record_type, values, dynamic):
+    """Convert scalar entries to Python floats and build the record."""
+    values = {key: float(v) if np.ndim(v) == 0 else np.asarray(v, dtype=float)
+              for key, v in values.items()}
+    dynamic = np.asarray(dynamic, dtype=float)
+    values['dynamic'] = None if np.all(dynamic == 1) else tuple(dynamic.tolist())
+    return record_type(**values)
+
+
+_VENTRICULAR_EXTRA = ('GtoSlow',)
+_ATRIAL_EXTRA = ('ISO', 'GNaL_junc', 'GNaL_sl', 'tauhl', 'Gkur', 'GkAch', 'SRleak')
+
+_COMMON_FIELDS = (
+    'FoRT', 'RToF', 'Ko', 'Nao', 'Cao', 'Mgi', 'ecl', 'GNa_junc', 'GNa_sl',
+    'nak_sigma', 'nak_junc', 'nak_sl', 'KmNaip', 'gkr', 'gki', 'Gks', 'Gkp',
+    'GtoFast', 'pNaK', 'eks_num', 'GClCa_junc', 'GClCa_sl', 'KdClCa', 'GClB',
+    'ca_junc', 'ca_sl', 'caK', 'Fjunc_CaL', 'Fsl_CaL', 'caNa_junc', 'caNa_sl',
+    'ncx_junc', 'ncx_sl', 'Kdact', 'nuFoRT', 'nu1FoRT', 'ksat', 'Nao3',
+    'KmCaiNao3', 'KmNai', 'KmNao3', 'KmCai', 'KmCao', 'pca_junc', 'pca_sl',
+    'KmPCa16', 'GNaB_junc', 'GNaB_sl', 'GCaB_junc', 'GCaB_sl', 'ec50SR', 'koCa',
+    'kiCa', 'kom', 'kim', 'ks', 'serca', 'Kmf', 'Kmr', 'hillSRCaP', 'kon_na',
+    'koff_na', 'Bmax_Naj', 'Bmax_Nasl', 'kon_tncl', 'koff_tncl', 'Bmax_TnClow',
+    'kon_tnchca', 'koff_tnchca', 'kon_tnchmg', 'koff_tnchmg', 'Bmax_TnChigh',
+    'kon_cam', 'koff_cam', 'Bmax_CaM', 'kon_myoca', 'koff_myoca', 'kon_myomg',
+    'koff_myomg', 'Bmax_myosin', 'kon_sr', 'koff_sr', 'Bmax_SR', 'kon_sll',
+    'koff_sll', 'Bmax_SLlowsl', 'Bmax_SLlowj', 'kon_slh', 'koff_slh',
+    'Bmax_SLhighsl', 'Bmax_SLhighj', 'kon_csqn', 'koff_csqn', 'Bmax_Csqn',
+    'Cmem_FVjunc', 'Cmem_FVsl', 'Jna_juncsl_Vjunc', 'Jna_juncsl_Vsl',
+    'Jna_slmyo_Vsl', 'Jna_slmyo_Vmyo', 'Jca_juncsl_Vjunc', 'Jca_juncsl_Vsl',
+    'Jca_slmyo_Vsl', 'Jca_slmyo_Vmyo', 'Vmyo_Vsr', 'Vsr_Vjunc', 'Vmyo_Vjunc',
+    'Vsr_Vmyo', 'I_app')
+GBVParameters = namedtuple('GBVParameters', _COMMON_FIELDS + _VENTRICULAR_EXTRA + ('dynamic',))
+GBVAtrialParameters = namedtuple('GBVAtrialParameters', _COMMON_FIELDS + _ATRIAL_EXTRA + ('dynamic',))
+
+
+def prepare(Pd):
+    """Compile a ventricular parameter dictionary (GBV_D.py or set_Pd) into a
+    GBVParameters record with all derived constants computed once."""
+    values = _derived(Pd)
+    values['GtoSlow'] = Pd['GtoSlow']
+    return _freeze(GBVParameters, values, Pd['dynamic'])
+
+
+def prepare_atrial(Pd):
+    """Compile an atrial parameter dictionary (set_Pd_atrial) into a
+    GBVAtrialParameters record with all derived constants computed once."""
+    Fjunc = Pd['Fjunc']
+    values = _derived(Pd)
+    values['ISO'] = Pd['ISO']
+    values['GNaL_junc'] = Fjunc*Pd['GNaL']
+    values['GNaL_sl'] = (1-Fjunc)*Pd['GNaL']
+    values['tauhl'] = Pd['tauhl']
+    values['Gkur'] = Pd['Gkur']
+    values['GkAch'] = Pd['GkAch']
+    values['SRleak'] = (1.0+0.25*Pd['AF'])*5.348e-6
+    return _freeze(GBVAtrialParameters, values, Pd['dynamic'])
+
+
+def as_array(P):
+    """Return the numeric entries of a prepared record as a read-only float64 array."""
+    values = np.array(P[:-1], dtype=float)
+    values.flags.writeable = False
+    return values
+
+
+#----------------------------------------------------------------------------
+# Right hand sides taking a prepared record
+
+def _ina_gates(Vm):
+    """Steady states and time constants of m, h and j (ten Tusscher INa)."""
+    mss = 1 / ((1 + exp( -(56.86 + Vm) / 9.03 ))**2)
+    taum = 0.1292 * exp(-((Vm+45.79)/15.54)**2) + 0.06487 * exp(-((Vm-4.823)/51.12)**2)
+    hss = 1 / ((1 + exp( (Vm + 71.55)/7.43 ))**2)
+    if Vm >= -40:
+        tauh = 1 / (0.77 / (0.13*(1 + exp( -(Vm + 10.66) / 11.1 ))))
+        tauj = 1 / ((0.6 * exp( 0.057 * Vm)) / (1 + exp( -0.1 * (Vm + 32) )))
+    else:
+        ah = 0.057 * exp( -(Vm + 80) / 6.8 )
+        bh = 2.7 * exp( 0.079 * Vm) + 3.1*10**5 * exp(0.3485 * Vm)
+        aj = ((-2.5428 * 10**4*exp(0.2444*Vm) - 6.948*10**-6 * exp(-0.04391*Vm)) * (Vm + 37.78)) /(1 + exp( 0.311 * (Vm + 79.23) ))
+        bj = (0.02424 * exp( -0.01052 * Vm )) / (1 + exp( -0.1378 * (Vm + 40.14) ))
+        tauh = 1 / (ah + bh)
+        tauj = 1 / (aj + bj)
+    return mss, taum, hss, tauh, tauj
+
+
+def _common_fluxes(P, Vm, d, f, fcaBj, fcaBsl, RyRr, RyRo, RyRi, NaBj, NaBsl,
+                   TnCL, TnCHc, TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl, SLHj,
+                   SLHsl, Csqnb, Ca_sr, Naj, Nasl, Nai, Ki, Caj, Casl, Cai, ek):
+    """Currents and fluxes that are identical in the ventricular and atrial models.
+
+    Returns the state derivatives of the Ca handling and buffer states, the
+    Na and Ca currents split by compartment, and the K and Cl currents that
+    both models share.
+    """
+    FoRT = P.FoRT
+    RToF = P.RToF
+    VmFoRT = Vm*FoRT
+
+    # Nernst Potentials
+    ena_junc = RToF*log(P.Nao/Naj)
+    ena_sl = RToF*log(P.Nao/Nasl)
+    eca_junc = 0.5*RToF*log(P.Cao/Caj)
+    eca_sl = 0.5*RToF*log(P.Cao/Casl)
+    ecl = P.ecl
+
+    # I_nak: Na/K Pump Current
+    fnak = 1/(1+0.1245*exp(-0.1*VmFoRT)+P.nak_sigma*exp(-VmFoRT))
+    I_nak_junc = P.nak_junc*fnak/(1+(P.KmNaip/Naj)**4)
+    I_nak_sl = P.nak_sl*fnak/(1+(P.KmNaip/Nasl)**4)
+
+    ## I_ks: Slowly Activating K Current
+    eks = RToF*log(P.eks_num/(Ki+P.pNaK*Nai))
+
+    ## I_ki: Time-Independent K Current
+    Vek = Vm-ek
+    aki = 1.02/(1+exp(0.2385*(Vek-59.215)))
+    bki = (0.49124*exp(0.08032*(Vek+5.476)) + exp(0.06175*(Vek-594.31))) /(1 + exp(-0.5143*(Vek+4.753)))
+    I_ki = P.gki*aki/(aki+bki)*Vek
+
+    # I_ClCa: Ca-activated Cl Current, I_Clbk: background Cl Current
+    I_ClCa = (P.GClCa_junc/(1+P.KdClCa/Caj) + P.GClCa_sl/(1+P.KdClCa/Casl))*(Vm-ecl)
+    I_Clbk = P.GClB*(Vm-ecl)
+
+    ## I_Ca: L-type Calcium Current
+    d_fcaBj = 1.7*Caj*(1-fcaBj)-11.9e-3*fcaBj
+    d_fcaBsl = 1.7*Casl*(1-fcaBsl)-11.9e-3*fcaBsl
+    e1 = exp(VmFoRT)
+    e2 = e1*e1
+    df = d*f
+    ghk1 = Vm/(e1-1)*df
+    ghk2 = Vm/(e2-1)*df
+    I_Ca_junc = P.ca_junc*ghk2*(Caj*e2-P.Cao)*(1-fcaBj)
+    I_Ca_sl = P.ca_sl*ghk2*(Casl*e2-P.Cao)*(1-fcaBsl)
+    I_CaK = P.caK*ghk1*(Ki*e1-P.Ko)*(P.Fjunc_CaL*(1-fcaBj)+P.Fsl_CaL*(1-fcaBsl))
+    I_CaNa_junc = P.caNa_junc*ghk1*(Naj*e1-P.Nao)*(1-fcaBj)
+    I_CaNa_sl = P.caNa_sl*ghk1*(Nasl*e1-P.Nao)*(1-fcaBsl)
+
+    # I_ncx: Na/Ca Exchanger flux
+    enu = exp(P.nuFoRT*Vm)
+    enu1 = exp(P.nu1FoRT*Vm)
+    Naj3 = Naj**3
+    Nasl3 = Nasl**3
+    Ka_junc = 1/(1+(P.Kdact/Caj)**2)
+    Ka_sl = 1/(1+(P.Kdact/Casl)**2)
+    s3_junc = P.KmCaiNao3*(1+(Naj/P.KmNai)**3) + P.KmNao3*Caj*(1+Caj/P.KmCai)+P.KmCao*Naj3+Naj3*P.Cao+P.Nao3*Caj
+    s3_sl = P.KmCaiNao3*(1+(Nasl/P.KmNai)**3) + P.KmNao3*Casl*(1+Casl/P.KmCai)+P.KmCao*Nasl3+Nasl3*P.Cao+P.Nao3*Casl
+    sat = 1/(1+P.ksat*enu1)
+    I_ncx_junc = P.ncx_junc*Ka_junc*(enu*Naj3*P.Cao-enu1*P.Nao3*Caj)/s3_junc*sat
+    I_ncx_sl = P.ncx_sl*Ka_sl*(enu*Nasl3*P.Cao-enu1*P.Nao3*Casl)/s3_sl*sat
+
+    # I_pca: Sarcolemmal Ca Pump Current
+    Caj16 = Caj**1.6
+    Casl16 = Casl**1.6
+    I_pca_junc = P.pca_junc*Caj16/(P.KmPCa16+Caj16)
+    I_pca_sl = P.pca_sl*Casl16/(P.KmPCa16+Casl16)
+
+    ## SR fluxes: Calcium Release, SR Ca pump
+    kCaSR = 15 - 14/(1+(P.ec50SR/Ca_sr)**2.5)
+    koSRCa = P.koCa/kCaSR
+    kiSRCa = P.kiCa*kCaSR
+    RI = 1-RyRr-RyRo-RyRi
+    kim = P.kim
+    kom = P.kom
+    d_RyRr = (kim*RI-kiSRCa*Caj*RyRr)-(koSRCa*Caj**2*RyRr-kom*RyRo)
+    d_RyRo = (koSRCa*Caj**2*RyRr-kom*RyRo)-(kiSRCa*Caj*RyRo-kim*RyRi)
+    d_RyRi = (kiSRCa*Caj*RyRo-kim*RyRi)-(kom*RyRi-koSRCa*Caj**2*RI)
+    J_SRCarel = P.ks*RyRo*(Ca_sr-Caj)
+    cf = (Cai/P.Kmf)**P.hillSRCaP
+    cr = (Ca_sr/P.Kmr)**P.hillSRCaP
+    J_serca = P.serca*(cf-cr)/(1+cf+cr)
+
+    # BACKROUND CURRENTS
+    I_nabk_junc = P.GNaB_junc*(Vm-ena_junc)
+    I_nabk_sl = P.GNaB_sl*(Vm-ena_sl)
+    I_cabk_junc = P.GCaB_junc*(Vm-eca_junc)
+    I_cabk_sl = P.GCaB_sl*(Vm-eca_sl)
+
+    # BUFFERS
+    d_NaBj = P.kon_na*Naj*(P.Bmax_Naj-NaBj)-P.koff_na*NaBj
+    d_NaBsl = P.kon_na*Nasl*(P.Bmax_Nasl-NaBsl)-P.koff_na*NaBsl
+    d_TnCL = P.kon_tncl*Cai*(P.Bmax_TnClow-TnCL)-P.koff_tncl*TnCL
+    d_TnCHc = P.kon_tnchca*Cai*(P.Bmax_TnChigh-TnCHc-TnCHm)-P.koff_tnchca*TnCHc
+    d_TnCHm = P.kon_tnchmg*P.Mgi*(P.Bmax_TnChigh-TnCHc-TnCHm)-P.koff_tnchmg*TnCHm
+    d_CaM = P.kon_cam*Cai*(P.Bmax_CaM-CaM)-P.koff_cam*CaM
+    d_Myoc = P.kon_myoca*Cai*(P.Bmax_myosin-Myoc-Myom)-P.koff_myoca*Myoc
+    d_Myom = P.kon_myomg*P.Mgi*(P.Bmax_myosin-Myoc-Myom)-P.koff_myomg*Myom
+    d_SRB = P.kon_sr*Cai*(P.Bmax_SR-SRB)-P.koff_sr*SRB
+    J_CaB_cytosol = d_TnCL + d_TnCHc + d_TnCHm + d_CaM + d_Myoc + d_Myom + d_SRB
+    d_SLLj = P.kon_sll*Caj*(P.Bmax_SLlowj-SLLj)-P.koff_sll*SLLj
+    d_SLLsl = P.kon_sll*Casl*(P.Bmax_SLlowsl-SLLsl)-P.koff_sll*SLLsl
+    d_SLHj = P.kon_slh*Caj*(P.Bmax_SLhighj-SLHj)-P.koff_slh*SLHj
+    d_SLHsl = P.kon_slh*Casl*(P.Bmax_SLhighsl-SLHsl)-P.koff_slh*SLHsl
+    d_Csqnb = P.kon_csqn*Ca_sr*(P.Bmax_Csqn-Csqnb)-P.koff_csqn*Csqnb
+
+    # Calcium Concentrations (the SR leak is added by the caller)
+    I_Ca_tot_junc = I_Ca_junc+I_cabk_junc+I_pca_junc-2*I_ncx_junc
+    I_Ca_tot_sl = I_Ca_sl+I_cabk_sl+I_pca_sl-2*I_ncx_sl
+    d_Ca_sr = J_serca-J_SRCarel-d_Csqnb
+    d_Caj = -I_Ca_tot_junc*0.5*P.Cmem_FVjunc+P.Jca_juncsl_Vjunc*(Casl-Caj)-d_SLLj-d_SLHj+J_SRCarel*P.Vsr_Vjunc
+    d_Casl = -I_Ca_tot_sl*0.5*P.Cmem_FVsl+P.Jca_juncsl_Vsl*(Caj-Casl)+P.Jca_slmyo_Vsl*(Cai-Casl)-d_SLLsl-d_SLHsl
+    d_Cai = -J_serca*P.Vsr_Vmyo-J_CaB_cytosol+P.Jca_slmyo_Vmyo*(Casl-Cai)
+
+    I_Na_junc_other = I_nabk_junc+3*I_ncx_junc+3*I_nak_junc+I_CaNa_junc
+    I_Na_sl_other = I_nabk_sl+3*I_ncx_sl+3*I_nak_sl+I_CaNa_sl
+    I_other = I_ki-2*(I_nak_junc+I_nak_sl)+I_CaK+I_ClCa+I_Clbk+I_Ca_tot_junc+I_Ca_tot_sl
+
+    return (d_fcaBj, d_fcaBsl, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL,
+            d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom, d_SRB, d_SLLj, d_SLLsl,
+            d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Caj, d_Casl, d_Cai,
+            ena_junc, ena_sl, eks, I_Na_junc_other, I_Na_sl_other, I_other)
+
+
+def _concentrations(P, Naj, Nasl, Nai, I_Na_tot_junc, I_Na_tot_sl, d_NaBj, d_NaBsl):
+    """Sodium concentration derivatives."""
+    d_Naj = -I_Na_tot_junc*P.Cmem_FVjunc+P.Jna_juncsl_Vjunc*(Nasl-Naj)-d_NaBj
+    d_Nasl = -I_Na_tot_sl*P.Cmem_FVsl+P.Jna_juncsl_Vsl*(Naj-Nasl)+P.Jna_slmyo_Vsl*(Nai-Nasl)-d_NaBsl
+    d_Nai = P.Jna_slmyo_Vmyo*(Nasl-Nai)
+    return d_Naj, d_Nasl, d_Nai
+
+
+def _apply_dynamic(ydot, dynamic):
+    if dynamic is None:
+        return ydot
+    return [x*y for x, y in zip(ydot, dynamic)]
+
+
+def grandi_bers_prepared(y, t, P):
+    """Ventricular Grandi-Bers right hand side taking a GBVParameters record."""
+    m,     h,     j,     d,     f,     fcaBj,     fcaBsl,    xtos,     ytos,     xtof,     ytof,     xkr,     xks,     RyRr,    RyRo,    RyRi,    NaBj,    NaBsl,    TnCL,     TnCHc,    TnCHm,    CaM,     Myoc,     Myom,     SRB,     SLLj,     SLLsl,     SLHj,     SLHsl,     Csqnb,     Ca_sr,    Naj,     Nasl,     Nai,     Ki,     Caj,     Casl,    Cai,     Vm  = y
+
+    ek = P.RToF*log(P.Ko/Ki)
+
+    # Gating variables
+    mss, taum, hss, tauh, tauj = _ina_gates(Vm)
+    d_m = (mss - m) / taum
+    d_h = (hss - h) / tauh
+    d_j = (hss - j) / tauj
+    dss = 1/(1+exp(-(Vm+5)/6.0))
+    fss = 1/(1+exp((Vm+35)/9))+0.6/(1+exp((50-Vm)/20))
+    taud = dss*(1-exp(-(Vm+5)/6.0))/(0.035*(Vm+5))
+    tauf = 1/(0.0197*exp( -(0.0337*(Vm+14.5))**2 )+0.02)
+    d_d = (dss-d)/taud
+    d_f = (fss-f)/tauf
+    xtoss = 1/(1+exp(-(Vm-19.0)/13))
+    ytoss = 1/(1+exp((Vm+19.5)/5))
+    d_xtos = (xtoss-xtos)/(9/(1+exp((Vm+3.0)/15))+0.5)
+    d_ytos = (ytoss-ytos)/(800/(1+exp((Vm+60.0)/10))+30)
+    d_xtof = (xtoss-xtof)/(11*exp(-((Vm+45)/60)**2)+1.0)
+    d_ytof = (ytoss-ytof)/(85*exp((-(Vm+40)**2/220))+7)
+    xrss = 1/(1+exp(-(Vm+10)/5))
+    tauxr = 550/(1+exp((-22-Vm)/9))*6/(1+exp((Vm+11)/9))+230/(1+exp((Vm+40)/20))
+    d_xkr = (xrss-xkr)/tauxr
+    d_xks = (1 / (1+exp(-(Vm + 3.8)/14.25))-xks)/(990.1/(1+exp(-(Vm+2.436)/14.12)))
+
+    (d_fcaBj, d_fcaBsl, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL,
+     d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom, d_SRB, d_SLLj, d_SLLsl,
+     d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Caj, d_Casl, d_Cai,
+     ena_junc, ena_sl, eks, I_Na_junc_other, I_Na_sl_other, I_other) = _common_fluxes(
+        P, Vm, d, f, fcaBj, fcaBsl, RyRr, RyRo, RyRi, NaBj, NaBsl, TnCL, TnCHc,
+        TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl, SLHj, SLHsl, Csqnb, Ca_sr,
+        Naj, Nasl, Nai, Ki, Caj, Casl, Cai, ek)
+
+    # SR Ca leak
+    J_SRleak = 5.348e-6*(Ca_sr-Caj)
+    d_Ca_sr -= J_SRleak*P.Vmyo_Vsr
+    d_Caj += J_SRleak*P.Vmyo_Vjunc
+
+    # Currents specific to the ventricular model
+    m3hj = m**3*h*j
+    I_Na_junc = P.GNa_junc*m3hj*(Vm-ena_junc)
+    I_Na_sl = P.GNa_sl*m3hj*(Vm-ena_sl)
+    I_kr = P.gkr*xkr/(1+exp((Vm+74)/24))*(Vm-ek)
+    I_ks = P.Gks*xks**2*(Vm-eks)
+    I_kp = P.Gkp/(1+exp(7.488-Vm/5.98))*(Vm-ek)
+    I_to = (P.GtoSlow*xtos*ytos + P.GtoFast*xtof*ytof)*(Vm-ek)
+
+    I_Na_tot_junc = I_Na_junc+I_Na_junc_other
+    I_Na_tot_sl = I_Na_sl+I_Na_sl_other
+    d_Naj, d_Nasl, d_Nai = _concentrations(P, Naj, Nasl, Nai, I_Na_tot_junc, I_Na_tot_sl, d_NaBj, d_NaBsl)
+    d_Ki = 0
+
+    I_tot = I_Na_tot_junc+I_Na_tot_sl+I_other+I_to+I_kr+I_ks+I_kp
+    I_app = P.I_app if (t<5) else 0.0
+    d_Vm = -(I_tot-I_app)
+
+    ydot = [d_m,d_h, d_j, d_d, d_f,d_fcaBj, d_fcaBsl, d_xtos, d_ytos,d_xtof, d_ytof, d_xkr, d_xks, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL, d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom,   d_SRB, d_SLLj, d_SLLsl, d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Naj, d_Nasl, d_Nai, d_Ki, d_Caj, d_Casl, d_Cai, d_Vm]
+
+    return _apply_dynamic(ydot, P.dynamic)
+
+
+def grandi_bers_atrial_prepared(y, t, P):
+    """Atrial Grandi-Bers right hand side taking a GBVAtrialParameters record."""
+    m,     h,     j,     d,     f,     fcaBj,     fcaBsl,    xtof,     ytof,     xkr,     xks,     RyRr,    RyRo,    RyRi,    NaBj,    NaBsl,    TnCL,     TnCHc,    TnCHm,    CaM,     Myoc,     Myom,     SRB,     SLLj,     SLLsl,     SLHj,     SLHsl,     Csqnb,     Ca_sr,    Naj,     Nasl,     Nai,     Ki,     Caj,     Casl,    Cai,     Vm,     rkuro,    skuro,    ml,    hl,    INal = y
+
+    ek = P.RToF*log(P.Ko/Ki)
+    ISO = P.ISO
+
+    # Gating variables
+    mss, taum, hss, tauh, tauj = _ina_gates(Vm)
+    d_m = (mss - m) / taum
+    d_h = (hss - h) / tauh
+    d_j = (hss - j) / tauj
+    VdISO = Vm+3*ISO+9
+    fss = 1/(1+exp((Vm+35)/9))+0.6/(1+exp((50-Vm)/20))
+    dss = 1/(1+exp(-VdISO/6.0))
+    taud = dss*(1-exp(-VdISO/6.0))/(0.035*VdISO)
+    tauf = 1/(0.0197*exp( -(0.0337*(Vm+3*ISO+25))**2 )+0.02)
+    d_d = (dss-d)/taud
+    d_f = (fss-f)/tauf
+    xtoss = 1/(1+exp(-(Vm-1.0)/11.0))
+    ytoss = 1/(1+exp((Vm+40.5)/11.5))
+    d_xtof = (xtoss-xtof)/(3.5*exp(-((Vm+45)/30)**2)+1.5)
+    d_ytof = (ytoss-ytof)/(25.635*exp(-(((Vm+52.45)/15.8827)**2.0))+24.14)
+    xrss = 1/(1+exp(-(Vm+10)/5))
+    tauxr = 550/(1+exp((-22-Vm)/9))*6/(1+exp((Vm+11)/9))+230/(1+exp((Vm+40)/20))
+    d_xkr = (xrss-xkr)/tauxr
+    xsss = 1 / (1+exp(-(Vm + 40*ISO + 3.8)/14.25))
+    tauxs = 990.1/(1+exp(-(Vm+40*ISO+2.436)/14.12))
+    d_xks = (xsss-xks)/tauxs
+    d_rkuro = (1.0/(1.0 + exp((Vm+6.0)/-8.6))-rkuro)/(9.0/(1.0+exp((Vm+5.0)/12.0))+0.5)
+    d_skuro = (1.0/(1.0 + exp((Vm+7.5)/10.0))-skuro)/(590.0/(1.0+exp((Vm+60.0)/10.0))+3050.0)
+    aml = 0.32*(Vm+47.13)/(1-exp(-0.1*(Vm+47.13)))
+    bml = 0.08*exp(-Vm/11)
+    d_ml = aml*(1-ml)-bml*ml
+    d_hl = (1/(1.0+exp((Vm+91.0)/6.1))-hl)/P.tauhl
+
+    (d_fcaBj, d_fcaBsl, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL,
+     d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom, d_SRB, d_SLLj, d_SLLsl,
+     d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Caj, d_Casl, d_Cai,
+     ena_junc, ena_sl, eks, I_Na_junc_other, I_Na_sl_other, I_other) = _common_fluxes(
+        P, Vm, d, f, fcaBj, fcaBsl, RyRr, RyRo, RyRi, NaBj, NaBsl, TnCL, TnCHc,
+        TnCHm, CaM, Myoc, Myom, SRB, SLLj, SLLsl, SLHj, SLHsl, Csqnb, Ca_sr,
+        Naj, Nasl, Nai, Ki, Caj, Casl, Cai, ek)
+
+    # SR Ca leak, increased in AF
+    J_SRleak = P.SRleak*(Ca_sr-Caj)
+    d_Ca_sr -= J_SRleak*P.Vmyo_Vsr
+    d_Caj += J_SRleak*P.Vmyo_Vjunc
+
+    # Currents specific to the atrial model
+    m3hj = m**3*h*j
+    I_Na_junc = P.GNa_junc*m3hj*(Vm-ena_junc)
+    I_Na_sl = P.GNa_sl*m3hj*(Vm-ena_sl)
+    ml3hl = ml**3*hl
+    I_NaL_junc = P.GNaL_junc*ml3hl*(Vm-ena_junc)
+    I_NaL_sl = P.GNaL_sl*ml3hl*(Vm-ena_sl)
+    d_INal = I_NaL_junc + I_NaL_sl
+    I_kr = P.gkr*xkr/(1+exp((Vm+74)/24))*(Vm-ek)
+    I_ks = P.Gks*xks**2*(Vm-eks)
+    I_kp = P.Gkp/(1+exp(7.488-Vm/5.98))*(Vm-ek)
+    I_to = P.GtoFast*xtof*ytof*(Vm-ek)
+    I_kur = P.Gkur*rkuro*skuro*(Vm-ek)
+    I_kAch = P.GkAch*(0.08+0.4/(1+exp((Vm+91)/12)))*(Vm-ek)
+
+    I_Na_tot_junc = I_Na_junc+I_NaL_junc+I_Na_junc_other
+    I_Na_tot_sl = I_Na_sl+I_NaL_sl+I_Na_sl_other
+    d_Naj, d_Nasl, d_Nai = _concentrations(P, Naj, Nasl, Nai, I_Na_tot_junc, I_Na_tot_sl, d_NaBj, d_NaBsl)
+    d_Ki = 0
+
+    I_tot = I_Na_tot_junc+I_Na_tot_sl+I_other+I_to+I_kr+I_ks+I_kp+I_kur+I_kAch
+    I_app = P.I_app if (t<5) else 0.0
+    d_Vm = -(I_tot-I_app)
+
+    ydot = [d_m,d_h, d_j, d_d, d_f,d_fcaBj, d_fcaBsl, d_xtof, d_ytof, d_xkr, d_xks, d_RyRr, d_RyRo, d_RyRi, d_NaBj, d_NaBsl, d_TnCL, d_TnCHc, d_TnCHm, d_CaM, d_Myoc, d_Myom, d_SRB, d_SLLj, d_SLLsl, d_SLHj, d_SLHsl, d_Csqnb, d_Ca_sr, d_Naj, d_Nasl, d_Nai, d_Ki, d_Caj, d_Casl, d_Cai, d_Vm,  d_rkuro, d_skuro, d_ml, d_hl, d_INal]
+
+    return _apply_dynamic(ydot, P.dynamic)
+
+
+#----------------------------------------------------------------------------
+# Micro-benchmark
+
+def benchmark(n_calls=20000):
+    """Time per RHS call of the dictionary and prepared versions of both models."""
+    from timeit import timeit
+    from L6_widgets import (set_Pd, set_Pd_atrial, Initialize, Initialize_atrial,
+                            grandi_bers_rhs, grandi_bers_rhs_atrial)
+
+    cases = [('ventricular', grandi_bers_rhs, grandi_bers_prepared, set_Pd(), prepare,
+              Initialize(list(np.load('Widget_init.npy')))),
+             ('atrial', grandi_bers_rhs_atrial, grandi_bers_atrial_prepared, set_Pd_atrial(),
+              prepare_atrial, Initialize_atrial(list(np.load('Widget_init_atrial.npy'))))]
+    for name, rhs, rhs_prepared, Pd, compile_Pd, y0 in cases:
+        P = compile_Pd(Pd)
+        y0 = [float(v) for v in y0]
+        err = np.max(np.abs(np.subtract(rhs(y0, 1.0, Pd), rhs_prepared(y0, 1.0, P))))
+        t_dict = timeit(lambda: rhs(y0, 1.0, Pd), number=n_calls)/n_calls
+        t_prep = timeit(lambda: rhs_prepared(y0, 1.0, P), number=n_calls)/n_calls
+        print("{:12s} dict: {:6.1f} us  prepared: {:6.1f} us  speedup: {:4.2f}x  max |diff|: {:.1e}".format(
+            name, t_dict*1e6, t_prep*1e6, t_dict/t_prep, err))
+
+
+if __name__ == '__main__':
+    benchmark()
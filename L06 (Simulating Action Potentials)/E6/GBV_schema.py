@@ -0,0 +1,108 @@
+"""
+State schemas of the Grandi-Bers ventricular and atrial models.
+
+VENTRICULAR and ATRIAL hold, for one model each, the state names, units and
+indices. They give
+
+* O(1) lookup of state indices, e.g. VENTRICULAR.index['Vm'], also under the
+  names the widgets use ('Vmo', 'Caio', ...);
+* named views of trajectory arrays without copying: states(Y)['Vm'] is a
+  view of the Vm column of the output of odeint, solve_population or any
+  other array with the states along its last axis.
+
+The state names are those of the right hand sides (GBV_prepared.py,
+GBV_batch.py). The parameters have a single vector layout, as_array(P) of a
+prepared record P = prepare(Pd) (GBV_prepared.py): the compiled kernels,
+GBV_compiled.parameter_matrix and the limit cycle cache all use it.
+
+Example:
+========
+from GBV_schema import VENTRICULAR
+
+Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+S = VENTRICULAR.states(Y)
+plt.plot(t, S['Vm'])
+"""
+
+import numpy as np
+
+
+class ModelSchema():
+    """Names, units and indices of the states of one model."""
+
+    def __init__(self, name, states, units, aliases=None):
+        self.name = name
+        self.state_names = tuple(states)
+        self.units = dict(zip(self.state_names, units))
+        self.index = {state: i for i, state in enumerate(self.state_names)}
+        # The widgets name each state after its initial value, e.g. 'Vmo'
+        for i, state in enumerate(self.state_names):
+            self.index.setdefault(state + 'o', i)
+        self.index.update(aliases or {})
+        self.state_dtype = np.dtype([(state, np.float64) for state in self.state_names])
+
+    def __len__(self):
+        return len(self.state_names)
+
+    def __repr__(self):
+        return "ModelSchema({!r}, {} states)".format(self.name, len(self))
+
+    #------------------------------------------------------------------------
+    # States
+
+    def name2index(self, name):
+        """Index of the state called name in the solution vector y."""
+        if type(name) != str:
+            raise TypeError("Input must be the name of a state in the model as a str")
+        try:
+            return self.index[name]
+        except KeyError:
+            raise ValueError("{} is not a state in the model".format(name))
+
+    def index2name(self, index):
+        """Name of the state at the given index of the solution vector y."""
+        if type(index) != int:
+            raise TypeError("Input must be the index of a state as an int")
+        return self.state_names[index]
+
+    def states(self, Y):
+        """Named view of an array with the states along its last axis.
+
+        The result has the shape of Y without its last axis, and each field,
+        e.g. states(Y)['Cai'], is a view into Y, so nothing is copied and
+        writes go through to Y. The last axis of Y must be contiguous.
+        """
+        Y = np.asarray(Y)
+        if Y.dtype != np.float64 or Y.shape[-1:] != (len(self),):
+            raise ValueError("expected float64 states along the last axis, length {}, got {} {}".format(
+                len(self), Y.dtype, Y.shape))
+        if Y.strides[-1] != Y.itemsize:
+            raise ValueError("the states must be contiguous along the last axis to be viewed without a copy")
+        return Y.view(self.state_dtype)[..., 0]
+
+
+#----------------------------------------------------------------------------
+# The two models
+
+_GATE, _mM, _mV = '1', 'mM', 'mV'
+
+_ventricular_states = (
+    ('m', _GATE), ('h', _GATE), ('j', _GATE), ('d', _GATE), ('f', _GATE),
+    ('fcaBj', _GATE), ('fcaBsl', _GATE), ('xtos', _GATE), ('ytos', _GATE),
+    ('xtof', _GATE), ('ytof', _GATE), ('xkr', _GATE), ('xks', _GATE),
+    ('RyRr', _GATE), ('RyRo', _GATE), ('RyRi', _GATE),
+    ('NaBj', _mM), ('NaBsl', _mM), ('TnCL', _mM), ('TnCHc', _mM), ('TnCHm', _mM),
+    ('CaM', _mM), ('Myoc', _mM), ('Myom', _mM), ('SRB', _mM), ('SLLj', _mM),
+    ('SLLsl', _mM), ('SLHj', _mM), ('SLHsl', _mM), ('Csqnb', _mM), ('Ca_sr', _mM),
+    ('Naj', _mM), ('Nasl', _mM), ('Nai', _mM), ('Ki', _mM), ('Caj', _mM),
+    ('Casl', _mM), ('Cai', _mM), ('Vm', _mV))
+
+# No slow Ito, but IKur gates, late INa gates and the time integral of INaL
+_atrial_states = tuple(s for s in _ventricular_states if s[0] not in ('xtos', 'ytos')) + (
+    ('rkuro', _GATE), ('skuro', _GATE), ('ml', _GATE), ('hl', _GATE), ('INal', 'pA/pF*ms'))
+
+
+VENTRICULAR = ModelSchema('grandi_bers', *zip(*_ventricular_states))
+# name2index_atrial used to spell two of the names with a trailing colon
+ATRIAL = ModelSchema('grandi_bers_atrial', *zip(*_atrial_states),
+                     aliases={'fcaBjo:': 5, 'NaBslo:': 15})
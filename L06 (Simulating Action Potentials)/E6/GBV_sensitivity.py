@@ -0,0 +1,223 @@
+"""
+Forward parameter sensitivities of the Grandi-Bers ventricular and atrial models.
+
+Fitting conductances to a recorded AP and Ca transient by finite differences
+costs one extra odeint run per parameter and iteration. sensitivities
+integrates the sensitivities S = dy/dp of the states to a chosen set of
+entries p of the parameter dictionary alongside the states themselves,
+
+    dS/dt = J(y) S + (d ydot/d P) (dP/dp),
+
+in one augmented odeint run. J is the analytic Jacobian and d ydot/d P the
+analytic derivative with respect to the prepared record, both generated by
+GBV_jacobian_codegen.py; dP/dp, the derivative of prepare or prepare_atrial,
+is obtained from sympy when the run starts. The Newton matrix of the
+augmented system is block diagonal with J in every block, so every Jacobian
+evaluation is shared by the states and all sensitivities.
+
+biomarker_gradients turns the sensitivities into the gradients of APD90,
+APD50 and the Ca transient amplitude, as GBV_biomarkers computes them from
+the same samples. The sensitivities are those of one run from a fixed
+initial state: the initial state does not move with the parameters.
+
+Example:
+========
+from L6_widgets import set_Pd
+from GBV_sensitivity import sensitivities, biomarker_gradients
+
+names = ['GNa', 'Gkr', 'Gks', 'IbarNaK', 'pCa']
+t = np.arange(0, 1000.5, 0.5)
+Y, S = sensitivities(set_Pd(), names, t)
+gradients = biomarker_gradients(t, Y, S)
+print(dict(zip(names, gradients['APD90'])))      # ms per unit of each entry
+
+Run this file as a script to compare against central finite differences.
+"""
+
+import os
+import types
+import numpy as np
+import sympy as sp
+
+import GBV_prepared
+from GBV_prepared import prepare, prepare_atrial, grandi_bers_prepared, grandi_bers_atrial_prepared
+from GBV_jacobian import (grandi_bers_jacobian, grandi_bers_atrial_jacobian,
+                          grandi_bers_parameter_jacobian, grandi_bers_atrial_parameter_jacobian)
+from GBV_schema import VENTRICULAR, ATRIAL
+from stimulus import PulseTrain, integrate
+
+_here = os.path.dirname(os.path.abspath(__file__))
+
+
+#----------------------------------------------------------------------------
+# Derivative of the compile step
+
+def _symbolic_prepare(atrial):
+    """prepare or prepare_atrial rebound to sympy functions, returning the
+    dictionary of prepared values instead of a frozen record."""
+    ns = dict(vars(GBV_prepared))
+    ns.update(np=types.SimpleNamespace(exp=sp.exp, log=sp.log, sqrt=sp.sqrt),
+              _freeze=lambda record_type, values, dynamic: values)
+    for name in ('_derived', 'prepare', 'prepare_atrial'):
+        ns[name] = types.FunctionType(getattr(GBV_prepared, name).__code__, ns, name)
+    return ns['prepare_atrial' if atrial else 'prepare']
+
+
+def prepared_derivatives(Pd, names, atrial=False):
+    """dP/dp, the derivative of the fields of the prepared record (in the
+    order of its _fields, without dynamic) with respect to the entries names
+    of the parameter dictionary Pd, as an (n_fields, len(names)) array."""
+    unknown = [name for name in names if name not in Pd]
+    if unknown:
+        raise KeyError("not in the parameter dictionary: {}".format(', '.join(unknown)))
+    symbols = [sp.Symbol(name, real=True) for name in names]
+    symbolic = dict(Pd)
+    symbolic.update(zip(names, symbols))
+    values = _symbolic_prepare(atrial)(symbolic)
+    point = {s: float(Pd[name]) for s, name in zip(symbols, names)}
+    record_type = GBV_prepared.GBVAtrialParameters if atrial else GBV_prepared.GBVParameters
+    D = np.zeros((len(record_type._fields) - 1, len(names)))
+    for i, field in enumerate(record_type._fields[:-1]):
+        expr = sp.sympify(values[field])
+        for k, s in enumerate(symbols):
+            if s in expr.free_symbols:
+                D[i, k] = float(sp.diff(expr, s).evalf(subs=point))
+    return D
+
+
+#----------------------------------------------------------------------------
+# Augmented system
+
+def _augmented(rhs, jacobian, parameter_jacobian, D, n):
+    """Right hand side and block diagonal Jacobian of the n states followed
+    by their sensitivities, stored one parameter after the other."""
+    k = D.shape[1]
+
+    def f(z, t, P):
+        y, S = z[:n], z[n:].reshape(k, n)
+        dS = S @ jacobian(y, t, P).T + (parameter_jacobian(y, t, P) @ D).T
+        return np.concatenate([rhs(y, t, P), dS.ravel()])
+
+    def Dfun(z, t, P):
+        return np.kron(np.eye(k + 1), jacobian(z[:n], t, P))
+
+    return f, Dfun
+
+
+def sensitivities(Pd, names, t, y0=None, atrial=False, S0=None, **kwargs):
+    """States Y (len(t), n_states) and sensitivities S (len(t), n_states,
+    len(names)), S[..., k] = dY/dPd[names[k]], of one run from y0.
+
+    y0 defaults to Widget_init.npy or Widget_init_atrial.npy and S0, the
+    sensitivity of y0, to zero. The stimulus of the first 5 ms is integrated
+    separately (see stimulus.py). Keyword arguments go to odeint. The
+    sensitivities take part in the error control with the absolute tolerance
+    atol/|p| (atol is 1.49012e-8 by default, as in odeint), which makes the
+    error test independent of the units of each parameter.
+    """
+    if atrial:
+        P, D = prepare_atrial(Pd), prepared_derivatives(Pd, names, atrial=True)
+        functions = (grandi_bers_atrial_prepared, grandi_bers_atrial_jacobian, grandi_bers_atrial_parameter_jacobian)
+        default = 'Widget_init_atrial.npy'
+    else:
+        P, D = prepare(Pd), prepared_derivatives(Pd, names)
+        functions = (grandi_bers_prepared, grandi_bers_jacobian, grandi_bers_parameter_jacobian)
+        default = 'Widget_init.npy'
+    y0 = np.load(os.path.join(_here, default)) if y0 is None else np.asarray(y0, dtype=float)
+    n, k = len(y0), len(names)
+    S0 = np.zeros((n, k)) if S0 is None else np.asarray(S0, dtype=float)
+    f, Dfun = _augmented(*functions, D, n)
+
+    atol = kwargs.pop('atol', 1.49012e-8)
+    scale = np.array([abs(Pd[name]) or 1.0 for name in names], dtype=float)
+    atol = np.concatenate([np.broadcast_to(atol, n), np.repeat(np.max(atol)/scale, n)])
+    z0 = np.concatenate([y0, S0.T.ravel()])
+    Z = integrate(f, z0, t, (P,), PulseTrain(0, 5), Dfun=Dfun, atol=atol, **kwargs)
+    return Z[:, :n], Z[:, n:].reshape(len(t), k, n).transpose(0, 2, 1)
+
+
+#----------------------------------------------------------------------------
+# Biomarker gradients
+
+def decay_time_gradient(t, X, SX, fraction=0.9):
+    """Gradient of the decay time of GBV_biomarkers._decay_time for one trace X
+    with sensitivities SX (len(t), n_parameters), or nan where X does not decay.
+
+    The peak and the two samples around the crossing are fixed sample
+    indices under small parameter changes, so the gradient is that of the
+    interpolated crossing time."""
+    peak = np.argmax(X)
+    level = X[peak] - fraction*(X[peak] - X[0])
+    below = np.flatnonzero((X < level) & (np.arange(len(t)) > peak))
+    if len(below) == 0:
+        return np.full(SX.shape[1], np.nan)
+    k = below[0]
+    X0, X1, dt = X[k-1], X[k], t[k] - t[k-1]
+    dlevel = (1 - fraction)*SX[peak] + fraction*SX[0]
+    return dt*((SX[k-1] - dlevel)*(X0 - X1) - (X0 - level)*(SX[k-1] - SX[k]))/(X0 - X1)**2
+
+
+def biomarker_gradients(t, Y, S, atrial=False):
+    """Gradients of APD90, APD50 and the Ca transient amplitude (see
+    GBV_biomarkers) with respect to the parameters of sensitivities.
+
+    The upstroke time that the APDs are measured from is the midpoint of the
+    sample interval with the fastest rise, which does not move under small
+    parameter changes; sample the upstroke finely for accurate APDs.
+    """
+    schema = ATRIAL if atrial else VENTRICULAR
+    iV, iCa = schema.index['Vm'], schema.index['Cai']
+    V, SV, SCa = Y[:, iV], S[:, iV], S[:, iCa]
+    return {'APD90': decay_time_gradient(t, V, SV, 0.9),
+            'APD50': decay_time_gradient(t, V, SV, 0.5),
+            'CaT_amplitude': SCa[np.argmax(Y[:, iCa])] - SCa[0]}
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(names=('GNa', 'Gkr', 'Gks', 'IbarNaK', 'pCa'), relative_step=1e-4):
+    """Compare the gradients and the wall time of one augmented run with
+    central finite differences, two runs per parameter."""
+    from time import perf_counter
+    from L6_widgets import set_Pd
+    from GBV_biomarkers import apd, ca_amplitude
+
+    Pd = set_Pd()
+    y0 = np.load(os.path.join(_here, 'Widget_init.npy'))
+    t = np.concatenate([np.linspace(0, 20, 2001), np.arange(20.5, 1000.25, 0.5)])
+    iV, iCa = VENTRICULAR.index['Vm'], VENTRICULAR.index['Cai']
+
+    def markers(Pd):
+        Y = integrate(grandi_bers_prepared, y0, t, (prepare(Pd),), PulseTrain(0, 5), Dfun=grandi_bers_jacobian)
+        return np.array([apd(t, Y[:, iV], 0.9), apd(t, Y[:, iV], 0.5), ca_amplitude(t, Y[:, iCa])])
+
+    start = perf_counter()
+    Y, S = sensitivities(Pd, names, t, y0)
+    gradients = biomarker_gradients(t, Y, S)
+    forward = perf_counter() - start
+
+    start = perf_counter()
+    differences = []
+    for name in names:
+        h = relative_step*abs(Pd[name])
+        up, down = dict(Pd), dict(Pd)
+        up[name] += h
+        down[name] -= h
+        differences.append((markers(up) - markers(down))/(2*h))
+    finite = perf_counter() - start
+
+    print('Normalized sensitivities p/B dB/dp, forward (finite differences)')
+    base = markers(Pd)
+    for k, name in enumerate(names):
+        row = ['{:>10s}'.format(name)]
+        for m, marker in enumerate(('APD90', 'APD50', 'CaT_amplitude')):
+            scale = Pd[name]/base[m]
+            row.append('{}: {:8.4f} ({:8.4f})'.format(marker, gradients[marker][k]*scale,
+                                                        differences[k][m]*scale))
+        print('  '.join(row))
+    print('forward sensitivities: {:.2f} s, finite differences: {:.2f} s'.format(forward, finite))
+
+
+if __name__ == '__main__':
+    benchmark()
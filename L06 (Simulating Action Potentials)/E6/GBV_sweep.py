@@ -0,0 +1,219 @@
+"""
+Conductance-scaling sweeps of the Grandi-Bers ventricular and atrial models.
+
+Instead of editing the multipliers in GBV_run.py by hand and rerunning one
+odeint at a time, sweep takes a table of scale factors, one row per
+simulation, spreads the simulations over a process pool in chunks and
+returns one row of biomarkers per simulation: APD50, APD90, dV/dt max,
+RMP and the amplitude and duration (CaTD90) of the Ca transient. The
+trajectories themselves are never sent back from the workers.
+
+The biomarkers are those of the last of beats paced beats (20 by default)
+from the limit cycle of the unmodified model, so the cell has largely
+adapted to its new conductances. With limit_cycle=True every sample is
+paced to its own limit cycle instead (see GBV_limit_cycle) and the table
+reports a beat on that cycle.
+
+The scale factors are the ones the widgets expose (see set_Pd and
+set_Pd_atrial). grid builds a full factorial design and random_sample a
+log-uniform random sample; factors that are left out stay at 1.
+
+Example:
+========
+from GBV_sweep import grid, random_sample, sweep
+
+table = sweep(grid(GNa=[0.5, 1, 2], Gkr=[0.5, 1, 2]))
+print(table['Gkr'], table['APD90'])
+table = sweep(random_sample(200, low=0.5, high=2, seed=1), processes=8)
+table = sweep(grid(Gkr=[0.5, 1, 2]), limit_cycle=True)
+
+The result is a NumPy structured array, so pandas.DataFrame(table) turns
+it into a data frame. Run this file as a script to time a sweep with an
+increasing number of processes.
+"""
+
+import os
+import itertools
+import multiprocessing
+
+import numpy as np
+
+from L6_widgets import set_Pd, set_Pd_atrial
+from GBV_schema import VENTRICULAR, ATRIAL
+from GBV_prepared import prepare, prepare_atrial, grandi_bers_prepared, grandi_bers_atrial_prepared
+from GBV_jacobian import grandi_bers_jacobian, grandi_bers_atrial_jacobian
+from GBV_biomarkers import apd, dvdt_max, rmp, ca_amplitude, ca_duration
+from GBV_limit_cycle import ventricular_limit_cycle, atrial_limit_cycle
+from stimulus import PulseTrain, integrate
+
+# Scale factors in the order set_Pd and set_Pd_atrial take them
+VENTRICULAR_MULTIPLIERS = ('GNa', 'GtoSlow', 'GtoFast', 'Gkr', 'Gks', 'Gkp', 'Gk1', 'GClCa',
+                           'pCa', 'VNCX', 'VNaK', 'GNaB', 'GCaB', 'GClB')
+ATRIAL_MULTIPLIERS = ('GNa', 'GtoFast', 'Gkr', 'Gkur', 'Gks', 'Gkp', 'Gk1', 'GClCa',
+                      'pCa', 'VNCX', 'VNaK', 'GNaB', 'GCaB', 'GClB', 'GkAch')
+
+# The stimulus of the right hand sides in every beat
+STIMULUS = PulseTrain(0, 5)
+
+# Durations in ms, dV/dt max in mV/ms, RMP in mV and the Ca amplitude in mM
+BIOMARKERS = ('APD50', 'APD90', 'dVdt_max', 'RMP', 'CaT_amplitude', 'CaTD90')
+
+
+#----------------------------------------------------------------------------
+# Designs
+
+def _columns(rows, names):
+    return {name: np.asarray(column, dtype=float) for name, column in zip(names, np.transpose(rows))}
+
+
+def grid(**axes):
+    """Full factorial design over the given scale factors, e.g.
+    grid(GNa=[0.5, 1, 2], Gkr=[0.5, 1, 2]) gives 9 rows."""
+    names = list(axes)
+    rows = list(itertools.product(*(np.ravel(axes[name]) for name in names)))
+    return _columns(rows, names)
+
+
+def random_sample(n, names=VENTRICULAR_MULTIPLIERS, low=0.5, high=2.0, log=True, seed=None):
+    """n rows of scale factors drawn independently between low and high,
+    uniformly in the logarithm when log is True."""
+    rng = np.random.default_rng(seed)
+    if log:
+        rows = np.exp(rng.uniform(np.log(low), np.log(high), (n, len(names))))
+    else:
+        rows = rng.uniform(low, high, (n, len(names)))
+    return _columns(rows, names)
+
+
+#----------------------------------------------------------------------------
+# Workers
+
+def _time_points(bcl):
+    """Output times for one beat: 0.01 ms through the upstroke for dV/dt max,
+    0.5 ms for the rest of the beat."""
+    return np.concatenate([np.linspace(0, 20, 2001), np.arange(20.5, bcl + 0.25, 0.5)])
+
+
+def _beat(rhs, jac, P, y, t):
+    """States at the times t of one beat from y, integrating the stimulus
+    (t < 5 ms) separately from the rest of the beat (see stimulus.py). The
+    step limit is raised for the beats that are only sampled at their end."""
+    return integrate(rhs, y, t, (P,), STIMULUS, Dfun=jac, mxstep=50000)
+
+
+def _simulate(coefficients, atrial, epi_endo, bcl, beats, y0, limit_cycle):
+    """Biomarkers of the last of beats beats for one set of scale factors, or
+    of one beat on their limit cycle."""
+    if atrial:
+        Pd = set_Pd_atrial(list(coefficients))
+        P, find_cycle = prepare_atrial(Pd), atrial_limit_cycle
+        rhs, jac = grandi_bers_atrial_prepared, grandi_bers_atrial_jacobian
+        iV, iCa = ATRIAL.index['Vm'], ATRIAL.index['Cai']
+    else:
+        Pd = set_Pd([epi_endo] + list(coefficients))
+        P, find_cycle = prepare(Pd), ventricular_limit_cycle
+        rhs, jac = grandi_bers_prepared, grandi_bers_jacobian
+        iV, iCa = VENTRICULAR.index['Vm'], VENTRICULAR.index['Cai']
+
+    y = y0
+    if limit_cycle:
+        y, beats = find_cycle(Pd, bcl, y0=y0, newton=True).y, 1
+    for beat in range(beats - 1):
+        y = _beat(rhs, jac, P, y, np.array([0, 5, bcl]))[-1]
+    t = _time_points(bcl)
+    Y = _beat(rhs, jac, P, y, t)
+    V, Cai = Y[:, iV], Y[:, iCa]
+    return (apd(t, V, 0.5), apd(t, V, 0.9), dvdt_max(t, V), rmp(t, V),
+            ca_amplitude(t, Cai), ca_duration(t, Cai, 0.9))
+
+
+def _run_chunk(task):
+    rows, options = task
+    return [_simulate(row, **options) for row in rows]
+
+
+#----------------------------------------------------------------------------
+# Sweep
+
+def sweep(samples, atrial=False, epi_endo=1, bcl=1000, beats=20, y0=None, limit_cycle=False,
+          processes=None, chunksize=None):
+    """Biomarkers for every row of samples, a dictionary of equally long
+    columns of scale factors as returned by grid or random_sample.
+
+    Each simulation starts from y0, by default the limit cycle of the
+    unmodified model at this BCL (from GBV_limit_cycle, computed once and then
+    cached on disk), and runs beats beats of bcl ms; the biomarkers are taken
+    from the last one. beats=1 gives the first beat after the change of
+    conductances. With limit_cycle=True each simulation is paced from y0 to its
+    own limit cycle instead (cached on disk per set of scale factors) and the
+    biomarkers are taken from one beat on it; beats is then not used. The rows
+    are split into chunks of chunksize (by default about four chunks per
+    process) that are handed to a pool of processes workers (os.cpu_count() by
+    default, 1 runs in this process). The simulations are independent and only
+    the biomarkers are sent back, so the run time scales with the number of
+    cores.
+
+    Returns a structured array with one field per scale factor (all of them,
+    1 where not sampled) and one per name in BIOMARKERS. Simulations where the
+    cell does not repolarize within the beat give nan durations.
+    """
+    names = ATRIAL_MULTIPLIERS if atrial else VENTRICULAR_MULTIPLIERS
+    unknown = set(samples) - set(names) - ({'Ach'} if atrial else set())
+    if unknown:
+        raise ValueError("unknown scale factors for the {} model: {}".format(
+            'atrial' if atrial else 'ventricular', ', '.join(sorted(unknown))))
+    n = len(next(iter(samples.values()))) if samples else 1
+    columns = [np.broadcast_to(np.asarray(samples.get(name, 1.0), dtype=float), n) for name in names]
+    if atrial:
+        columns.append(np.broadcast_to(np.asarray(samples.get('Ach', 0.0), dtype=float), n))
+    rows = np.column_stack(columns)
+
+    if y0 is None and atrial:
+        y0 = atrial_limit_cycle(set_Pd_atrial(), bcl, newton=True).y
+    elif y0 is None:
+        y0 = ventricular_limit_cycle(set_Pd([epi_endo] + [1]*len(names)), bcl, newton=True).y
+    options = dict(atrial=atrial, epi_endo=epi_endo, bcl=bcl, beats=beats, y0=np.asarray(y0, dtype=float),
+                   limit_cycle=limit_cycle)
+
+    processes = processes or os.cpu_count() or 1
+    chunksize = chunksize or max(1, -(-n//(4*processes)))
+    tasks = [(rows[i:i+chunksize], options) for i in range(0, n, chunksize)]
+    if processes == 1:
+        chunks = list(map(_run_chunk, tasks))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            chunks = list(pool.imap(_run_chunk, tasks))
+    markers = [m for chunk in chunks for m in chunk]
+
+    fields = list(names) + (['Ach'] if atrial else []) + list(BIOMARKERS)
+    table = np.zeros(n, dtype=[(field, float) for field in fields])
+    for k, name in enumerate(fields[:rows.shape[1]]):
+        table[name] = rows[:, k]
+    for k, name in enumerate(BIOMARKERS):
+        table[name] = [m[k] for m in markers]
+    return table
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n=32):
+    """Wall time of a random ventricular sweep with 1, 2, 4, ... processes."""
+    from time import perf_counter
+
+    samples = random_sample(n, seed=0)
+    counts = [1]
+    while counts[-1]*2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1]*2)
+    for processes in counts:
+        start = perf_counter()
+        table = sweep(samples, processes=processes)
+        elapsed = perf_counter() - start
+        if processes == 1:
+            serial = elapsed
+        print("{:3d} processes: {:6.2f} s  speedup {:4.1f}".format(processes, elapsed, serial/elapsed))
+    print("APD90 from {:.1f} to {:.1f} ms".format(np.nanmin(table['APD90']), np.nanmax(table['APD90'])))
+
+
+if __name__ == '__main__':
+    benchmark()
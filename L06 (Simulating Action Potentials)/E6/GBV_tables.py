@@ -0,0 +1,157 @@
+"""
+Voltage lookup tables for the batched Grandi-Bers models.
+
+Every gate steady state and time constant and the voltage-only current
+factors of voltage_terms (GHK and NCX exponentials, fnak, rkr, kp_kp, I_kAch)
+are tabulated on a uniform Vm grid, by default -100 to 100 mV in 0.05 mV
+steps, and interpolated linearly. Tables are cached per parameter set: they
+depend only on the physical constants and the few gating parameters listed
+in VENTRICULAR_KEYS and ATRIAL_KEYS, which must be equal for all cells of a
+population table. The conductances and the other per-cell parameters are
+applied outside the table as before.
+
+Example:
+========
+from GBV_batch import parameter_table, solve_population
+from GBV_tables import grandi_bers_tabulated, ventricular_table
+
+P = parameter_table(Pds)
+ventricular_table(P).print_error_report()
+Y = solve_population(grandi_bers_tabulated, Y0, t, P)
+Y = solve_population(grandi_bers_batch, Y0, t, P, method='rush_larsen', tabulated=True)
+
+Run this file as a script for the error reports and a timing comparison.
+"""
+
+import numpy as np
+
+from GBV_batch import (ventricular_gates, atrial_gates, voltage_terms,
+                       grandi_bers_batch, grandi_bers_atrial_batch)
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from sscp_tools.lookup_tables import cached_table
+
+
+VENTRICULAR_GATE_NAMES = ('m', 'h', 'j', 'd', 'f', 'xtos', 'ytos', 'xtof', 'ytof', 'xkr', 'xks')
+ATRIAL_GATE_NAMES = ('m', 'h', 'j', 'd', 'f', 'xtof', 'ytof', 'xkr', 'xks', 'xkur', 'ykur', 'ml', 'hl')
+TERM_NAMES = ('fnak', 'rkr', 'kp_kp', 'e1', 'ghk1', 'e2', 'ghk2', 'enu', 'enu1', 'kach')
+
+# Parameters the tabulated terms depend on
+VENTRICULAR_KEYS = ('Frdy', 'R', 'Temp', 'Nao', 'nu')
+ATRIAL_KEYS = VENTRICULAR_KEYS + ('ISO', 'tauhl')
+
+
+def _table_parameters(Pd, keys):
+    """The entries of Pd the table depends on, as a dictionary of floats."""
+    values = {}
+    for key in keys:
+        value = np.asarray(Pd[key], dtype=float)
+        if value.ndim > 0 and np.any(value != value.flat[0]):
+            raise ValueError("A lookup table needs the same {} for all cells".format(key))
+        values[key] = float(value.flat[0])
+    return values
+
+
+def _table(model, gates, gate_names, keys, Pd, grid):
+    params = _table_parameters(Pd, keys)
+
+    def terms(V):
+        inf, tau = gates(V, params)
+        return tuple(inf) + tuple(tau) + voltage_terms(V, params)
+
+    names = (tuple(name + '_inf' for name in gate_names) +
+             tuple('tau_' + name for name in gate_names) + TERM_NAMES)
+    key = (model, tuple(params[k] for k in keys))
+    return cached_table(key, terms, names, **grid)
+
+
+def ventricular_table(Pd, **grid):
+    """Cached lookup table of the ventricular gates and voltage terms.
+
+    grid may set vmin, vmax and dv [mV].
+    """
+    return _table('ventricular', ventricular_gates, VENTRICULAR_GATE_NAMES,
+                  VENTRICULAR_KEYS, Pd, grid)
+
+
+def atrial_table(Pd, **grid):
+    """Cached lookup table of the atrial gates and voltage terms."""
+    return _table('atrial', atrial_gates, ATRIAL_GATE_NAMES, ATRIAL_KEYS, Pd, grid)
+
+
+def table_for(rhs, Pd, **grid):
+    """Lookup table belonging to grandi_bers_batch or grandi_bers_atrial_batch."""
+    if rhs is grandi_bers_batch:
+        return ventricular_table(Pd, **grid)
+    if rhs is grandi_bers_atrial_batch:
+        return atrial_table(Pd, **grid)
+    raise ValueError("Lookup tables exist for grandi_bers_batch and grandi_bers_atrial_batch only")
+
+
+def lookup(table, Vm):
+    """Interpolated ((inf, tau), terms) at Vm, in the layout taken by the
+    gates and terms arguments of the batched right hand sides."""
+    values = table(Vm)
+    n = (len(values) - len(TERM_NAMES))//2
+    return (values[:n], values[n:2*n]), values[2*n:]
+
+
+def grandi_bers_tabulated(Y, t, Pd, table=None):
+    """grandi_bers_batch with the voltage-only terms taken from a lookup table."""
+    table = table or ventricular_table(Pd)
+    gates, terms = lookup(table, Y[..., 38])
+    return grandi_bers_batch(Y, t, Pd, gates=gates, terms=terms)
+
+
+def grandi_bers_atrial_tabulated(Y, t, Pd, table=None):
+    """grandi_bers_atrial_batch with the voltage-only terms taken from a lookup table."""
+    table = table or atrial_table(Pd)
+    gates, terms = lookup(table, Y[..., 36])
+    return grandi_bers_atrial_batch(Y, t, Pd, gates=gates, terms=terms)
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n_cells=1000, repeats=100):
+    """Print the error reports and time exact against tabulated RHS calls."""
+    from time import perf_counter
+    from GBV_batch import parameter_table, solve_population
+    from GBV_biomarkers import apd
+    from L6_widgets import set_Pd, set_Pd_atrial
+
+    scales = np.linspace(0.5, 1.5, n_cells)
+    cases = [('ventricular', grandi_bers_batch, grandi_bers_tabulated, ventricular_table,
+              [set_Pd([1, 1, 1, 1, s] + [1]*10) for s in scales], np.load('Widget_init.npy'), 38),
+             ('atrial', grandi_bers_atrial_batch, grandi_bers_atrial_tabulated, atrial_table,
+              [set_Pd_atrial([1, 1, s] + [1]*12 + [0]) for s in scales], np.load('Widget_init_atrial.npy'), 36)]
+    for name, exact, tabulated, make_table, Pds, y0, iVm in cases:
+        Pd = parameter_table(Pds)
+        print("{} table".format(name))
+        make_table(Pd).print_error_report()
+
+        Y = np.tile(y0, (n_cells, 1))
+        Y[:, iVm] = np.linspace(-90, 50, n_cells)
+        for label, rhs in (('exact', exact), ('tabulated', tabulated)):
+            rhs(Y, 0, Pd)
+            start = perf_counter()
+            for i in range(repeats):
+                rhs(Y, 0, Pd)
+            print("  {:9s} RHS, {} cells: {:6.2f} ms".format(label, n_cells, (perf_counter() - start)/repeats*1e3))
+
+        t = np.linspace(0, 1000, 1001)
+        few = parameter_table(Pds[::n_cells//10])
+        Y0 = np.tile(y0, (10, 1))
+        for label, kwargs in (('exact', {}), ('tabulated', {'tabulated': True})):
+            start = perf_counter()
+            Vm = solve_population(exact, Y0, t, few, method='rush_larsen', dt=0.1, scheme='grl1', **kwargs)[:, :, iVm]
+            print("  {:9s} grl1 dt 0.1, 10 cells: APD90 {:.2f} to {:.2f} ms, {:.2f} s".format(
+                label, np.min(apd(t, Vm)), np.max(apd(t, Vm)), perf_counter() - start))
+
+
+if __name__ == '__main__':
+    benchmark()
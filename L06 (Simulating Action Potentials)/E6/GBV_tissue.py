@@ -0,0 +1,243 @@
+"""
+Strands and sheets of coupled Grandi-Bers ventricular cells.
+
+The reaction-diffusion equation of the monodomain model,
+
+    dVm/dt = div(D grad Vm) + (ventricular Grandi-Bers right hand side),
+
+is solved on a regular grid of cells with no-flux boundaries, in one
+dimension (a strand) or two (a sheet), by Strang operator splitting as in
+L8: every step of dt ms is a half step of diffusion, a full step of the
+cell models and another half step of diffusion.
+
+* The diffusion half steps are Crank-Nicolson steps on Vm alone. The
+  sparse matrix of the implicit part (tridiagonal in 1D, banded in 2D) is
+  factorized once, so every half step is one sparse triangular solve.
+* The reaction step advances all nodes with one compiled generalized
+  Rush-Larsen step (GBV_compiled.advance_population), in parallel over the
+  nodes. Each node uses one of a few shared parameter vectors, so epi/endo
+  heterogeneity (Pd['epi'], see set_Pd) costs no memory per node.
+
+The stimulus is the one of the cell model: the nodes in the stimulus mask
+get I_app for the first 5 ms of every beat of bcl ms, the others none.
+Activation times (the upward crossing of threshold, interpolated within the
+step) are recorded for every beat while the simulation runs, and
+conduction_velocity and mean_velocity turn them into local and average
+conduction velocities. Lengths are in mm and times in ms, so D is in
+mm^2/ms and velocities are in mm/ms = m/s.
+
+The reaction step dominates the cost, 3 to 4 us per node and step on one
+core (see benchmark; the diffusion solves of a 100 x 100 sheet take under
+10% of it), so 10^4 nodes for one second at dt = 0.05 ms take about 13
+minutes on one core, and the reaction step scales with the number of cores.
+
+Example:
+========
+from GBV_tissue import simulate, conduction_velocity, mean_velocity
+
+# A 2 cm strand, endo cells in the first half and epi cells in the second
+epi = np.r_[np.zeros(100), np.ones(100)]
+result = simulate(200, duration=400, epi=epi)
+print(mean_velocity(result.activation[0], result.dx), 'm/s')
+plt.plot(result.t, result.V[:, ::20])
+
+# A 1 x 1 cm sheet paced along its left edge every 500 ms
+stimulus = np.zeros((100, 100), dtype=bool)
+stimulus[:, :3] = True
+result = simulate((100, 100), duration=1000, stimulus=stimulus, bcl=500)
+plt.imshow(result.activation[1]); plt.colorbar()
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sps
+from scipy.sparse.linalg import splu
+
+from L6_widgets import set_Pd
+from GBV_schema import VENTRICULAR
+from GBV_prepared import GBVParameters
+from GBV_compiled import parameter_matrix, advance_population
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_I_APP = GBVParameters._fields.index('I_app')
+
+TissueResult = namedtuple('TissueResult', ['t', 'V', 'activation', 'y', 'dx'])
+TissueResult.__doc__ = """Output of simulate: the recording times t, the Vm
+recordings V (len(t),) + shape, the activation times activation
+(n_beats,) + shape (nan where a node did not activate in that beat), the
+final states y shape + (n_states,) and the grid spacing dx."""
+
+
+#----------------------------------------------------------------------------
+# Diffusion
+
+def laplacian(shape, dx, D=1.0):
+    """Sparse matrix of div(D grad) on a regular grid with spacing dx and
+    no-flux boundaries, for node values flattened in C order. D is a
+    scalar or one coefficient per axis."""
+    D = np.broadcast_to(np.asarray(D, dtype=float), (len(shape),))
+    L = sps.csr_matrix((np.prod(shape), np.prod(shape)))
+    for axis, n in enumerate(shape):
+        diagonals = [np.ones(n - 1), -2*np.ones(n), np.ones(n - 1)]
+        diagonals[0][-1] = diagonals[2][0] = 2    # mirror the neighbour at the boundaries
+        second = sps.diags(diagonals, [-1, 0, 1])*(D[axis]/dx**2)
+        before = sps.identity(int(np.prod(shape[:axis])))
+        after = sps.identity(int(np.prod(shape[axis+1:])))
+        L = L + sps.kron(sps.kron(before, second), after)
+    return L.tocsc()
+
+
+class _CrankNicolson():
+    """Crank-Nicolson step of dv/dt = L v of length h, factorized once."""
+
+    def __init__(self, L, h):
+        identity = sps.identity(L.shape[0], format='csc')
+        self.explicit = (identity + 0.5*h*L).tocsr()
+        self.implicit = splu((identity - 0.5*h*L).tocsc())
+
+    def __call__(self, v):
+        return self.implicit.solve(self.explicit @ v)
+
+
+#----------------------------------------------------------------------------
+# Simulation
+
+def _parameters(epi, stimulus, multipliers, amplitude):
+    """Shared parameter vectors, one per cell type with and without the
+    stimulus, and the index of the vector of every node."""
+    types, code = np.unique(np.ravel(epi), return_inverse=True)
+    p, dynamic = parameter_matrix([set_Pd([e] + list(multipliers)) for e in types])
+    shared = np.repeat(p, 2, axis=0)
+    shared[0::2, _I_APP] = 0.0
+    shared[1::2, _I_APP] = amplitude
+    cells = np.broadcast_to(code.reshape(np.shape(epi)), stimulus.shape)
+    index = 2*cells + stimulus
+    return shared, np.repeat(dynamic, 2, axis=0), np.ascontiguousarray(index.ravel(), dtype=np.intp)
+
+
+def simulate(shape, duration, dx=0.1, D=0.1, dt=0.05, epi=1, multipliers=None, stimulus=None,
+             stimulus_amplitude=20.0, bcl=None, y0=None, record_every=1.0, threshold=-20.0, scheme='grl2'):
+    """Simulate a strand (shape = n or (n,)) or sheet (shape = (ny, nx)) of
+    ventricular Grandi-Bers cells for duration ms.
+
+    dx is the node spacing [mm], D the diffusion coefficient [mm^2/ms], a
+    scalar or one per axis, and dt the splitting step [ms]. epi is the cell
+    type, Pd['epi'] of set_Pd, for all nodes or an array of shape; multipliers
+    are the 14 scale factors of set_Pd after epi_endo, the same for all
+    nodes. stimulus is a boolean mask of the stimulated nodes, by default
+    the first 5 nodes along the last axis; they get stimulus_amplitude for
+    5 ms at the start of every beat of bcl ms, or only once when bcl is
+    None. The default is about three times the I_app of an isolated cell,
+    which does not excite 5 nodes that lose current to their neighbours.
+    y0, the initial state of every node or of each node
+    (shape + (n_states,)), defaults to Widget_init.npy.
+
+    Vm is recorded every record_every ms (a multiple of dt; None records
+    only the end). Returns a TissueResult.
+    """
+    shape = tuple(np.atleast_1d(shape))
+    n_nodes = int(np.prod(shape))
+    iV = VENTRICULAR.index['Vm']
+    multipliers = [1]*14 if multipliers is None else multipliers
+    if stimulus is None:
+        stimulus = np.zeros(shape, dtype=bool)
+        stimulus[..., :5] = True
+    stimulus = np.asarray(stimulus, dtype=bool)
+    if stimulus.shape != shape:
+        raise ValueError("the stimulus mask has shape {}, the tissue {}".format(stimulus.shape, shape))
+    p, dynamic, cell_parameters = _parameters(epi, stimulus, multipliers, stimulus_amplitude)
+
+    if y0 is None:
+        y0 = np.load(os.path.join(_here, 'Widget_init.npy'))
+    Y = np.ascontiguousarray(np.broadcast_to(np.asarray(y0, dtype=float), shape + (len(VENTRICULAR),))
+                             .reshape(n_nodes, -1))
+    n_steps = int(round(duration/dt))
+    every = n_steps if record_every is None else int(round(record_every/dt))
+    if every < 1 or not np.isclose(every*dt, record_every or duration):
+        raise ValueError("record_every must be a multiple of dt")
+    half_step = _CrankNicolson(laplacian(shape, dx, D), dt/2)
+
+    n_beats = 1 if bcl is None else int(np.ceil(duration/bcl))
+    activation = np.full((n_beats, n_nodes), np.nan)
+    t_record = [0.0]
+    V_record = [Y[:, iV].copy()]
+    for step in range(n_steps):
+        t = step*dt
+        V_before = Y[:, iV].copy()
+        Y[:, iV] = half_step(V_before)
+        advance_population(Y, t, dt, p, dynamic, cell_parameters, scheme=scheme, bcl=bcl)
+        Y[:, iV] = half_step(Y[:, iV])
+
+        V = Y[:, iV]
+        crossed = (V_before < threshold) & (V >= threshold)
+        if crossed.any():
+            beat = 0 if bcl is None else min(int(t//bcl), n_beats - 1)
+            first = crossed & np.isnan(activation[beat])
+            activation[beat, first] = t + dt*(threshold - V_before[first])/(V[first] - V_before[first])
+        if (step + 1) % every == 0:
+            t_record.append((step + 1)*dt)
+            V_record.append(V.copy())
+
+    return TissueResult(np.array(t_record), np.array(V_record).reshape((-1,) + shape),
+                        activation.reshape((n_beats,) + shape), Y.reshape(shape + (-1,)), dx)
+
+
+#----------------------------------------------------------------------------
+# Conduction velocity
+
+def conduction_velocity(activation, dx):
+    """Local conduction velocity 1/|grad T| [mm/ms] of an activation map T,
+    with central differences inside the grid."""
+    gradient = np.gradient(activation, dx)
+    if activation.ndim == 1:
+        gradient = [gradient]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1/np.sqrt(sum(g**2 for g in gradient))
+
+
+def mean_velocity(activation, dx, interior=(0.25, 0.75)):
+    """Conduction velocity [mm/ms] along the last axis, from a least squares
+    fit of the activation times against position over the given fraction of
+    the grid, away from the stimulus and the far boundary. For a sheet
+    every row is included, which assumes a planar wave along that axis."""
+    n = activation.shape[-1]
+    columns = slice(int(interior[0]*n), int(interior[1]*n))
+    x = np.broadcast_to(np.arange(n)*dx, activation.shape)[..., columns].ravel()
+    T = activation[..., columns].ravel()
+    valid = np.isfinite(T)
+    if valid.sum() < 2:
+        return np.nan
+    slope = np.polyfit(x[valid], T[valid], 1)[0]
+    return 1/slope
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n=200, duration=100.0):
+    """Conduction velocity of a strand at three splitting steps, the cost per
+    node and step, and a sheet with epi and endo halves."""
+    from time import perf_counter
+    from GBV_compiled import warm_up
+
+    warm_up()
+    for dt in (0.1, 0.05, 0.025):
+        start = perf_counter()
+        result = simulate(n, duration, dt=dt, record_every=None)
+        elapsed = perf_counter() - start
+        print("strand of {} nodes, dt = {:5.3f} ms: CV {:.3f} m/s, {:.2f} us per node and step".format(
+            n, dt, mean_velocity(result.activation[0], result.dx), elapsed/(n*duration/dt)*1e6))
+
+    epi = np.zeros((50, 50))
+    epi[:, 25:] = 1
+    start = perf_counter()
+    result = simulate((50, 50), 50.0, epi=epi, record_every=None)
+    print("50 x 50 sheet, 50 ms: {:.1f} s, CV {:.3f} m/s, last activation at {:.1f} ms".format(
+        perf_counter() - start, mean_velocity(result.activation[0], result.dx),
+        np.nanmax(result.activation[0])))
+
+
+if __name__ == '__main__':
+    benchmark()
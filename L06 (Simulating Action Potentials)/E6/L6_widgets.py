@@ -9,11 +9,22 @@ from L6_widgets import VentricularAPWidget
 VentricularAPWidget().display()
 """
 
+import os
+from functools import lru_cache
+
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 from math import exp, log, sqrt, pi
-from ipywidgets import interact, FloatSlider, Dropdown
+from ipywidgets import FloatSlider, Dropdown
+from GBV_schema import VENTRICULAR, ATRIAL
+from stimulus import PulseTrain, integrate
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from sscp_tools.widget_runtime import interact_async, cancellable
 
 class VentricularAPWidget():
     """A widget to solve the Grandi-Bers ventricular action potential model"""
@@ -21,7 +32,7 @@ class VentricularAPWidget():
     #The widget
      
     def __init__(self):
-        interact(self.solve_and_plot,
+        interact_async(self.solve, self.plot,
                           epi_endo = Dropdown(options={'Epi': 1, 'Endo': 0},value=1,description='Cell type:'),
                           GNa_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gNa scale factor', continuous_update=False),
                           GtoSlow_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gto,slow scale factor', continuous_update=False),
@@ -41,35 +52,34 @@ class VentricularAPWidget():
     #----------------------------------------------------------------------------
     #The run function
      
-    def solve_and_plot(self,epi_endo, GNa_coeff, GtoSlow_coeff, GtoFast_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
+    def solve(self,epi_endo, GNa_coeff, GtoSlow_coeff, GtoFast_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
                             Gk1_coeff, GClCa_coeff, pCa_coeff, VNCX_coeff, VNaK_coeff, GNaB_coeff, GCaB_coeff, GClB_coeff):
          
         Params_to_change = [epi_endo, GNa_coeff, GtoSlow_coeff, GtoFast_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
                             Gk1_coeff, GClCa_coeff, pCa_coeff, VNCX_coeff, VNaK_coeff, GNaB_coeff, GCaB_coeff, GClB_coeff] 
         
-        
-        Pd = set_Pd()
-        y0 = Initialize(np.load('Widget_init.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+        return baseline(), simulate(Params_to_change)
+
+    def plot(self, result, **values):
+        (t, V, Cai), new = result
         plt.figure(1)
-        plt.plot(t,Y[:, name2index("Vmo")]);
+        plt.plot(t,V);
         plt.figure(2)
-        plt.plot(t,Y[:, name2index("Caio")]*1000);
-        Pd = set_Pd(Params_to_change)
-        y0 = Initialize(np.load('Widget_init.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+        plt.plot(t,Cai*1000);
+        t, V, Cai = new
         plt.figure(1)
-        plt.plot(t,Y[:, name2index("Vmo")]);
+        plt.plot(t,V);
         plt.legend((r'Default',r'$new$'))
         plt.ylabel('V(mV)')
         plt.figure(2)
-        plt.plot(t,Y[:, name2index("Caio")]*1000);
+        plt.plot(t,Cai*1000);
         plt.legend((r'Default',r'$new$'))
         plt.ylabel('Ca_i(uM)')
         plt.xlabel('time (ms)')
         plt.show();
+
+    def solve_and_plot(self, *args, **kwargs):
+        self.plot(self.solve(*args, **kwargs))
  
 class VentricularAPWidget2():
     """A widget to solve the Grandi-Bers ventricular action potential model 
@@ -78,7 +88,7 @@ class VentricularAPWidget2():
     #The widget
     
     def __init__(self):
-        interact(self.solve_and_plot,
+        interact_async(self.solve, self.plot,
                           epi_endo = Dropdown(options={'Epi': 1, 'Endo': 0},value=1,description='Cell type:'),
                           GNa_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gNa scale factor', continuous_update=False),
                           GtoSlow_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gto,slow scale factor', continuous_update=False),
@@ -99,45 +109,43 @@ class VentricularAPWidget2():
     #----------------------------------------------------------------------------
     #The run function
     
-    def solve_and_plot(self,epi_endo, GNa_coeff, GtoSlow_coeff, GtoFast_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
+    def solve(self,epi_endo, GNa_coeff, GtoSlow_coeff, GtoFast_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
                             Gk1_coeff, GClCa_coeff, pCa_coeff, VNCX_coeff, VNaK_coeff, GNaB_coeff, GCaB_coeff, GClB_coeff):
         
         Params_to_change = [epi_endo, GNa_coeff, GtoSlow_coeff, GtoFast_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
                             Gk1_coeff, GClCa_coeff, pCa_coeff, VNCX_coeff, VNaK_coeff, GNaB_coeff, GCaB_coeff, GClB_coeff] 
         
-        Pd = set_Pd()
-        y0 = Initialize(np.load('Widget_init.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+        return baseline(), baseline(atrial=True), simulate(Params_to_change)
+
+    def plot(self, result, **values):
+        ventricular, atrial, new = result
+        t, V, Cai = ventricular
         plt.figure(1)
-        plt.plot(t,Y[:, name2index("Vmo")])
+        plt.plot(t,V)
         plt.figure(2)
-        plt.plot(t,Y[:, name2index("Caio")]*1000)
+        plt.plot(t,Cai*1000)
         
-        Pd_atrial = set_Pd_atrial()
-        y0 = Initialize_atrial(np.load('Widget_init_atrial.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs_atrial, y0, t, (Pd_atrial,))
+        t, V, Cai = atrial
         plt.figure(1)
-        plt.plot(t,Y[:, name2index_atrial("Vmo")])
+        plt.plot(t,V)
         plt.figure(2)
-        plt.plot(t,Y[:, name2index_atrial("Caio")]*1000)
+        plt.plot(t,Cai*1000)
         
-        Pd = set_Pd(Params_to_change)
-        y0 = Initialize(np.load('Widget_init.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+        t, V, Cai = new
         plt.figure(1)
-        plt.plot(t,Y[:, name2index("Vmo")])
+        plt.plot(t,V)
         plt.legend((r'Ventricular',r'Atrial',r'$new$ Ventricular'))
         plt.ylabel('V(mV)')
         plt.figure(2)
-        plt.plot(t,Y[:, name2index("Caio")]*1000)
+        plt.plot(t,Cai*1000)
         plt.legend((r'Ventricular',r'Atrial',r'$new$ Ventricular'))
         plt.ylabel('Ca_i(uM)')
         plt.xlabel('time (ms)')
         plt.show()
 
+    def solve_and_plot(self, *args, **kwargs):
+        self.plot(self.solve(*args, **kwargs))
+
 
 class AtrialAPWidget():
     """A widget to solve the Grandi-Bers atrial action potential model and allow it to be pushed toward the 
@@ -146,7 +154,7 @@ class AtrialAPWidget():
     #The widget
     
     def __init__(self):
-        interact(self.solve_and_plot,        
+        interact_async(self.solve, self.plot,        
                           GNa_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gNa scale factor', continuous_update=False),
                           GtoFast_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gto,fast scale factor', continuous_update=False),
                           Gkr_coeff = FloatSlider(value=1, min=0, max=10, step=0.1, description='gKr scale factor', continuous_update=False),
@@ -168,41 +176,90 @@ class AtrialAPWidget():
     #----------------------------------------------------------------------------
     #The run function
     
-    def solve_and_plot(self,GNa_coeff, GtoFast_coeff, Gkur_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
+    def solve(self,GNa_coeff, GtoFast_coeff, Gkur_coeff, Gkr_coeff, Gks_coeff, Gkp_coeff, 
                        Gk1_coeff, GClCa_coeff, pCa_coeff, VNCX_coeff, VNaK_coeff, GNaB_coeff, GCaB_coeff, GClB_coeff, GkAch_coeff, Ach):
         
         Params_to_change = [GNa_coeff, GtoFast_coeff, Gkr_coeff, Gkur_coeff, Gks_coeff, Gkp_coeff, 
                             Gk1_coeff, GClCa_coeff, pCa_coeff, VNCX_coeff, VNaK_coeff, GNaB_coeff, GCaB_coeff, GClB_coeff, GkAch_coeff, Ach] 
         
-        Pd_atrial = set_Pd_atrial()
-        y0 = Initialize_atrial(np.load('Widget_init_atrial.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs_atrial, y0, t, (Pd_atrial,))
+        return baseline(atrial=True), baseline(), simulate(Params_to_change, atrial=True)
+
+    def plot(self, result, **values):
+        atrial, ventricular, new = result
+        t, V, Cai = atrial
         plt.figure(1)
-        plt.plot(t,Y[:, name2index_atrial("Vmo")])
+        plt.plot(t,V)
         plt.figure(2)
-        plt.plot(t,Y[:, name2index_atrial("Caio")]*1000)
+        plt.plot(t,Cai*1000)
         
-        Pd = set_Pd()
-        y0 = Initialize(np.load('Widget_init.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs, y0, t, (Pd,))
+        t, V, Cai = ventricular
         plt.figure(1)
-        plt.plot(t,Y[:,name2index("Vmo")])
+        plt.plot(t,V)
         plt.figure(2)
-        plt.plot(t,Y[:,name2index("Caio")]*1000)
+        plt.plot(t,Cai*1000)
         
-        Pd_atrial = set_Pd_atrial(Params_to_change)
-        y0 = Initialize_atrial(np.load('Widget_init_atrial.npy'))
-        t = np.linspace(0,1000,1001)
-        Y = odeint(grandi_bers_rhs_atrial, y0, t, (Pd_atrial,))
+        t, V, Cai = new
         plt.figure(1)
-        plt.plot(t,Y[:,name2index_atrial("Vmo")])
+        plt.plot(t,V)
         plt.legend((r'Atrial',r'Ventricular',r'$new$ Atrial'))
         plt.figure(2)
-        plt.plot(t,Y[:,name2index_atrial("Caio")]*1000)
+        plt.plot(t,Cai*1000)
         plt.legend((r'Atrial',r'Ventricular',r'$new$ Atrial'))
         plt.show()
+
+    def solve_and_plot(self, *args, **kwargs):
+        self.plot(self.solve(*args, **kwargs))
+
+
+#----------------------------------------------------------------------------
+# Cached simulations shared by the widgets.
+# The default baselines are solved once per process, modified parameter sets
+# are kept in a bounded LRU cache keyed on the tuple of scale factors. Only
+# the V and Ca_i traces are kept, as read-only arrays, since every widget
+# and every user of the kernel shares them.
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_t = np.linspace(0,1000,1001)
+_t.setflags(write=False)
+
+@lru_cache(maxsize=None)
+def initial_state(atrial=False):
+    """Initial state from Widget_init.npy or Widget_init_atrial.npy, loaded once and read-only."""
+    y0 = np.load(os.path.join(_here, 'Widget_init_atrial.npy' if atrial else 'Widget_init.npy'))
+    y0.setflags(write=False)
+    return y0
+
+def _solve(Params_to_change, atrial):
+    if atrial:
+        Pd = set_Pd_atrial(None if Params_to_change is None else list(Params_to_change))
+        Y = integrate(cancellable(grandi_bers_rhs_atrial), Initialize_atrial(initial_state(True)), _t, (Pd,), PulseTrain(0, 5))
+        V, Cai = Y[:, name2index_atrial("Vmo")], Y[:, name2index_atrial("Caio")]
+    else:
+        Pd = set_Pd(None if Params_to_change is None else list(Params_to_change))
+        Y = integrate(cancellable(grandi_bers_rhs), Initialize(initial_state(False)), _t, (Pd,), PulseTrain(0, 5))
+        V, Cai = Y[:, name2index("Vmo")], Y[:, name2index("Caio")]
+    V, Cai = V.copy(), Cai.copy()
+    V.setflags(write=False)
+    Cai.setflags(write=False)
+    return _t, V, Cai
+
+@lru_cache(maxsize=None)
+def baseline(atrial=False):
+    """Time, V and Ca_i of the default ventricular or atrial model, solved once per process."""
+    return _solve(None, atrial)
+
+@lru_cache(maxsize=64)
+def _simulate(Params_to_change, atrial):
+    return _solve(Params_to_change, atrial)
+
+def simulate(Params_to_change, atrial=False):
+    """Time, V and Ca_i for a list of scale factors as passed to set_Pd or set_Pd_atrial.
+
+    Results are cached for the 64 most recently used parameter sets (about
+    16 kB each).
+    """
+    return _simulate(tuple(float(p) for p in Params_to_change), atrial)
+
 #----------------------------------------------------------------------------
 # Global functions
 # Ventricular first
@@ -738,31 +795,10 @@ def Initialize(y0 = None):
          
 def name2index(name):
     """Take the name of a state in the model, return the index of that state in the solution vector y."""
-    state_names = ["mo", "ho", "jo", "do", "fo", "fcaBjo", "fcaBslo", 
-           "xtoso", "ytoso", "xtofo", "ytofo", "xkro", "xkso", "RyRro",
-           "RyRoo", "RyRio", "NaBjo", "NaBslo", "TnCLo", "TnCHco", "TnCHmo",
-           "CaMo", "Myoco", "Myomo", "SRBo", "SLLjo", "SLLslo", "SLHjo", 
-           "SLHslo", "Csqnbo", "Ca_sro", "Najo", "Naslo", "Naio", "Kio", 
-           "Cajo", "Caslo", "Caio", "Vmo"]
-    if type(name) == str:
-        try:
-            return state_names.index(name)
-        except ValueError:
-            raise ValueError("{} is not a state in the model".format(name))
-    else:
-        raise TypeError("Input must be the name of a state in the model as a str")
+    return VENTRICULAR.name2index(name)
  
 def index2name(index):
-    state_names = ["mo", "ho", "jo", "do", "fo", "fcaBjo", "fcaBslo", 
-           "xtoso", "ytoso", "xtofo", "ytofo", "xkro", "xkso", "RyRro",
-           "RyRoo", "RyRio", "NaBjo", "NaBslo", "TnCLo", "TnCHco", "TnCHmo",
-           "CaMo", "Myoco", "Myomo", "SRBo", "SLLjo", "SLLslo", "SLHjo", 
-           "SLHslo", "Csqnbo", "Ca_sro", "Najo", "Naslo", "Naio", "Kio", 
-           "Cajo", "Caslo", "Caio", "Vmo"]
-    if type(index) == int:
-        return state_names[index]
-    else:
-        raise TypeError("Input must be the index of a state as an int")
+    return VENTRICULAR.index2name(index) + 'o'
 #--------------------------------------------------------------------------------------------     
 
 def grandi_bers_rhs_atrial(y, t, Pd):
@@ -1333,28 +1369,7 @@ def Initialize_atrial(y0 = None):
 
 def name2index_atrial(name):
     """Take the name of a state in the model, return the index of that state in the solution vector y."""  
-    state_names = ["mo", "ho", "jo", "do", "fo", "fcaBjo:", "fcaBslo", 
-               "xtofo", "ytofo", "xkro", "xkso", "RyRro", "RyRoo", "RyRio",
-               "NaBjo", "NaBslo:", "TnCLo", "TnCHco", "TnCHmo", "CaMo", "Myoco", "Myomo",
-               "SRBo", "SLLjo", "SLLslo", "SLHjo", "SLHslo", "Csqnbo","Ca_sro","Najo","Naslo",
-               "Naio","Kio","Cajo","Caslo","Caio","Vmo","rkuro","skuro",
-               "mlo","hlo","INalo"]
-    if type(name) == str:
-        try:
-            return state_names.index(name)
-        except ValueError:
-            raise ValueError("{} is not a state in the model".format(name))
-    else:
-        raise TypeError("Input must be the name of a state in the model as a str")
+    return ATRIAL.name2index(name)
         
 def index2name_atrial(index):
-    state_names = ["mo", "ho", "jo", "do", "fo", "fcaBjo:", "fcaBslo", 
-               "xtofo", "ytofo", "xkro", "xkso", "RyRro", "RyRoo", "RyRio",
-               "NaBjo", "NaBslo:", "TnCLo", "TnCHco", "TnCHmo", "CaMo", "Myoco", "Myomo",
-               "SRBo", "SLLjo", "SLLslo", "SLHjo", "SLHslo", "Csqnbo","Ca_sro","Najo","Naslo",
-               "Naio","Kio","Cajo","Caslo","Caio","Vmo","rkuro","skuro",
-               "mlo","hlo","INalo"]
-    if type(index) == int:
-        return state_names[index]
-    else:
-        raise TypeError("Input must be the index of a state as an int")   
\ No newline at end of file
+    return ATRIAL.index2name(index) + 'o'
@@ -0,0 +1,151 @@
+"""
+Integration split at the edges of a stimulus protocol.
+
+The stimulus of a paced cell model switches on and off abruptly. An
+adaptive solver that steps across such an edge sees a sudden error, rejects
+the step, shrinks the step size by orders of magnitude and grows it again,
+and it can also step over a short stimulus entirely. integrate splits the
+output times at every edge of the protocol and integrates each smooth
+segment with its own odeint call, which never steps past the end of the
+segment (tcrit). The right hand side is evaluated with the time kept
+strictly inside the segment, so it sees the stimulus of the segment at both
+of its ends whether the model's pulse is open or closed at the edge.
+
+Where the edge switches the stimulus off, the last step size of the
+previous segment is handed to the next one (h0): the solver resolved the
+fast dynamics up to the edge and can continue with that step instead of
+probing for an initial one. Where the stimulus switches on, the solver
+chooses its initial step afresh.
+
+Example:
+========
+import numpy as np
+from stimulus import PulseTrain, integrate
+
+# The Grandi-Bers models: a 5 ms stimulus at the start of every beat, with
+# time in the right hand side counted from the start of the beat
+protocol = PulseTrain(start=0, duration=5, period=1000)
+t = np.arange(0, 5001.0)
+Y, info = integrate(grandi_bers_prepared, y0, t, (P,), protocol, periodic_time=True, full_output=True)
+print(info['nfe'], 'RHS calls in', info['segments'], 'segments')
+
+# A single pulse during the first ms (L4_code.py)
+V = integrate(dV_dt, V0, np.arange(0, 2, 0.01), protocol=PulseTrain(0, 1))
+"""
+
+import math
+import numpy as np
+from scipy.integrate import odeint
+
+
+class PulseTrain():
+    """Rectangular pulses of the given amplitude and duration, the first one
+    at start and then one every period ms up to stop (a single pulse when
+    period is None). Calling the train gives the amplitude at time t."""
+
+    def __init__(self, start=0.0, duration=1.0, period=None, stop=np.inf, amplitude=1.0):
+        if period is not None and not 0 < duration <= period:
+            raise ValueError("the duration must be positive and at most the period")
+        self.start = float(start)
+        self.duration = float(duration)
+        self.period = None if period is None else float(period)
+        self.stop = float(stop)
+        self.amplitude = amplitude
+
+    def __repr__(self):
+        return "PulseTrain(start={:g}, duration={:g}, period={}, stop={:g})".format(
+            self.start, self.duration, self.period, self.stop)
+
+    def _onsets(self, t0, t1):
+        """Onsets of the pulses that overlap [t0, t1]."""
+        if self.period is None:
+            onsets = [self.start]
+        else:
+            first = max(math.floor((t0 - self.start - self.duration)/self.period), 0)
+            last = math.floor((min(t1, self.stop) - self.start)/self.period)
+            onsets = [self.start + k*self.period for k in range(first, last + 1)]
+        return [s for s in onsets if s <= self.stop and s + self.duration >= t0 and s <= t1]
+
+    def __call__(self, t):
+        for s in self._onsets(t, t):
+            if s <= t < s + self.duration:
+                return self.amplitude
+        return 0.0
+
+    def edges(self, t0, t1):
+        """(time, rising) of the pulse edges strictly between t0 and t1."""
+        edges = []
+        for s in self._onsets(t0, t1):
+            edges += [(s, True), (s + self.duration, False)]
+        return [(t, rising) for t, rising in edges if t0 < t < t1]
+
+
+def _segments(t0, t1, protocol, breaks, period):
+    """Segment boundaries between t0 and t1 and whether each boundary is a
+    rising edge, at which the step size is not carried over."""
+    edges = {} if protocol is None else dict(protocol.edges(t0, t1))
+    for b in breaks:
+        if t0 < b < t1:
+            edges.setdefault(b, False)
+    if period is not None:
+        for k in range(math.floor(t0/period) + 1, math.ceil(t1/period)):
+            edges.setdefault(k*period, False)
+    times = sorted(edges)
+    return [t0] + times + [t1], [True] + [edges[t] for t in times]
+
+
+def _clamped(function, offset, low, high, tfirst):
+    """function called with the time shifted by -offset and clamped to [low, high]."""
+    if tfirst:
+        return lambda s, x, *p: function(min(max(s - offset, low), high), x, *p)
+    return lambda x, s, *p: function(x, min(max(s - offset, low), high), *p)
+
+
+def integrate(rhs, y0, t, args=(), protocol=None, breaks=(), periodic_time=False, carry_step=True,
+              full_output=False, tfirst=False, **kwargs):
+    """Solve the ODE at the times t like odeint, integrating separately
+    between the edges of protocol (an object with an edges(t0, t1) method
+    such as PulseTrain) and the additional times in breaks.
+
+    With periodic_time=True the right hand side is called with the time since
+    the start of the current period of the protocol, for models that apply
+    their stimulus counting time from the start of a beat. carry_step=False
+    lets the solver choose a new initial step in every segment. Keyword
+    arguments go to odeint. With full_output=True the statistics of all
+    segments are returned as well: the total number of RHS calls ('nfe'),
+    Jacobian evaluations ('nje') and steps ('nst'), and the number of segments.
+    """
+    t = np.asarray(t, dtype=float)
+    period = protocol.period if periodic_time else None
+    if periodic_time and period is None:
+        raise ValueError("periodic_time needs a protocol with a period")
+    bounds, rising = _segments(t[0], t[-1], protocol, breaks, period)
+
+    Y = np.empty((len(t), np.size(y0)))
+    Y[0] = y0
+    y = np.array(y0, dtype=float).ravel()
+    h = 0.0
+    totals = dict(nfe=0, nje=0, nst=0, segments=len(bounds) - 1)
+    for a, b, restart in zip(bounds[:-1], bounds[1:], rising):
+        inside = (t > a) & (t <= b)
+        times = np.concatenate([[a], t[inside]])
+        if times[-1] != b:
+            times = np.append(times, b)
+        offset = period*math.floor(a/period + 1e-12) if period is not None else 0.0
+        # Keep the time strictly inside (a, b): the stimulus of the segment applies at both ends
+        eps = 1e-9*(b - a)
+        low, high = a - offset + eps, b - offset - eps
+        fun, options = _clamped(rhs, offset, low, high, tfirst), dict(kwargs)
+        if kwargs.get('Dfun') is not None:
+            options['Dfun'] = _clamped(kwargs['Dfun'], offset, low, high, tfirst)
+        h0 = 0.0 if restart or not carry_step else h
+        out, info = odeint(fun, y, times, args, full_output=True, tfirst=tfirst, h0=h0, tcrit=[b], **options)
+        if info['message'] != 'Integration successful.':
+            raise RuntimeError("integration failed between t = {:g} and {:g}: {}".format(a, b, info['message']))
+        Y[inside] = out[1:1 + inside.sum()]
+        y, h = out[-1], info['hu'][-1]
+        for key in ('nfe', 'nje', 'nst'):
+            totals[key] += int(info[key][-1])
+    if full_output:
+        return Y, totals
+    return Y
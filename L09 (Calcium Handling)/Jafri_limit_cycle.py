@@ -0,0 +1,171 @@
+"""
+The complete Jafri et al. (1998) model and its paced limit cycle.
+
+rhs assembles the whole model from Jafri_model_parts in the same way as
+the example solution to exercise 4 of E9, with every parameter taken from
+the Jafri_model_parts object. steady_state paces it at a given BCL until
+the start-of-beat state converges, see sscp_tools/limit_cycle.py, and
+caches the result on disk.
+
+Note that with the default parameters and initial state the SR gains Ca
+on every beat, at BCL 500 and 1000 ms alike (and also with Nai, Ko and Ki
+held fixed), until spontaneous release sets in after 10 to 15 beats. This
+version of the model therefore has no paced limit cycle, and steady_state
+only converges for parameter sets where the SR load settles.
+
+Example:
+========
+import numpy as np
+from scipy.integrate import solve_ivp
+from Jafri_model import Jafri_model_parts
+from Jafri_limit_cycle import rhs, compiled_rhs, initial_state, steady_state
+
+cycle = steady_state(bcl=500, newton=True)
+solution = solve_ivp(rhs, (0, 500), cycle.y, max_step=1)
+
+# The same with the right hand side compiled by numba (see sscp_tools/nopython.py)
+fast_rhs = compiled_rhs()
+p = np.array(Jafri_model_parts().parameters)
+solution = solve_ivp(fast_rhs, (0, 500), initial_state, max_step=1, args=(p,))
+"""
+
+import math
+import numpy as np
+
+from Jafri_model import Jafri_model_parts
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.limit_cycle import limit_cycle
+from sscp_tools.nopython import nopython_source, compile_sources
+
+
+state_names = ('V', 'Nai', 'm', 'h', 'j', 'O', 'O_Ca', 'C0', 'C1', 'C2', 'C3', 'C4',
+               'C_Ca0', 'C_Ca1', 'C_Ca2', 'C_Ca3', 'C_Ca4', 'Ca_SS', 'Ko', 'Ki', 'y', 'X',
+               'Cai', 'P_O1', 'P_O2', 'P_C1', 'P_C2', 'Ca_JSR', 'Ca_NSR', 'HTRPNCa', 'LTRPNCa')
+
+# Initial state of the E9 notebooks
+initial_state = np.array([-84.1638, 10.2042, 0.0328302, 0.988354, 0.99254, 9.84546e-21, 0,
+                          0.997208, 6.38897e-5, 1.535e-9, 1.63909e-14, 6.56337e-20, 2.72826e-3,
+                          6.99215e-7, 6.71989e-11, 2.87031e-15, 4.59752e-20, 1.36058e-4, 5.4,
+                          143.727, 0.998983, 0.000928836, 9.94893e-11, 1.19168e-3, 6.30613e-9,
+                          0.762527, 0.236283, 1.17504, 1.243891, 0.13598, 0.00635])
+
+
+def rhs(t, y, model=None, table=None):
+    """Right hand side of the Jafri model, in the argument order of solve_ivp.
+
+    model is a Jafri_model_parts object holding the parameters (the defaults
+    when None) and table an optional lookup table from model.voltage_table().
+    """
+    model = model or Jafri_model_parts()
+    V, Nai, m, h, j, O, O_Ca, C0, C1, C2, C3, C4, C_Ca0, C_Ca1, C_Ca2, C_Ca3, C_Ca4, Ca_SS, Ko, Ki, y, X, Cai, P_O1, P_O2, P_C1, P_C2, Ca_JSR, Ca_NSR, HTRPNCa, LTRPNCa = y
+    R, T, F = model.R, model.T, model.F
+
+    ## Unit conversion factors
+    conv_Amp_SS = model.Am/(2.0*model.V_SS*F)
+    conv_Amp_myo = model.Am/(2.0*model.V_myo*F)
+
+    dm_dt, dh_dt, dj_dt, i_Na, dX_dt, i_K, i_K1, i_Kp, i_NaK, i_ns_Ca, i_ns_Na,\
+    i_ns_K, i_p_Ca, i_Ca_b, i_Na_b, dy_dt, dC0_dt, dC1_dt, dC2_dt, dC3_dt, dC4_dt,\
+    dC_Ca0_dt, dC_Ca1_dt, dC_Ca2_dt, dC_Ca3_dt, dC_Ca4_dt, dO_dt, dO_Ca_dt,\
+    dHTRPNCa_dt,dLTRPNCa_dt, i_Ca_L_Ca, i_Ca_L_K, J_trpn = model.currents_concentrations(V, m, h, j,\
+                                                                   Nai, X, Ko, Ki, Cai, y, C0, C1, C2, C3, C4, C_Ca0,\
+                                                                   C_Ca1, C_Ca2, C_Ca3, C_Ca4, O, O_Ca, Ca_SS, Ca_JSR,\
+                                                                   Ca_NSR, HTRPNCa, LTRPNCa, table=table)
+
+    ## Na Ca exchanger current I_NaCa
+    i_NaCa = ((((((model.k_NaCa*1.0)/((model.K_mNa**3.0) + (model.Nao**3.0)))*1.0)/(model.K_mCa + model.Cao))*1.0)/(1.0 + model.k_sat*math.exp(((model.eta - 1.0)*V*F)/(R*T))))*(math.exp((model.eta*V*F)/(R*T))*(Nai**3.0)*model.Cao - math.exp(((model.eta - 1.0)*V*F)/( R*T))*(model.Nao**3.0)*Cai)
+
+    ## RyR channel states (Keizer and Levine)
+    RyR_open = P_O1 + P_O2
+    J_rel =  model.v1*RyR_open*(Ca_JSR - Ca_SS)
+
+    dP_C1_dt =  -model.k_a_plus*(Ca_SS**model.nCa)*P_C1 + model.k_a_minus*P_O1
+    dP_O1_dt = (model.k_a_plus*(Ca_SS**model.nCa)*P_C1 - (model.k_a_minus*P_O1 + model.k_b_plus*(Ca_SS**model.mCa)*P_O1+ model.k_c_plus*P_O1))+ model.k_b_minus*P_O2+ model.k_c_minus*P_C2
+    dP_O2_dt = model.k_b_plus*(Ca_SS**model.mCa)*P_O1 - model.k_b_minus*P_O2
+    dP_C2_dt = model.k_c_plus*P_O1 -  model.k_c_minus*P_C2
+
+    ## Calcium subsystem currents
+    J_leak = model.v2*(Ca_NSR - Cai)
+    J_up = (model.v3*(Cai**2.0))/((model.K_mup**2.0) + (Cai**2.0))
+    J_tr = (Ca_NSR - Ca_JSR)/model.tau_tr
+    J_xfer = (Ca_SS - Cai)/model.tau_xfer
+
+    ## Calcium subsystem concentrations
+    Bi = 1.0/(1.0 + (model.CMDN_tot*model.K_mCMDN)/((model.K_mCMDN+Cai)**2.0))
+    B_JSR = 1.0/(1.0 + (model.CSQN_tot*model.K_mCSQN)/((model.K_mCSQN+Ca_JSR)**2.0))
+    B_SS = 1.0/(1.0 + (model.CMDN_tot*model.K_mCMDN)/((model.K_mCMDN+Ca_SS)**2.0))
+
+    dCa_SS_dt = B_SS*(((J_rel*model.V_JSR)/model.V_SS - (J_xfer*model.V_myo)/model.V_SS) - i_Ca_L_Ca*conv_Amp_SS)
+    dCa_JSR_dt = B_JSR*(J_tr - J_rel)
+    dCa_NSR_dt = ((J_up - J_leak)*model.V_myo)/model.V_NSR - (J_tr*model.V_JSR)/model.V_NSR
+    dCai_dt = Bi*((J_leak + J_xfer) - ( J_up + J_trpn + (i_Ca_b - i_NaCa+i_p_Ca)*conv_Amp_myo))
+
+    ## Ionic curents
+    if t>=model.stim_start and t<=model.stim_end and (t - model.stim_start) -  math.floor((t - model.stim_start)/model.stim_period)*model.stim_period <= model.stim_duration:
+        I_stim = model.stim_amplitude
+    else:
+        I_stim = 0
+
+    dV_dt = (I_stim - (i_Na + i_Ca_L_Ca + i_Ca_L_K + i_K + i_NaCa + i_K1 + i_Kp + i_p_Ca + i_Na_b + i_Ca_b + i_NaK + i_ns_Na + i_ns_K))/model.Cm
+
+    dNai_dt = -(i_Na + i_Na_b + i_ns_Na + i_NaCa*3.0 + i_NaK*3.0)*2*conv_Amp_myo
+    dKi_dt = -(i_Ca_L_K + i_K + i_K1 + i_Kp + i_ns_K + - i_NaK*2.0)*2*conv_Amp_myo
+    dKo_dt = (i_Ca_L_K + i_K + i_K1 + i_Kp + i_ns_K + - i_NaK*2.0)*2*conv_Amp_myo
+
+    return dV_dt, dNai_dt, dm_dt, dh_dt, dj_dt, dO_dt, dO_Ca_dt, dC0_dt, dC1_dt, dC2_dt, dC3_dt, dC4_dt, dC_Ca0_dt, dC_Ca1_dt, dC_Ca2_dt, dC_Ca3_dt, dC_Ca4_dt, dCa_SS_dt, dKo_dt, dKi_dt, dy_dt, dX_dt, dCai_dt, dP_O1_dt, dP_O2_dt, dP_C1_dt, dP_C2_dt, dCa_JSR_dt, dCa_NSR_dt, dHTRPNCa_dt, dLTRPNCa_dt
+
+
+def compiled_rhs():
+    """rhs compiled with numba, taking the parameter vector
+    np.array(model.parameters) in place of the model: f(t, y, p).
+
+    Jafri_model_parts.voltage_terms, currents_concentrations and rhs are
+    rewritten to read their parameters from p and compiled together; the
+    lookup table is left out, the compiled exponentials are cheaper than the
+    interpolation. Without numba the rewritten functions run as Python.
+    """
+    names = Jafri_model_parts.parameter_names
+    sources = [
+        nopython_source(Jafri_model_parts.voltage_terms, {'self': names}),
+        nopython_source(Jafri_model_parts.currents_concentrations, {'self': names}, substitutions=[
+            (', table=None)', ')'),
+            ('self.voltage_terms(V) if table is None else table(V)', 'voltage_terms(p, V)')]),
+        nopython_source(rhs, {'model': names}, substitutions=[
+            ('(t, y, model=None, table=None)', '(t, y, model)'),
+            ('model = model or Jafri_model_parts()', ''),
+            ('model.currents_concentrations(', 'currents_concentrations(model, '),
+            (', table=table)', ')')])]
+    return compile_sources('jafri', sources)['rhs']
+
+
+def steady_state(bcl=500, model=None, y0=None, tabulated=False, compiled=False, **kwargs):
+    """Limit cycle of the Jafri model paced every bcl ms.
+
+    The stimulus period of a copy of model is set to bcl, so the stimulus
+    falls stim_start ms into every beat. compiled=True integrates the
+    numba-compiled right hand side (compiled_rhs) instead, which ignores
+    tabulated. Keyword arguments go to limit_cycle, e.g. newton=True or tol.
+
+    The three right hand sides are cached under separate model names
+    (jafri, jafri_tabulated, jafri_compiled), so a cycle converged with the
+    lookup table is not returned for the exact right hand side.
+    """
+    paced = Jafri_model_parts()
+    if model is not None:
+        paced.__dict__.update(model.__dict__)
+    paced.stim_period = bcl
+    y0 = initial_state if y0 is None else y0
+    if compiled:
+        name, f, args = 'jafri_compiled', compiled_rhs(), (np.array(paced.parameters),)
+    elif tabulated:
+        name, f, args = 'jafri_tabulated', rhs, (paced, paced.voltage_table())
+    else:
+        name, f, args = 'jafri', rhs, (paced, None)
+    return limit_cycle(name, f, y0, bcl, args, paced.parameters,
+                       tfirst=True, breaks=(paced.stim_start, paced.stim_start + paced.stim_duration),
+                       **kwargs)
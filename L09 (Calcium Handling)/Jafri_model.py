@@ -2,6 +2,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.lookup_tables import cached_table
+
 class Jafri_model_parts():
     # parameters
     R = 8.3145e3
@@ -74,31 +82,33 @@ class Jafri_model_parts():
     V_NSR =  0.081*V_myo
     V_JSR =  0.00464*V_myo
     
+    parameter_names = ('R', 'T', 'F', 'Cm', 'stim_start', 'stim_end', 'stim_period',
+                       'stim_duration', 'stim_amplitude', 'g_Na', 'Nao', 'P_Ca', 'P_K',
+                       'i_Ca_L_Ca_half', 'a', 'b', 'g', 'f', 'g_', 'f_', 'omega', 'Cao',
+                       'g_K_max', 'P_NaK', 'g_K1_max', 'g_Kp', 'k_NaCa', 'K_mNa', 'K_mCa',
+                       'k_sat', 'eta', 'K_mpCa', 'I_pCa', 'g_Nab', 'g_Cab', 'I_NaK', 'K_mNai',
+                       'K_mKo', 'K_m_ns_Ca', 'P_ns_Ca', 'Am', 'V_myo', 'v1', 'v2', 'v3', 'nCa',
+                       'mCa', 'k_a_plus', 'k_a_minus', 'k_b_plus', 'k_b_minus', 'k_c_plus',
+                       'k_c_minus', 'k_htrpn_plus', 'k_htrpn_minus', 'k_ltrpn_plus',
+                       'k_ltrpn_minus', 'tau_tr', 'K_mup', 'K_mCMDN', 'K_mCSQN', 'tau_xfer',
+                       'HTRPN_tot', 'LTRPN_tot', 'CSQN_tot', 'CMDN_tot', 'V_SS', 'V_NSR',
+                       'V_JSR')
+
     @property
     def parameters(self):
-        return (self.R, self.T, self.F, self.Cm, self.stim_start, self.stim_end, self.stim_period,
-                self.stim_duration, self.stim_amplitude, self.g_Na, self.Nao, self.P_Ca, self.P_K, 
-                self.i_Ca_L_Ca_half, self.a, self.b, self.g, self.f, self.g_, self.f_, self.omega, 
-                self.Cao, self.g_K_max, self.P_NaK, self.g_K1_max, self.g_Kp, self.k_NaCa, self.K_mNa, 
-                self.K_mCa, self.k_sat, self.eta, self.K_mpCa, self.I_pCa, self.g_Nab, self.g_Cab, 
-                self.I_NaK, self.K_mNai, self.K_mKo, self.K_m_ns_Ca, self.P_ns_Ca, self.Am, self.V_myo, 
-                self.v1, self.v2, self.v3, self.nCa, self.mCa, self.k_a_plus, self.k_a_minus, 
-                self.k_b_plus, self.k_b_minus, self.k_c_plus, self.k_c_minus, self.k_htrpn_plus, 
-                self.k_htrpn_minus, self.k_ltrpn_plus, self.k_ltrpn_minus, self.tau_tr, self.K_mup, 
-                self.K_mCMDN, self.K_mCSQN, self.tau_xfer, self.HTRPN_tot, self.LTRPN_tot, self.CSQN_tot, 
-                self.CMDN_tot, self.V_SS, self.V_NSR, self.V_JSR)
+        return tuple(getattr(self, name) for name in self.parameter_names)
 
     def test_class(self, t, V):
         print(f"It is time {t} and voltage {V}")
         
     
-    def currents_concentrations(self, V, m, h, j, Nai, X, Ko, Ki, Cai, y, C0, C1, C2, C3, C4, \
-                                C_Ca0, C_Ca1, C_Ca2, C_Ca3, C_Ca4, O, O_Ca, Ca_SS, Ca_JSR, Ca_NSR,\
-                                HTRPNCa, LTRPNCa ):
-        #fast_Na_current
-        E_Na =  ((self.R*self.T)/self.F)*math.log(self.Nao/Nai)
-        i_Na =  self.g_Na*(m**3.0)*h*j*(V - E_Na)
+    voltage_term_names = ('alpha_m', 'beta_m', 'alpha_h', 'beta_h', 'alpha_j', 'beta_j',
+                          'alpha_X', 'beta_X', 'Xi', 'Kp', 'f_NaK', 'alpha', 'beta',
+                          'y_infinity', 'tau_y', 'i_Ca_L_Ca_max', 'ghk_K', 'exp_VFRT')
 
+    def voltage_terms(self, V):
+        """Rate constants and current factors that depend on V only, in the
+        order of voltage_term_names."""
         alpha_m = (0.32*(V + 47.13))/(1.0 - math.exp(-0.1*(V + 47.13)))
         beta_m =  0.08*math.exp( - V/11.0)
     
@@ -112,20 +122,56 @@ class Jafri_model_parts():
             beta_h = 1.0/( 0.13*(1.0 + math.exp((V + 10.66)/-11.1)))
             alpha_j = 0.0
             beta_j = ( 0.3*math.exp(-2.535e-07*V))/(1.0 + math.exp(-0.1*(V+32.0)))
-    
+
+        alpha_X = (7.19e-05*(V + 30.0))/(1.0 - math.exp(-0.1480*(V + 30.0)))
+        beta_X = (0.000131*(V + 30.0))/(-1.0 + math.exp(0.0687*(V + 30.0)))
+        Xi = 1.0/(1.0 + math.exp((V - 56.26)/32.10))
+        Kp = 1.0/(1.0 + math.exp((7.488 - V)/5.98))
+        sigma = (1.0/7.0)*(math.exp(self.Nao/67.3) - 1.0)
+        f_NaK = 1.0/(1.0 + 0.1245*math.exp((-0.10*V*self.F)/(self.R*self.T)) + 0.0365*sigma*math.exp((-V*self.F)/(self.R*self.T)))
+
+        alpha = 0.40*math.exp((V + 12.0)/10.0)
+        beta = 0.05*math.exp((V + 12.0)/-13.0)
+        y_infinity = 1.0/(1.0 + math.exp((V + 55.0)/7.5))+0.1/(1.0 + math.exp((-V + 21.0)/6.0))
+        tau_y = 20.0 + 600.0/(1.0 + math.exp((V + 30.0)/9.5))
+        i_Ca_L_Ca_max = (((self.P_Ca*4.0*V*(self.F**2.0))/(self.R*self.T))*(0.001*math.exp((2.0*V*self.F)/(self.R*self.T)) -  0.341*self.Cao))/(math.exp((2.0*V*self.F)/(self.R*self.T)) - 1.0)
+        exp_VFRT = math.exp((V*self.F)/(self.R*self.T))
+        ghk_K = ((V*(self.F**2.0))/(self.R*self.T))/(exp_VFRT - 1.0)
+
+        return (alpha_m, beta_m, alpha_h, beta_h, alpha_j, beta_j, alpha_X, beta_X, Xi, Kp,
+                f_NaK, alpha, beta, y_infinity, tau_y, i_Ca_L_Ca_max, ghk_K, exp_VFRT)
+
+    def voltage_table(self, vmin=-100.0, vmax=100.0, dv=0.05):
+        """Lookup table of voltage_terms, cached per parameter set.
+
+        Pass it to currents_concentrations to interpolate the exponentials
+        instead of evaluating them; table.print_error_report() shows the
+        interpolation error of every term.
+        """
+        return cached_table(('Jafri', self.parameters), self.voltage_terms, self.voltage_term_names,
+                            vmin, vmax, dv, vectorized=False)
+
+    def currents_concentrations(self, V, m, h, j, Nai, X, Ko, Ki, Cai, y, C0, C1, C2, C3, C4, \
+                                C_Ca0, C_Ca1, C_Ca2, C_Ca3, C_Ca4, O, O_Ca, Ca_SS, Ca_JSR, Ca_NSR,\
+                                HTRPNCa, LTRPNCa, table=None):
+        (alpha_m, beta_m, alpha_h, beta_h, alpha_j, beta_j, alpha_X, beta_X, Xi, Kp,
+         f_NaK, alpha, beta, y_infinity, tau_y, i_Ca_L_Ca_max, ghk_K, exp_VFRT) = \
+            self.voltage_terms(V) if table is None else table(V)
+
+        #fast_Na_current
+        E_Na =  ((self.R*self.T)/self.F)*math.log(self.Nao/Nai)
+        i_Na =  self.g_Na*(m**3.0)*h*j*(V - E_Na)
+
         dm_dt =  alpha_m*(1.0 - m) - beta_m*m
         dh_dt =  alpha_h*(1.0 - h) - beta_h*h
         dj_dt =  alpha_j*(1.0 - j) - beta_j*j
         
         
         # Time dependent K current IK
-        alpha_X = (7.19e-05*(V + 30.0))/(1.0 - math.exp(-0.1480*(V + 30.0)))
-        beta_X = (0.000131*(V + 30.0))/(-1.0 + math.exp(0.0687*(V + 30.0)))
         dX_dt = alpha_X*(1.0 - X) - beta_X*X
 
         g_K = self.g_K_max*math.sqrt(Ko/5.4)
         E_K = ((self.R*self.T)/self.F)*math.log((Ko + self.P_NaK*self.Nao)/(Ki + self.P_NaK*Nai))
-        Xi = 1.0/(1.0 + math.exp((V - 56.26)/32.10))
         i_K = g_K*Xi*(X**2.0)*(V - E_K)
         
         
@@ -140,12 +186,9 @@ class Jafri_model_parts():
     
         ## Plateau current I_Kp
         E_Kp = E_K1
-        Kp = 1.0/(1.0 + math.exp((7.488 - V)/5.98))
         i_Kp = self.g_Kp*Kp*(V - E_Kp)
         
         ## Na K pump
-        sigma = (1.0/7.0)*(math.exp(self.Nao/67.3) - 1.0)
-        f_NaK = 1.0/(1.0 + 0.1245*math.exp((-0.10*V*self.F)/(self.R*self.T)) + 0.0365*sigma*math.exp((-V*self.F)/(self.R*self.T)))
         i_NaK = (((self.I_NaK*f_NaK*1.0)/(1.0 + ((self.K_mNai/Nai)**1.5)))*Ko)/(Ko + self.K_mKo)
         
         ## Nonspecific Ca activated current I_nsCa
@@ -173,14 +216,10 @@ class Jafri_model_parts():
    
     
         ## L type calcium channel
-        alpha = 0.40*math.exp((V + 12.0)/10.0)
-        beta = 0.05*math.exp((V + 12.0)/-13.0)
         gamma = 0.1875*Ca_SS
         alpha_a = alpha*self.a
         beta_b = beta/self.b
 
-        y_infinity = 1.0/(1.0 + math.exp((V + 55.0)/7.5))+0.1/(1.0 + math.exp((-V + 21.0)/6.0))
-        tau_y = 20.0 + 600.0/(1.0 + math.exp((V + 30.0)/9.5))
         dy_dt = (y_infinity - y)/tau_y
 
         dC0_dt = (beta*C1 + self.omega*C_Ca0) - (4.0*alpha + gamma)*C0
@@ -196,11 +235,10 @@ class Jafri_model_parts():
         dO_dt = self.f*C4 - self.g*O
         dO_Ca_dt = self.f_*C_Ca4 - self.g_*O_Ca
 
-        i_Ca_L_Ca_max = (((self.P_Ca*4.0*V*(self.F**2.0))/(self.R*self.T))*(0.001*math.exp((2.0*V*self.F)/(self.R*self.T)) -  0.341*self.Cao))/(math.exp((2.0*V*self.F)/(self.R*self.T)) - 1.0)
         i_Ca_L_Ca = i_Ca_L_Ca_max*y*(O + O_Ca)
 
         p_k = self.P_K/(1.0 + i_Ca_L_Ca_max/self.i_Ca_L_Ca_half)
-        i_Ca_L_K = (((p_k*y*(O + O_Ca)*V*(self.F**2.0))/(self.R*self.T))*(Ki*math.exp((V*self.F)/(self.R*self.T)) - Ko))/(math.exp((V*self.F)/(self.R*self.T)) - 1.0)
+        i_Ca_L_K = p_k*y*(O + O_Ca)*ghk_K*(Ki*exp_VFRT - Ko)
 
 
         ## Calcium buffered troponin
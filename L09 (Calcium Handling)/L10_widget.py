@@ -1,7 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
-from ipywidgets import interact, IntSlider, FloatSlider
+from ipywidgets import IntSlider, FloatSlider
+
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.phase_plane import PhasePlane
+from sscp_tools.widget_runtime import interact_async, cancellable
 
 
 class CICRWidget:
@@ -42,12 +51,13 @@ class CICRWidget:
         return dCai_dt, dCaSR_dt
     
     def initial_conditions_widget(self):
-        def solve_and_plot(Cai_0, CaSR_0):
-            y0 = Cai_0, CaSR_0
-            T = (0, 800)
+        T = (0, 800)
 
-            solution = solve_ivp(self.rhs, T, y0, args=self.parameters, max_step=0.1)
+        def solve(Cai_0, CaSR_0):
+            y0 = Cai_0, CaSR_0
+            return solve_ivp(cancellable(self.rhs), T, y0, args=self.parameters, max_step=0.1)
 
+        def plot(solution, **values):
             Cai, CaSR = solution.y
             t = solution.t
 
@@ -65,24 +75,27 @@ class CICRWidget:
             plt.ylim(0, 10)
             plt.show()
 
-        widget = interact(solve_and_plot,
+        widget = interact_async(solve, plot,
                           Cai_0 = FloatSlider(value=0.1, min=0, max=1.0, step=0.1, continuous_update=False),
                           CaSR_0 = FloatSlider(value=4.0, min=0.0, max=8.0, step=0.25, continuous_update=False))
 
 
 
     def krel_widget(self):
-        def solve_and_plot(kappa0, kappa1, Kd, n):
+        def solve(kappa0, kappa1, Kd, n):
             Cai = np.linspace(0, 1, 1001)
             k_rel = kappa0 + kappa1 * Cai**n/(Cai**n + Kd**n)
+            return Cai, k_rel
 
+        def plot(result, **values):
+            Cai, k_rel = result
             plt.plot(Cai, k_rel)
             plt.xlabel('Cyt. calcium (µM)')
             plt.ylabel('Release rate (1/s)')
             plt.axis((0, 1, 0, 2))
             plt.show()
 
-        widget = interact(solve_and_plot,
+        widget = interact_async(solve, plot,
                           kappa0 = FloatSlider(value=0.1, min=0, max=1.0, step=0.1),
                           kappa1 = FloatSlider(value=0.6, min=0.0, max=1.0, step=0.1),
                           Kd = FloatSlider(value=0.5, min=0.2, max=0.8, step=0.1),
@@ -90,14 +103,15 @@ class CICRWidget:
 
 
     def cicr_widget(self):
-        def solve_and_plot(Kd, n):
-            self.Kd = Kd
-            self.n = n
-            y0 = (0.080, 4.0)
-            T = (0, 800)
+        y0 = (0.080, 4.0)
+        T = (0, 800)
 
-            solution = solve_ivp(self.rhs, T, y0, args=self.parameters, max_step=0.1)
+        def solve(Kd, n):
+            p = (self.Cao, self.k_entry, self.k_extrusion, self.k_uptake,
+                 self.kappa0, self.kappa1, Kd, n, self.gamma)
+            return solve_ivp(cancellable(self.rhs), T, y0, args=p, max_step=0.1)
 
+        def plot(solution, **values):
             Cai, CaSR = solution.y
             t = solution.t
 
@@ -115,8 +129,47 @@ class CICRWidget:
             plt.ylim(0, 10)
             plt.show()
 
-        widget = interact(solve_and_plot,
+        widget = interact_async(solve, plot,
                   n = FloatSlider(value=3.0, min=2.0, max=4.0, step=0.1),
                   Kd = FloatSlider(value=0.5, min=0.0, max=1.0, step=0.1))
 
 
+    def _plane(self):
+        """The phase plane of rhs, made once per widget object."""
+        if not hasattr(self, '_phase_plane'):
+            self._phase_plane = PhasePlane(lambda Cai, CaSR, *p: self.rhs(0, (Cai, CaSR), *p)[0],
+                                           lambda Cai, CaSR, *p: self.rhs(0, (Cai, CaSR), *p)[1],
+                                           spacing=(0.005, 0.05))
+        return self._phase_plane
+
+    def phase_plane_widget(self):
+        plane = self._plane()
+        window = (0, 1), (0, 10)
+        y0 = (0.080, 4.0)
+        T = (0, 800)
+
+        def solve(Kd, n):
+            p = (self.Cao, self.k_entry, self.k_extrusion, self.k_uptake,
+                 self.kappa0, self.kappa1, Kd, n, self.gamma)
+            solution = solve_ivp(cancellable(self.rhs), T, y0, args=p, max_step=0.1)
+            field = plane.field(p, p, *window, every=20)
+            nullclines = [plane.nullclines(k, p, *window) for k in range(2)]
+            return solution, field, nullclines
+
+        def plot(result, **values):
+            solution, (x, y, U, V), nullclines = result
+            Cai, CaSR = solution.y
+            plt.quiver(x, y, U, V, color='0.7', angles='xy')
+            for lines, color, label in zip(nullclines, ('C1', 'C2'), ('Cyt. nullcline', 'SR nullcline')):
+                for i, line in enumerate(lines):
+                    plt.plot(line[:, 0], line[:, 1], color, label=label if i == 0 else None)
+            plt.plot(Cai, CaSR, 'C0', label='Trajectory')
+            plt.xlabel('Cyt. calcium (µM)')
+            plt.ylabel('SR Calcium (µM)')
+            plt.axis((*window[0], *window[1]))
+            plt.legend()
+            plt.show()
+
+        widget = interact_async(solve, plot,
+                  n = FloatSlider(value=3.0, min=2.0, max=4.0, step=0.1),
+                  Kd = FloatSlider(value=0.5, min=0.0, max=1.0, step=0.1))
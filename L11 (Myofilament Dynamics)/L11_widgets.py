@@ -12,7 +12,15 @@ ReactionWidget().display()
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import odeint
-from ipywidgets import interact, IntSlider, FloatSlider
+from ipywidgets import IntSlider, FloatSlider
+
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.widget_runtime import interact_async, cancellable
 
 
 class ReactionWidget():
@@ -25,7 +33,7 @@ class ReactionWidget():
         dA2_dt = h*A_1-(h_prime+g)*A_2
         return [dD_dt, dA1_dt, dA2_dt]
 
-    def solve_and_plot(self, k_on, f, h, g):
+    def solve(self, k_on, f, h, g):
         self.k_on = k_on
         self.f = f
         self.h = h
@@ -37,7 +45,10 @@ class ReactionWidget():
         time = np.linspace(0, 10, 5000)
         params = (R_T, k_on, k_off, f, f_prime,  h, h_prime, g)
         initial_condition = (0, 0, 0)
-        solutions = odeint(self.rhs, initial_condition, time, params)
+        return time, odeint(cancellable(self.rhs), initial_condition, time, params)
+
+    def plot(self, result, **values):
+        time, solutions = result
         D, A_1, A_2 = np.hsplit(solutions, 3)
         
         
@@ -72,8 +83,11 @@ class ReactionWidget():
         ktr = 1 / t_half
         print("k_dev = ",ktr, " 1/sec")
 
+    def solve_and_plot(self, k_on, f, h, g):
+        self.plot(self.solve(k_on, f, h, g))
+
     def display(self):
-        widget = interact(self.solve_and_plot,
+        widget = interact_async(self.solve, self.plot,
                           k_on = FloatSlider(value=400, min=100, max=500, step=2),
                           f = FloatSlider(value=50, min=0, max=500, step=5),
                           h = FloatSlider(value=8, min=0, max=15, step=0.1),
@@ -20,14 +20,22 @@ from numpy import *
 import pylab
 from scipy.integrate import ode
 import matplotlib.pyplot as plt
-from ipywidgets import interact, IntSlider, FloatSlider
+from ipywidgets import IntSlider, FloatSlider
+
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.widget_runtime import interact_async, check_cancelled
 
 class ReactionWidget():
     """A widget solving the simplified Razumova Model."""
 
 
 
-    def solve_and_plot(self, u, v, w):
+    def solve(self, u, v, w):
         def computeRates(voi, states, constants):
             rates = [0.0] * sizeStates; algebraic = [0.0] * sizeAlgebraic
             #Here we are considering D = states[0],A1 = states[1], and A2 = states[2]
@@ -90,6 +98,7 @@ class ReactionWidget():
             states = array([[0.0] * len(time)] * sizeStates)
             states[:,0] = init_states
             for (i,t) in enumerate(time[1:]):
+                check_cancelled()
                 if r.successful():
                     r.integrate(t)
                     states[:,i+1] = r.y
@@ -100,9 +109,11 @@ class ReactionWidget():
             SS_force[index] = A_2[len(A_2)-1]
             log_Cal[index] = log(calConc[index])
             index+=1
-    
-    
-    
+
+        return log_Cal, SS_force, time, A_2
+
+    def plot(self, result, **values):
+        log_Cal, SS_force, time, A_2 = result
         plt.plot(log_Cal, SS_force, label=r'Steady State Force-pCa curve')
         plt.xlabel('log(Ca/Ca_50)')
         plt.ylabel('Force')
@@ -120,8 +131,11 @@ class ReactionWidget():
 
         plt.show()
 
+    def solve_and_plot(self, u, v, w):
+        self.plot(self.solve(u, v, w))
+
     def display(self):
-        widget = interact(self.solve_and_plot,
+        widget = interact_async(self.solve, self.plot,
                           u = FloatSlider(value=1, min=1, max=3, step=0.1),
                           v = FloatSlider(value=1, min=1, max=3, step=0.1),
                           w = FloatSlider(value=1, min=1, max=3, step=0.1))
@@ -12,16 +12,24 @@ import rice_model_2008 as rice
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import odeint
-from ipywidgets import interact, IntSlider, FloatSlider
+from ipywidgets import IntSlider, FloatSlider
 import math
 
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.widget_runtime import interact_async, cancellable
+
 class Fig3AWidget():
     """A widget solving the Rice model to steady state, allowing an 
     version of Figure 3A from Rice et al (2008)."""
     def __init__(self):
         
 
-        interact(self.solve_and_plot,
+        interact_async(self.solve, self.plot,
                           SL = FloatSlider(value=1.85, min=1.4, max=2.4, step=0.05),
                           Fmax = FloatSlider(value=0.17, min=0.17, max=0.92, step=0.05),
                           Ca50 = FloatSlider(value=3.0, min=0.87, max=3.0, step=0.05),
@@ -31,10 +39,10 @@ class Fig3AWidget():
                      )
 
     
-    def solve_and_plot(self, SL, Fmax, Ca50, n):
+    def solve(self, SL):
         """
         Solve the model to steady state for Ca values in [0,10], for a
-        given value of SL, and plot the resulting F-Ca curve.
+        given value of SL.
         """
         t = np.linspace(0,100,101)
         Cai = np.linspace(0,10,101)
@@ -44,10 +52,14 @@ class Fig3AWidget():
         Fss = np.empty_like(Cai)
         for i in range(len(Cai)):
             p = (rice.init_parameter_values(start_time=1000,Ca_diastolic=Cai[i],SLmin=2.5),)
-            s = odeint(rice.rhs,init,t,p)
+            s = odeint(cancellable(rice.rhs),init,t,p)
             m = rice.monitor(s[-1],t[-1],p[0])
             Fss[i] = m[force_index]
+        return Cai, Fss
 
+    def plot(self, result, SL, Fmax=0.17, Ca50=3.0, n=7.6):
+        """Plot the F-Ca curve with a Hill curve for Fmax, Ca50 and n."""
+        Cai, Fss = result
         plt.semilogx(Cai,Fss)
         plt.ylabel('Normalized force at steady state')
         plt.xlabel('Ca concentration')
@@ -71,16 +83,23 @@ class Fig3AWidget():
         
         plt.show()
 
+    def solve_and_plot(self, SL, Fmax, Ca50, n):
+        """
+        Solve the model to steady state for Ca values in [0,10], for a
+        given value of SL, and plot the resulting F-Ca curve.
+        """
+        self.plot(self.solve(SL), SL, Fmax, Ca50, n)
+
 
     def display(self):
-        widget = interact(self.solve_and_plot,
+        widget = interact_async(self.solve, self.plot,
                           SL = FloatSlider(value=1.85, min=1.4, max=2.4, step=0.05))
 
 
 
 class Fig5Awidget():
     def __init__(self):
-        interact(self.solve_and_plot,
+        interact_async(self.solve, self.plot,
                      SL = FloatSlider(value=1.85, min=1.4, max=2.4, step=0.05),
                      Ca_amplitude = FloatSlider(value=1.45, min=1.0, max=1.9, step=0.05),
                      tau1 = FloatSlider(value=20, min=10, max=30, step=1),
@@ -94,7 +113,7 @@ class Fig5Awidget():
                      gxb = FloatSlider(value=0.07, min=0.02, max=0.1, step=0.01))
                      
         
-    def solve_and_plot(self,SL,Ca_amplitude,tau1,tau2,kn_p,kp_n,f_app,g_app,h_f,h_b,gxb):
+    def solve(self,SL,Ca_amplitude,tau1,tau2,kn_p,kp_n,f_app,g_app,h_f,h_b,gxb):
         t = np.linspace(0,1000,101)
         
         p = rice.init_parameter_values(SLmin=2.5, Ca_amplitude=Ca_amplitude, tau1=tau1, tau2=tau2,
@@ -104,14 +123,17 @@ class Fig5Awidget():
         ca_ind = rice.monitor_indices("Cai")     
 
         init = rice.init_state_values(SL=SL)
-        s = odeint(rice.rhs,init,t,(p,))
+        s = odeint(cancellable(rice.rhs),init,t,(p,))
         force = []
         cai = []
         for tn,sn in zip(t,s):
             m = rice.monitor(sn,tn,p)
             force.append(m[force_ind])
             cai.append(m[ca_ind])
+        return t, cai, force
 
+    def plot(self, result, **values):
+        t, cai, force = result
         plt.figure(1)
         plt.plot(t,cai)
 
@@ -119,6 +141,9 @@ class Fig5Awidget():
         plt.plot(t,force)
         plt.show()
 
+    def solve_and_plot(self, *args, **kwargs):
+        self.plot(self.solve(*args, **kwargs))
+
         
 #if __name__ == '__main__':
 #    ReactionWidget().display()
@@ -0,0 +1,52 @@
+"""
+Paced limit cycle of the Rice et al. (2008) myofilament model.
+
+The Ca transient of rice_model_2008 starts at start_time after the start of
+each beat, so pacing the model at a BCL amounts to restarting time at zero
+every bcl ms. steady_state finds the periodic state with
+sscp_tools/limit_cycle.py and caches it on disk.
+
+Example:
+========
+import rice_model_2008 as rice
+from rice_limit_cycle import steady_state
+
+p = rice.init_parameter_values(Ca_amplitude=1.2)
+cycle = steady_state(bcl=1000, parameters=p)
+s = odeint(rice.rhs, cycle.y, np.linspace(0, 1000, 1001), (p,))
+s = odeint(compiled_rhs(), cycle.y, np.linspace(0, 1000, 1001), (p,))   # numba
+"""
+
+import rice_model_2008 as rice
+try:
+    import sscp_tools
+except ImportError:
+    # Not installed (see README.md): import it from this checkout
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sscp_tools.limit_cycle import limit_cycle
+from sscp_tools.nopython import nopython_source, compile_sources
+
+# Position of start_time in the parameter array of rice_model_2008
+START_TIME = 33
+
+
+def compiled_rhs():
+    """rice_model_2008.rhs compiled with numba (see sscp_tools/nopython.py),
+    with the same arguments. The generated code already takes a parameter
+    array; only the imports inside the function have to go. Without numba
+    the rewritten function runs as Python."""
+    return compile_sources('rice', [nopython_source(rice.rhs)])['rhs']
+
+
+def steady_state(bcl=1000, parameters=None, y0=None, compiled=False, **kwargs):
+    """Limit cycle of the Rice model with one Ca transient every bcl ms.
+
+    parameters and y0 default to the values of rice_model_2008. compiled=True
+    integrates compiled_rhs. Keyword arguments go to limit_cycle, e.g.
+    newton=True or tol.
+    """
+    parameters = rice.init_parameter_values() if parameters is None else parameters
+    y0 = rice.init_state_values() if y0 is None else y0
+    rhs = compiled_rhs() if compiled else rice.rhs
+    return limit_cycle('rice', rhs, y0, bcl, (parameters,), breaks=(parameters[START_TIME],), **kwargs)
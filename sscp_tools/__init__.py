@@ -0,0 +1,40 @@
+"""
+Numerical tools shared by the lecture code.
+
+The lecture folders import these modules from here instead of keeping a
+copy each:
+
+* widget_runtime: background, cancellable computation for the widgets;
+* limit_cycle: paced steady states with an on-disk cache;
+* nopython: optional numba compilation of right hand sides;
+* lookup_tables: voltage lookup tables for gating kinetics;
+* linear_ode: closed-form solutions of linear ODEs;
+* phase_plane: cached vector fields and nullclines;
+* stochastic_channels: ensemble and population simulation of Markov channels;
+* markov_spec: Markov models declared as states, rates and transitions.
+
+The package is installed into the course environment by environment.yml
+(pip install -e . from the top of the repository). A lecture module run
+without it adds the repository to sys.path itself.
+
+On-disk caches (limit cycles, generated numba modules) go to cache_dir(),
+$SSCP_TOOLS_CACHE if it is set and sscp_tools under $XDG_CACHE_HOME (by
+default ~/.cache) otherwise, never into the package or the lecture folders.
+
+Example:
+========
+from sscp_tools.widget_runtime import interact_async
+from sscp_tools.markov_spec import MarkovSpec, MarkovModel
+"""
+
+import os
+
+
+def cache_dir(*names):
+    """Path of the on-disk cache directory of sscp_tools, or of a
+    subdirectory of it. The directory is not created."""
+    root = os.environ.get('SSCP_TOOLS_CACHE')
+    if not root:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'sscp_tools')
+    return os.path.join(root, *names)
@@ -0,0 +1,263 @@
+"""
+Periodic steady states (limit cycles) of paced single-cell models.
+
+A cell model paced at a fixed basic cycle length (BCL) settles on a limit
+cycle after enough beats. limit_cycle paces a model one beat at a time
+until the state at the start of a beat changes by less than a tolerance
+from one beat to the next, optionally accelerated by Newton-Krylov shooting
+on the one-beat map, and stores the result in an on-disk cache keyed by
+model name, BCL and a hash of the parameter vector. On later calls the
+cached state is returned directly, and a cached state for nearby
+parameters or BCL is used as the starting point when there is no exact
+match. The cache is the limit_cycles folder of sscp_tools.cache_dir(),
+outside the repository.
+
+One beat is the interval t = 0 to t = bcl, so the right hand side must
+apply its stimulus once within that interval, counting time from the start
+of the beat. Each beat is integrated in separate pieces between the given
+breaks (the start and end of the stimulus, for example), so the
+integrator never steps across a discontinuity.
+
+Example:
+========
+import numpy as np
+from scipy.integrate import odeint
+from sscp_tools.limit_cycle import limit_cycle
+from L6_widgets import set_Pd
+from GBV_prepared import prepare, grandi_bers_prepared
+
+P = prepare(set_Pd([1, 1, 1, 1, 2] + [1]*10))
+y0 = np.load('Widget_init.npy')
+cycle = limit_cycle('grandi_bers', grandi_bers_prepared, y0, 1000, (P,), breaks=(5.0,))
+Y = odeint(grandi_bers_prepared, cycle.y, np.linspace(0, 1000, 1001), (P,))
+"""
+
+import os
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+from scipy.integrate import odeint
+from scipy.sparse.linalg import LinearOperator, gmres
+
+import sscp_tools
+
+
+LimitCycle = namedtuple('LimitCycle', 'y bcl beats residual converged cached')
+LimitCycle.__doc__ = """State at the start of a beat on the limit cycle.
+
+beats counts the beats simulated in this call (one-beat maps inside the
+Newton iterations included), residual is the relative beat-to-beat change
+of the returned state, and cached tells whether it came from the cache.
+"""
+
+CACHE_DIR = sscp_tools.cache_dir('limit_cycles')
+
+
+#----------------------------------------------------------------------------
+# Parameter records
+
+def parameter_vector(params):
+    """Flatten a parameter record (namedtuple, tuple or array) to a float
+    vector, fields in order. Fields that are None are left out.
+
+    The model wrappers pass the records their kernels take, so the vector is
+    the kernel's own layout, e.g. as_array(P) followed by the dynamic flags
+    for a prepared Grandi-Bers record P.
+    """
+    if isinstance(params, dict):
+        raise TypeError("pass the prepared parameter record or vector, not a dictionary")
+    parts = [parameter_vector(p) if isinstance(p, tuple) else np.ravel(np.asarray(p, dtype=float))
+             for p in params if p is not None]
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def parameter_hash(params):
+    """Short hexadecimal hash of a parameter record."""
+    h = hashlib.sha1()
+    h.update(parameter_vector(params).tobytes())
+    return h.hexdigest()[:16]
+
+
+#----------------------------------------------------------------------------
+# Cache
+
+def _cache_file(cache_dir, model, bcl, params):
+    name = '{}_bcl{:g}_{}.npz'.format(model, bcl, parameter_hash(params))
+    return os.path.join(cache_dir, name)
+
+
+def _load(filename):
+    with np.load(filename) as data:
+        return {key: data[key] for key in data.files}
+
+
+def _nearest(cache_dir, model, bcl, p):
+    """Cached state of model whose parameters and BCL are closest to p and
+    bcl, measured in relative differences, or None."""
+    if not os.path.isdir(cache_dir):
+        return None
+    best, best_distance = None, np.inf
+    for name in os.listdir(cache_dir):
+        if not (name.startswith(model + '_bcl') and name.endswith('.npz')):
+            continue
+        entry = _load(os.path.join(cache_dir, name))
+        if entry['params'].shape != p.shape:
+            continue
+        q = entry['params']
+        scale = np.where(q == 0, 1.0, np.abs(q))
+        distance = np.sum(((p - q)/scale)**2) + ((bcl - entry['bcl'])/bcl)**2
+        if distance < best_distance:
+            best, best_distance = entry, distance
+    return best
+
+
+def clear_cache(model=None, cache_dir=CACHE_DIR):
+    """Delete the cached states of one model, or of all models."""
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith('.npz') and (model is None or name.startswith(model + '_bcl')):
+            os.remove(os.path.join(cache_dir, name))
+
+
+#----------------------------------------------------------------------------
+# Pacing and shooting
+
+def _change(y1, y0, floor):
+    """Largest relative change between two states."""
+    return np.max(np.abs(y1 - y0)/np.maximum(np.abs(y0), floor))
+
+
+def limit_cycle(model, rhs, y0, bcl, args=(), params=None, breaks=(), tol=1e-6, max_beats=2000,
+                newton=False, prepace=20, warm_start=True, cache=True, cache_dir=CACHE_DIR,
+                floor=1e-6, **kwargs):
+    """Pace rhs at the given BCL [ms] until the start-of-beat state converges.
+
+    model names the model in the cache and params is the parameter record
+    that identifies the cache entry (defaults to args). breaks lists the
+    times within a beat where rhs is discontinuous. Pacing stops once the
+    largest relative beat-to-beat change, with state magnitudes below floor
+    counted as floor, is below tol. With newton=True the cycle is found by
+    Newton-Krylov shooting on the one-beat map after prepace beats, and
+    plain pacing takes over if the Newton iteration stalls. With
+    warm_start=True, y0 is replaced by the cached state of the nearest
+    parameter set and BCL when there is one. Further keyword arguments go to
+    odeint, e.g. Dfun or tfirst.
+    """
+    params = args if params is None else params
+    p = parameter_vector(params)
+    filename = _cache_file(cache_dir, model, bcl, params)
+
+    if cache and os.path.exists(filename):
+        entry = _load(filename)
+        if entry['residual'] <= tol:
+            return LimitCycle(entry['y'], bcl, 0, float(entry['residual']), True, True)
+        y0, prepace = entry['y'], min(prepace, 2)
+    elif warm_start:
+        entry = _nearest(cache_dir, model, bcl, p)
+        if entry is not None:
+            # Close to the cycle already, a couple of beats find the frozen states
+            y0, prepace = entry['y'], min(prepace, 2)
+
+    kwargs.setdefault('rtol', 1e-9)
+    kwargs.setdefault('atol', 1e-11)
+    kwargs.setdefault('mxstep', 50000)
+    t = [0.0] + sorted(b for b in breaks if 0 < b < bcl) + [bcl]
+
+    def beat(y):
+        for t0, t1 in zip(t[:-1], t[1:]):
+            Y, info = odeint(rhs, y, [t0, t1], args, full_output=True, **kwargs)
+            if info['message'] != 'Integration successful.':
+                raise RuntimeError("{} beat failed at t = {:g} ms: {}".format(model, t0, info['message']))
+            y = Y[-1]
+        return y
+
+    y = np.array(y0, dtype=float)
+    beats = 0
+    residual = np.inf
+    frozen = np.full(len(y), prepace > 0)
+    if newton:
+        for beats in range(1, prepace + 1):
+            y_next = beat(y)
+            frozen &= y_next == y
+            residual, y = _change(y_next, y, floor), y_next
+            if residual <= tol:
+                break
+        if residual > tol:
+            y, residual, n = _shoot(beat, y, ~frozen, tol, floor, max_beats - beats)
+            beats += n
+    while residual > tol and beats < max_beats:
+        y_next = beat(y)
+        residual, y = _change(y_next, y, floor), y_next
+        beats += 1
+
+    converged = residual <= tol
+    if cache and converged:
+        # Written under a temporary name first, so that processes pacing in
+        # parallel never read a partly written entry
+        os.makedirs(cache_dir, exist_ok=True)
+        part = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(part, 'wb') as outfile:
+            np.savez(outfile, y=y, bcl=bcl, params=p, residual=residual)
+        os.replace(part, filename)
+    return LimitCycle(y, bcl, beats, residual, converged, False)
+
+
+def _shoot(beat, y, free, tol, floor, budget, max_iter=20, krylov=10, eps=1e-4, max_step=0.5):
+    """Damped Newton-GMRES solution of beat(y) = y.
+
+    The unknowns are the free states scaled by their magnitude; states that
+    did not change at all while pacing (constant concentrations, for
+    example) are left out, since they make the Jacobian singular. Jacobian
+    products are finite differences of the one-beat map, one beat each.
+    Newton steps are limited to max_step in the scaled variables and halved
+    until the residual decreases, or the beat can be integrated at all. No
+    iteration is started that could take the number of beats simulated past
+    budget. Returns the best state found, its residual and the number of
+    beats simulated.
+    """
+    scale = np.maximum(np.abs(y), floor)[free]
+    count = [0]
+
+    def state(z):
+        x = y.copy()
+        x[free] = z*scale
+        return x
+
+    def one_beat(z):
+        count[0] += 1
+        return beat(state(z))[free]/scale
+
+    z = y[free]/scale
+    Pz = one_beat(z)
+    F = Pz - z
+    for i in range(max_iter):
+        if np.max(np.abs(F)) <= tol or count[0] + krylov + 5 > budget:
+            break
+
+        def jv(v, z=z, Pz=Pz):
+            norm = np.linalg.norm(v)
+            if norm == 0:
+                return np.zeros_like(v)
+            return (one_beat(z + eps/norm*v) - Pz)*norm/eps - v
+
+        J = LinearOperator((len(z), len(z)), matvec=jv)
+        dz, info = gmres(J, -F, restart=krylov, maxiter=1, rtol=1e-3)
+        dz *= min(1.0, max_step/max(np.max(np.abs(dz)), 1e-300))
+        for halving in range(5):
+            z_new = z + dz
+            try:
+                P_new = one_beat(z_new)
+            except RuntimeError:
+                # The trial state is too far off for the integrator
+                dz /= 2
+                continue
+            F_new = P_new - z_new
+            if np.max(np.abs(F_new)) < np.max(np.abs(F)):
+                break
+            dz /= 2
+        else:
+            break
+        z, Pz, F = z_new, P_new, F_new
+    return state(z), _change(state(Pz), state(z), floor), count[0]
@@ -0,0 +1,226 @@
+"""
+Exact solutions of linear ODEs with piecewise-constant forcing.
+
+Many of the widgets solve ODEs of the form
+
+    dy/dt = A y + b(t),
+
+where A is constant and b(t) only jumps at a few known times (a stimulus
+switched off at t = 1, a voltage-clamp step): the gating equation
+dm/dt = a*(1-m) - b*m, a membrane with constant conductances, the voltage
+clamp circuit. Between the jumps the solution is known in closed form,
+
+    y(s + tau) = y(s) + tau*phi1(tau*A) (A y(s) + b),   phi1(z) = (e^z - 1)/z,
+
+so the solution on a whole time grid costs a few exponentials instead of an
+adaptive integration that has to be kept to small steps around the jumps.
+
+solve takes an ordinary right hand side, as for odeint, and the times in
+breaks where the forcing jumps. In every segment between the breaks it
+checks that the right hand side is affine in y and the same at both ends
+and in the middle of the segment (n + 2 calls at three times), recovers A
+and b from those calls and evaluates the closed form on all the output
+times of the segment at once: with NumPy's expm1 for one state and with the
+matrix exponential of the augmented matrix [[A, A y + b], [0, 0]] for
+several, from its eigenvectors (or scipy's expm on a stack of matrices
+where they are ill-conditioned). A segment whose right hand side
+is not affine, or changes inside the segment, is integrated with odeint
+instead, so a widget can keep a single right hand side that students are
+free to change. solve_affine takes A and b directly.
+
+Example:
+========
+from sscp_tools.linear_ode import solve, solve_affine
+
+# The gating equation of L4 and a membrane stimulated for 1 ms
+m = solve(lambda m, t: a*(1 - m) - b*m, 0.0, np.arange(0, 1, 0.01))
+V = solve(dV_dt, -60, np.arange(0, 2, 0.01), breaks=[1.0])
+
+# The same with the system declared
+m = solve_affine(-(a + b), a, 0.0, np.arange(0, 1, 0.01))
+
+Run this file as a script to compare the cost and accuracy with odeint and
+solve_ivp.
+"""
+
+import numpy as np
+from scipy.integrate import odeint
+from scipy.linalg import expm
+
+
+#----------------------------------------------------------------------------
+# Closed form
+
+def _phi1(z):
+    """(e^z - 1)/z, 1 at z = 0."""
+    z = np.asarray(z, dtype=float)
+    small = np.abs(z) < 1e-12
+    return np.where(small, 1.0 + z/2, np.expm1(z)/np.where(small, 1.0, z))
+
+
+def propagate(A, b, y, tau):
+    """Exact solutions of dy/dt = A y + b from y at time 0 at the times tau,
+    shape (len(tau), n)."""
+    tau = np.asarray(tau, dtype=float)
+    A = np.atleast_2d(np.asarray(A, dtype=float))
+    y = np.atleast_1d(np.asarray(y, dtype=float))
+    g = A @ y + np.broadcast_to(np.asarray(b, dtype=float), y.shape)
+    if len(y) == 1:
+        return y + (tau*_phi1(tau*A[0, 0])*g[0])[:, None]
+    n = len(y)
+    M = np.zeros((n + 1, n + 1))
+    M[:n, :n], M[:n, n] = A, g
+    # Last column of exp(tau M) from the eigenvectors of M where they are well
+    # conditioned, else from the matrix exponential of every tau
+    lam, V = np.linalg.eig(M)
+    if np.linalg.cond(V) < 1e8:
+        c = np.linalg.solve(V, np.eye(n + 1)[:, n])
+        return y + ((V[:n]*c) @ np.exp(np.outer(lam, tau))).real.T
+    return y + expm(tau[:, None, None]*M)[:, :n, n]
+
+
+def solve_affine(A, b, y0, t, breaks=()):
+    """Solution of dy/dt = A y + b(t) at the times t, (len(t), n) like odeint.
+
+    A is a constant (n, n) matrix (a number for one state) and b a constant
+    vector or a function of t that is constant between the times in breaks;
+    it is evaluated in the middle of every segment.
+    """
+    forcing = b if callable(b) else (lambda s: b)
+    return _solve_segments(lambda a, c, y, tau: propagate(A, forcing((a + c)/2), y, tau), y0, t, breaks)
+
+
+#----------------------------------------------------------------------------
+# Detection
+
+def affine_parts(rhs, y, t, args=(), tfirst=False, rtol=1e-9):
+    """(A, b) such that rhs(y, t) = A y + b, from n + 1 calls around y, or
+    None if rhs is not affine in y (checked with one more call)."""
+    f = (lambda x: np.atleast_1d(rhs(t, x, *args))) if tfirst else (lambda x: np.atleast_1d(rhs(x, t, *args)))
+    y = np.atleast_1d(np.asarray(y, dtype=float))
+    n = len(y)
+    h = np.maximum(1.0, np.abs(y))
+    f0 = np.asarray(f(y), dtype=float)
+    A = np.empty((n, n))
+    for i in range(n):
+        step = np.zeros(n)
+        step[i] = h[i]
+        A[:, i] = (f(y + step) - f0)/h[i]
+    b = f0 - A @ y
+    # A check point that is not on the coordinate axes through y
+    probe = y + h*np.linspace(-0.7, 1.3, n)
+    expected = A @ probe + b
+    scale = np.abs(f0).max() + np.abs(A @ probe).max() + np.abs(b).max()
+    if not np.all(np.isfinite(expected)) or np.abs(f(probe) - expected).max() > rtol*max(scale, 1e-300):
+        return None
+    return A, b
+
+
+def _segment_parts(rhs, y, a, c, args, tfirst, rtol):
+    """A and b of rhs on the segment (a, c), or None if rhs is not affine
+    there or differs between the ends and the middle of the segment."""
+    eps = 1e-6*(c - a)
+    parts = [affine_parts(rhs, y, s, args, tfirst, rtol) for s in ((a + c)/2, a + eps, c - eps)]
+    if any(p is None for p in parts):
+        return None
+    A, b = parts[0]
+    for A_s, b_s in parts[1:]:
+        if not (np.allclose(A_s, A, rtol=rtol, atol=0) and np.allclose(b_s, b, rtol=rtol, atol=rtol*np.abs(b).max())):
+            return None
+    return A, b
+
+
+def solve(rhs, y0, t, args=(), breaks=(), tfirst=False, rtol=1e-9, full_output=False, **kwargs):
+    """Solve the ODE at the times t like odeint, exactly on every segment
+    between the times in breaks where rhs is affine in y and constant in t.
+
+    The other segments are integrated with odeint (keyword arguments go to
+    odeint). With full_output=True the number of segments solved exactly
+    and with odeint is returned as well.
+    """
+    counts = dict(exact=0, numerical=0)
+
+    def segment(a, c, y, tau):
+        parts = _segment_parts(rhs, y, a, c, args, tfirst, rtol)
+        if parts is not None:
+            counts['exact'] += 1
+            return propagate(*parts, y, tau)
+        counts['numerical'] += 1
+        return odeint(rhs, y, a + tau, args, tfirst=tfirst, tcrit=[c], **kwargs)
+
+    Y = _solve_segments(segment, y0, t, breaks)
+    if full_output:
+        return Y, counts
+    return Y
+
+
+def _solve_segments(segment, y0, t, breaks):
+    """Solutions at t from segment(a, c, y, tau) on every segment (a, c)
+    between the breaks, tau the times from a that include 0 and c - a."""
+    t = np.asarray(t, dtype=float)
+    bounds = [t[0]] + sorted(s for s in set(breaks) if t[0] < s < t[-1]) + [t[-1]]
+    Y = np.empty((len(t), np.size(y0)))
+    Y[0] = y = np.array(y0, dtype=float).ravel()
+    for a, c in zip(bounds[:-1], bounds[1:]):
+        inside = (t > a) & (t <= c)
+        times = np.concatenate([[a], t[inside]])
+        if times[-1] != c:
+            times = np.append(times, c)
+        out = segment(a, c, y, times - a)
+        Y[inside] = out[1:1 + inside.sum()]
+        y = out[-1]
+    return Y
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(repeat=20):
+    """Time the widget ODEs of L3 and L4 with solve and with the integrators
+    and settings the widgets used, and print the largest difference."""
+    from time import perf_counter
+    from scipy.integrate import solve_ivp
+
+    def gating(m, t):
+        return 4*(1 - m) - 2*m
+
+    def conductances(V, t):
+        I_app = -1.0 if t < 1 else 0.0
+        return (-I_app - 0.3*(V - 50) - 0.2*(V + 80))/0.05
+
+    def clamp(t, V):
+        return -(V - ((t > 2)*(t < 6)*40 - 80))/(10*0.05)
+
+    def membrane(t, V):
+        return -(0.005*(V - 70) + 0.02*(V + 86) + 0.002*(V - 114))/0.05
+
+    def two_states(y, t):
+        return np.array([-2*y[0] + y[1] + (t < 1), 0.5*y[0] - y[1]])
+
+    cases = [('gating, odeint', gating, 0.0, np.arange(0, 1, 0.01), (), False, {}),
+             ('constant conductances, odeint', conductances, -60.0, np.arange(0, 2, 0.01), (1.0,), False,
+              dict(tcrit=[1.0])),
+             ('voltage clamp, solve_ivp', clamp, -80.0, np.linspace(0, 10, 101), (2.0, 6.0), True,
+              dict(max_step=0.01)),
+             ('membrane, solve_ivp', membrane, 0.0, np.linspace(0, 20, 41), (), True, dict(max_step=0.5)),
+             ('two states, odeint', two_states, [0.0, 0.0], np.arange(0, 5, 0.01), (1.0,), False, {})]
+
+    for name, rhs, y0, t, breaks, tfirst, options in cases:
+        start = perf_counter()
+        for _ in range(repeat):
+            if tfirst:
+                reference = solve_ivp(rhs, (t[0], t[-1]), np.atleast_1d(y0), t_eval=t, **options).y.T
+            else:
+                reference = odeint(rhs, y0, t, **options)
+        numerical = (perf_counter() - start)/repeat
+
+        start = perf_counter()
+        for _ in range(repeat):
+            Y, counts = solve(rhs, y0, t, breaks=breaks, tfirst=tfirst, full_output=True)
+        exact = (perf_counter() - start)/repeat
+        print("{:30s} {:8.2f} ms numerical, {:6.2f} ms exact ({} exact segments), max difference {:.1e}".format(
+            name, numerical*1e3, exact*1e3, counts['exact'], np.abs(Y - reference).max()))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,151 @@
+"""
+Voltage lookup tables.
+
+Many terms of a cardiac model depend on the membrane potential only: gate
+steady states and time constants, GHK and exchanger exponentials, rectifier
+factors. A VoltageTable evaluates such terms once on a uniform grid and
+replaces the exponentials by a linear interpolation, which for a population
+of cells costs one index computation and one gather per term.
+
+Values outside [vmin, vmax] are clamped to the end points of the table.
+Removable singularities of the exact expressions that fall on a grid point
+(for example the GHK prefactor at V=0) are filled in from the neighbouring
+points, so the table is smooth where the formula is 0/0.
+
+Example:
+========
+import numpy as np
+from sscp_tools.lookup_tables import VoltageTable
+
+def terms(V):
+    return 1/(1+np.exp((V+74)/24)), V/(np.exp(V/25.7)-1)
+
+table = VoltageTable(terms, ('rkr', 'ghk'))
+rkr, ghk = table(np.linspace(-90, 40, 1000))
+print(table.error_report())
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class VoltageTable(object):
+    """Linear interpolation table of voltage-only terms.
+
+    func maps a voltage array to a tuple of arrays (one per name), or, if
+    vectorized is False, a single float voltage to a tuple of floats.
+    """
+
+    def __init__(self, func, names, vmin=-100.0, vmax=100.0, dv=0.05, vectorized=True):
+        self.func = func
+        self.names = tuple(names)
+        self.vectorized = vectorized
+        self.vmin = float(vmin)
+        self.dv = float(dv)
+        n = int(round((vmax - vmin)/dv)) + 1
+        self.V = self.vmin + self.dv*np.arange(n)
+        self.vmax = self.V[-1]
+
+        values = self._exact(self.V)
+        for column in values.T:
+            finite = np.isfinite(column)
+            if not finite.all():
+                column[~finite] = np.interp(self.V[~finite], self.V[finite], column[finite])
+        self.values = values
+        self.slopes = np.vstack((np.diff(values, axis=0), np.zeros((1, len(self.names)))))
+
+        # Row lists for the scalar path, which is faster than NumPy indexing
+        self._rows = values.tolist()
+        self._row_slopes = self.slopes.tolist()
+
+    def _exact(self, V):
+        """Exact values of all terms at the voltages V, shape (len(V), n_terms)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.vectorized:
+                columns = self.func(V)
+                return np.stack([np.broadcast_to(np.asarray(c, dtype=float), V.shape)
+                                 for c in columns], axis=-1).copy()
+            return np.array([self._exact_scalar(float(v)) for v in V], dtype=float)
+
+    def _exact_scalar(self, v):
+        """Exact terms at a single voltage, nan where the scalar code fails
+        (for example with a ZeroDivisionError at a removable singularity)."""
+        try:
+            return self.func(v)
+        except (ZeroDivisionError, OverflowError, ValueError):
+            return (np.nan,)*len(self.names)
+
+    def __call__(self, V):
+        """Interpolated terms at V, one array (or float) per name."""
+        if np.ndim(V) == 0:
+            x = (min(max(float(V), self.vmin), self.vmax) - self.vmin)/self.dv
+            i = min(int(x), len(self._rows) - 1)
+            f = x - i
+            return tuple(v + f*s for v, s in zip(self._rows[i], self._row_slopes[i]))
+
+        x = (np.clip(V, self.vmin, self.vmax) - self.vmin)/self.dv
+        i = np.clip(x.astype(int), 0, len(self.V) - 1)
+        f = (x - i)[..., None]
+        out = self.values[i] + f*self.slopes[i]
+        return tuple(np.moveaxis(out, -1, 0))
+
+    def error_report(self, points=4):
+        """Worst-case interpolation error of each term against the exact expression.
+
+        The exact terms are evaluated at `points` equally spaced voltages inside
+        every grid interval. Returns a dictionary name -> (max absolute error,
+        max error relative to the largest magnitude of the term, voltage of the
+        worst error). Points where the exact expression is not finite are
+        skipped.
+        """
+        offsets = (np.arange(points) + 1.0)/(points + 1)
+        V = (self.V[:-1, None] + self.dv*offsets).ravel()
+        exact = self._exact(V)
+        approx = np.stack(self(V), axis=-1)
+        report = {}
+        for k, name in enumerate(self.names):
+            err = np.where(np.isfinite(exact[:, k]), np.abs(approx[:, k] - exact[:, k]), 0)
+            worst = np.argmax(err)
+            scale = np.max(np.abs(self.values[:, k]))
+            report[name] = (err[worst], err[worst]/scale if scale > 0 else 0.0, V[worst])
+        return report
+
+    def print_error_report(self, points=4):
+        """Print error_report as a table."""
+        print('%-12s %12s %12s %10s' % ('term', 'max abs', 'max rel', 'at V'))
+        for name, (abs_err, rel_err, V) in sorted(self.error_report(points).items()):
+            print('%-12s %12.3e %12.3e %10.2f' % (name, abs_err, rel_err, V))
+
+
+#----------------------------------------------------------------------------
+# Cache of tables, keyed by the caller on everything the terms depend on
+
+# The number of tables kept; the least recently used one goes first
+MAX_TABLES = 32
+
+_tables = OrderedDict()
+
+
+def cached_table(key, func, names, vmin=-100.0, vmax=100.0, dv=0.05, vectorized=True):
+    """Return the table stored under key and grid, building it on first use.
+
+    key must be hashable and identify the terms and every parameter value
+    they depend on, for example (model name, tuple of parameter values).
+    Only the MAX_TABLES most recently used tables are kept, so a parameter
+    sweep does not accumulate one table per parameter set.
+    """
+    full_key = (key, float(vmin), float(vmax), float(dv))
+    table = _tables.get(full_key)
+    if table is None:
+        table = _tables[full_key] = VoltageTable(func, names, vmin, vmax, dv, vectorized)
+        while len(_tables) > MAX_TABLES:
+            _tables.popitem(last=False)
+    else:
+        _tables.move_to_end(full_key)
+    return table
+
+
+def clear_cache():
+    """Forget all cached tables."""
+    _tables.clear()
@@ -0,0 +1,391 @@
+"""
+Markov channel models declared as states, rates and transitions.
+
+The Markov models of E5 build their rate matrix by hand on every call of
+the right hand side: a new dense np.zeros((n, n)), the transitions written
+in entry by entry, and the diagonal from a Python loop of column sums.
+A MarkovSpec declares the same model as data:
+
+* states, the names of the states, in the order of the state vector;
+* rates, named rate expressions in V and the parameter vector P, in the
+  order they are evaluated, so a rate may use the rates before it;
+* transitions, (source, target, expression) for every transition, the
+  expression a rate name or any expression of the rates, V and P.
+
+Expressions are NumPy source with exp, log, sqrt, abs, minimum, maximum,
+where and pi available. MarkovModel compiles a spec once: the expressions
+become one generated function that evaluates all transition rates for whole
+arrays of voltages (and of parameter vectors) in one pass, and the
+transitions become index arrays, so that
+
+* matrix(V, P) fills A(V), dy/dt = A y with A[j, i] the rate from i to j,
+  for every voltage at once, into a preallocated array if given;
+* rhs(y, V, P) computes A y from the fluxes of the transitions, without
+  building A; with compiled=True, one state vector at one voltage (an ODE
+  solver step) goes through scalar code compiled with numba
+  (sscp_tools.nopython) when it is installed;
+* jacobian(V, P) is the Jacobian of rhs with respect to y (A itself) and
+  voltage_derivative(y, V, P) the derivative with respect to V, from the
+  analytic derivatives of the rate expressions (with sympy, made when
+  first needed), for models where V is itself a state;
+* reduced(V, P) is the system after the conservation law (the states
+  sum to 1) has removed one state: dx/dt = J x + b, with expand and
+  reduce to move between y and x, and steady_state solving J x = -b.
+
+Example:
+========
+from sscp_tools.markov_spec import MarkovSpec, MarkovModel
+
+spec = MarkovSpec(states=['C', 'O', 'I'],
+                  rates={'k_co': 'P[0]*exp(V/P[1])', 'k_oc': 'P[2]*exp(-V/P[1])'},
+                  transitions=[('C', 'O', 'k_co'), ('O', 'C', 'k_oc'), ('O', 'I', 'P[3]'), ('I', 'O', 'P[4]')])
+model = MarkovModel(spec, compiled=True)
+P = np.array([1.0, 20.0, 0.5, 0.1, 0.01])
+A = model.matrix(np.linspace(-100, 50, 151), P)   # (151, 3, 3)
+dy = model.rhs(np.full(3, 1/3), 0.0, P)
+y_inf = model.steady_state(-80.0, P)
+
+Run this module (python -m sscp_tools.markov_spec) to time the compiled
+IKur and INa models of E5 against the hand-written matrices.
+"""
+
+import ast
+from collections import namedtuple
+
+import math
+
+import numpy as np
+
+MarkovSpec = namedtuple('MarkovSpec', ['states', 'rates', 'transitions'])
+
+# The names expressions can use besides V, P and the rates
+NAMESPACE = dict(exp=np.exp, log=np.log, sqrt=np.sqrt, abs=np.abs, minimum=np.minimum,
+                 maximum=np.maximum, where=np.where, pi=np.pi)
+
+# The same names for one voltage and one parameter vector, with math
+SCALAR_NAMESPACE = dict(exp=math.exp, log=math.log, sqrt=math.sqrt, abs=abs, minimum=min, maximum=max,
+                        where=lambda condition, a, b: a if condition else b, pi=math.pi)
+
+
+def _generate(name, assignments, results):
+    """Source of a function name(V, P) that makes the assignments in turn
+    and returns the tuple of results."""
+    lines = ["def {}(V, P):".format(name)]
+    lines += ["    {} = {}".format(target, expression) for target, expression in assignments]
+    lines.append("    return ({},)".format(', '.join(results)))
+    return '\n'.join(lines) + '\n'
+
+
+class _Scalar(ast.NodeTransformer):
+    """Rewrite an expression for one voltage with math, which numba compiles:
+    exp(x) becomes math.exp(x), minimum min, where(c, a, b) a if c else b."""
+
+    MATH = {'exp', 'log', 'sqrt', 'pi'}
+    BUILTINS = {'minimum': 'min', 'maximum': 'max', 'abs': 'abs'}
+
+    def visit_Name(self, node):
+        if node.id in self.MATH:
+            return ast.copy_location(ast.Attribute(ast.Name('math', ast.Load()), node.id, ast.Load()), node)
+        if node.id in self.BUILTINS:
+            node.id = self.BUILTINS[node.id]
+        return node
+
+    def visit_Call(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id == 'where':
+            condition, a, b = node.args
+            return ast.copy_location(ast.IfExp(condition, a, b), node)
+        return node
+
+
+def _scalar(expression):
+    tree = _Scalar().visit(ast.parse(expression, mode='eval'))
+    return ast.unparse(ast.fix_missing_locations(tree))
+
+
+class MarkovModel():
+    """A MarkovSpec compiled for vectorized evaluation. The state removed
+    by the conservation law is eliminate (a name; the last state by
+    default). With compiled=True, rhs of one state vector at one voltage
+    runs compiled_rhs.
+
+    V is a number or an array, P a parameter vector or an array of them
+    (one per row); results have the shape P.shape[:-1] + V.shape followed
+    by the shape of the state vector or matrix.
+    """
+
+    def __init__(self, spec, eliminate=None, compiled=False):
+        self.spec = spec
+        self.states = tuple(spec.states)
+        self.n = n = len(self.states)
+        index = {state: i for i, state in enumerate(self.states)}
+        unknown = {s for source, target, _ in spec.transitions for s in (source, target)} - set(index)
+        if unknown:
+            raise ValueError("transitions between unknown states: {}".format(', '.join(sorted(unknown))))
+        pairs = [(index[source], index[target]) for source, target, _ in spec.transitions]
+        if len(set(pairs)) != len(pairs) or any(i == j for i, j in pairs):
+            raise ValueError("every transition must join two different states, once")
+        self.source = np.array([i for i, _ in pairs], dtype=np.intp)
+        self.target = np.array([j for _, j in pairs], dtype=np.intp)
+
+        # Flux of every transition onto the states: +1 at the target, -1 at the source
+        self.incidence = np.zeros((len(pairs), n))
+        self.incidence[np.arange(len(pairs)), self.target] += 1
+        self.incidence[np.arange(len(pairs)), self.source] -= 1
+        self.outflow = (self.incidence < 0).astype(float)
+
+        self.rate_names = tuple(spec.rates)
+        self.source_code = _generate('transition_rates', list(spec.rates.items()),
+                                     ['({})'.format(expression) for _, _, expression in spec.transitions])
+        code = compile(self.source_code, '<MarkovModel {}>'.format('-'.join(self.states)), 'exec')
+        namespace, scalar_namespace = dict(NAMESPACE), dict(SCALAR_NAMESPACE)
+        exec(code, namespace)
+        exec(code, scalar_namespace)
+        self._rates = namespace['transition_rates']
+        self._scalar_rates = scalar_namespace['transition_rates']
+        self._derivatives = None
+        self.compiled = compiled
+        self._compiled_rhs = None
+
+        self.eliminated = index[eliminate] if eliminate is not None else n - 1
+        self.kept = np.array([i for i in range(n) if i != self.eliminated], dtype=np.intp)
+
+    def __repr__(self):
+        return "MarkovModel({} states, {} transitions)".format(self.n, len(self.source))
+
+    #------------------------------------------------------------------------
+    # Evaluation
+
+    def _arguments(self, V, P):
+        """V and the parameters, shaped to broadcast to P.shape[:-1] + V.shape."""
+        V = np.asarray(V, dtype=float)
+        P = np.asarray(P, dtype=float)
+        P = np.moveaxis(P, -1, 0).reshape(P.shape[-1:] + P.shape[:-1] + (1,)*V.ndim)
+        return V, P, P.shape[1:len(P.shape) - V.ndim] + V.shape
+
+    def rates(self, V, P):
+        """The rates of all transitions, shape P.shape[:-1] + V.shape + (transitions,)."""
+        if np.ndim(V) == 0 and np.ndim(P) == 1:
+            # One voltage (a step of an ODE solver): math on floats is faster
+            try:
+                return np.array(self._scalar_rates(float(V), [float(p) for p in P]))
+            except (OverflowError, ZeroDivisionError, ValueError):
+                pass
+        V, P, shape = self._arguments(V, P)
+        with np.errstate(over='ignore'):
+            values = self._rates(V, P)
+        return np.stack([np.broadcast_to(value, shape) for value in values], axis=-1)
+
+    def matrix(self, V, P, out=None):
+        """A(V), shape P.shape[:-1] + V.shape + (n, n), written into out if given."""
+        k = self.rates(V, P)
+        if out is None:
+            out = np.zeros(k.shape[:-1] + (self.n, self.n))
+        else:
+            out[...] = 0.0
+        out[..., self.target, self.source] = k
+        # The diagonal: minus the total rate out of every state
+        diagonal = np.arange(self.n)
+        out[..., diagonal, diagonal] = -(k @ self.outflow)
+        return out
+
+    def rhs(self, y, V, P):
+        """dy/dt = A(V) y from the fluxes of the transitions."""
+        y = np.asarray(y, dtype=float)
+        if self.compiled and y.ndim == 1 and np.ndim(V) == 0 and np.ndim(P) == 1:
+            if self._compiled_rhs is None:
+                self._compiled_rhs = self.compiled_rhs() or False
+            if self._compiled_rhs:
+                return self._compiled_rhs(y, float(V), np.asarray(P, dtype=float))
+        return (self.rates(V, P)*y[..., self.source]) @ self.incidence
+
+    def compiled_rhs(self):
+        """rhs(y, V, P) for one state vector, one voltage and one parameter
+        vector as scalar code compiled with numba, or None without numba.
+        The machine code is cached on disk, so only the first session
+        compiles it."""
+        from sscp_tools.nopython import NUMBA, compile_sources
+        if not NUMBA:
+            return None
+        lines = ["def markov_rhs(y, V, P):"]
+        lines += ["    {} = {}".format(name, _scalar(expression)) for name, expression in self.spec.rates.items()]
+        lines += ["    _f{} = ({})*y[{}]".format(k, _scalar(expression), i)
+                  for k, ((_, _, expression), i) in enumerate(zip(self.spec.transitions, self.source))]
+        lines.append("    dy = np.zeros({})".format(self.n))
+        for k, (i, j) in enumerate(zip(self.source, self.target)):
+            lines.append("    dy[{}] -= _f{}".format(i, k))
+            lines.append("    dy[{}] += _f{}".format(j, k))
+        lines.append("    return dy")
+        return compile_sources('markov', ['\n'.join(lines)])['markov_rhs']
+
+    def jacobian(self, V, P):
+        """The Jacobian of rhs with respect to y, which is A(V)."""
+        return self.matrix(V, P)
+
+    def voltage_derivative(self, y, V, P):
+        """The derivative of rhs with respect to V, (dA/dV) y."""
+        if self._derivatives is None:
+            self._derivatives = self._compile_derivatives()
+        V_, P_, shape = self._arguments(V, P)
+        with np.errstate(over='ignore'):
+            dk = np.stack([np.broadcast_to(value, shape) for value in self._derivatives(V_, P_)], axis=-1)
+        return (dk*np.asarray(y, dtype=float)[..., self.source]) @ self.incidence
+
+    def _compile_derivatives(self):
+        """A function of (V, P) returning the derivatives of all transition
+        rates with respect to V, by the chain rule through the rates."""
+        import sympy
+        from sympy.printing.numpy import NumPyPrinter
+
+        V = sympy.Symbol('V')
+        names = dict(V=V, P=sympy.IndexedBase('P'))
+        names.update(exp=sympy.exp, log=sympy.log, sqrt=sympy.sqrt, abs=sympy.Abs, minimum=sympy.Min,
+                     maximum=sympy.Max, pi=sympy.pi)
+        printer = NumPyPrinter({'fully_qualified_modules': False, 'inline': True})
+
+        assignments = []
+        derivatives = {}        # rate symbol: symbol of its derivative
+        for name, expression in list(self.spec.rates.items()) + [
+                ('_k{}'.format(i), e) for i, (_, _, e) in enumerate(self.spec.transitions)]:
+            expr = sympy.sympify(expression, locals=names)
+            d = sympy.diff(expr, V) + sum((sympy.diff(expr, r)*dr for r, dr in derivatives.items()), sympy.S.Zero)
+            symbol = sympy.Symbol(name)
+            names[name] = symbol
+            assignments.append((name, printer.doprint(expr)))
+            assignments.append(('d_' + name, printer.doprint(d)))
+            derivatives[symbol] = sympy.Symbol('d_' + name)
+        results = ['d__k{}'.format(i) for i in range(len(self.spec.transitions))]
+        source = _generate('rate_derivatives', assignments, results)
+        namespace = dict(NAMESPACE, numpy=np)
+        exec(compile(source, '<MarkovModel derivatives>', 'exec'), namespace)
+        return namespace['rate_derivatives']
+
+    #------------------------------------------------------------------------
+    # Conservation law
+
+    def reduced(self, V, P):
+        """J and b of dx/dt = J x + b, x the states without the eliminated
+        one, which is 1 - sum(x)."""
+        A = self.matrix(V, P)
+        a = A[..., self.kept, self.eliminated]
+        J = A[..., self.kept[:, None], self.kept] - a[..., :, None]
+        return J, a
+
+    def reduce(self, y):
+        """The reduced state x of y."""
+        return np.asarray(y, dtype=float)[..., self.kept]
+
+    def expand(self, x):
+        """The full state y of a reduced state x."""
+        x = np.asarray(x, dtype=float)
+        y = np.empty(x.shape[:-1] + (self.n,))
+        y[..., self.kept] = x
+        y[..., self.eliminated] = 1 - x.sum(axis=-1)
+        return y
+
+    def steady_state(self, V, P):
+        """The steady state at the voltage V, from J x = -b. Raises
+        LinAlgError for models whose steady state is not unique (states
+        that cannot be reached from each other)."""
+        J, b = self.reduced(V, P)
+        return self.expand(np.linalg.solve(J, -b[..., None])[..., 0])
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+# The hand-written matrices of the IKur model (ObFunc.py) and the INa model
+# (Old/E6.py) that the declarations replace, at the defaults of the widgets
+
+P_KUR = np.array([45, 20, 65, 50, 20, 15, 1.0, 0.023, 29, 15, 2e-5, 2e-5, 0.5])
+P_NA = np.zeros(31)
+P_NA[:27] = [3.802, 0.1027, 2.5, 17, 15, 12, 0.2, 0.23, 0.25, 0.1917, 20.3, 0.2, 2.5, 0.22, 7.5,
+             0.188495, 16.6, 0.393956, 7e-07, 7.2, 0.0084/1.9, 2e-05, 100, 8.9554e-07, 11.3944,
+             4.8696e-05, 23.2696]
+P_NA[28:] = [2.868e-04, 35.9898, 7]
+
+
+def _dense(n, entries):
+    A = np.zeros((n, n))
+    for (j, i), rate in entries.items():
+        A[j, i] = rate
+    for i in range(n):
+        A[i, i] = -math.fsum(A[:, i])
+    return A
+
+
+def hand_kur(V, P=P_KUR):
+    # O, I, C4, C3, C2, C1 = 0..5, B = 6
+    alpha = math.exp((V-P[0])/P[1])
+    beta = math.exp((V-P[2])/P[3])*math.exp(-(V+P[4])/P[5])/(P[6]+P[7]*math.exp(-(V+P[8])/P[9]))
+    return _dense(7, {(5, 4): beta, (4, 5): 4*alpha, (4, 3): 2*beta, (3, 4): 3*alpha, (3, 2): 3*beta,
+                     (2, 3): 2*alpha, (0, 2): alpha, (2, 0): 4*beta, (0, 1): P[10], (1, 0): P[11]})
+
+
+def hand_na(V, P=P_NA):
+    # O, IF, IM1, IM2, C3, C2, C1, IC3, IC2 = 0..8
+    alpha1 = P[0]/(P[1]*math.exp(-(V+P[2])/P[3]) + P[6]*math.exp(-(V+P[2])/150))
+    alpha2 = P[0]/(P[1]*math.exp(-(V+P[2])/P[4]) + P[7]*math.exp(-(V+P[2])/150))
+    alpha3 = P[0]/(P[1]*math.exp(-(V+P[2])/P[5]) + P[8]*math.exp(-(V+P[2])/150))
+    beta1 = P[9]*math.exp(-(V+P[2])/P[10])
+    beta2 = P[11]*math.exp(-(V-P[12])/P[10])
+    beta3 = P[13]*math.exp(-(V-P[14])/P[10])
+    alpha4 = 1/(P[15]*math.exp(-(V+7)/P[16])+P[17])
+    alpha5 = P[18]*math.exp(-(V+7)/P[19])
+    beta5 = P[20] + P[21]*(V+7)
+    beta4 = (alpha3*alpha4*alpha5)/(beta3*beta5)
+    alpha6 = alpha4/P[22]
+    beta6 = P[23]*math.exp(-V/P[24])
+    alpha7 = P[25]*math.exp(V/P[26])
+    beta7 = P[28]*math.exp(-V/P[29])
+    return _dense(9, {(4, 5): beta1, (5, 4): alpha1, (5, 6): beta2, (6, 5): alpha2, (6, 0): beta3,
+                     (0, 6): alpha3, (0, 1): beta4, (1, 0): alpha4, (1, 6): beta5, (6, 1): alpha5,
+                     (8, 5): beta5, (5, 8): alpha5, (7, 4): beta5, (4, 7): alpha5, (1, 2): beta6,
+                     (2, 1): alpha6, (2, 3): beta7, (3, 2): alpha7})
+
+
+def benchmark(repeat=500):
+    """Time the rate matrices and right hand sides of the IKur model
+    (ObFunc.py) and the INa model (Old/E6.py) against the hand-written
+    ones they replace, and check that they agree."""
+    import os
+    import sys
+    import timeit
+    from time import perf_counter
+
+    # The models are defined in E5 and E5/Old
+    E5 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'L05 (Building Ion Channel Models)', 'E5')
+    sys.path += [E5, os.path.join(E5, 'Old')]
+    import ObFunc
+    import E6
+
+    V = np.linspace(-100, 60, 161)
+    for name, model, hand, P in (('IKur', ObFunc.IKUR, hand_kur, P_KUR), ('INa', E6.NA_MARKOV, hand_na, P_NA)):
+        start = perf_counter()
+        reference = np.array([hand(v) for v in V])
+        loop = perf_counter() - start
+        start = perf_counter()
+        A = model.matrix(V, P)
+        compiled = perf_counter() - start
+        print("{}: {} matrices, hand-written {:.2f} ms, compiled {:.3f} ms, largest relative difference {:.1e}".format(
+            name, len(V), loop*1e3, compiled*1e3, (np.abs(A - reference)/np.abs(reference).max()).max()))
+
+        y = np.full(model.n, 1/model.n)
+        loop = min(timeit.repeat(lambda: hand(-20.0).dot(y), number=repeat, repeat=5))
+        compiled = min(timeit.repeat(lambda: model.rhs(y, -20.0, P), number=repeat, repeat=5))
+        print("{}: one right hand side, hand-written {:.1f} us, compiled {:.1f} us".format(
+            name, loop/repeat*1e6, compiled/repeat*1e6))
+
+        h = 1e-4
+        numerical = (model.rhs(y, -20.0 + h, P) - model.rhs(y, -20.0 - h, P))/(2*h)
+        print("{}: (dA/dV) y, largest difference from central differences {:.1e}".format(
+            name, np.abs(model.voltage_derivative(y, -20.0, P) - numerical).max()))
+
+    y_inf = E6.NA_MARKOV.steady_state(-90.0, P_NA)
+    print("INa steady state at -90 mV: sum {:.15f}, largest |A y| {:.1e}".format(
+        y_inf.sum(), np.abs(E6.NA_MARKOV.rhs(y_inf, -90.0, P_NA)).max()))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,161 @@
+"""
+Optional numba compilation of model right hand sides.
+
+numba compiles plain scalar Python (loops, math functions, NumPy arrays)
+to machine code, which makes a model right hand side one to two orders of
+magnitude cheaper per call. numba is optional: without it, or with the
+environment variable NO_NUMBA set, jit returns the Python function
+unchanged, so everything built on it keeps working, only slower.
+
+jit compiles functions that are already written for numba. Right hand
+sides that look up their parameters on an object (self.g_Na, model.Cm) or
+import modules inside the function are first rewritten by nopython_source,
+which replaces the attribute lookups by entries of a parameter vector, and
+compiled from a generated module by compile_sources.
+
+Compiled code is cached on disk (cache=True, the default), so a new
+Python session or notebook kernel loads the machine code instead of
+compiling it again. numba keeps the cache of a jit function next to its
+source in __pycache__; the generated modules of compile_sources and their
+cache go to the nopython folder of sscp_tools.cache_dir(). Loading still
+takes a moment on the first call, which a model module can take up front
+by calling its compiled functions once (GBV_compiled.warm_up does).
+
+Example:
+========
+from sscp_tools.nopython import jit, nopython_source, compile_sources
+
+@jit
+def decay(y, k):
+    return -k*y
+
+source = nopython_source(model.currents, {'self': model.parameter_names}, 'currents')
+currents = compile_sources('my_model', [source])['currents']
+"""
+
+import os
+import re
+import sys
+import ast
+import inspect
+import textwrap
+import hashlib
+import importlib.util
+
+import sscp_tools
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA = numba is not None and not os.environ.get('NO_NUMBA')
+prange = numba.prange if NUMBA else range
+
+GENERATED_DIR = sscp_tools.cache_dir('nopython')
+
+
+def jit(function=None, cache=True, parallel=False, **options):
+    """numba.njit with an on-disk cache, or the function itself without numba.
+
+    Works as @jit, @jit(parallel=True) or jit(function).
+    """
+    def decorate(function):
+        if not NUMBA:
+            return function
+        return numba.njit(cache=cache, parallel=parallel, **options)(function)
+    return decorate if function is None else decorate(function)
+
+
+#----------------------------------------------------------------------------
+# Rewriting Python right hand sides
+
+class _Rewrite(ast.NodeTransformer):
+    """Replace obj.name by p[index] and obj itself by p, and drop imports and
+    the docstring."""
+
+    def __init__(self, attributes):
+        self.index = {obj: {key: i for i, key in enumerate(names)} for obj, names in attributes.items()}
+
+    def visit_FunctionDef(self, node):
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+            body = body[1:]
+        node.body = body or [ast.Pass()]
+        for arg in node.args.args:
+            if arg.arg in self.index:
+                arg.arg = 'p'
+        return self.generic_visit(node)
+
+    def visit_Import(self, node):
+        return None
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Attribute(self, node):
+        if isinstance(node.value, ast.Name) and node.value.id in self.index:
+            index = self.index[node.value.id]
+            if node.attr not in index:
+                raise ValueError("{}.{} is not a parameter".format(node.value.id, node.attr))
+            return ast.copy_location(ast.Subscript(ast.Name('p', ast.Load()), ast.Constant(index[node.attr]),
+                                                   node.ctx), node)
+        return self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id in self.index:
+            node.id = 'p'
+        return node
+
+
+def nopython_source(function, attributes=None, name=None, substitutions=()):
+    """Source of function rewritten for numba.
+
+    Import statements inside the function are removed (math and np are
+    available in the generated module), and so is the docstring.
+    attributes maps an object name to the parameter names looked up on it,
+    e.g. {'self': names}; every self.<name> becomes p[<index of name>], and
+    self itself, as an argument or passed on, is renamed p. substitutions are (old, new) string
+    replacements applied to the source first, for the constructs that need
+    more than that (extra keyword arguments, calls of other methods). name
+    renames the function.
+    """
+    source = textwrap.dedent(inspect.getsource(function))
+    for old, new in substitutions:
+        if old not in source:
+            raise ValueError("{!r} does not occur in {}".format(old, function.__name__))
+        source = source.replace(old, new)
+    tree = _Rewrite(attributes or {}).visit(ast.parse(source))
+    if name is not None:
+        tree.body[0].name = name
+    return ast.unparse(ast.fix_missing_locations(tree))
+
+
+def compile_sources(module_name, sources, cache=True):
+    """Write the function sources to a generated module, compile each
+    function with jit and return them as a dictionary by name.
+
+    The functions may call each other. The module is only rewritten when
+    its contents change, which keeps the numba cache of the previous
+    session valid.
+    """
+    decorator = '@jit(cache={})\n'.format(cache)
+    code = '\n\n\n'.join(['# Generated by nopython.compile_sources, do not edit\n'
+                          'import math\nimport numpy as np\nfrom sscp_tools.nopython import jit']
+                         + [decorator + source for source in sources]) + '\n'
+    digest = hashlib.sha1(code.encode()).hexdigest()[:12]
+    filename = os.path.join(GENERATED_DIR, '{}_{}.py'.format(module_name, digest))
+    if not os.path.exists(filename):
+        os.makedirs(GENERATED_DIR, exist_ok=True)
+        with open(filename + '.tmp', 'w') as outfile:
+            outfile.write(code)
+        os.replace(filename + '.tmp', filename)
+
+    name = 'nopython_{}_{}'.format(module_name, digest)
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, filename)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[name] = module
+    module = sys.modules[name]
+    functions = [re.match(r'def (\w+)\(', source).group(1) for source in sources]
+    return {function: getattr(module, function) for function in functions}
@@ -0,0 +1,217 @@
+"""
+Cached vector fields and nullclines of two-dimensional ODEs.
+
+A phase-plane widget evaluates the right hand side on a grid and finds the
+nullclines, the zero levels of its two components, on every slider event,
+although most events change only a parameter that enters one of the
+components, or move the plotted window a little. PhasePlane keeps the two
+components apart, each with its own parameters:
+
+    dx/dt = fx(x, y, *px),    dy/dt = fy(x, y, *py),
+
+and evaluates them on a fixed lattice of points (i*hx, j*hy), in square
+tiles of tile x tile points that are cached per component, parameter tuple
+and tile. Every tile is one vectorized call of fx or fy. A window is put
+together from the tiles that cover it, so moving a parameter of fy leaves
+all of fx in the cache, and panning the window only evaluates the tiles
+that come into view.
+
+The nullclines are the zero-level contour lines of the component on the
+grid (contourpy, which matplotlib uses for contour), and every vertex is
+then moved onto the curve by a Newton step along the gradient, so a coarse
+lattice gives nullclines that are accurate to far below its spacing.
+Contour lines are cached like the tiles.
+
+Example:
+========
+from sscp_tools.phase_plane import PhasePlane
+
+# Morris-Lecar, with the parameters of u and of w given separately
+plane = PhasePlane(lambda u, w, I, gca, gk: dudt(u, w, gca, gk, gl, Eca, Ek, El, I, C, u1, u2),
+                   lambda u, w, tau_w: dwdt(u, w, tau_w, u3, u4),
+                   spacing=(0.5, 0.005))
+window = (-80, 60), (-0.1, 1.1)
+for line in plane.nullclines(0, (I, gca, gk), *window):
+    plt.plot(*line.T, 'r--')
+x, y, U, V = plane.field((I, gca, gk), (tau_w,), *window, every=10)
+plt.quiver(x, y, U, V)
+"""
+
+import functools
+import math
+from collections import namedtuple
+
+import numpy as np
+import contourpy
+
+Field = namedtuple('Field', ['x', 'y', 'U', 'V'])
+
+
+class PhasePlane():
+    """The vector field (fx, fy) of a two-dimensional ODE on the lattice
+    with the given spacing (hx, hy), cached in tiles. fx and fy take grids
+    of x and y followed by their own parameters and return an array of the
+    shape of the grids. Parameter tuples must be hashable.
+
+    maxsize is the number of tiles (and of contour sets) kept per
+    component; a tile takes 8*tile**2 bytes.
+    """
+
+    def __init__(self, fx, fy, spacing, tile=64, maxsize=512):
+        self.components = (fx, fy)
+        self.spacing = tuple(float(h) for h in np.broadcast_to(spacing, (2,)))
+        self.tile = int(tile)
+        self.evaluations = [0, 0]
+        self._tile = functools.lru_cache(maxsize=maxsize)(self._evaluate_tile)
+        self._lines = functools.lru_cache(maxsize=maxsize)(self._contour)
+
+    def __repr__(self):
+        return "PhasePlane(spacing={}, tile={})".format(self.spacing, self.tile)
+
+    def clear(self):
+        """Empty the caches."""
+        self._tile.cache_clear()
+        self._lines.cache_clear()
+
+    #------------------------------------------------------------------------
+    # Grid values
+
+    def _evaluate_tile(self, k, params, a, b):
+        """Component k on tile (a, b), the lattice points a*tile..(a+1)*tile - 1
+        along x and b*tile..(b+1)*tile - 1 along y, shape (tile, tile)."""
+        hx, hy = self.spacing
+        offsets = np.arange(self.tile)
+        X, Y = np.meshgrid((a*self.tile + offsets)*hx, (b*self.tile + offsets)*hy)
+        self.evaluations[k] += 1
+        with np.errstate(all='ignore'):
+            values = np.asarray(self.components[k](X, Y, *params), dtype=float)
+        return np.broadcast_to(values, X.shape)
+
+    def _indices(self, x_range, y_range):
+        """First and last lattice index covering the window along each axis."""
+        hx, hy = self.spacing
+        return (math.floor(x_range[0]/hx), math.ceil(x_range[1]/hx),
+                math.floor(y_range[0]/hy), math.ceil(y_range[1]/hy))
+
+    def grid(self, x_range, y_range):
+        """Lattice coordinates x and y covering the window."""
+        i0, i1, j0, j1 = self._indices(x_range, y_range)
+        return np.arange(i0, i1 + 1)*self.spacing[0], np.arange(j0, j1 + 1)*self.spacing[1]
+
+    def values(self, k, params, x_range, y_range):
+        """Component k (0 for fx, 1 for fy) on the lattice points covering
+        the window, shape (len(y), len(x)) of grid."""
+        i0, i1, j0, j1 = self._indices(x_range, y_range)
+        T = self.tile
+        out = np.empty((j1 - j0 + 1, i1 - i0 + 1))
+        for a in range(i0//T, i1//T + 1):
+            for b in range(j0//T, j1//T + 1):
+                values = self._tile(k, tuple(params), a, b)
+                # The part of the tile inside the window
+                ia, ib = max(i0, a*T), min(i1, (a + 1)*T - 1)
+                ja, jb = max(j0, b*T), min(j1, (b + 1)*T - 1)
+                out[ja - j0:jb - j0 + 1, ia - i0:ib - i0 + 1] = values[ja - b*T:jb - b*T + 1, ia - a*T:ib - a*T + 1]
+        return out
+
+    def field(self, px, py, x_range, y_range, every=1):
+        """Field(x, y, U, V) of the vector field on the window, every every'th
+        lattice point along each axis (for quiver and streamplot)."""
+        x, y = self.grid(x_range, y_range)
+        U = self.values(0, px, x_range, y_range)
+        V = self.values(1, py, x_range, y_range)
+        return Field(x[::every], y[::every], U[::every, ::every], V[::every, ::every])
+
+    #------------------------------------------------------------------------
+    # Nullclines
+
+    def _contour(self, k, params, window, polish):
+        x_range, y_range = window
+        x, y = self.grid(x_range, y_range)
+        Z = self.values(k, params, x_range, y_range)
+        lines = contourpy.contour_generator(x, y, np.ma.masked_invalid(Z)).lines(0.0)
+        if polish:
+            lines = [self._polish(k, params, line) for line in lines]
+        return tuple(lines)
+
+    def _polish(self, k, params, line, steps=2):
+        """Newton steps along the gradient that move the vertices of a
+        contour line onto the zero level of component k, where the step is
+        shorter than a lattice spacing."""
+        f = self.components[k]
+        hx, hy = self.spacing
+        x, y = line[:, 0].copy(), line[:, 1].copy()
+        with np.errstate(all='ignore'):
+            for _ in range(steps):
+                F = np.broadcast_to(f(x, y, *params), x.shape)
+                Fx = (np.broadcast_to(f(x + 1e-4*hx, y, *params), x.shape) - F)/(1e-4*hx)
+                Fy = (np.broadcast_to(f(x, y + 1e-4*hy, *params), x.shape) - F)/(1e-4*hy)
+                # The step in lattice units, so that both axes count the same
+                gx, gy = Fx*hx, Fy*hy
+                scale = F/(gx**2 + gy**2)
+                sx, sy = -scale*gx, -scale*gy
+                ok = np.isfinite(sx) & np.isfinite(sy) & (sx**2 + sy**2 < 1)
+                x = np.where(ok, x + sx*hx, x)
+                y = np.where(ok, y + sy*hy, y)
+        return np.column_stack([x, y])
+
+    def nullclines(self, k, params, x_range, y_range, polish=True):
+        """The nullcline of component k (0: dx/dt = 0, 1: dy/dt = 0) in the
+        window, as a tuple of (n, 2) arrays of vertices, one per line."""
+        window = (tuple(map(float, x_range)), tuple(map(float, y_range)))
+        return self._lines(k, tuple(params), window, polish)
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def benchmark(n_events=50, seed=0):
+    """Slider events on the reduced AP model of L4 (one of Vam, Vbm, Vah and
+    Vbh moves at a time), with the field and both nullclines recomputed from
+    scratch and from the cache, and the accuracy of the nullclines."""
+    from time import perf_counter
+
+    g_Na, g_K, E_Na, E_K, C_m, d = 0.8, 0.1, 50.0, -80.0, 0.05, 15.0
+
+    def dV(V, h, Vam, Vbm):
+        m = 1/(1 + np.exp(-(V - Vam)/d - (V - Vbm)/d))
+        return (-g_Na*h*m*(V - E_Na) - g_K*(V - E_K))/C_m
+
+    def dh(V, h, Vah, Vbh):
+        return np.exp(-(V - Vah)/5)*(1 - h) - h*np.exp((V - Vbh)/5)
+
+    window = (E_K - 1, E_Na + 1), (-0.2, 1.2)
+    rng = np.random.default_rng(seed)
+    params = np.array([-60.0, -10.0, -80.0, -20.0])
+    events = []
+    for _ in range(n_events):
+        params[rng.integers(4)] += rng.choice([-1.0, 1.0])
+        events.append(tuple(params))
+
+    def run(plane, clear):
+        start = perf_counter()
+        for Vam, Vbm, Vah, Vbh in events:
+            if clear:
+                plane.clear()
+            plane.field((Vam, Vbm), (Vah, Vbh), *window)
+            plane.nullclines(0, (Vam, Vbm), *window)
+            plane.nullclines(1, (Vah, Vbh), *window)
+        return (perf_counter() - start)/n_events
+
+    plane = PhasePlane(dV, dh, spacing=(0.5, 0.005))
+    scratch = run(plane, clear=True)
+    plane = PhasePlane(dV, dh, spacing=(0.5, 0.005))
+    cached = run(plane, clear=False)
+    print("{} slider events: {:.2f} ms per event from scratch, {:.2f} ms cached, {} tile evaluations".format(
+        n_events, scratch*1e3, cached*1e3, sum(plane.evaluations)))
+
+    # Distance of the h-nullcline from the exact h_inf, in units of h
+    Vam, Vbm, Vah, Vbh = events[-1]
+    for polish in (False, True):
+        line = np.concatenate(plane.nullclines(1, (Vah, Vbh), *window, polish=polish))
+        exact = 1/(1 + np.exp((line[:, 0] - Vbh)/5 + (line[:, 0] - Vah)/5))
+        print("h-nullcline, {}: largest error {:.1e}".format('polished' if polish else 'contour only',
+                                                               np.abs(line[:, 1] - exact).max()))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,379 @@
+"""
+Stochastic simulation of an ensemble of independent ion channels.
+
+stochastic_L4.ipynb advances N channels of a Markov model one channel and
+one time step at a time with advance(state, A, dt): with probability
+A[j, state]*dt the channel jumps to state j, otherwise it stays. This
+module runs the same scheme for the whole ensemble at once, in two ways:
+
+* simulate_channels keeps the state of every channel in one integer array.
+  The cumulative jump probabilities of every source state are tabulated
+  once (transition_table), every step draws one random number per channel,
+  picks the channels whose number falls below their total jump probability
+  and moves only those, to the first state whose cumulative probability
+  exceeds the number, as advance does. The models have a handful of
+  states, so comparing against the row of the table is a searchsorted
+  without the per-call overhead. It costs one random number per channel
+  and step and records N states per sample, so it suits the notebook sizes
+  (thousands of channels), not 10^6 channels over 10^4 steps: records
+  larger than MAX_RECORD_BYTES are refused.
+* simulate_counts only keeps the number of channels in each state. The
+  channels are independent and identical, so the channels leaving each
+  state in a step are multinomially distributed over the targets, and one
+  multinomial draw per state advances all of them. The cost per step does
+  not depend on N, so 10^6 channels over 10^4 steps take a fraction of a
+  second. Only simulate_counts handles ensembles of that size. The
+  occupancies have the same distribution as those of simulate_channels,
+  but single channel records are not available.
+
+gillespie and tau_leap work on the counts as well, for many independent
+trials at once, and return the counts at given sample times (histograms
+turns them into occupancy histograms). gillespie is the exact stochastic
+simulation algorithm, one event per step, so its cost grows with N.
+tau_leap moves the channels of each state from one sample time to the next
+with one multinomial draw, with the probabilities of expm(A h): that is
+exact at the sample times whatever N and the interval, as the channels are
+independent. With a dt it takes first-order steps like advance instead.
+
+The generator A follows the notebook (A[j, i] is the rate from state i to
+state j, columns sum to zero, dy/dt = A y). For voltage-dependent models A
+is a function of V and V gives the membrane potential of every step; the
+transition tables are made once per distinct voltage, so a voltage-clamp
+protocol with a few levels costs a few tables.
+
+Example:
+========
+from sscp_tools.stochastic_channels import simulate_channels, simulate_counts, tau_leap, histograms
+
+A = transition_matrix(k_co=5, k_oc=10, k_oi=1, k_io=0)
+dt = 0.01
+S = simulate_channels(A, dt, n_steps=200, N=1000)       # (201, 1000) states
+p_open = np.mean(S == 1, axis=1)
+
+counts = simulate_counts(A, dt, n_steps=10000, N=10**6)  # (10001, 3)
+p_open = counts[:, 1]/10**6
+
+# A voltage step from -80 to 0 mV after 10 ms
+V = np.where(np.arange(2000)*dt < 10, -80.0, 0.0)
+counts = simulate_counts(lambda V: rate_matrix(V), dt, 2000, 10**5, V=V)
+
+# 1000 trials of 100 IKur channels of E5 at 0 mV (rate_matrix of ObFunc.py)
+t = np.linspace(0, 500, 51)
+counts = tau_leap(rate_matrix(np.array(P + [0.0])), 100, t, trials=1000)
+edges, trials_per_bin = histograms(counts, 100)
+
+Run this file as a script to time the engines against the loop of the notebook.
+"""
+
+import numpy as np
+
+# Largest record simulate_channels allocates, in bytes
+MAX_RECORD_BYTES = 2**30
+
+
+#----------------------------------------------------------------------------
+# Transition tables
+
+def transition_table(A, dt):
+    """Cumulative jump probabilities of one step of length dt, shape (n, n):
+    row i holds the cumulative sum over the targets j of A[j, i]*dt, with
+    the term of i itself left out, so the last column is the probability
+    of leaving state i."""
+    A = np.asarray(A, dtype=float)
+    P = A.T*dt
+    np.fill_diagonal(P, 0.0)
+    if (P < 0).any():
+        raise ValueError("the off-diagonal rates must be non-negative")
+    table = np.cumsum(P, axis=1)
+    if (table[:, -1] > 1).any():
+        raise ValueError("dt is too long: the probability of leaving a state "
+                         "in one step exceeds one ({:.3g})".format(table[:, -1].max()))
+    return table
+
+
+def _tables(A, dt, n_steps, V):
+    """Transition tables (k, n, n) and the index of the table of every
+    step, for a constant A or a function A(V) of the voltages of V."""
+    if not callable(A):
+        return transition_table(A, dt)[None], np.zeros(n_steps, dtype=np.intp)
+    if V is None:
+        raise ValueError("a voltage-dependent generator needs the voltages V of the steps")
+    V = np.broadcast_to(np.asarray(V, dtype=float), (n_steps,))
+    levels, index = np.unique(V, return_inverse=True)
+    return np.array([transition_table(A(v), dt) for v in levels]), index
+
+
+def _initial_counts(state0, n, N):
+    """Number of channels in each state, from a state for all of them or
+    an occupancy vector (counts or probabilities)."""
+    if np.ndim(state0) == 0:
+        counts = np.zeros(n, dtype=np.int64)
+        counts[int(state0)] = N
+        return counts
+    occupancy = np.asarray(state0, dtype=float)
+    counts = np.floor(occupancy/occupancy.sum()*N).astype(np.int64)
+    counts[np.argmax(occupancy)] += N - counts.sum()
+    return counts
+
+
+#----------------------------------------------------------------------------
+# Engines
+
+def simulate_channels(A, dt, n_steps, N, state0=0, V=None, seed=None, every=1):
+    """States of N channels over n_steps steps of length dt, as an
+    (n_steps//every + 1, N) array recorded every every steps.
+
+    state0 is the initial state of every channel, or an occupancy vector
+    that the channels are distributed over. A is a generator or a function
+    of V, the voltage of each step. seed seeds NumPy's default generator.
+
+    The record takes (n_steps//every + 1)*N bytes or more; a ValueError is
+    raised when that exceeds MAX_RECORD_BYTES, so record less often (every)
+    or use simulate_counts, which is the engine for large ensembles.
+    """
+    rng = np.random.default_rng(seed)
+    tables, index = _tables(A, dt, n_steps, V)
+    n = tables.shape[1]
+    dtype = np.int8 if n < 128 else np.int32
+    size = (n_steps//every + 1)*N*np.dtype(dtype).itemsize
+    if size > MAX_RECORD_BYTES:
+        raise ValueError("the record of {} channels over {} steps takes {:.1f} GB; record every more steps "
+                         "or use simulate_counts".format(N, n_steps, size/1e9))
+    states = np.repeat(np.arange(n, dtype=dtype), _initial_counts(state0, n, N))
+    if np.ndim(state0):
+        rng.shuffle(states)
+
+    record = np.empty((n_steps//every + 1, N), dtype=dtype)
+    record[0] = states
+    r = np.empty(N)
+    for step in range(n_steps):
+        table = tables[index[step]]
+        rng.random(out=r)
+        moving = np.flatnonzero(r < table[states, -1])
+        if moving.size:
+            s, u = states[moving], r[moving]
+            states[moving] = (u[:, None] >= table[s]).sum(axis=1)
+        if (step + 1) % every == 0:
+            record[(step + 1)//every] = states
+    return record
+
+
+def simulate_counts(A, dt, n_steps, N, state0=0, V=None, seed=None, every=1):
+    """Number of channels in each state, of N channels over n_steps steps
+    of length dt, as an (n_steps//every + 1, n) array. Arguments as for
+    simulate_channels."""
+    rng = np.random.default_rng(seed)
+    tables, index = _tables(A, dt, n_steps, V)
+    n = tables.shape[1]
+    # Row i: the probability of jumping from i to each state, staying included
+    jumps = np.diff(tables, axis=2, prepend=0.0)
+    jumps[:, np.arange(n), np.arange(n)] = 1 - tables[:, :, -1]
+    jumps = np.clip(jumps, 0.0, 1.0)
+
+    counts = _initial_counts(state0, n, N)
+    record = np.empty((n_steps//every + 1, n), dtype=np.int64)
+    record[0] = counts
+    for step in range(n_steps):
+        counts = rng.multinomial(counts, jumps[index[step]]).sum(axis=0)
+        if (step + 1) % every == 0:
+            record[(step + 1)//every] = counts
+    return record
+
+
+#----------------------------------------------------------------------------
+# Population engines, many trials at once
+
+def _trial_counts(state0, n, N, trials):
+    """Initial counts of every trial, (trials, n): from state0 as for
+    _initial_counts, or the counts (trials, n) that a previous run ended
+    with, to continue a protocol with another A."""
+    if np.ndim(state0) == 2:
+        counts = np.array(state0, dtype=np.int64)
+        if counts.shape != (trials, n) or (counts.sum(axis=1) != N).any():
+            raise ValueError("state0 must hold N channels in each of the {} trials".format(trials))
+        return counts
+    return np.tile(_initial_counts(state0, n, N), (trials, 1))
+
+
+def gillespie(A, N, t, trials=1, state0=0, seed=None):
+    """Exact stochastic simulation (Gillespie's direct method) of the number
+    of channels in each state, for N channels with the generator A.
+
+    Returns the counts at the sample times t, shape (trials, len(t), n).
+    All trials take their next event together, so the number of steps is
+    the largest number of events of any trial, which grows with N; use
+    tau_leap for large N.
+    """
+    rng = np.random.default_rng(seed)
+    A = np.asarray(A, dtype=float)
+    n = len(A)
+    t = np.asarray(t, dtype=float)
+    rates = A.T.copy()                      # rates[i, j]: from i to j
+    np.fill_diagonal(rates, 0.0)
+    source = np.repeat(np.arange(n), n)     # of the reactions, flattened
+    target = np.tile(np.arange(n), n)
+
+    counts = _trial_counts(state0, n, N, trials)
+    out = np.empty((trials, len(t), n), dtype=np.int64)
+    time = np.full(trials, t[0])
+    recorded = np.zeros(trials, dtype=np.intp)   # samples recorded per trial
+    active = np.arange(trials)
+    while active.size:
+        c = counts[active]
+        propensity = (c[:, :, None]*rates).reshape(len(active), n*n)
+        cumulative = np.cumsum(propensity, axis=1)
+        total = cumulative[:, -1]
+        with np.errstate(divide='ignore'):
+            time_next = time[active] + rng.exponential(size=len(active))/total
+        # Samples before the next event see the present counts
+        reached = np.searchsorted(t, time_next, side='right')
+        for k in np.flatnonzero(reached > recorded[active]):
+            trial = active[k]
+            out[trial, recorded[trial]:reached[k]] = c[k]
+            recorded[trial] = reached[k]
+        going = recorded[active] < len(t)
+        active, c, cumulative, total = active[going], c[going], cumulative[going], total[going]
+        time[active] = time_next[going]
+        reaction = (cumulative < (rng.random(len(active))*total)[:, None]).sum(axis=1)
+        np.add.at(counts, (active, source[reaction]), -1)
+        np.add.at(counts, (active, target[reaction]), 1)
+    return out
+
+
+def _step_probabilities(A, h, exact):
+    """Probability that a channel in state i is in state j after a step h,
+    shape (n, n) indexed [i, j]: from the matrix exponential if exact, else
+    the first-order probabilities of advance."""
+    if exact:
+        from scipy.linalg import expm
+        P = expm(A*h).T
+    else:
+        table = transition_table(A, h)
+        P = np.diff(table, axis=1, prepend=0.0)
+        P[np.diag_indices_from(P)] = 1 - table[:, -1]
+    P = np.clip(P, 0.0, None)
+    return P/P.sum(axis=1, keepdims=True)
+
+
+def tau_leap(A, N, t, trials=1, state0=0, dt=None, seed=None):
+    """Number of channels in each state for N channels with the generator
+    A, leaping from sample to sample with binomial (multinomial) draws.
+
+    Returns the counts at the sample times t, shape (trials, len(t), n).
+    The channels are independent, so those in state i at one time are
+    distributed over the states a time h later by a multinomial draw with
+    the probabilities of column i of expm(A h). With dt=None every sample
+    interval is one such draw, which is exact for any interval length;
+    with a dt the intervals are divided into steps of at most dt with the
+    first-order probabilities A*dt of advance, as in the notebook. Either
+    way the cost does not depend on N.
+    """
+    rng = np.random.default_rng(seed)
+    A = np.asarray(A, dtype=float)
+    n = len(A)
+    t = np.asarray(t, dtype=float)
+    counts = _trial_counts(state0, n, N, trials)
+    out = np.empty((trials, len(t), n), dtype=np.int64)
+    out[:, 0] = counts
+    probabilities = {}
+    for k, interval in enumerate(np.diff(t)):
+        steps = 1 if dt is None else max(1, int(np.ceil(interval/dt - 1e-9)))
+        h = interval/steps
+        key = round(h, 12)
+        if key not in probabilities:
+            probabilities[key] = _step_probabilities(A, h, dt is None)
+        for _ in range(steps):
+            counts = rng.multinomial(counts, probabilities[key]).sum(axis=1)
+        out[:, k + 1] = counts
+    return out
+
+
+def histograms(counts, N, bins=20):
+    """Histograms over the trials of the occupancy (fraction of N) of every
+    state at every sample time, for the counts of gillespie or tau_leap.
+    Returns the bin edges and the number of trials per bin, shape
+    (len(t), n, bins)."""
+    trials, n_times, n = counts.shape
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    index = np.minimum((counts/N*bins).astype(np.intp), bins - 1)
+    # One bincount over (time, state, bin)
+    flat = (np.arange(n_times)[:, None]*n + np.arange(n))*bins + index
+    histogram = np.bincount(flat.ravel(), minlength=n_times*n*bins)
+    return edges, histogram.reshape(n_times, n, bins)
+
+
+#----------------------------------------------------------------------------
+# Benchmark
+
+def _advance(state, A, dt):
+    """advance of stochastic_L4.ipynb."""
+    P = A[:, state]*dt
+    P[state] = 0
+    CP = np.cumsum(P)
+    random_number = np.random.rand()
+    for i in range(len(CP)):
+        if random_number < CP[i]:
+            return i
+    return state
+
+
+def benchmark():
+    """The loop of the notebook against the engines, and the occupancies
+    against the solution of dy/dt = A y."""
+    from time import perf_counter
+    from scipy.linalg import expm
+
+    k_co, k_oc, k_oi, k_io = 5, 10, 1, 0.5
+    A = np.array([[-k_co, k_oc, 0], [k_co, -k_oc - k_oi, k_io], [0, k_oi, -k_io]], dtype=float)
+    dt, n_steps = 0.01, 200
+
+    N = 1000
+    start = perf_counter()
+    S = np.zeros((n_steps + 1, N), 'i')
+    for n in range(N):
+        for i in range(n_steps):
+            S[i + 1, n] = _advance(S[i, n], A, dt)
+    loop = perf_counter() - start
+    start = perf_counter()
+    simulate_channels(A, dt, n_steps, N, seed=1)
+    vectorized = perf_counter() - start
+    print("N = {}, {} steps: loop {:.2f} s, simulate_channels {:.4f} s ({:.0f}x)".format(
+        N, n_steps, loop, vectorized, loop/vectorized))
+
+    exact = np.array([expm(A*dt*k)[:, 0] for k in range(n_steps + 1)])
+    for N in (10**5, 10**6):
+        start = perf_counter()
+        S = simulate_channels(A, dt, n_steps, N, seed=1)
+        channels = perf_counter() - start
+        p = np.stack([np.mean(S == k, axis=1) for k in range(3)], axis=1)
+        start = perf_counter()
+        counts = simulate_counts(A, dt, n_steps, N, seed=1)
+        ensemble = perf_counter() - start
+        print("N = {:.0e}, {} steps: simulate_channels {:.2f} s (largest error {:.4f}), "
+              "simulate_counts {:.4f} s (largest error {:.4f})".format(
+                  N, n_steps, channels, np.abs(p - exact).max(), ensemble, np.abs(counts/N - exact).max()))
+
+    start = perf_counter()
+    counts = simulate_counts(A, dt, 10**4, 10**6, seed=1)
+    print("N = 1e6, 1e4 steps: simulate_counts {:.2f} s".format(perf_counter() - start))
+
+    # Many trials: mean and variance of the open count at the last sample
+    t = np.linspace(0, 2, 21)
+    p = expm(A*t[-1])[:, 0]
+    for N in (100, 1000, 10**6):
+        line = "N = {:.0e}, 1000 trials, expected open {:.1f} (variance {:.1f}):".format(
+            N, N*p[1], N*p[1]*(1 - p[1]))
+        engines = [('tau_leap', lambda: tau_leap(A, N, t, 1000, seed=1)),
+                   ('tau_leap dt={}'.format(dt), lambda: tau_leap(A, N, t, 1000, dt=dt, seed=1))]
+        if N <= 1000:
+            engines.insert(0, ('gillespie', lambda: gillespie(A, N, t, 1000, seed=1)))
+        for name, run in engines:
+            start = perf_counter()
+            open_count = run()[:, -1, 1]
+            line += " {} {:.3f} s ({:.1f}, {:.1f})".format(
+                name, perf_counter() - start, open_count.mean(), open_count.var())
+        print(line)
+
+
+if __name__ == '__main__':
+    benchmark()
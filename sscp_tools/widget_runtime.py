@@ -0,0 +1,186 @@
+"""
+Background computation for the interactive widgets.
+
+interact runs the whole simulation inside the slider callback, so the
+kernel is blocked while it runs, and every slider event that arrives in the
+meantime queues up another full simulation for values that are already
+stale. interact_async splits the widget function in two:
+
+* compute(**values) runs the simulation and returns its result. It runs in
+  a background thread (one per widget), so the kernel stays free to
+  receive slider events. It is only passed the values it takes as
+  arguments, and when those are the ones of the last result (a control
+  that only changes the figure moved), the last result is drawn again
+  without computing.
+* plot(result, **values) draws the result. It runs in the kernel's main
+  thread, in the output area of the widget, and only for the result of the
+  latest event; the figure of the previous result stays up until then.
+
+A new event supersedes the computation in flight: one that has not started
+is dropped, and one that is running is told to stop. Python cannot stop a
+thread from the outside, so the computation stops at its next call of
+check_cancelled, which raises Cancelled. Wrapping the right hand side given
+to odeint or solve_ivp with cancellable does that at every RHS call, and
+both integrators pass the exception on. scipy's ode class does not, so a
+loop of ode.integrate calls checks between the calls instead. A
+computation that never checks runs to the end and its result is dropped.
+
+Outside a running kernel (a script, or a test calling the widget directly)
+interact_async calls compute and plot in turn, like interact.
+
+Example:
+========
+from sscp_tools.widget_runtime import interact_async, cancellable
+
+def compute(a):
+    t = np.linspace(0, 1000, 1001)
+    return t, odeint(cancellable(rhs), y0, t, (a,))
+
+def plot(result, a):
+    t, y = result
+    plt.plot(t, y)
+    plt.show()
+
+interact_async(compute, plot, a=FloatSlider(value=1, min=0, max=10, continuous_update=False))
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from IPython.display import display, clear_output
+from ipywidgets import interactive, Label, VBox
+from ipywidgets.widgets.interaction import show_inline_matplotlib_plots
+
+
+class Cancelled(Exception):
+    """Raised in a computation that a newer event has superseded."""
+
+
+_local = threading.local()
+
+
+def check_cancelled():
+    """Raise Cancelled if the computation running in this thread has been
+    superseded. Does nothing outside interact_async."""
+    event = getattr(_local, 'cancelled', None)
+    if event is not None and event.is_set():
+        raise Cancelled()
+
+
+def cancellable(function):
+    """function with a check_cancelled before every call, for the right hand
+    side of an integrator: a superseded solve stops at its next RHS call."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        check_cancelled()
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def _running_loop():
+    """The event loop of the kernel, or None outside one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncInteractive(VBox):
+    """The controls of interactive(compute, **controls) with a status line,
+    computing in a background thread. See interact_async."""
+
+    def __init__(self, compute, plot, **controls):
+        self.compute = compute
+        self.plot = plot
+        self.generation = 0
+        self.last = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._cancelled = None
+        self._future = None
+        parameters = inspect.signature(compute).parameters.values()
+        if any(p.kind == p.VAR_KEYWORD for p in parameters):
+            self._arguments = None
+        else:
+            self._arguments = {p.name for p in parameters}
+        self.status = Label()
+
+        def submit(**values):
+            # interactive calls submit once while it is being made; run it after
+            if hasattr(self, 'controls'):
+                self._submit(values)
+
+        self.controls = interactive(submit, clear_output=False, **controls)
+        super().__init__([self.controls, self.status])
+        self.controls.update()
+
+    @property
+    def output(self):
+        return self.controls.out
+
+    def _run(self, cancelled, arguments):
+        _local.cancelled = cancelled
+        try:
+            check_cancelled()
+            return arguments, self.compute(**arguments)
+        finally:
+            _local.cancelled = None
+
+    def _submit(self, values):
+        if self._arguments is None:
+            arguments = dict(values)
+        else:
+            arguments = {name: value for name, value in values.items() if name in self._arguments}
+        # Supersede the computation in flight
+        self.generation += 1
+        generation = self.generation
+        if self._cancelled is not None:
+            self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
+
+        loop = _running_loop()
+        if self.last is not None and self.last[0] == arguments:
+            self._draw(self.last[1], values)
+        elif loop is None:
+            self.last = arguments, self.compute(**arguments)
+            self._draw(self.last[1], values)
+        else:
+            self._cancelled = cancelled = threading.Event()
+            self.status.value = 'Computing...'
+            self._future = self._executor.submit(self._run, cancelled, arguments)
+            self._future.add_done_callback(
+                lambda future: loop.call_soon_threadsafe(self._finish, generation, future, values))
+
+    def _draw(self, result, values):
+        self.status.value = ''
+        with self.output:
+            clear_output(wait=True)
+            self.plot(result, **values)
+            show_inline_matplotlib_plots()
+
+    def _finish(self, generation, future, values):
+        """Draw the result of the latest event, in the main thread."""
+        if generation != self.generation or future.cancelled():
+            return
+        try:
+            self.last = future.result()
+        except Cancelled:
+            return
+        except Exception:
+            self.status.value = ''
+            with self.output:
+                clear_output(wait=True)
+                raise
+        self._draw(self.last[1], values)
+
+
+def interact_async(compute, plot, **controls):
+    """Display controls like interact(f, **controls), with f(**values) split
+    into compute(**values) in a background thread and plot(result, **values)
+    for the result of the latest event. Returns the AsyncInteractive."""
+    widget = AsyncInteractive(compute, plot, **controls)
+    display(widget)
+    return widget
@@ -0,0 +1,24 @@
+"""
+The lecture code is a set of flat modules in folders whose names are not
+valid package names, so the tests import it the way the notebooks do: with
+the folder on sys.path. The folders are appended, after the standard
+library, and sscp_tools is imported from the top of the repository when it
+is not installed.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FOLDERS = ['L04 (Ion Channel Gating)',
+           os.path.join('L05 (Building Ion Channel Models)', 'E5'),
+           os.path.join('L05 (Building Ion Channel Models)', 'E5', 'Old'),
+           os.path.join('L06 (Simulating Action Potentials)', 'E6')]
+
+for folder in [''] + FOLDERS:
+    path = os.path.join(ROOT, folder).rstrip(os.sep)
+    if path not in sys.path:
+        sys.path.append(path)
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
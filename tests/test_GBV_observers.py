@@ -0,0 +1,63 @@
+"""Observers driven by integrate alone and by pace."""
+
+import numpy as np
+from scipy.integrate import odeint
+
+from GBV_biomarkers import ca_duration
+from GBV_observers import integrate, pace, BiomarkerObserver, TrajectoryRecorder
+
+
+def test_integrate_starts_the_recorder():
+    trace = TrajectoryRecorder(every=0.25)
+    y = integrate(lambda y, t: -y, [1.0], 0.0, 2.0, observers=[trace])
+    t, Y = trace.result()
+    assert np.allclose(t, np.arange(0, 2.01, 0.25))
+    assert np.allclose(Y[:, 0], np.exp(-t), rtol=1e-5)
+    assert np.isclose(y[0], np.exp(-2.0), rtol=1e-5)
+
+
+def test_integrate_starts_the_biomarkers():
+    # A pulse of V followed by a relaxation, and a Ca transient after it
+    def rhs(y, t):
+        V, Ca = y
+        stimulus = 50.0 if t < 2 else 0.0
+        return [stimulus - 0.05*(V + 80), 0.02*(V + 80) - 0.01*Ca]
+
+    markers = BiomarkerObserver(0, 1, levels=(0.5, 0.9))
+    integrate(rhs, [-80.0, 0.0], 0.0, 300.0, observers=[markers])
+    beats = markers.result()
+    assert len(beats) == 1
+    assert np.isclose(beats['V_rest'][0], -80.0)
+    assert beats['V_peak'][0] > -80.0
+    # V decays exponentially with rate 0.05 after the pulse
+    assert np.isclose(beats['APD50'][0] - (2.0 - beats['t_upstroke'][0]), np.log(2)/0.05, rtol=1e-3)
+    assert np.isfinite(beats['Ca_peak'][0])
+
+
+def test_pace_starts_every_beat_once():
+    def rhs(y, t):
+        return [(5.0 if t < 1 else 0.0) - 0.1*y[0]]
+
+    markers = BiomarkerObserver(0)
+    trace = TrajectoryRecorder(every=10.0)
+    pace(rhs, [0.0], 100.0, 3, observers=[markers, trace], breaks=(1.0,))
+    t, Y = trace.result()
+    assert len(markers.result()) == 3
+    assert np.allclose(t, np.arange(0, 300.1, 10.0))
+
+
+def test_ca_duration_matches_the_biomarkers():
+    # The same pulse; CaTD90 is measured from the fastest rise of Ca, as in GBV_biomarkers
+    def rhs(y, t):
+        V, Ca = y
+        stimulus = 50.0 if t < 2 else 0.0
+        return [stimulus - 0.05*(V + 80), 0.02*(V + 80) - 0.01*Ca]
+
+    markers = BiomarkerObserver(0, 1)
+    integrate(rhs, [-80.0, 0.0], 0.0, 600.0, observers=[markers])
+    t = np.linspace(0, 600, 60001)
+    pulse = odeint(rhs, [-80.0, 0.0], t[:201], rtol=1e-10, atol=1e-12)
+    Y = np.vstack([pulse, odeint(rhs, pulse[-1], t[200:], rtol=1e-10, atol=1e-12)[1:]])
+    CaTD90 = markers.result()['CaTD90'][0]
+    assert np.isfinite(CaTD90)
+    assert abs(CaTD90 - ca_duration(t, Y[:, 1], 0.9)) < 0.05
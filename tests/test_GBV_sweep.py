@@ -0,0 +1,19 @@
+import os
+
+import numpy as np
+
+import GBV_sweep
+from GBV_sweep import grid, sweep
+
+Y0 = np.load(os.path.join(os.path.dirname(GBV_sweep.__file__), 'Widget_init.npy'))
+
+
+def test_sweep_reports_the_last_paced_beat():
+    samples = grid(Gkr=[0.5])
+    first = sweep(samples, beats=1, y0=Y0, processes=1)
+    third = sweep(samples, beats=3, y0=Y0, processes=1)
+    assert third['Gkr'][0] == 0.5 and third['GNa'][0] == 1
+    for name in GBV_sweep.BIOMARKERS:
+        assert np.isfinite(third[name][0])
+    # The cell is still adapting to the smaller Gkr over the first beats
+    assert third['APD90'][0] != first['APD90'][0]
@@ -0,0 +1,46 @@
+import numpy as np
+
+import L4_code
+from L4_code import ReducedAPModel
+
+
+def finite_difference_jacobian(model, Y, eps=1e-6):
+    J = np.zeros((2, 2))
+    for i in range(2):
+        dY = np.zeros(2)
+        dY[i] = eps
+        J[:, i] = (model.dY_dt(Y + dY) - model.dY_dt(Y - dY))/(2*eps)
+    return J
+
+
+def test_jacobian_matches_finite_differences():
+    for params in [(), (-50.0, -5.0, -70.0, -30.0), (-90.0, 10.0, -60.0, -10.0)]:
+        model = ReducedAPModel(*params)
+        for Y in [(-80.0, 0.9), (-50.0, 0.5), (0.0, 0.1), (30.0, 0.01)]:
+            Y = np.array(Y)
+            assert np.allclose(model.jacobian(Y), finite_difference_jacobian(model, Y), rtol=1e-5, atol=1e-8)
+
+
+def test_jacobian_of_arrays():
+    model = ReducedAPModel()
+    V = np.linspace(-90, 40, 7)
+    h = np.linspace(0.05, 0.95, 7)
+    J = model.jacobian(np.array([V, h]))
+    assert J.shape == (2, 2, 7)
+    for k in range(7):
+        assert np.allclose(J[..., k], model.jacobian(np.array([V[k], h[k]])))
+
+
+def test_solve_leaves_the_module_functions_alone():
+    time = np.linspace(0, 2, 21)
+    L4_code.solve(time, -50, 0.5, -50, -5, -70, -30)
+    assert L4_code.m_inf(-40.0) == ReducedAPModel().m_inf(-40.0)
+
+
+def test_legacy_functions_take_a_model():
+    model = ReducedAPModel(-50.0, -5.0, -70.0, -30.0)
+    assert L4_code.m_inf(-40.0, model) == model.m_inf(-40.0)
+    assert L4_code.dY_dt([-40.0, 0.5], model=model) == list(model.dY_dt([-40.0, 0.5]))
+    lambda_max, V_eq, h_eq = L4_code.check_stability(-70, model)
+    assert abs(model.dVdt_scalar(V_eq)) < 1e-8
+    assert h_eq == model.h_inf(V_eq)
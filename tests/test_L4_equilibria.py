@@ -0,0 +1,36 @@
+import io
+import contextlib
+
+import numpy as np
+
+import L4_code
+from L4_equilibria import scan, grid, count, DEFAULTS
+
+
+def test_scan_finds_every_equilibrium_of_check_stability():
+    # The comparison of benchmark(), on a coarser grid
+    points = grid(Vam=np.linspace(-120, 0, 7), Vbh=np.linspace(-100, 0, 7))
+    table = scan(**points)
+    n = len(points['Vam'])
+    for i in range(n):
+        model = L4_code.ReducedAPModel(*(points[name][i] for name in DEFAULTS))
+        rows = table[table['point'] == i]
+        for guess in range(-80, -40, 10):
+            with np.errstate(all='ignore'), contextlib.redirect_stdout(io.StringIO()):
+                lambda_max, V_eq, h_eq = L4_code.check_stability(guess, model)
+            if h_eq < -1:
+                continue
+            k = np.argmin(np.abs(rows['V_eq'] - V_eq))
+            assert abs(rows['V_eq'][k] - V_eq) < 1e-4
+            assert np.isclose(rows['h_eq'][k], h_eq, atol=1e-6)
+            assert np.isclose(rows['lambda_max'][k], lambda_max, rtol=1e-3, atol=1e-4)
+
+
+def test_scan_of_the_defaults():
+    table = scan()
+    model = L4_code.ReducedAPModel()
+    total, unstable = count(table, 1)
+    assert total[0] == len(table) >= 1
+    for row in table:
+        assert abs(model.dVdt_scalar(row['V_eq'])) < 1e-8
+        assert (row['lambda_max'] > 0) == (row['kind'] in ('saddle', 'unstable node', 'unstable focus'))
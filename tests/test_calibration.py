@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pytest
+
+from calibration import EvaluationLog, Evaluator, multistart
+
+BOUNDS = [(0.1, 10), (0.1, 10)]
+STARTS = np.array([[5.0, 5.0], [0.5, 8.0]])
+
+
+def quadratic(x):
+    return (x[0] - 2)**2 + (x[1] - 3)**2
+
+
+def test_batch_cost_that_raises():
+    def cost(X):
+        if np.any(X[:, 0] > 5):
+            raise ValueError("no solution")
+        return X.sum(axis=1)
+
+    X = np.array([[1.0, 1.0], [6.0, 1.0], [2.0, 2.0]])
+    with Evaluator(cost, batch=True, processes=1) as evaluate:
+        f = evaluate(X)
+    assert np.array_equal(f, [2.0, np.inf, 4.0])
+
+
+def test_interrupted_multistart_resumes_from_the_log(tmp_path):
+    path = str(tmp_path/'log.txt')
+    full = multistart(quadratic, STARTS, bounds=BOUNDS, processes=1, maxfev=60)
+    total = full['nfev'].sum()
+
+    calls = []
+
+    def interrupted(x):
+        calls.append(x)
+        if len(calls) > 70:
+            raise KeyboardInterrupt
+        return quadratic(x)
+
+    with pytest.raises(KeyboardInterrupt):
+        multistart(interrupted, STARTS, bounds=BOUNDS, processes=1, maxfev=60, log=EvaluationLog(path))
+    # The first search finished, the points of the second are in its part file
+    assert os.path.exists(path + '.part1')
+
+    log = EvaluationLog(path)
+    assert len(log) == 70
+    assert not os.path.exists(path + '.part1')
+
+    calls.clear()
+    table = multistart(quadratic, STARTS, bounds=BOUNDS, processes=1, maxfev=60, log=log)
+    assert np.array_equal(np.sort(table['f']), np.sort(full['f']))
+    assert len(EvaluationLog(path)) <= total
@@ -0,0 +1,34 @@
+import os
+
+import numpy as np
+
+import sscp_tools
+from sscp_tools import limit_cycle as lc
+
+
+def pulse(y, t):
+    # Relaxation towards 0, pushed towards 10 during the first ms of a beat
+    return -y + 10*(t < 1)
+
+
+def test_limit_cycle_is_cached_in_the_given_directory(tmp_path):
+    cycle = lc.limit_cycle('pulse', pulse, [0.0], 10, breaks=(1.0,), cache_dir=str(tmp_path))
+    y0 = 10*(1 - np.exp(-1))*np.exp(-9)/(1 - np.exp(-10))
+    assert cycle.converged and not cycle.cached
+    assert abs(cycle.y[0] - y0) < 1e-6*y0
+    assert [name.startswith('pulse_bcl10_') for name in os.listdir(tmp_path)] == [True]
+
+    again = lc.limit_cycle('pulse', pulse, [0.0], 10, breaks=(1.0,), cache_dir=str(tmp_path))
+    assert again.cached and again.beats == 0
+    assert np.array_equal(again.y, cycle.y)
+
+
+def test_cache_dir_is_outside_the_package(monkeypatch, tmp_path):
+    package = os.path.dirname(os.path.abspath(sscp_tools.__file__))
+    assert not os.path.abspath(lc.CACHE_DIR).startswith(package)
+
+    monkeypatch.delenv('SSCP_TOOLS_CACHE', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert sscp_tools.cache_dir('limit_cycles') == os.path.join(str(tmp_path), 'sscp_tools', 'limit_cycles')
+    monkeypatch.setenv('SSCP_TOOLS_CACHE', 'cache')
+    assert sscp_tools.cache_dir('nopython') == os.path.join('cache', 'nopython')
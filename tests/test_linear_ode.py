@@ -0,0 +1,52 @@
+import numpy as np
+from scipy.integrate import odeint
+
+from sscp_tools import linear_ode
+
+
+def compare(rhs, y0, t, breaks=(), tfirst=False, exact=None):
+    Y, counts = linear_ode.solve(rhs, y0, t, breaks=breaks, tfirst=tfirst, full_output=True)
+    reference = odeint(rhs, y0, t, tfirst=tfirst, tcrit=list(breaks) or None, rtol=1e-10, atol=1e-12)
+    assert Y.shape == reference.shape
+    assert np.allclose(Y, reference, rtol=1e-6, atol=1e-7)
+    if exact is not None:
+        assert counts['exact'] == exact
+    return Y, counts
+
+
+def test_gating_equation():
+    t = np.arange(0, 1, 0.01)
+    Y, _ = compare(lambda m, t: 4*(1 - m) - 2*m, 0.0, t, exact=1)
+    assert np.allclose(Y[:, 0], 2/3*(1 - np.exp(-6*t)), rtol=1e-12, atol=1e-14)
+
+
+def test_stimulus_switched_off():
+    def conductances(V, t):
+        I_app = -1.0 if t < 1 else 0.0
+        return (-I_app - 0.3*(V - 50) - 0.2*(V + 80))/0.05
+    compare(conductances, -60.0, np.arange(0, 2, 0.01), breaks=(1.0,), exact=2)
+
+
+def test_voltage_clamp_tfirst():
+    def clamp(t, V):
+        return -(V - ((t > 2)*(t < 6)*40 - 80))/(10*0.05)
+    compare(clamp, -80.0, np.linspace(0, 10, 101), breaks=(2.0, 6.0), tfirst=True, exact=3)
+
+
+def test_two_states():
+    def two_states(y, t):
+        return np.array([-2*y[0] + y[1] + (t < 1), 0.5*y[0] - y[1]])
+    compare(two_states, [0.0, 0.0], np.arange(0, 5, 0.01), breaks=(1.0,), exact=2)
+
+
+def test_nonlinear_segments_use_odeint():
+    _, counts = compare(lambda y, t: -y**2, 1.0, np.linspace(0, 3, 31))
+    assert counts == dict(exact=0, numerical=1)
+
+
+def test_solve_affine():
+    t = np.linspace(0, 4, 41)
+    A = np.array([[-1.0, 2.0], [-2.0, -1.0]])
+    Y = linear_ode.solve_affine(A, [1.0, 0.0], [0.5, -0.5], t)
+    reference = odeint(lambda y, t: A @ y + [1.0, 0.0], [0.5, -0.5], t, rtol=1e-10, atol=1e-12)
+    assert np.allclose(Y, reference, rtol=1e-6, atol=1e-7)
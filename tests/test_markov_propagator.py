@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+from scipy.integrate import ode
+from scipy.linalg import expm
+
+import markov_propagator
+from markov_propagator import Propagator, batch_clamp
+from ObFunc import Init, markov_rhs, rate_matrix
+
+# The defaults of the sliders of Markov_Widget and the step potentials of SS.txt
+P = [45, 20, 65, 50, 20, 15, 1.0, 0.023, 29, 15, 2e-5, 2e-5, 0.5]
+V = np.loadtxt(os.path.join(os.path.dirname(markov_propagator.__file__), 'SS.txt'))[:, 0]
+Y0 = Init(-70, P)
+
+
+def stepped(y0, V, dt, n_steps):
+    # expm(A(V)*dt) applied n_steps times, every sample
+    E = np.array([expm(rate_matrix(np.array(P + [v]))*dt) for v in V])
+    y = np.broadcast_to(y0, (len(V), len(Y0)))
+    Y = [y]
+    for _ in range(n_steps):
+        y = np.einsum('vij,vj->vi', E, y)
+        Y.append(y)
+    return np.array(Y)
+
+
+def test_clamp_matches_expm_stepping():
+    Y = Propagator(rate_matrix).clamp(P, Y0, V, 0.1, 10000)
+    assert Y.shape == (10001, len(V), 7)
+    assert np.abs(Y - stepped(Y0, V, 0.1, 10000)).max() < 1e-11
+
+
+def test_clamp_matches_vode():
+    # The vode loop of Activation, over 200 ms
+    dt, n_steps = 0.1, 2000
+    reference = np.empty((n_steps, len(V)))
+    for n, v in enumerate(V):
+        r = ode(lambda t, y, P: markov_rhs(y, P))
+        r.set_integrator('vode', method='bdf', with_jacobian=False, rtol=1e-5, max_step=0.1)
+        r.set_initial_value(Y0, 0).set_f_params(np.array(P + [v]))
+        for ind in range(n_steps):
+            r.integrate(r.t + dt)
+            reference[ind, n] = r.y[0]
+    Y = Propagator(rate_matrix).clamp(P, Y0, V, dt, n_steps)
+    assert np.abs(Y[1:, :, 0] - reference).max() < 1e-6
+
+
+def test_protocol_of_a_prepulse_and_a_test_pulse():
+    prepulses = np.arange(-80, 1, 20.0)
+    propagator = Propagator(rate_matrix)
+    Y = propagator.protocol(P, Y0, [(prepulses, 500), (40.0, 200)], dt=0.1)
+    assert Y.shape == (701, len(prepulses), 7)
+    first = stepped(Y0, prepulses, 0.1, 500)
+    second = stepped(first[-1], np.full(len(prepulses), 40.0), 0.1, 200)
+    assert np.abs(Y - np.concatenate([first, second[1:]])).max() < 1e-11
+    # The voltage and parameter vector of the test pulse are cached
+    assert propagator._eig.cache_info().currsize == len(prepulses) + 1
+
+
+def test_batch_clamp_matches_expm_per_model():
+    rng = np.random.default_rng(0)
+    candidates = np.array(P)*rng.uniform(0.8, 1.25, size=(4, len(P)))
+    A = np.array([[rate_matrix(np.append(p, v)) for v in (-40.0, 20.0)] for p in candidates])
+    t = np.linspace(0, 50, 11)
+    Y = batch_clamp(A, Y0, t)
+    assert Y.shape == (4, 2, 11, 7)
+    for index in np.ndindex(4, 2):
+        reference = expm(A[index]*t[:, None, None]) @ Y0
+        assert np.abs(Y[index] - reference).max() < 1e-11
+    assert np.allclose(batch_clamp(A, Y0, t, rows=0), Y[..., :1], rtol=0, atol=1e-15)
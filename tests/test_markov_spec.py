@@ -0,0 +1,48 @@
+import numpy as np
+
+from sscp_tools.markov_spec import P_KUR, P_NA, MarkovModel, hand_kur, hand_na
+
+import ObFunc
+import E6
+
+MODELS = [(ObFunc.IKUR, hand_kur, P_KUR), (E6.NA_MARKOV, hand_na, P_NA)]
+V = np.linspace(-100, 60, 161)
+
+
+def test_matrix_matches_the_hand_written_matrices():
+    for model, hand, P in MODELS:
+        reference = np.array([hand(v) for v in V])
+        A = model.matrix(V, P)
+        assert A.shape == reference.shape
+        assert np.allclose(A, reference, rtol=1e-12, atol=1e-12*np.abs(reference).max())
+        assert np.allclose(model.matrix(-20.0, P), hand(-20.0), rtol=1e-12, atol=0)
+
+
+def test_rhs_and_voltage_derivative():
+    for model, hand, P in MODELS:
+        y = np.full(model.n, 1/model.n)
+        assert np.allclose(model.rhs(y, -20.0, P), hand(-20.0) @ y, rtol=1e-12, atol=1e-15)
+        h = 1e-4
+        numerical = (model.rhs(y, -20.0 + h, P) - model.rhs(y, -20.0 - h, P))/(2*h)
+        assert np.allclose(model.voltage_derivative(y, -20.0, P), numerical, rtol=1e-5, atol=1e-9)
+
+
+def test_steady_state():
+    y = E6.NA_MARKOV.steady_state(-90.0, P_NA)
+    assert abs(y.sum() - 1) < 1e-12
+    assert np.abs(E6.NA_MARKOV.rhs(y, -90.0, P_NA)).max() < 1e-10
+
+
+def test_compiled_rhs_matches_the_vectorized_rhs():
+    # minimum and where are rewritten for the scalar code
+    rates = dict(ObFunc.IKUR_SPEC.rates, alpha='minimum(exp((V-P[0])/P[1]), 1e3)')
+    transitions = ObFunc.IKUR_SPEC.transitions[:-1] + [('O', 'I', 'where(V > 0, P[11], 0.5*P[11])')]
+    spec = ObFunc.IKUR_SPEC._replace(rates=rates, transitions=transitions)
+    compiled, reference = MarkovModel(spec, compiled=True), MarkovModel(spec)
+    y = np.random.default_rng(1).random(7)
+    for v in (-100.0, -20.0, 40.0, 200.0):
+        assert np.allclose(compiled.rhs(y, v, P_KUR), reference.rhs(y, v, P_KUR), rtol=1e-13, atol=1e-15)
+    # ObFunc.f goes through the compiled IKur model
+    assert ObFunc.IKUR.compiled
+    assert np.allclose(ObFunc.f(0.0, y, np.append(P_KUR[:-1], -20.0)),
+                       MarkovModel(ObFunc.IKUR_SPEC).rhs(y, -20.0, P_KUR[:-1]), rtol=1e-13, atol=1e-15)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+
+from sscp_tools.stochastic_channels import (gillespie, histograms, simulate_channels,
+                                          simulate_counts, tau_leap)
+
+A = np.array([[-5.0, 10.0, 0.0],
+              [5.0, -11.0, 0.0],
+              [0.0, 1.0, 0.0]])
+
+
+def test_simulate_channels_refuses_huge_records():
+    with pytest.raises(ValueError, match='simulate_counts'):
+        simulate_channels(A, 0.01, 10**4, 10**6)
+
+
+def test_engines_follow_the_master_equation():
+    dt, n_steps, N = 0.01, 200, 20000
+    exact = np.array([expm(A*dt*k)[:, 0] for k in range(0, n_steps + 1, 50)])
+    S = simulate_channels(A, dt, n_steps, N, seed=1, every=50)
+    counts = simulate_counts(A, dt, n_steps, N, seed=1, every=50)
+    assert S.shape == (5, N) and counts.shape == (5, 3)
+    p = np.stack([np.mean(S == i, axis=1) for i in range(3)], axis=1)
+    # First-order steps of dt = 0.01 and 20000 channels: a few percent
+    assert np.abs(p - exact).max() < 0.03
+    assert np.abs(counts/N - exact).max() < 0.03
+    assert np.all(counts.sum(axis=1) == N)
+
+
+@pytest.mark.parametrize('engine', ['gillespie', 'exact', 'dt'])
+def test_population_engines_follow_the_master_equation(engine):
+    N, trials = 50, 4000
+    t = np.array([0.0, 0.05, 0.2, 0.5])
+    if engine == 'gillespie':
+        counts = gillespie(A, N, t, trials=trials, seed=2)
+    elif engine == 'exact':
+        counts = tau_leap(A, N, t, trials=trials, seed=2)
+    else:
+        counts = tau_leap(A, N, t, trials=trials, dt=0.001, seed=2)
+    assert counts.shape == (trials, len(t), 3)
+    assert np.all(counts.sum(axis=2) == N) and np.all(counts[:, 0, 0] == N)
+    # The channels are independent: the open count is binomial
+    p = expm(A*t[-1])[0, 0]
+    mean, var = N*p, N*p*(1 - p)
+    opened = counts[:, -1, 0]
+    assert abs(opened.mean() - mean) < 5*np.sqrt(var/trials)
+    assert abs(opened.var() - var) < 0.15*var
+
+
+def test_absorbing_state():
+    t = np.linspace(0, 1, 5)
+    for counts in (gillespie(A, 10, t, trials=3, state0=2, seed=3),
+                   tau_leap(A, 10, t, trials=3, state0=2, seed=3),
+                   tau_leap(A, 10, t, trials=3, state0=2, dt=0.1, seed=3)):
+        assert np.all(counts[:, :, 2] == 10)
+
+
+def test_histograms():
+    N = 10
+    counts = tau_leap(A, N, [0.0, 0.5], trials=200, seed=4)
+    edges, histogram = histograms(counts, N, bins=5)
+    assert np.allclose(edges, np.linspace(0, 1, 6))
+    assert histogram.shape == (2, 3, 5)
+    assert np.all(histogram.sum(axis=2) == 200)
+    # All channels start in state 0, which falls in the last bin
+    assert histogram[0, 0, -1] == 200 and histogram[0, 1, 0] == 200
+    expected = np.bincount(np.minimum(counts[:, 1, 0]*5//N, 4), minlength=5)
+    assert np.array_equal(histogram[1, 0], expected)